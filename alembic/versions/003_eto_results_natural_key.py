@@ -0,0 +1,56 @@
+"""Add natural key to eto_results
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+
+Este script:
+1. Adiciona a coluna 'source' em 'eto_results'
+2. Arredonda lat/lng para 4 casas decimais
+3. Remove linhas duplicadas (mantém a mais recente)
+4. Cria restrição única (lat, lng, date, source) usada pelo upsert em massa
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'eto_results',
+        sa.Column('source', sa.String(50), nullable=False, server_default='nasa_power')
+    )
+
+    op.execute("UPDATE eto_results SET lat = round(lat::numeric, 4), lng = round(lng::numeric, 4)")
+
+    # Remover duplicatas antes de criar a restrição única
+    op.execute("""
+        DELETE FROM eto_results a
+        USING eto_results b
+        WHERE a.lat = b.lat
+          AND a.lng = b.lng
+          AND a.date = b.date
+          AND a.source = b.source
+          AND a.id < b.id
+    """)
+
+    op.create_unique_constraint(
+        'uq_eto_results_natural_key',
+        'eto_results',
+        ['lat', 'lng', 'date', 'source']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_eto_results_natural_key', 'eto_results', type_='unique')
+    op.drop_column('eto_results', 'source')
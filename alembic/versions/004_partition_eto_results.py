@@ -0,0 +1,125 @@
+"""Partition eto_results by year with BRIN indexes
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+Este script:
+1. Renomeia 'eto_results' para 'eto_results_legacy'
+2. Cria 'eto_results' particionada por RANGE (date), uma partição por ano
+3. Cria índices BRIN em date e (lat, lng) — baratos e eficientes para
+   consultas por intervalo de datas e bounding box
+4. Copia os dados e remove a tabela legada
+
+Novas partições anuais são criadas sob demanda por
+``backend.database.data_storage.ensure_eto_partitions``.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FIRST_YEAR = 1990
+
+COLUMNS = (
+    "lat, lng, elevation, date, t2m_max, t2m_min, rh2m, ws2m, "
+    "radiation, precipitation, eto, source"
+)
+
+
+def _create_year_partition(year: int) -> None:
+    op.execute(f"""
+        CREATE TABLE IF NOT EXISTS eto_results_y{year}
+        PARTITION OF eto_results
+        FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE eto_results RENAME TO eto_results_legacy")
+    op.execute("ALTER TABLE eto_results_legacy RENAME CONSTRAINT uq_eto_results_natural_key TO uq_eto_results_legacy_key")
+    op.execute("ALTER SEQUENCE eto_results_id_seq RENAME TO eto_results_legacy_id_seq")
+    for name in ("ix_eto_results_id", "ix_eto_results_lat", "ix_eto_results_lng", "ix_eto_results_date"):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    # A chave de partição (date) precisa fazer parte da PK e da chave única
+    op.execute("""
+        CREATE TABLE eto_results (
+            id bigserial NOT NULL,
+            lat double precision NOT NULL,
+            lng double precision NOT NULL,
+            elevation double precision,
+            date timestamp NOT NULL,
+            t2m_max double precision,
+            t2m_min double precision,
+            rh2m double precision,
+            ws2m double precision,
+            radiation double precision,
+            precipitation double precision,
+            eto double precision NOT NULL,
+            source varchar(50) NOT NULL DEFAULT 'nasa_power',
+            PRIMARY KEY (id, date),
+            CONSTRAINT uq_eto_results_natural_key UNIQUE (lat, lng, date, source)
+        ) PARTITION BY RANGE (date)
+    """)
+
+    for year in range(FIRST_YEAR, date.today().year + 2):
+        _create_year_partition(year)
+
+    op.execute("CREATE INDEX idx_eto_results_date_brin ON eto_results USING brin (date)")
+    op.execute("CREATE INDEX idx_eto_results_coords_brin ON eto_results USING brin (lat, lng)")
+
+    # Garante partições para anos fora do intervalo padrão já presentes
+    op.execute("""
+        DO $$
+        DECLARE y int;
+        BEGIN
+            FOR y IN SELECT DISTINCT extract(year FROM date)::int FROM eto_results_legacy LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS eto_results_y%s PARTITION OF eto_results '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    y, make_date(y, 1, 1), make_date(y + 1, 1, 1)
+                );
+            END LOOP;
+        END $$;
+    """)
+
+    op.execute(f"INSERT INTO eto_results ({COLUMNS}) SELECT {COLUMNS} FROM eto_results_legacy")
+    op.execute("DROP TABLE eto_results_legacy")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE eto_results RENAME TO eto_results_partitioned")
+    op.execute("ALTER TABLE eto_results_partitioned RENAME CONSTRAINT uq_eto_results_natural_key TO uq_eto_results_partitioned_key")
+    op.execute("""
+        CREATE TABLE eto_results (
+            id serial PRIMARY KEY,
+            lat double precision NOT NULL,
+            lng double precision NOT NULL,
+            elevation double precision,
+            date timestamp NOT NULL,
+            t2m_max double precision,
+            t2m_min double precision,
+            rh2m double precision,
+            ws2m double precision,
+            radiation double precision,
+            precipitation double precision,
+            eto double precision NOT NULL,
+            source varchar(50) NOT NULL DEFAULT 'nasa_power',
+            CONSTRAINT uq_eto_results_natural_key UNIQUE (lat, lng, date, source)
+        )
+    """)
+    op.execute(f"INSERT INTO eto_results ({COLUMNS}) SELECT {COLUMNS} FROM eto_results_partitioned")
+    op.execute("DROP TABLE eto_results_partitioned CASCADE")
+    op.create_index('ix_eto_results_id', 'eto_results', ['id'])
+    op.create_index('ix_eto_results_lat', 'eto_results', ['lat'])
+    op.create_index('ix_eto_results_lng', 'eto_results', ['lng'])
+    op.create_index('ix_eto_results_date', 'eto_results', ['date'])
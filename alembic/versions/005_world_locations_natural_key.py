@@ -0,0 +1,45 @@
+"""Add natural key to world_locations
+
+Revision ID: 005_world_locations_key
+Revises: 002_cache_favorites
+Create Date: 2026-10-19
+
+Este script:
+1. Remove linhas duplicadas de 'world_locations' (mantém a mais recente)
+2. Cria índice único (location_name, country_code, lat, lon), usado pelo
+   upsert da carga em streaming (scripts/load_data_to_pg.py)
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005_world_locations_key'
+down_revision = '002_cache_favorites'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade: adiciona chave natural em world_locations."""
+    op.execute(
+        """
+        DELETE FROM world_locations a
+        USING world_locations b
+        WHERE a.location_name = b.location_name
+          AND a.country_code = b.country_code
+          AND a.lat = b.lat
+          AND a.lon = b.lon
+          AND a.id < b.id
+        """
+    )
+
+    op.create_index(
+        'uq_world_locations_natural_key',
+        'world_locations',
+        ['location_name', 'country_code', 'lat', 'lon'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade: remove chave natural."""
+    op.drop_index('uq_world_locations_natural_key', table_name='world_locations')
@@ -82,8 +82,8 @@ def upgrade() -> None:
         sa.Column('n_days', sa.Integer, nullable=True, comment='Dias de dados usados'),
         sa.Column('created_at', sa.DateTime, nullable=False, server_default=sa.func.now()),
         sa.Column('updated_at', sa.DateTime, nullable=False, server_default=sa.func.now()),
-        schema='climate_history',
-        sa.UniqueConstraint('city_id', 'period_key', 'month', name='uq_monthly_normals')
+        sa.UniqueConstraint('city_id', 'period_key', 'month', name='uq_monthly_normals'),
+        schema='climate_history'
     )
     
     # Índices para monthly_climate_normals
@@ -129,8 +129,8 @@ def upgrade() -> None:
         sa.Column('proximity_weight', sa.Float, nullable=True, comment='Peso = 1/distance'),
         sa.Column('confidence_score', sa.Float, nullable=True, comment='0-1, baseado em overlap de dados'),
         sa.Column('created_at', sa.DateTime, nullable=False, server_default=sa.func.now()),
-        schema='climate_history',
-        sa.UniqueConstraint('city_id', 'station_id', name='uq_city_station')
+        sa.UniqueConstraint('city_id', 'station_id', name='uq_city_station'),
+        schema='climate_history'
     )
     
     # Índices para city_nearby_stations
@@ -0,0 +1,176 @@
+// Camadas do mapa mundial renderizadas no navegador.
+//
+// - dashExtensions.map: funções referenciadas pelas props dos dl.GeoJSON
+//   ({"variable": "dashExtensions.map.<nome>"}): pontos e clusters
+//   coloridos pela ETo (classes/cores vêm do ``hideout`` da camada)
+// - dash_clientside.map: callbacks clientside (sem round trip ao servidor)
+
+(function () {
+    function escapeHtml(value) {
+        return String(value === undefined || value === null ? '' : value)
+            .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;')
+            .replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+    }
+
+    function etoColor(eto, hideout) {
+        if (eto === undefined || eto === null || !hideout) {
+            return (hideout && hideout.neutralColor) || '#6c757d';
+        }
+        let color = hideout.colorscale[0];
+        hideout.classes.forEach(function (limit, i) {
+            if (eto >= limit) { color = hideout.colorscale[i]; }
+        });
+        return color;
+    }
+
+    function featureTooltip(props) {
+        let text = '<b>' + escapeHtml(props.name) + '</b>';
+        if (props.uf || props.country_code) {
+            text += ', ' + escapeHtml(props.uf || props.country_code);
+        }
+        if (props.eto !== undefined && props.eto !== null) {
+            text += '<br/>ETo: ' + Number(props.eto).toFixed(2) + ' mm/dia';
+        }
+        if (props.elevation !== undefined && props.elevation !== null) {
+            text += '<br/>Elevação: ' + Number(props.elevation).toFixed(1) + ' m';
+        }
+        return text;
+    }
+
+    const SELECTION_ICONS = {
+        user: 'https://raw.githubusercontent.com/pointhi/leaflet-color-markers/master/img/marker-icon-2x-blue.png',
+        click: 'https://raw.githubusercontent.com/pointhi/leaflet-color-markers/master/img/marker-icon-2x-red.png'
+    };
+
+    window.dashExtensions = Object.assign({}, window.dashExtensions, {
+        map: {
+            // Ponto de cidade colorido pela ETo do dia
+            pointToLayer: function (feature, latlng, context) {
+                const props = feature.properties || {};
+                return L.circleMarker(latlng, {
+                    radius: 6,
+                    color: '#ffffff',
+                    weight: 1,
+                    fillColor: etoColor(props.eto, context.hideout),
+                    fillOpacity: 0.9
+                }).bindTooltip(featureTooltip(props));
+            },
+
+            // Cluster: tamanho pela contagem, cor pela ETo média dos pontos
+            clusterToLayer: function (feature, latlng, index, context) {
+                const count = feature.properties.point_count;
+                const leaves = index.getLeaves(feature.properties.cluster_id, 500);
+                let sum = 0, n = 0;
+                leaves.forEach(function (leaf) {
+                    const eto = leaf.properties.eto;
+                    if (eto !== undefined && eto !== null) { sum += eto; n += 1; }
+                });
+                const color = etoColor(n ? sum / n : null, context.hideout);
+                const size = count < 10 ? 30 : count < 100 ? 36 : 44;
+                const icon = L.divIcon({
+                    html: '<div style="background-color:' + color + ';width:' + size +
+                        'px;height:' + size + 'px;line-height:' + size + 'px;">' +
+                        '<span>' + feature.properties.point_count_abbreviated + '</span></div>',
+                    className: 'marker-cluster eto-cluster',
+                    iconSize: L.point(size, size)
+                });
+                return L.marker(latlng, {icon: icon});
+            },
+
+            // Popup dos estados (propriedades do BR_UF_2024)
+            bindStatePopup: function (feature, layer) {
+                const props = feature.properties || {};
+                layer.bindPopup(
+                    '<div style="min-width:150px;">' +
+                    '<h6 style="margin:0 0 8px 0;color:#2d5016;">' + escapeHtml(props.NM_UF) + '</h6>' +
+                    '<hr style="margin:4px 0;"/><p style="margin:0;font-size:12px;">' +
+                    '<strong>UF:</strong> ' + escapeHtml(props.SIGLA_UF) + '<br/>' +
+                    '<strong>Região:</strong> ' + escapeHtml(props.NM_REGIA || 'N/A') +
+                    '</p></div>'
+                );
+            },
+
+            // Marcadores de seleção (geolocalização/clique) com popup
+            selectionMarker: function (feature, latlng) {
+                const props = feature.properties || {};
+                let html = '<h6 style="margin-bottom:8px;text-align:center;">' +
+                    escapeHtml(props.title) + '</h6>';
+                (props.details || []).forEach(function (item) {
+                    html += '<div style="font-size:13px;"><b>' + escapeHtml(item[0]) +
+                        ': </b>' + escapeHtml(item[1]) + '</div>';
+                });
+                if (props.type === 'click') {
+                    html += '<hr style="margin:8px 0;"/><div style="font-size:12px;' +
+                        'font-weight:bold;color:#2d5016;">⚡ Ações rápidas: use os ' +
+                        'botões acima do mapa</div>';
+                }
+                return L.marker(latlng, {
+                    icon: L.icon({
+                        iconUrl: SELECTION_ICONS[props.type] || SELECTION_ICONS.click,
+                        iconSize: [25, 41],
+                        iconAnchor: [12, 41],
+                        popupAnchor: [0, -34]
+                    })
+                }).bindPopup(html);
+            }
+        }
+    });
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        map: {
+            // markers-store -> FeatureCollection da camada dynamic-markers
+            markersToGeoJSON: function (markers) {
+                return {
+                    type: 'FeatureCollection',
+                    features: (markers || []).map(function (marker) {
+                        return {
+                            type: 'Feature',
+                            geometry: {
+                                type: 'Point',
+                                coordinates: [marker.position[1], marker.position[0]]
+                            },
+                            properties: {
+                                type: marker.type,
+                                title: marker.title,
+                                details: marker.details
+                            }
+                        };
+                    })
+                };
+            },
+
+            // Faixa de detalhe da camada Brasil conforme o zoom
+            brasilLayerUrl: function (zoom, config, currentUrl) {
+                if (!config || zoom === undefined || zoom === null) {
+                    return window.dash_clientside.no_update;
+                }
+                let band = config.bands[0].name;
+                config.bands.forEach(function (b) {
+                    if (zoom >= b.min_zoom) { band = b.name; }
+                });
+                const url = config.layers.br_uf[band];
+                return url === currentUrl ? window.dash_clientside.no_update : url;
+            },
+
+            // Clique em uma cidade (não em cluster) seleciona a localização
+            selectFeature: function (matopibaClick, worldClick) {
+                const ctx = window.dash_clientside.callback_context;
+                if (!ctx.triggered.length) {
+                    return window.dash_clientside.no_update;
+                }
+                const feature = ctx.triggered[0].prop_id.startsWith('matopiba-layer')
+                    ? matopibaClick : worldClick;
+                if (!feature || !feature.geometry || (feature.properties || {}).cluster) {
+                    return window.dash_clientside.no_update;
+                }
+                const props = feature.properties || {};
+                return {
+                    lat: feature.geometry.coordinates[1],
+                    lon: feature.geometry.coordinates[0],
+                    name: props.name,
+                    location_id: props.id === undefined ? null : props.id
+                };
+            }
+        }
+    });
+})();
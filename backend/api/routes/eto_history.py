@@ -0,0 +1,116 @@
+"""
+Rotas para consulta do histórico de ETo armazenado.
+
+Responsabilidade: GET /eto-history/point e /eto-history/bbox
+(séries colunares a partir de eto_results, sem chamar APIs externas)
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from backend.api.services.eto_history_service import (MAX_BBOX_ROWS,
+                                                      EToHistoryService)
+from backend.database import get_db
+
+router = APIRouter(prefix="/eto-history", tags=["ETo History"])
+
+
+def _parse_dates(start_date: str, end_date: str):
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Dates must be in YYYY-MM-DD format"
+        )
+    if start > end:
+        raise HTTPException(
+            status_code=400, detail="start_date must be <= end_date"
+        )
+    return start, end
+
+
+@router.get("/point", response_model=dict)
+async def get_point_history(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lng: float = Query(..., ge=-180, le=180, description="Longitude"),
+    start_date: str = Query(..., description="Data inicial (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="Data final (YYYY-MM-DD)"),
+    source: str = Query(default="nasa_power", description="Fonte dos dados"),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """
+    Retorna a série diária de ETo armazenada para um ponto.
+
+    Args:
+        lat: Latitude (arredondada para 4 casas decimais)
+        lng: Longitude (arredondada para 4 casas decimais)
+        start_date: Data inicial
+        end_date: Data final (inclusiva)
+        source: Fonte dos dados
+        db: Sessão do banco de dados
+
+    Returns:
+        Dict colunar (dates, eto, t2m_max, ...) com cobertura do intervalo
+    """
+    start, end = _parse_dates(start_date, end_date)
+    try:
+        series = EToHistoryService(db).get_point_series(
+            lat, lng, start, end, source
+        )
+        logger.info(
+            f"ETo history point ({lat}, {lng}) {start}..{end}: "
+            f"{series['coverage']['available_days']} dias"
+        )
+        return series
+    except Exception as e:
+        logger.error(f"Error retrieving ETo history: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/bbox", response_model=dict)
+async def get_bbox_history(
+    bbox: str = Query(..., description="Bounding box: 'west,south,east,north'"),
+    start_date: str = Query(..., description="Data inicial (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="Data final (YYYY-MM-DD)"),
+    source: str = Query(default="nasa_power", description="Fonte dos dados"),
+    limit: int = Query(
+        default=MAX_BBOX_ROWS, ge=1, le=MAX_BBOX_ROWS, description="Máximo de linhas"
+    ),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """
+    Retorna séries de ETo de todos os pontos dentro de uma bounding box.
+
+    Args:
+        bbox: 'west,south,east,north'
+        start_date: Data inicial
+        end_date: Data final (inclusiva)
+        source: Fonte dos dados
+        limit: Máximo de linhas retornadas
+        db: Sessão do banco de dados
+
+    Returns:
+        Dict colunar (lat, lng, dates, eto, ...) ordenado por ponto e data
+    """
+    try:
+        west, south, east, north = map(float, bbox.split(","))
+        if not (west < east and south < north):
+            raise ValueError("west must be < east, south < north")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid bbox format. Error: {str(e)}"
+        )
+
+    start, end = _parse_dates(start_date, end_date)
+    try:
+        return EToHistoryService(db).get_bbox_series(
+            west, south, east, north, start, end, source, limit
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving ETo bbox history: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -4,18 +4,45 @@ Estas rotas são consumidas pelo frontend Dash e não são expostas diretamente
 ao usuário.
 """
 
+import os
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Union
 
+import numpy as np
+import pandas as pd
 from fastapi import APIRouter, HTTPException
 from loguru import logger
+from starlette.concurrency import run_in_threadpool
 
+from backend.api.services.climate_normals_cube import (MAX_STATION_DISTANCE_KM,
+                                                       normals_cube)
+from backend.api.services.eto_fast_path import eto_fast_path
+from backend.api.services.eto_history_service import EToHistoryService
+from backend.api.services.eto_task_dedup import eto_task_dedup
 from backend.api.services.openmeteo_smart_client import OpenMeteoSmartClient
+from backend.core.data_processing.gap_filling import fill_series
+from backend.core.data_processing.quality_control import \
+    quality_control_series
 from backend.core.eto_calculation.eto_calculation import calculate_eto_pipeline
+from backend.database.connection import get_db_context
+from backend.infrastructure.celery.tasks.eto_batch_tasks import \
+    eto_batch_submitter
 from utils.logging import configure_logging
 
 configure_logging()
 
+# Requisições do /eto_calculate agregadas em lotes pelo worker
+# (ver eto_batch_tasks); "false" volta a uma task por requisição
+ETO_MICRO_BATCHING = os.getenv("ETO_MICRO_BATCHING", "true").lower() == "true"
+
+# Jobs curtos com dados no cache calculados no processo da API
+# (ver eto_fast_path); "false" envia tudo ao Celery
+ETO_FAST_PATH = os.getenv("ETO_FAST_PATH", "true").lower() == "true"
+
+# Períodos já gravados em eto_results respondidos do banco
+# (ver eto_history_service); "false" sempre recalcula
+ETO_REUSE_STORED = os.getenv("ETO_REUSE_STORED", "true").lower() == "true"
+
 # Router interno para funções de ETo, consumido pelo Dash
 eto_router = APIRouter(
     prefix="/internal/eto", 
@@ -23,6 +50,29 @@ eto_router = APIRouter(
 )
 
 
+def _stored_eto_response(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Resposta "completed" a partir de eto_results (None = período incompleto)."""
+    try:
+        with get_db_context() as db:
+            records = EToHistoryService(db).get_stored_records(
+                params["lat"], params["lng"], params["elevation"],
+                params["d_inicial"], params["d_final"], source=params["database"],
+            )
+    except Exception as e:
+        logger.warning(f"Falha ao consultar eto_results ({e}); recalculando")
+        return None
+    if records is None:
+        return None
+    return {
+        "task_id": None,
+        "status": "completed",
+        "deduplicated": False,
+        "execution": "stored",
+        "data": records,
+        "warnings": [],
+    }
+
+
 @eto_router.post("/eto_calculate")
 async def calculate_eto_endpoint(
     lat: float,
@@ -109,7 +159,7 @@ async def calculate_eto_endpoint(
                 detail="Formato de data inválido. Use YYYY-MM-DD."
             )
 
-        task = calculate_eto_pipeline.apply_async(kwargs={
+        params = {
             "lat": lat,
             "lng": lng,
             "elevation": float(elevation),
@@ -118,15 +168,45 @@ async def calculate_eto_endpoint(
             "d_final": end_date,
             "estado": estado if estado else "",
             "cidade": cidade if cidade else ""
-        })
+        }
+
+        # Período já calculado: nada a buscar no provedor
+        if ETO_REUSE_STORED:
+            response = await run_in_threadpool(_stored_eto_response, params)
+            if response is not None:
+                logger.info(f"✅ ETo reused from eto_results: {start_date}..{end_date}")
+                response["message"] = "Cálculo de ETo concluído."
+                return response
+
+        # Custo baixo (dados no cache): resultado na própria resposta
+        if ETO_FAST_PATH:
+            response = await eto_fast_path.try_run(params)
+            if response is not None:
+                logger.info(f"✅ ETo calculated inline: task_id={response['task_id']}")
+                response["message"] = "Cálculo de ETo concluído."
+                return response
+
+        # Requisições equivalentes compartilham a mesma tarefa (ou o
+        # resultado recente dela)
+        response = await run_in_threadpool(
+            eto_task_dedup.submit,
+            params,
+            eto_batch_submitter if ETO_MICRO_BATCHING else calculate_eto_pipeline,
+        )
+        task_id = response["task_id"]
+        
+        if response["status"] == "completed":
+            logger.info(f"✅ ETo result reused: task_id={task_id}")
+            response["message"] = "Resultado de ETo recente reaproveitado."
+            return response
         
         # Return task_id immediately for WebSocket real-time updates
-        logger.info(f"✅ ETo calculation task initiated: task_id={task.id}")
-        return {
-            "task_id": task.id,
-            "status": "queued",
-            "message": f"Cálculo de ETo iniciado. ID da tarefa: {task.id}"
-        }
+        logger.info(
+            f"✅ ETo calculation task {'attached' if response['deduplicated'] else 'initiated'}: "
+            f"task_id={task_id}"
+        )
+        response["message"] = f"Cálculo de ETo iniciado. ID da tarefa: {task_id}"
+        return response
 
     except HTTPException as e:
         logger.error(f"Erro de validação: {e.detail}")
@@ -185,6 +265,21 @@ async def calculate_eto_smart(
                 "api_calls": int,
                 "data_points": int,
                 "total_latency_ms": float
+            },
+            "quality_control": {  # valores reprovados (anulados em climate_data)
+                "<variável>": {"range": int, "clear_sky": int, ...}
+            },
+            "quality_control_dates": [...],  # dias com valor reprovado; o
+                                             # et0 do provedor foi descartado
+            "gap_filling": {  # lacunas preenchidas em climate_data
+                "<variável>": {"interpolated": int, "climatology": int}
+            },
+            "climatology": {  # ausente se não houver estação até 250 km
+                "city_name": str,
+                "distance_km": float,
+                "percentile": [...],
+                "z_score": [...],
+                ...
             }
         }
     """
@@ -252,6 +347,46 @@ async def calculate_eto_smart(
                 f"Latency={response['metadata']['total_latency_ms']}ms"
             )
             
+            cube = await run_in_threadpool(normals_cube.get)
+            
+            # Controle de qualidade (valores reprovados viram None) e
+            # preenchimento das lacunas, ancorado na climatologia do ETo
+            climate_data = response.get("climate_data") or {}
+            if climate_data.get("dates"):
+                location = response.get("location") or {}
+                # O ETo do provedor foi calculado com as entradas reprovadas:
+                # é anulado nesses dias (e preenchido como lacuna, se possível)
+                climate_data, qc = quality_control_series(
+                    climate_data, lat, location.get("elevation"),
+                    dependent=("et0_fao_evapotranspiration",),
+                )
+                climatology = None
+                if cube is not None:
+                    months = [d.month for d in pd.to_datetime(climate_data["dates"])]
+                    eto_mean = cube.anomalies(
+                        lat, lng, months, np.zeros(len(months)),
+                        max_distance_km=MAX_STATION_DISTANCE_KM,
+                    )["daily_mean"]
+                    if not np.isnan(eto_mean).all():
+                        climatology = {"et0_fao_evapotranspiration": eto_mean}
+                climate_data, gaps = fill_series(climate_data, climatology)
+                response["climate_data"] = climate_data
+                response["quality_control"] = qc.summary()
+                response["quality_control_dates"] = [
+                    day for day, bad in zip(climate_data["dates"], qc.any_flagged().ravel()) if bad
+                ]
+                response["gap_filling"] = gaps.summary()
+            
+            # Contexto climatológico (percentil vs normal) do cubo em memória
+            if cube is not None and climate_data.get("dates"):
+                response["climatology"] = cube.annotate_series(
+                    lat,
+                    lng,
+                    climate_data["dates"],
+                    climate_data.get("et0_fao_evapotranspiration", []),
+                    max_distance_km=MAX_STATION_DISTANCE_KM,
+                )
+            
             return response
         
         finally:
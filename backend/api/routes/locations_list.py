@@ -2,16 +2,26 @@
 Rotas para listar localizações e obter marcadores do mapa.
 Extraído de: world_locations.py (linhas 22-133)
 
-Responsabilidade: GET / e /markers
+Responsabilidade: GET /, /export, /markers e /markers.geojson
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from loguru import logger
 from sqlalchemy.orm import Session
 
-from backend.database import get_db
+from backend.api.services.location_listing import (
+    EXPORT_FORMATS,
+    MAX_MARKERS,
+    fetch_location_page,
+    fetch_marker_collection,
+    location_count_cache,
+    stream_locations_csv,
+    stream_locations_ndjson,
+)
+from backend.database import get_db, get_db_context
 from backend.database.models.world_locations import WorldLocation
 
 router = APIRouter(prefix="/world-locations", tags=["Locations"])
@@ -19,11 +29,19 @@ router = APIRouter(prefix="/world-locations", tags=["Locations"])
 
 @router.get("/", response_model=List[dict])
 async def get_all_locations(
+    response: Response,
     limit: int = Query(
         default=100, le=1000, description="Máximo de localizações"
     ),
+    after_id: Optional[int] = Query(
+        default=None,
+        ge=0,
+        description="Cursor: último ID da página anterior (X-Next-Cursor)",
+    ),
     offset: int = Query(
-        default=0, ge=0, description="Offset para paginação"
+        default=0,
+        ge=0,
+        description="Offset legado (prefira after_id em páginas profundas)",
     ),
     country_code: Optional[str] = Query(
         default=None, description="Filtro por país"
@@ -31,11 +49,16 @@ async def get_all_locations(
     db: Session = Depends(get_db),
 ):
     """
-    Retorna todas as localizações mundiais com paginação.
+    Retorna todas as localizações mundiais com paginação keyset.
+
+    A próxima página é obtida passando o cabeçalho ``X-Next-Cursor`` da
+    resposta como ``after_id``. ``X-Total-Count`` traz um total aproximado
+    (em cache por país), sem recontar a tabela a cada página.
 
     Args:
         limit: Máximo de resultados (default: 100, max: 1000)
-        offset: Offset para paginação
+        after_id: Cursor de paginação (ID da última localização recebida)
+        offset: Offset legado, ignorado quando after_id é informado
         country_code: Filtro opcional por código do país
         db: Sessão do banco de dados
 
@@ -43,39 +66,152 @@ async def get_all_locations(
         Lista de localizações com coordenadas e elevação
     """
     try:
-        query = db.query(WorldLocation)
-
-        if country_code:
-            query = query.filter(
-                WorldLocation.country_code == country_code.upper()
-            )
+        locations, next_cursor = fetch_location_page(
+            db,
+            limit=limit,
+            after_id=after_id,
+            country_code=country_code,
+            offset=offset,
+        )
+        total = location_count_cache.get_total(db, country_code)
 
-        total = query.count()
-        locations = query.offset(offset).limit(limit).all()
+        response.headers["X-Total-Count"] = str(total)
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
 
         logger.info(
             f"Retrieved {len(locations)} locations "
-            f"(total: {total}, offset: {offset})"
+            f"(total≈{total}, after_id: {after_id}, offset: {offset})"
         )
 
-        return [
-            {
-                "id": loc.id,
-                "name": loc.location_name,
-                "country": loc.country,
-                "country_code": loc.country_code,
-                "lat": round(loc.lat, 4),
-                "lon": round(loc.lon, 4),
-                "elevation_m": round(loc.elevation_m, 1),
-            }
-            for loc in locations
-        ]
+        return locations
 
     except Exception as e:
         logger.error(f"Error retrieving locations: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/export")
+async def export_locations(
+    format: str = Query(
+        default="ndjson", description="Formato: 'ndjson' ou 'csv'"
+    ),
+    country_code: Optional[str] = Query(
+        default=None, description="Filtro por país"
+    ),
+):
+    """
+    Exporta todas as localizações em streaming (NDJSON ou CSV).
+
+    Para consumidores em massa: as linhas são lidas de um cursor
+    server-side e enviadas em blocos, com memória constante.
+
+    Args:
+        format: 'ndjson' (um JSON por linha) ou 'csv'
+        country_code: Filtro opcional por código do país
+
+    Returns:
+        StreamingResponse com o conteúdo exportado
+    """
+    fmt = format.lower()
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format '{format}'. Use one of {EXPORT_FORMATS}",
+        )
+
+    stream = (
+        stream_locations_ndjson if fmt == "ndjson" else stream_locations_csv
+    )
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+
+    def generate():
+        # Sessão própria: a dependência get_db é encerrada antes do
+        # término do streaming
+        with get_db_context() as db:
+            yield from stream(db, country_code)
+
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="world_locations.{fmt}"'
+            )
+        },
+    )
+
+
+def _parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """Valida 'west,south,east,north' (HTTPException 400 se inválido)."""
+    try:
+        west, south, east, north = map(float, bbox.split(","))
+        # Validar bounding box
+        if not (west < east and south < north):
+            raise ValueError(
+                "Invalid bbox: west must be < east, "
+                "south < north"
+            )
+        if not (-180 <= west <= 180 and -180 <= east <= 180):
+            raise ValueError(
+                "Invalid bbox: longitude out of range"
+            )
+        if not (-90 <= south <= 90 and -90 <= north <= 90):
+            raise ValueError(
+                "Invalid bbox: latitude out of range"
+            )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid bbox format. Error: {str(e)}",
+        )
+    return west, south, east, north
+
+
+@router.get("/markers.geojson")
+async def get_map_markers_geojson(
+    response: Response,
+    bbox: Optional[str] = Query(
+        default=None,
+        description="Bounding box: 'west,south,east,north'",
+    ),
+    db: Session = Depends(get_db),
+):
+    """
+    Retorna os marcadores do mapa como uma única FeatureCollection.
+
+    Consumido pela camada GeoJSON do mapa mundial, que agrupa
+    (supercluster) e colore os pontos pela ETo do dia no navegador.
+
+    Acima de ``MAX_MARKERS`` pontos a resposta traz só os primeiros (por
+    ID), com ``truncated: true`` na coleção e o cabeçalho
+    ``X-Markers-Truncated``; o cliente deve então pedir por ``bbox``.
+
+    Args:
+        bbox: Bounding box opcional para filtrar por viewport
+
+    Returns:
+        FeatureCollection com id, name, country_code e eto por ponto,
+        mais ``truncated`` e ``limit``
+    """
+    parsed_bbox = _parse_bbox(bbox) if bbox else None
+    try:
+        collection = fetch_marker_collection(db, parsed_bbox)
+    except Exception as e:
+        logger.error(f"Error retrieving marker GeoJSON: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    logger.info(f"Retrieved {len(collection['features'])} GeoJSON markers for map")
+    if collection["truncated"]:
+        logger.warning(
+            f"Marker GeoJSON truncated at {collection['limit']} points (bbox={bbox})"
+        )
+        response.headers["X-Markers-Truncated"] = "true"
+    # Cache curto: a ETo do dia vai sendo preenchida pelo cálculo diário
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return collection
+
+
 @router.get("/markers", response_model=List[dict])
 async def get_map_markers(
     bbox: Optional[str] = Query(
@@ -103,36 +239,15 @@ async def get_map_markers(
         )
 
         if bbox:
-            try:
-                west, south, east, north = map(float, bbox.split(","))
-                # Validar bounding box
-                if not (west < east and south < north):
-                    raise ValueError(
-                        "Invalid bbox: west must be < east, "
-                        "south < north"
-                    )
-                if not (-180 <= west <= 180 and -180 <= east <= 180):
-                    raise ValueError(
-                        "Invalid bbox: longitude out of range"
-                    )
-                if not (-90 <= south <= 90 and -90 <= north <= 90):
-                    raise ValueError(
-                        "Invalid bbox: latitude out of range"
-                    )
-
-                query = query.filter(
-                    WorldLocation.lon >= west,
-                    WorldLocation.lon <= east,
-                    WorldLocation.lat >= south,
-                    WorldLocation.lat <= north,
-                )
-            except ValueError as e:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid bbox format. Error: {str(e)}",
-                )
-
-        locations = query.limit(10000).all()
+            west, south, east, north = _parse_bbox(bbox)
+            query = query.filter(
+                WorldLocation.lon >= west,
+                WorldLocation.lon <= east,
+                WorldLocation.lat >= south,
+                WorldLocation.lat <= north,
+            )
+
+        locations = query.order_by(WorldLocation.id).limit(MAX_MARKERS).all()
         logger.info(f"Retrieved {len(locations)} markers for map")
 
         return [
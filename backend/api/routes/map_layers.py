@@ -0,0 +1,70 @@
+"""
+Rotas das camadas GeoJSON do mapa.
+
+Responsabilidade: GET /map-layers e /map-layers/{layer}/{band}.geojson
+"""
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from backend.api.services.map_layers import (
+    BAND_NAMES,
+    CACHE_CONTROL,
+    MEDIA_TYPE,
+    ZOOM_BANDS,
+    map_layer_store,
+)
+from config.settings import get_settings
+
+router = APIRouter(prefix="/map-layers", tags=["Map Layers"])
+
+
+@router.get("")
+def list_map_layers():
+    """
+    Lista as camadas, as faixas de zoom e as URLs versionadas.
+
+    Returns:
+        Dict com ``bands`` (nome + zoom mínimo) e ``layers`` (URLs por faixa)
+    """
+    return {
+        "bands": [{"name": name, "min_zoom": min_zoom} for name, min_zoom, _, _ in ZOOM_BANDS],
+        "layers": map_layer_store.urls(get_settings().API_V1_PREFIX),
+    }
+
+
+@router.get("/{layer}/{band}.geojson")
+def get_map_layer(layer: str, band: str, request: Request) -> Response:
+    """
+    Retorna uma camada simplificada para a faixa de zoom.
+
+    O corpo é pré-comprimido (brotli/gzip conforme ``Accept-Encoding``),
+    com ETag e cache longo; ``If-None-Match`` responde 304.
+
+    Args:
+        layer: Nome da camada (ex.: br_uf, matopiba_cities)
+        band: Faixa de zoom (low, mid, high)
+
+    Raises:
+        HTTPException 404: Camada ou faixa inexistente
+    """
+    variant = map_layer_store.get(layer, band)
+    if variant is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Camada {layer}/{band} não encontrada (faixas: {', '.join(BAND_NAMES)})",
+        )
+
+    etag = f'"{variant.etag}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    encoding, body = variant.negotiate(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=MEDIA_TYPE, headers=headers)
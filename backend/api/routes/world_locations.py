@@ -7,11 +7,15 @@ e cache de cálculos diários de ETo.
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from loguru import logger
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from backend.api.services.location_listing import (
+    fetch_location_page,
+    location_count_cache,
+)
 from backend.database import get_db
 from backend.database.models.world_locations import EToWorldCache, WorldLocation
 
@@ -20,8 +24,12 @@ router = APIRouter(prefix="/world-locations", tags=["World Locations"])
 
 @router.get("/", response_model=List[dict])
 async def get_all_locations(
+    response: Response,
     limit: int = Query(default=1000, le=10000, description="Máximo de localizações"),
-    offset: int = Query(default=0, ge=0, description="Offset para paginação"),
+    after_id: Optional[int] = Query(
+        default=None, ge=0, description="Cursor: último ID da página anterior"
+    ),
+    offset: int = Query(default=0, ge=0, description="Offset legado para paginação"),
     country_code: Optional[str] = Query(
         default=None, description="Filtro por código do país (ex: USA, BRA)"
     ),
@@ -30,9 +38,12 @@ async def get_all_locations(
     """
     Retorna todas as localizações mundiais pré-carregadas.
 
+    Paginação keyset: use o cabeçalho ``X-Next-Cursor`` como ``after_id``.
+
     Args:
         limit: Número máximo de resultados (default: 1000, max: 10000)
-        offset: Offset para paginação (default: 0)
+        after_id: Cursor de paginação (ID da última localização recebida)
+        offset: Offset legado, ignorado quando after_id é informado
         country_code: Filtro opcional por código do país
         db: Sessão do banco de dados
 
@@ -40,33 +51,25 @@ async def get_all_locations(
         List[dict]: Lista de localizações com coordenadas e elevação
     """
     try:
-        query = db.query(WorldLocation)
-
-        if country_code:
-            query = query.filter(
-                WorldLocation.country_code == country_code.upper()
-            )
+        locations, next_cursor = fetch_location_page(
+            db,
+            limit=limit,
+            after_id=after_id,
+            country_code=country_code,
+            offset=offset,
+        )
+        total = location_count_cache.get_total(db, country_code)
 
-        total = query.count()
-        locations = query.offset(offset).limit(limit).all()
+        response.headers["X-Total-Count"] = str(total)
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
 
         logger.info(
             f"Retrieved {len(locations)} locations "
-            f"(total: {total}, offset: {offset})"
+            f"(total≈{total}, after_id: {after_id}, offset: {offset})"
         )
 
-        return [
-            {
-                "id": loc.id,
-                "name": loc.location_name,
-                "country": loc.country,
-                "country_code": loc.country_code,
-                "lat": round(loc.lat, 4),
-                "lon": round(loc.lon, 4),
-                "elevation_m": round(loc.elevation_m, 1),
-            }
-            for loc in locations
-        ]
+        return locations
 
     except Exception as e:
         logger.error(f"Error retrieving locations: {e}")
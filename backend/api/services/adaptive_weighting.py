@@ -0,0 +1,201 @@
+"""
+Pesos adaptativos por climatologia para a fusão de fontes.
+
+Versão de produção do protótipo ``SmartKalmanFilter``: em vez de carregar
+um pickle por instância e classificar cada medição de cada fonte, usa o
+cubo de normais (``climate_normals_cube``, memory-mapped quando exportado
+em ``data/climate_tables``) carregado uma vez por processo e classifica a
+matriz (dias × fontes) inteira com operações NumPy:
+
+- Outlier estatístico (|z| > 3.5 em relação à média/desvio diários do
+  mês, Wilks 2011): peso × 0.1 (quase descartado)
+- Extremo climático (fora de [p01, p99] do mês, ETCCDI): peso × 0.7
+  (atenuado, mas mantido)
+- Demais valores: peso × 1.0
+
+Os multiplicadores alimentam ``ClimateFusionService.fuse_source_matrix``
+na mesma passada. Nenhuma rota funde várias fontes hoje (o ETo usa uma
+fonte, com a substituta só nos dias de atraso); o motor fica disponível
+para o modo de fusão das fontes climáticas.
+
+Exemplo:
+    fused = adaptive_weighting_engine.fuse(lat, lon, data_by_source, "eto")
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from backend.api.services.climate_fusion import (ClimateFusionService,
+                                                 climate_fusion_service)
+from backend.api.services.climate_normals_cube import (
+    MAX_STATION_DISTANCE_KM, STAT_INDEX, ClimateNormalsCubeProvider,
+    normals_cube)
+
+OUTLIER_Z_SCORE = 3.5
+OUTLIER_WEIGHT = 0.1
+EXTREME_WEIGHT = 0.7
+
+# Nome da variável nas fontes -> variável do cubo de normais
+CLIMATE_VARIABLES = {
+    "eto": "eto",
+    "ETo": "eto",
+    "et0_fao_evapotranspiration": "eto",
+    "precipitation": "precipitation",
+    "precipitation_sum": "precipitation",
+}
+
+# Estatísticas do cubo por variável: (média, desvio, p01, p99)
+_THRESHOLD_STATS = {
+    "eto": ("eto_daily_mean", "eto_daily_std", "eto_p01", "eto_p99"),
+    "precipitation": ("precip_daily_mean", "precip_daily_std", None, "precip_p99"),
+}
+
+
+class AdaptiveWeightingEngine:
+    """Classificação vetorizada de extremos/outliers e fusão ponderada."""
+
+    def __init__(
+        self,
+        fusion_service: Optional[ClimateFusionService] = None,
+        cube_provider: Optional[ClimateNormalsCubeProvider] = None,
+        max_distance_km: float = MAX_STATION_DISTANCE_KM,
+    ):
+        """
+        Args:
+            fusion_service: Serviço de fusão (default: singleton)
+            cube_provider: Provedor do cubo de normais (default: singleton)
+            max_distance_km: Distância máxima até a estação de referência
+        """
+        self.fusion_service = fusion_service or climate_fusion_service
+        self.cube_provider = cube_provider or normals_cube
+        self.max_distance_km = max_distance_km
+
+    def score(
+        self,
+        lat: float,
+        lon: float,
+        months: Sequence[int],
+        values: np.ndarray,
+        variable: str,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Classifica uma matriz (dias × fontes) contra a climatologia.
+
+        Args:
+            lat, lon: Ponto da requisição (define a estação de referência)
+            months: Mês (1-12) de cada linha
+            values: Matriz de valores (NaN = ausente)
+            variable: Variável (ver ``CLIMATE_VARIABLES``)
+
+        Returns:
+            Matrizes alinhadas com ``values``: z_score, is_extreme,
+            is_outlier e weight (multiplicador do peso da fonte)
+        """
+        values = np.asarray(values, dtype=float)
+        result = {
+            "z_score": np.full(values.shape, np.nan),
+            "is_extreme": np.zeros(values.shape, dtype=bool),
+            "is_outlier": np.zeros(values.shape, dtype=bool),
+            "weight": np.ones(values.shape),
+        }
+
+        climate_variable = CLIMATE_VARIABLES.get(variable)
+        cube = self.cube_provider.get()
+        if climate_variable is None or cube is None or len(cube) == 0 or not values.size:
+            return result
+
+        station, distance_km = cube.nearest(lat, lon)
+        if distance_km[0] > self.max_distance_km:
+            return result
+
+        # Estatísticas do mês de cada linha: (dias, estatísticas)
+        cells = cube.values[int(station[0]), np.asarray(months, dtype=int) - 1]
+        mean_stat, std_stat, low_stat, high_stat = _THRESHOLD_STATS[climate_variable]
+        mean = cells[:, STAT_INDEX[mean_stat], None].astype(float)
+        std = cells[:, STAT_INDEX[std_stat], None].astype(float)
+        high = cells[:, STAT_INDEX[high_stat], None].astype(float)
+        low = (
+            cells[:, STAT_INDEX[low_stat], None].astype(float)
+            if low_stat
+            else np.full_like(high, -np.inf)
+        )
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z_score = np.abs(values - mean) / std
+        z_score = np.where(std > 0, z_score, np.nan)
+
+        # Precipitação zero nunca é extremo (dia seco)
+        classifiable = ~np.isnan(values)
+        if climate_variable == "precipitation":
+            classifiable &= values != 0
+
+        is_outlier = classifiable & (z_score > OUTLIER_Z_SCORE)
+        is_extreme = classifiable & ~is_outlier & ((values > high) | (values < low))
+
+        result["z_score"] = z_score
+        result["is_outlier"] = is_outlier
+        result["is_extreme"] = is_extreme
+        result["weight"] = np.where(
+            is_outlier, OUTLIER_WEIGHT, np.where(is_extreme, EXTREME_WEIGHT, 1.0)
+        )
+        return result
+
+    def fuse(
+        self,
+        lat: float,
+        lon: float,
+        data_by_source: Dict[str, List[Dict[str, Any]]],
+        variable: str,
+        date_field: str = "date",
+    ) -> List[Dict[str, Any]]:
+        """
+        Funde as fontes com pesos ajustados pela climatologia.
+
+        Returns:
+            Registros fundidos (formato de ``fuse_multiple_sources``) com
+            ``<variável>_weights`` (peso efetivo por fonte) e
+            ``<variável>_flags`` (fontes atenuadas como extremo/outlier)
+        """
+        dates, sources, values = self.fusion_service.build_source_matrix(
+            data_by_source, variable, date_field
+        )
+        if not dates:
+            return []
+
+        months = pd.DatetimeIndex(pd.to_datetime(list(dates))).month.to_numpy()
+        scores = self.score(lat, lon, months, values, variable)
+        fused = self.fusion_service.fuse_source_matrix(
+            dates,
+            sources,
+            values,
+            variable,
+            adaptive_weights=scores["weight"],
+            date_field=date_field,
+        )
+
+        # Índices das linhas que geraram registro (linhas sem peso são omitidas)
+        row_by_date = {date: i for i, date in enumerate(dates)}
+        for record in fused:
+            i = row_by_date[record[date_field]]
+            flags = {
+                source: ("outlier" if scores["is_outlier"][i, j] else "extreme")
+                for j, source in enumerate(sources)
+                if scores["is_outlier"][i, j] or scores["is_extreme"][i, j]
+            }
+            if flags:
+                record[f"{variable}_flags"] = flags
+
+        n_flagged = int(scores["is_outlier"].sum() + scores["is_extreme"].sum())
+        if n_flagged:
+            logger.debug(
+                f"Adaptive weighting ({lat}, {lon}) {variable}: "
+                f"{n_flagged} valores atenuados"
+            )
+        return fused
+
+
+# Instância singleton
+adaptive_weighting_engine = AdaptiveWeightingEngine()
@@ -6,8 +6,9 @@ Benefício: Permite usar dados de múltiplas fontes com confiabilidade.
 """
 
 from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 from loguru import logger
 
 
@@ -84,69 +85,116 @@ class ClimateFusionService:
                     return data
             return []
         
-        # Construir índice de dados por data
-        data_by_date = {}
+        dates, sources, values = self.build_source_matrix(
+            data_by_source, variable, date_field
+        )
+        fused_data = self.fuse_source_matrix(
+            dates, sources, values, variable, date_field=date_field
+        )
         
+        logger.info(
+            f"Fused {len(fused_data)} records for {variable} "
+            f"from {len(data_by_source)} sources"
+        )
+        
+        return fused_data
+    
+    def build_source_matrix(
+        self,
+        data_by_source: Dict[str, List[Dict[str, Any]]],
+        variable: str,
+        date_field: str = "date"
+    ) -> Tuple[List[Any], List[str], np.ndarray]:
+        """
+        Alinha os dados das fontes em uma matriz (datas × fontes).
+        
+        Fontes sem peso são ignoradas; valores ausentes viram NaN.
+        
+        Returns:
+            (datas ordenadas, fontes, matriz float com NaN onde falta dado)
+        """
+        sources = []
         for source, data_list in data_by_source.items():
             if not data_list:
                 continue
-            
-            weight = self.weights.get(source, 0)
-            if weight == 0:
+            if self.weights.get(source, 0) == 0:
                 logger.warning(f"Source {source} has zero weight, skipping")
                 continue
-            
-            for record in data_list:
-                date = record.get(date_field)
-                if date not in data_by_date:
-                    data_by_date[date] = []
-                
+            sources.append(source)
+        
+        dates = sorted({
+            record.get(date_field)
+            for source in sources
+            for record in data_by_source[source]
+        })
+        date_index = {date: i for i, date in enumerate(dates)}
+        
+        values = np.full((len(dates), len(sources)), np.nan)
+        for j, source in enumerate(sources):
+            for record in data_by_source[source]:
                 value = record.get(variable)
                 if value is not None:
-                    data_by_date[date].append({
-                        "source": source,
-                        "value": value,
-                        "weight": weight
-                    })
+                    values[date_index[record.get(date_field)], j] = value
         
-        # Calcular média ponderada por data
+        return dates, sources, values
+    
+    def fuse_source_matrix(
+        self,
+        dates: Sequence[Any],
+        sources: Sequence[str],
+        values: np.ndarray,
+        variable: str,
+        adaptive_weights: Optional[np.ndarray] = None,
+        date_field: str = "date"
+    ) -> List[Dict[str, Any]]:
+        """
+        Média ponderada vetorizada de uma matriz (datas × fontes).
+        
+        O peso efetivo de cada célula é o peso normalizado da fonte
+        multiplicado pelo peso adaptativo (ex: atenuação de extremos e
+        outliers calculada pelo ``AdaptiveWeightingEngine``).
+        
+        Args:
+            dates: Datas (linhas)
+            sources: Fontes (colunas)
+            values: Matriz de valores (NaN = ausente)
+            variable: Nome da variável na saída
+            adaptive_weights: Matriz de multiplicadores (default: 1)
+            date_field: Nome do campo de data na saída
+        
+        Returns:
+            Lista de registros fundidos (mesmo formato de
+            ``fuse_multiple_sources``)
+        """
         normalized_weights = self.normalize_weights()
-        fused_data = []
+        base = np.array([normalized_weights.get(source, 0) for source in sources])
+        present = ~np.isnan(values)
         
-        for date in sorted(data_by_date.keys()):
-            sources_data = data_by_date[date]
-            
-            if not sources_data:
-                continue
-            
-            # Calcular média ponderada
-            weighted_sum = 0
-            total_weight = 0
-            sources_used = []
-            
-            for source_data in sources_data:
-                source = source_data["source"]
-                value = source_data["value"]
-                weight = normalized_weights.get(source, 0)
-                
-                weighted_sum += value * weight
-                total_weight += weight
-                sources_used.append(source)
-            
-            if total_weight > 0:
-                fused_value = weighted_sum / total_weight
-                
-                fused_data.append({
-                    date_field: date,
-                    variable: round(fused_value, 2),
-                    f"{variable}_sources": sources_used,
-                    f"{variable}_confidence": round(total_weight * 100),
-                })
+        weights = np.where(present, base, 0.0)
+        if adaptive_weights is not None:
+            weights = weights * adaptive_weights
+        total_weight = weights.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fused = (weights * np.nan_to_num(values)).sum(axis=1) / total_weight
+        # Confiança considera a cobertura das fontes, não a atenuação
+        coverage = np.where(present, base, 0.0).sum(axis=1)
         
-        logger.info(
-            f"Fused {len(fused_data)} records for {variable} "
-            f"from {len(data_by_source)} sources"
-        )
+        fused_data = []
+        for i, date in enumerate(dates):
+            if total_weight[i] <= 0:
+                continue
+            record = {
+                date_field: date,
+                variable: round(float(fused[i]), 2),
+                f"{variable}_sources": [s for s, ok in zip(sources, present[i]) if ok],
+                f"{variable}_confidence": round(float(coverage[i]) * 100),
+            }
+            if adaptive_weights is not None:
+                record[f"{variable}_weights"] = {
+                    s: round(float(w), 4)
+                    for s, w, ok in zip(sources, weights[i], present[i]) if ok
+                }
+            fused_data.append(record)
         
         return fused_data
     
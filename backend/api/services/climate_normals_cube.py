@@ -0,0 +1,591 @@
+"""
+Cubo em memória das normais climatológicas mensais.
+
+Carrega ``climate_history.monthly_climate_normals`` (ou, sem banco, os
+relatórios ``reports/cities/*.json``) em um array NumPy
+(cidade × mês × estatística) com índice espacial (KD-tree) sobre as
+coordenadas de ``studied_cities``. Comparar um valor de ETo com a
+climatologia da estação mais próxima passa a ser uma consulta em memória,
+sem round trip ao banco nem parse de JSON.
+
+O cubo é carregado na inicialização da API e recarregado quando a
+assinatura da tabela (quantidade de linhas + maior ``updated_at``) ou dos
+relatórios (quantidade + maior mtime) muda.
+
+O cubo também pode ser exportado como tabelas climáticas compactas
+(``data/climate_tables``: ``values.npy`` float32 + ``meta.json``), abertas
+com ``mmap_mode='r'``: workers e processos de lote compartilham as mesmas
+páginas sem consultar o banco. Quando existem, essas tabelas têm
+prioridade sobre as demais fontes. Cada exportação vai para um diretório
+de versão novo e o link ``current`` é trocado atomicamente; arquivos já
+mapeados pelos workers nunca são reescritos, e os workers reabrem as
+tabelas quando o link muda:
+
+    python -m backend.api.services.climate_normals_cube data/climate_tables
+
+Exemplo:
+    cube = normals_cube.get()
+    context = cube.anomaly(-22.7, -47.6, month=7, value=3.9)
+    # {"city_name": "Piracicaba", "distance_km": 4.2, "percentile": 71.3, ...}
+"""
+
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from scipy.spatial import cKDTree
+from sqlalchemy import text
+
+from backend.database.connection import get_db_context
+from backend.infrastructure.loaders.climate_history_loader import (
+    NORMAL_FIELDS, SCHEMA, parse_city_report, resolve_city_coordinates)
+
+# Eixo de estatísticas do cubo (mesma ordem das colunas da tabela)
+STATISTICS = tuple(NORMAL_FIELDS)
+STAT_INDEX = {name: i for i, name in enumerate(STATISTICS)}
+
+DEFAULT_PERIOD = "1991-2020"
+DEFAULT_REPORTS_DIR = "reports/cities"
+DEFAULT_TABLES_DIR = os.getenv("CLIMATE_TABLES_DIR", "data/climate_tables")
+TABLES_VERSION = 1
+
+# Link para a versão exportada em uso e versões mantidas no diretório
+# (a anterior fica para quem resolveu o link pouco antes da troca)
+CURRENT_LINK = "current"
+KEPT_TABLE_VERSIONS = 2
+EARTH_RADIUS_KM = 6371.0088
+
+# Distância máxima para usar a climatologia de uma estação em respostas
+MAX_STATION_DISTANCE_KM = 250.0
+
+# Estatísticas usadas na anomalia: (média diária, desvio diário, normal)
+MOMENTS = {
+    "eto": ("eto_daily_mean", "eto_daily_std", "eto_normal"),
+    "precipitation": (
+        "precip_daily_mean",
+        "precip_daily_std",
+        "precip_normal",
+    ),
+}
+
+# Percentis conhecidos da distribuição diária de ETo (estatística, percentil)
+ETO_PERCENTILE_LADDER = (
+    ("eto_abs_min", 0.0),
+    ("eto_p01", 1.0),
+    ("eto_p05", 5.0),
+    ("eto_p10", 10.0),
+    ("eto_p25", 25.0),
+    ("eto_daily_median", 50.0),
+    ("eto_p75", 75.0),
+    ("eto_p90", 90.0),
+    ("eto_p95", 95.0),
+    ("eto_p99", 99.0),
+    ("eto_abs_max", 100.0),
+)
+
+
+def resolve_tables_dir(directory: Any) -> Path:
+    """Diretório da versão corrente das tabelas (ou o próprio diretório)."""
+    link = Path(directory) / CURRENT_LINK
+    return link.resolve() if link.is_symlink() else Path(directory)
+
+
+def _unit_vectors(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Coordenadas geográficas -> vetores unitários 3D (para a KD-tree)."""
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack(
+        (cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat))
+    )
+
+
+class ClimateNormalsCube:
+    """
+    Snapshot imutável das normais mensais de um período de referência.
+
+    ``values[c, m - 1, s]`` é a estatística ``STATISTICS[s]`` do mês ``m``
+    da cidade ``city_names[c]`` (NaN quando ausente).
+    """
+
+    def __init__(
+        self,
+        city_names: Sequence[str],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        values: np.ndarray,
+        period_key: str,
+        source: str,
+        signature: Any = None,
+    ):
+        self.city_names = list(city_names)
+        self.latitudes = np.asarray(latitudes, dtype=float)
+        self.longitudes = np.asarray(longitudes, dtype=float)
+        self.values = values
+        self.period_key = period_key
+        self.source = source
+        self.signature = signature
+        self.loaded_at = datetime.utcnow()
+        self._tree = (
+            cKDTree(_unit_vectors(self.latitudes, self.longitudes))
+            if self.city_names
+            else None
+        )
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Sequence[Any]],
+        period_key: str,
+        source: str,
+        signature: Any = None,
+    ) -> "ClimateNormalsCube":
+        """
+        Monta o cubo a partir de linhas
+        ``(city_name, latitude, longitude, month, *STATISTICS)``.
+        """
+        cities: Dict[str, int] = {}
+        coords: List[Tuple[float, float]] = []
+        cells: List[Tuple[int, int, Sequence[Any]]] = []
+        for city_name, lat, lon, month, *stats in rows:
+            if city_name not in cities:
+                cities[city_name] = len(cities)
+                coords.append((float(lat), float(lon)))
+            cells.append((cities[city_name], int(month) - 1, stats))
+
+        values = np.full((len(cities), 12, len(STATISTICS)), np.nan, dtype=np.float32)
+        for city_idx, month_idx, stats in cells:
+            values[city_idx, month_idx] = [
+                np.nan if v is None else float(v) for v in stats
+            ]
+
+        coords_array = np.asarray(coords, dtype=float).reshape(-1, 2)
+        return cls(
+            list(cities),
+            coords_array[:, 0],
+            coords_array[:, 1],
+            values,
+            period_key,
+            source,
+            signature,
+        )
+
+    def save(self, directory: str) -> None:
+        """
+        Exporta o cubo como tabelas memory-mappable.
+
+        Os arquivos são gravados em um diretório de versão novo e o link
+        ``current`` passa a apontar para ele com ``os.replace``; as
+        versões antigas além de ``KEPT_TABLE_VERSIONS`` são removidas
+        (páginas já mapeadas continuam válidas até o worker reabrir).
+        """
+        target = Path(directory)
+        target.mkdir(parents=True, exist_ok=True)
+        version = target / f"v{time.time_ns()}-{os.getpid()}"
+        version.mkdir()
+        np.save(version / "values.npy", np.ascontiguousarray(self.values, dtype=np.float32))
+        np.save(version / "coords.npy", np.column_stack((self.latitudes, self.longitudes)))
+        meta = {
+            "version": TABLES_VERSION,
+            "period_key": self.period_key,
+            "statistics": list(STATISTICS),
+            "city_names": self.city_names,
+            "source": self.source,
+        }
+        (version / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+        tmp_link = target / f"{CURRENT_LINK}.{os.getpid()}.tmp"
+        tmp_link.unlink(missing_ok=True)
+        tmp_link.symlink_to(version.name, target_is_directory=True)
+        os.replace(tmp_link, target / CURRENT_LINK)
+
+        versions = sorted(
+            (p for p in target.glob("v*-*") if p.is_dir()),
+            key=lambda p: int(p.name[1:].split("-")[0]),
+        )
+        for old in versions[:-KEPT_TABLE_VERSIONS]:
+            shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def open(cls, directory: str, signature: Any = None) -> "ClimateNormalsCube":
+        """
+        Abre tabelas exportadas por ``save`` (valores memory-mapped).
+
+        Raises:
+            FileNotFoundError: Se as tabelas não existirem
+            ValueError: Se a versão ou as estatísticas forem incompatíveis
+        """
+        source = resolve_tables_dir(directory)
+        meta = json.loads((source / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != TABLES_VERSION or tuple(meta["statistics"]) != STATISTICS:
+            raise ValueError(f"Tabelas climáticas incompatíveis em {source}")
+        coords = np.load(source / "coords.npy")
+        return cls(
+            meta["city_names"],
+            coords[:, 0],
+            coords[:, 1],
+            np.load(source / "values.npy", mmap_mode="r"),
+            meta["period_key"],
+            "tables",
+            signature,
+        )
+
+    def __len__(self) -> int:
+        return len(self.city_names)
+
+    def stat(self, city_name: str, month: int, statistic: str) -> Optional[float]:
+        """Uma estatística de uma cidade/mês (None se ausente)."""
+        value = self.values[
+            self.city_names.index(city_name), month - 1, STAT_INDEX[statistic]
+        ]
+        return None if np.isnan(value) else float(value)
+
+    def nearest(
+        self, lats: Any, lons: Any
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estação (cidade estudada) mais próxima de cada ponto.
+
+        Returns:
+            (índices no cubo, distâncias em km pelo grande círculo)
+        """
+        chord, idx = self._tree.query(_unit_vectors(np.atleast_1d(lats), np.atleast_1d(lons)))
+        distance_km = 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+        return np.asarray(idx), distance_km
+
+    def anomalies(
+        self,
+        lats: Any,
+        lons: Any,
+        months: Any,
+        values: Any,
+        variable: str = "eto",
+        max_distance_km: Optional[float] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Anomalia de cada valor em relação à normal da estação mais próxima.
+
+        Args:
+            lats, lons: Coordenadas (escalares são propagados)
+            months: Mês (1-12) de cada valor
+            values: Valores observados/calculados
+            variable: 'eto' ou 'precipitation'
+            max_distance_km: Estações mais distantes são ignoradas (NaN)
+
+        Returns:
+            Dict de arrays alinhados: station (índice, -1 se nenhuma),
+            distance_km, normal, daily_mean, anomaly, z_score e percentile
+            (interpolado entre os percentis conhecidos; apenas ETo)
+        """
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        n = len(values)
+        months = np.broadcast_to(np.atleast_1d(np.asarray(months, dtype=int)), (n,))
+        lats = np.broadcast_to(np.atleast_1d(np.asarray(lats, dtype=float)), (n,))
+        lons = np.broadcast_to(np.atleast_1d(np.asarray(lons, dtype=float)), (n,))
+
+        mean_stat, std_stat, normal_stat = MOMENTS[variable]
+        result = {
+            "station": np.full(n, -1, dtype=np.int64),
+            "distance_km": np.full(n, np.nan),
+            "normal": np.full(n, np.nan),
+            "daily_mean": np.full(n, np.nan),
+            "anomaly": np.full(n, np.nan),
+            "z_score": np.full(n, np.nan),
+            "percentile": np.full(n, np.nan),
+        }
+        if n == 0 or self._tree is None:
+            return result
+
+        station, distance_km = self.nearest(lats, lons)
+        usable = np.ones(n, dtype=bool)
+        if max_distance_km is not None:
+            usable = distance_km <= max_distance_km
+
+        month_idx = months - 1
+        cells = self.values[station, month_idx]  # (n, n_stats)
+        daily_mean = cells[:, STAT_INDEX[mean_stat]].astype(float)
+        daily_std = cells[:, STAT_INDEX[std_stat]].astype(float)
+
+        result["station"] = np.where(usable, station, -1)
+        result["distance_km"] = np.where(usable, distance_km, np.nan)
+        result["normal"] = np.where(usable, cells[:, STAT_INDEX[normal_stat]], np.nan)
+        result["daily_mean"] = np.where(usable, daily_mean, np.nan)
+        result["anomaly"] = np.where(usable, values - daily_mean, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result["z_score"] = np.where(
+                usable & (daily_std > 0), (values - daily_mean) / daily_std, np.nan
+            )
+
+        if variable == "eto":
+            ladder_idx = [STAT_INDEX[name] for name, _ in ETO_PERCENTILE_LADDER]
+            ladder_pct = np.array([pct for _, pct in ETO_PERCENTILE_LADDER])
+            # Uma interpolação por (estação, mês) distintos
+            keys = station * 12 + month_idx
+            for key in np.unique(keys[usable]):
+                rows = usable & (keys == key)
+                quantiles = self.values[key // 12, key % 12, ladder_idx].astype(float)
+                known = ~np.isnan(quantiles)
+                if known.sum() < 2:
+                    continue
+                result["percentile"][rows] = np.interp(
+                    values[rows], quantiles[known], ladder_pct[known]
+                )
+
+        return result
+
+    def anomaly(
+        self,
+        lat: float,
+        lon: float,
+        month: int,
+        value: float,
+        variable: str = "eto",
+        max_distance_km: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Versão escalar de ``anomalies`` com a estação identificada.
+
+        Returns:
+            Dict serializável ou None se não houver estação utilizável
+        """
+        result = self.anomalies(lat, lon, month, value, variable, max_distance_km)
+        station = int(result["station"][0])
+        if station < 0:
+            return None
+        return {
+            "city_name": self.city_names[station],
+            "distance_km": round(float(result["distance_km"][0]), 1),
+            "period": self.period_key,
+            **{
+                key: (None if np.isnan(result[key][0]) else round(float(result[key][0]), 3))
+                for key in ("normal", "daily_mean", "anomaly", "z_score", "percentile")
+            },
+        }
+
+    def annotate_series(
+        self,
+        lat: float,
+        lon: float,
+        dates: Sequence[Any],
+        values: Sequence[Any],
+        variable: str = "eto",
+        max_distance_km: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Contexto climatológico de uma série diária de um ponto.
+
+        Returns:
+            Dict colunar (percentile, z_score, anomaly, normal) alinhado
+            com ``dates`` ou None se não houver estação utilizável ou se
+            ``values`` não tiver um valor por data
+        """
+        if not len(dates) or len(values) != len(dates):
+            return None
+        months = pd.DatetimeIndex(pd.to_datetime(list(dates))).month.to_numpy()
+        series = np.array(
+            [np.nan if v is None else v for v in values], dtype=float
+        )
+        result = self.anomalies(lat, lon, months, series, variable, max_distance_km)
+        station = int(result["station"][0])
+        if station < 0:
+            return None
+
+        def _column(key: str) -> List[Optional[float]]:
+            return [None if np.isnan(v) else round(float(v), 3) for v in result[key]]
+
+        return {
+            "city_name": self.city_names[station],
+            "distance_km": round(float(result["distance_km"][0]), 1),
+            "period": self.period_key,
+            "normal": _column("normal"),
+            "anomaly": _column("anomaly"),
+            "z_score": _column("z_score"),
+            "percentile": _column("percentile"),
+        }
+
+
+class ClimateNormalsCubeProvider:
+    """
+    Mantém o cubo corrente e o recarrega quando os dados de origem mudam.
+
+    A verificação de mudança é barata (uma agregação ou um ``stat`` dos
+    relatórios) e feita no máximo a cada ``refresh_interval`` segundos;
+    o cubo só é reconstruído quando a assinatura muda.
+    """
+
+    def __init__(
+        self,
+        period_key: str = DEFAULT_PERIOD,
+        reports_dir: str = DEFAULT_REPORTS_DIR,
+        refresh_interval: int = 300,
+        tables_dir: str = DEFAULT_TABLES_DIR,
+    ):
+        """
+        Args:
+            period_key: Período de referência das normais
+            reports_dir: Relatórios JSON usados quando o banco não responde
+            refresh_interval: Intervalo mínimo entre verificações (s)
+            tables_dir: Tabelas memory-mapped (prioritárias se existirem)
+        """
+        self.period_key = period_key
+        self.reports_dir = Path(reports_dir)
+        self.tables_dir = Path(tables_dir)
+        self.refresh_interval = refresh_interval
+        self._cube: Optional[ClimateNormalsCube] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[ClimateNormalsCube]:
+        """Cubo corrente (verifica mudanças se o intervalo expirou)."""
+        if time.monotonic() - self._checked_at >= self.refresh_interval:
+            self.refresh()
+        return self._cube
+
+    def refresh(self, force: bool = False) -> Optional[ClimateNormalsCube]:
+        """
+        Recarrega o cubo se a origem mudou (ou sempre, com ``force``).
+
+        Tenta o banco primeiro e usa os relatórios JSON como alternativa.
+        Falhas são registradas e mantêm o cubo anterior.
+        """
+        if not self._lock.acquire(blocking=False):
+            # Outra thread já está recarregando: usa o cubo atual
+            return self._cube
+        try:
+            self._checked_at = time.monotonic()
+            for loader in (
+                self._load_from_tables,
+                self._load_from_database,
+                self._load_from_reports,
+            ):
+                try:
+                    cube = loader(force)
+                except Exception as e:
+                    logger.warning(
+                        f"Normals cube: falha em {loader.__name__}: {e}"
+                    )
+                    continue
+                if cube is None:
+                    continue
+                if cube is not self._cube:
+                    self._cube = cube
+                    logger.info(
+                        f"Normals cube ({cube.source}) carregado: "
+                        f"{len(cube)} cidades, período {cube.period_key}"
+                    )
+                return cube
+            return self._cube
+        finally:
+            self._lock.release()
+
+    # Cada loader retorna um novo cubo, o cubo atual (origem inalterada)
+    # ou None (origem indisponível/vazia)
+
+    def _unchanged(self, source: str, signature: Any) -> bool:
+        return (
+            self._cube is not None
+            and self._cube.source == source
+            and self._cube.signature == signature
+        )
+
+    def _load_from_tables(self, force: bool) -> Optional[ClimateNormalsCube]:
+        # A versão corrente identifica a exportação: nova versão, novo mmap
+        version_dir = resolve_tables_dir(self.tables_dir)
+        meta_path = version_dir / "meta.json"
+        if not meta_path.exists():
+            return None
+        signature = (str(version_dir), meta_path.stat().st_mtime_ns)
+        if not force and self._unchanged("tables", signature):
+            return self._cube
+        cube = ClimateNormalsCube.open(str(version_dir), signature)
+        if cube.period_key != self.period_key:
+            return None
+        return cube
+
+    def _load_from_database(self, force: bool) -> Optional[ClimateNormalsCube]:
+        with get_db_context() as db:
+            count, last_update = db.execute(
+                text(
+                    f"SELECT count(*), max(updated_at) "
+                    f"FROM {SCHEMA}.monthly_climate_normals "
+                    f"WHERE period_key = :period"
+                ),
+                {"period": self.period_key},
+            ).one()
+            if not count:
+                return None
+            signature = (int(count), str(last_update))
+            if not force and self._unchanged("database", signature):
+                return self._cube
+
+            stats = ", ".join(f"n.{name}" for name in STATISTICS)
+            rows = db.execute(
+                text(
+                    f"SELECT c.city_name, c.latitude, c.longitude, n.month, {stats} "
+                    f"FROM {SCHEMA}.monthly_climate_normals n "
+                    f"JOIN {SCHEMA}.studied_cities c ON c.id = n.city_id "
+                    f"WHERE n.period_key = :period "
+                    # Cidades gravadas sem coordenadas por cargas antigas
+                    f"AND NOT (c.latitude = 0 AND c.longitude = 0) "
+                    f"ORDER BY c.id, n.month"
+                ),
+                {"period": self.period_key},
+            ).fetchall()
+        return ClimateNormalsCube.from_rows(
+            rows, self.period_key, "database", signature
+        )
+
+    def _load_from_reports(self, force: bool) -> Optional[ClimateNormalsCube]:
+        paths = sorted(self.reports_dir.glob("*.json"))
+        if not paths:
+            return None
+        signature = (len(paths), max(p.stat().st_mtime_ns for p in paths))
+        if not force and self._unchanged("reports", signature):
+            return self._cube
+
+        # Relatórios sem coordenadas usam o catálogo; os não resolvidos
+        # ficam fora do índice espacial (parse_city_report devolve None)
+        coordinates = resolve_city_coordinates(
+            [p.stem[len("report_"):] for p in paths]
+        )
+        rows = []
+        for path in paths:
+            parsed = parse_city_report(str(path), coordinates)
+            if parsed is None:
+                continue
+            city_row, normal_rows = parsed
+            city_name, _, _, lat, lon = city_row[:5]
+            for normal in normal_rows:
+                if normal[1] == self.period_key:
+                    rows.append([city_name, lat, lon, normal[2], *normal[3:]])
+        return ClimateNormalsCube.from_rows(
+            rows, self.period_key, "reports", signature
+        )
+
+
+normals_cube = ClimateNormalsCubeProvider()
+
+
+if __name__ == "__main__":
+    """
+    Exporta as normais (banco ou relatórios) como tabelas memory-mapped.
+
+    Uso:
+    python -m backend.api.services.climate_normals_cube [data/climate_tables]
+    """
+    target_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TABLES_DIR
+    provider = ClimateNormalsCubeProvider(tables_dir=os.devnull)
+    exported = provider.refresh(force=True)
+    if exported is None:
+        sys.exit("Nenhuma normal climatológica disponível para exportar")
+    exported.save(target_dir)
+    logger.info(f"Tabelas climáticas exportadas em {target_dir}: {len(exported)} cidades")
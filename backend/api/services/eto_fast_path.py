@@ -0,0 +1,229 @@
+"""
+Caminho rápido em processo para cálculos curtos de ETo.
+
+Um ponto com 7-15 dias e dados já no cache Redis custa milissegundos
+de numpy; passar por broker, worker, result backend e WebSocket só
+acrescenta latência de fila. Quando o custo estimado é baixo, o
+cálculo roda aqui mesmo, em um pool de threads limitado, e o resultado
+volta na própria resposta:
+
+- fonte com suporte (``nasa_power``) e período ≤ ``FAST_PATH_MAX_DAYS``
+- série da célula da grade presente no cache (``climate:nasa``); dias
+  ainda não publicados pelo NASA POWER são completados com a série do
+  Open-Meteo, se ela também estiver no cache (``climate:openmeteo``)
+- vaga livre no pool (no máximo ``FAST_PATH_MAX_WORKERS`` simultâneos)
+
+Qualquer outra situação (cache frio, pool cheio, erro ou leitura do
+cache acima de ``FAST_PATH_TIMEOUT_SECONDS``) devolve None e o chamador
+segue para o Celery. O cálculo é o mesmo do worker de lotes (``build_eto_records``).
+
+Exemplo:
+    response = await eto_fast_path.try_run(params)
+    if response is None:
+        response = eto_task_dedup.submit(params, calculate_eto_pipeline)
+"""
+
+import asyncio
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+from loguru import logger
+
+FAST_PATH_SOURCES = frozenset({"nasa_power"})
+FAST_PATH_MAX_DAYS = 15
+
+# Cálculos simultâneos em processo; acima disso a requisição vai ao Celery
+FAST_PATH_MAX_WORKERS = int(os.getenv("ETO_FAST_PATH_WORKERS", "4"))
+
+# Tempo máximo de leitura do cache antes de desistir e usar o Celery
+FAST_PATH_TIMEOUT_SECONDS = 2.0
+
+
+class EToFastPath:
+    """Executa no processo da API os cálculos de ETo de custo baixo."""
+
+    def __init__(
+        self,
+        cache=None,
+        max_workers: int = FAST_PATH_MAX_WORKERS,
+        substitute_cache=None,
+    ):
+        """
+        Args:
+            cache: ClimateCacheService da NASA (default: ``climate:nasa``)
+            max_workers: Tamanho do pool e limite de cálculos simultâneos
+            substitute_cache: ClimateCacheService da fonte substituta
+                (default: ``climate:openmeteo``)
+        """
+        self._cache = cache
+        self._substitute_cache = substitute_cache
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.stats = {"inline": 0, "cache_miss": 0, "busy": 0, "failed": 0}
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            from backend.infrastructure.cache.climate_cache import \
+                create_climate_cache
+
+            self._cache = create_climate_cache("nasa")
+        return self._cache
+
+    @property
+    def substitute_cache(self):
+        if self._substitute_cache is None:
+            from backend.infrastructure.cache.climate_cache import \
+                create_climate_cache
+            from backend.infrastructure.celery.tasks.eto_batch_tasks import \
+                SUBSTITUTE_SOURCE
+
+            self._substitute_cache = create_climate_cache(SUBSTITUTE_SOURCE)
+        return self._substitute_cache
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="eto-fast-path"
+            )
+        return self._executor
+
+    def eligible(self, params: Dict[str, Any]) -> bool:
+        """Fonte e período compatíveis com o caminho rápido."""
+        if params.get("database") not in FAST_PATH_SOURCES:
+            return False
+        start = datetime.strptime(params["d_inicial"], "%Y-%m-%d")
+        end = datetime.strptime(params["d_final"], "%Y-%m-%d")
+        return 0 <= (end - start).days < FAST_PATH_MAX_DAYS
+
+    async def try_run(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Calcula inline se o custo for baixo.
+
+        O limite de tempo vale até a submissão ao pool: um cálculo já
+        submetido é aguardado até o fim (custa milissegundos), para não
+        rodar em paralelo com a mesma requisição enviada ao Celery.
+
+        Args:
+            params: kwargs da tarefa de ETo (lat, lng, elevation, database,
+                d_inicial, d_final, ...)
+
+        Returns:
+            Resposta "completed" com ``data`` e ``warnings``, ou None para
+            seguir pelo Celery
+        """
+        from backend.infrastructure.celery.tasks.eto_batch_tasks import \
+            build_eto_records
+
+        if not self.eligible(params):
+            return None
+        if not self._acquire():
+            self.stats["busy"] += 1
+            return None
+
+        submitted = False
+        try:
+            inputs = await asyncio.wait_for(self._load(params), FAST_PATH_TIMEOUT_SECONDS)
+            if inputs is None:
+                return None
+
+            # A vaga é liberada quando o cálculo termina no pool, mesmo que
+            # quem aguarda seja cancelado antes
+            future = self.executor.submit(build_eto_records, *inputs)
+            submitted = True
+            future.add_done_callback(self._release)
+            outcome = await asyncio.wrap_future(future)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.warning(f"Caminho rápido de ETo falhou ({e!r}); usando Celery")
+            return None
+        finally:
+            if not submitted:
+                self._release()
+
+        task_id = inputs[0][0]["task_id"]
+        records, warnings = outcome[task_id]
+        if records is None:
+            return None
+
+        # Publicar no broker pode bloquear: fica fora do event loop
+        asyncio.get_running_loop().run_in_executor(
+            None, self._persist, records, params["database"]
+        )
+        self.stats["inline"] += 1
+        return {
+            "task_id": task_id,
+            "status": "completed",
+            "deduplicated": False,
+            "execution": "inline",
+            "data": records,
+            "warnings": warnings,
+        }
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def _load(self, params: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        """Argumentos de ``build_eto_records`` a partir do cache (None = cache frio)."""
+        from backend.infrastructure.celery.tasks.eto_batch_tasks import (
+            cell_key, fetch_substitute_cells, missing_days)
+
+        start = datetime.strptime(params["d_inicial"], "%Y-%m-%d")
+        end = datetime.strptime(params["d_final"], "%Y-%m-%d")
+        cell = cell_key(params)
+
+        series = await self.cache.get(
+            source="nasa_power", lat=cell[0], lon=cell[1], start=start, end=end
+        )
+        if not series:
+            self.stats["cache_miss"] += 1
+            return None
+
+        dates = [d.strftime("%Y-%m-%d") for d in pd.date_range(start, end)]
+        substitutes = {}
+        if missing_days(series, dates):
+            substitutes = await fetch_substitute_cells(
+                [cell], start, end, cache=self.substitute_cache, fetch_missing=False
+            )
+        return (
+            [{"task_id": uuid.uuid4().hex, "params": params}],
+            {cell: series},
+            dates,
+            substitutes,
+        )
+
+    @staticmethod
+    def _persist(records, source: str) -> None:
+        """Gravação em eto_results continua assíncrona (não bloqueia a resposta)."""
+        from backend.infrastructure.celery.tasks.eto_storage_tasks import \
+            persist_eto_results
+
+        try:
+            persist_eto_results.delay(records, source=source, quality_checked=True)
+        except Exception as e:
+            logger.warning(f"Não foi possível agendar a gravação do ETo inline: {e}")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Instância singleton
+eto_fast_path = EToFastPath()
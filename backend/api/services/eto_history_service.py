@@ -0,0 +1,231 @@
+"""
+Serviço de consulta ao histórico de ETo (``eto_results``).
+
+Responde "ETo do ponto X entre as datas A e B" (ou de uma bounding box)
+diretamente do armazenamento particionado, em formato colunar:
+
+    {
+        "dates": ["2025-01-01", ...],
+        "eto": [4.1, ...],
+        "t2m_max": [31.2, ...],
+        ...
+    }
+
+Consultas repetidas reaproveitam resultados já calculados:
+``get_stored_records`` devolve o período no formato do pipeline quando
+todos os dias já estão gravados, e o ``/eto_calculate`` responde sem ir
+ao provedor.
+
+Exemplo:
+    service = EToHistoryService(db)
+    series = service.get_point_series(-22.7, -47.6, start, end)
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.database.data_storage import (COORD_PRECISION, DEFAULT_SOURCE,
+                                           RECORD_KEYS)
+
+# Colunas de valores retornadas nas séries
+SERIES_COLUMNS = (
+    "eto",
+    "t2m_max",
+    "t2m_min",
+    "rh2m",
+    "ws2m",
+    "radiation",
+    "precipitation",
+)
+
+# Limite de linhas por consulta de bounding box
+MAX_BBOX_ROWS = 200000
+
+# Dias mais recentes podem ter sido calculados com a fonte substituta
+# (atraso do NASA POWER) e só são reaproveitados depois desse prazo
+SETTLED_AFTER_DAYS = 7
+
+
+def snap_coordinate(value: float) -> float:
+    """Arredonda a coordenada para a precisão da chave natural."""
+    return round(float(value), COORD_PRECISION)
+
+
+def _as_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _date_range(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+class EToHistoryService:
+    """
+    Consultas colunares por ponto ou bounding box em ``eto_results``.
+
+    As consultas de ponto usam a chave única (lat, lng, date, source);
+    as de bounding box usam os índices BRIN em date e (lat, lng), com
+    poda de partições pelo intervalo de datas.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Args:
+            db: Sessão SQLAlchemy
+        """
+        self.db = db
+
+    def get_point_series(
+        self,
+        lat: float,
+        lng: float,
+        start_date: Any,
+        end_date: Any,
+        source: str = DEFAULT_SOURCE,
+    ) -> Dict[str, Any]:
+        """
+        Série diária de um ponto no intervalo [start_date, end_date].
+
+        Args:
+            lat: Latitude (arredondada para a chave natural)
+            lng: Longitude (arredondada para a chave natural)
+            start_date: Data inicial (date, datetime ou 'YYYY-MM-DD')
+            end_date: Data final (inclusiva)
+            source: Fonte dos dados
+
+        Returns:
+            Dict colunar com dates, colunas de SERIES_COLUMNS e coverage
+        """
+        start, end = _as_date(start_date), _as_date(end_date)
+        columns = ", ".join(SERIES_COLUMNS)
+        rows = self.db.execute(
+            text(
+                f"SELECT date, {columns} FROM eto_results "
+                f"WHERE lat = :lat AND lng = :lng AND source = :source "
+                f"AND date >= :start AND date < :end_excl "
+                f"ORDER BY date"
+            ),
+            {
+                "lat": snap_coordinate(lat),
+                "lng": snap_coordinate(lng),
+                "source": source,
+                "start": start,
+                "end_excl": end + timedelta(days=1),
+            },
+        ).fetchall()
+
+        series = self._to_columnar(rows, ("date",) + SERIES_COLUMNS)
+        requested = _date_range(start, end)
+        available = {_as_date(d) for d in series["dates"]}
+        missing = [d for d in requested if d not in available]
+        series["coverage"] = {
+            "requested_days": len(requested),
+            "available_days": len(available),
+            "missing_dates": [d.isoformat() for d in missing],
+        }
+        return series
+
+    def get_bbox_series(
+        self,
+        west: float,
+        south: float,
+        east: float,
+        north: float,
+        start_date: Any,
+        end_date: Any,
+        source: str = DEFAULT_SOURCE,
+        limit: int = MAX_BBOX_ROWS,
+    ) -> Dict[str, Any]:
+        """
+        Séries de todos os pontos dentro da bounding box no intervalo.
+
+        Returns:
+            Dict colunar com lat, lng, dates e colunas de SERIES_COLUMNS,
+            ordenado por (lat, lng, date); ``truncated`` indica se o
+            limite de linhas foi atingido
+        """
+        start, end = _as_date(start_date), _as_date(end_date)
+        columns = ", ".join(SERIES_COLUMNS)
+        rows = self.db.execute(
+            text(
+                f"SELECT lat, lng, date, {columns} FROM eto_results "
+                f"WHERE lat BETWEEN :south AND :north "
+                f"AND lng BETWEEN :west AND :east "
+                f"AND source = :source "
+                f"AND date >= :start AND date < :end_excl "
+                f"ORDER BY lat, lng, date "
+                f"LIMIT :limit"
+            ),
+            {
+                "south": south,
+                "north": north,
+                "west": west,
+                "east": east,
+                "source": source,
+                "start": start,
+                "end_excl": end + timedelta(days=1),
+                "limit": limit + 1,
+            },
+        ).fetchall()
+
+        truncated = len(rows) > limit
+        series = self._to_columnar(
+            rows[:limit], ("lat", "lng", "date") + SERIES_COLUMNS
+        )
+        series["truncated"] = truncated
+        series["n_points"] = len({(la, ln) for la, ln in zip(series["lat"], series["lng"])})
+        return series
+
+    def get_stored_records(
+        self,
+        lat: float,
+        lng: float,
+        elevation: float,
+        start_date: Any,
+        end_date: Any,
+        source: str = DEFAULT_SOURCE,
+        today: Optional[date] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Registros do período no formato do pipeline, se já estiverem gravados.
+
+        Returns:
+            Lista de registros (``lat``, ``lng``, ``elev``, ``date``,
+            ``T2M_MAX``, ..., ``ETo``), ou None se faltar algum dia ou se
+            o período terminar há menos de ``SETTLED_AFTER_DAYS`` dias
+        """
+        end = _as_date(end_date)
+        if (today or date.today()) - end < timedelta(days=SETTLED_AFTER_DAYS):
+            return None
+
+        series = self.get_point_series(lat, lng, start_date, end, source)
+        if series["coverage"]["missing_dates"]:
+            return None
+
+        records = []
+        for i, day in enumerate(series["dates"]):
+            record = {"lat": lat, "lng": lng, "elev": elevation, "date": day}
+            for column in SERIES_COLUMNS:
+                record[RECORD_KEYS[column]] = series[column][i]
+            records.append(record)
+        return records
+
+    @staticmethod
+    def _to_columnar(rows, names: Tuple[str, ...]) -> Dict[str, List[Any]]:
+        columns: Dict[str, List[Any]] = {
+            ("dates" if name == "date" else name): [] for name in names
+        }
+        keys = list(columns.keys())
+        for row in rows:
+            for key, value in zip(keys, row):
+                if key == "dates":
+                    value = _as_date(value).isoformat()
+                columns[key].append(value)
+        return columns
@@ -0,0 +1,184 @@
+"""
+Deduplicação idempotente das tarefas de cálculo de ETo.
+
+Requisições equivalentes (mesmos parâmetros normalizados, coordenadas
+alinhadas à grade do provedor) compartilham uma única tarefa Celery:
+
+- tarefa em andamento: devolve o mesmo ``task_id`` (os WebSockets dos
+  vários usuários acompanham a mesma tarefa pelo ``TaskStatusHub``)
+- tarefa concluída há menos de ``RESULT_FRESH_SECONDS``: devolve o
+  resultado armazenado imediatamente
+- tarefa com falha, cancelada ou resultado vencido: submete uma nova
+
+A chave é reservada com ``SET NX`` antes da submissão, então duas
+requisições simultâneas nunca disparam tarefas duplicadas.
+
+Layout no Redis:
+    eto_task:<sha1 dos parâmetros normalizados> -> task_id (TTL)
+
+Exemplo:
+    response = eto_task_dedup.submit(params, calculate_eto_pipeline)
+"""
+
+import hashlib
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from celery.result import AsyncResult
+from loguru import logger
+
+KEY_PREFIX = "eto_task"
+
+# Resolução da grade de cada provedor (lat, lon) em graus
+PROVIDER_GRID = {
+    "nasa_power": (0.5, 0.625),
+    "open_meteo": (0.1, 0.1),
+}
+DEFAULT_GRID = (0.01, 0.01)
+
+# Tempo máximo que uma reserva permanece (cobre fila + execução)
+KEY_TTL_SECONDS = 3600
+
+# Idade máxima de um resultado concluído para ser reaproveitado
+RESULT_FRESH_SECONDS = 1800
+
+IN_FLIGHT_STATES = frozenset({"PENDING", "RECEIVED", "STARTED", "RETRY", "PROGRESS"})
+
+
+def snap_to_grid(value: float, step: float) -> float:
+    """Centro da célula da grade que contém ``value``."""
+    return round(round(float(value) / step) * step, 6)
+
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normaliza os parâmetros que definem o resultado do cálculo.
+
+    Coordenadas são alinhadas à grade do provedor (pontos na mesma célula
+    recebem os mesmos dados) e a elevação é arredondada ao metro.
+    """
+    database = params["database"]
+    lat_step, lng_step = PROVIDER_GRID.get(database, DEFAULT_GRID)
+    return {
+        "lat": snap_to_grid(params["lat"], lat_step),
+        "lng": snap_to_grid(params["lng"], lng_step),
+        "elevation": int(round(float(params["elevation"]))),
+        "database": database,
+        "d_inicial": params["d_inicial"],
+        "d_final": params["d_final"],
+    }
+
+
+def request_key(params: Dict[str, Any]) -> str:
+    """Chave Redis da requisição normalizada."""
+    normalized = json.dumps(normalize_params(params), sort_keys=True)
+    return f"{KEY_PREFIX}:{hashlib.sha1(normalized.encode()).hexdigest()}"
+
+
+def _is_fresh(task: AsyncResult) -> bool:
+    date_done = task.date_done
+    if date_done is None:
+        return False
+    if date_done.tzinfo is None:
+        date_done = date_done.replace(tzinfo=timezone.utc)
+    age = (datetime.now(timezone.utc) - date_done).total_seconds()
+    return age <= RESULT_FRESH_SECONDS
+
+
+class EToTaskDeduplicator:
+    """Reserva e reaproveitamento de tarefas de ETo por parâmetros."""
+
+    def __init__(self, redis_client=None):
+        """
+        Args:
+            redis_client: Cliente Redis síncrono (default: pool compartilhado)
+        """
+        self._redis = redis_client
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            from backend.database.redis_pool import get_redis_client
+
+            self._redis = get_redis_client()
+        return self._redis
+
+    def submit(self, params: Dict[str, Any], task, **apply_options) -> Dict[str, Any]:
+        """
+        Submete a tarefa ou reaproveita uma equivalente.
+
+        Args:
+            params: kwargs da tarefa (lat, lng, elevation, database,
+                d_inicial, d_final, ...)
+            task: Task Celery (``calculate_eto_pipeline``)
+            **apply_options: Opções extras de ``apply_async``
+
+        Returns:
+            {"task_id", "status", "deduplicated", ...}; com ``status``
+            "completed" inclui ``data`` e ``warnings``
+        """
+        key = request_key(params)
+        for _ in range(2):
+            task_id = uuid.uuid4().hex
+            if self.redis.set(key, task_id, nx=True, ex=KEY_TTL_SECONDS):
+                task.apply_async(kwargs=params, task_id=task_id, **apply_options)
+                return {"task_id": task_id, "status": "queued", "deduplicated": False}
+
+            existing_id = self.redis.get(key)
+            if existing_id is None:
+                # Reserva expirou entre o SET e o GET: tenta de novo
+                continue
+            if isinstance(existing_id, bytes):
+                existing_id = existing_id.decode()
+
+            response = self._reuse(existing_id)
+            if response is not None:
+                return response
+
+            # Falha, cancelamento ou resultado vencido: libera a reserva
+            # (somente se ainda for a mesma tarefa) e submete de novo
+            self._release(key, existing_id)
+
+        task_id = uuid.uuid4().hex
+        task.apply_async(kwargs=params, task_id=task_id, **apply_options)
+        return {"task_id": task_id, "status": "queued", "deduplicated": False}
+
+    def _reuse(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Resposta para uma tarefa existente, ou None se não reaproveitável."""
+        existing = AsyncResult(task_id)
+        state = existing.state
+
+        if state in IN_FLIGHT_STATES:
+            logger.info(f"♻️ Requisição de ETo duplicada anexada à tarefa {task_id} ({state})")
+            return {
+                "task_id": task_id,
+                "status": "queued" if state in ("PENDING", "RECEIVED") else "running",
+                "deduplicated": True,
+            }
+
+        if state == "SUCCESS" and _is_fresh(existing):
+            task_result = existing.result
+            result, warnings = task_result if task_result else (None, None)
+            logger.info(f"♻️ Resultado de ETo reaproveitado da tarefa {task_id}")
+            return {
+                "task_id": task_id,
+                "status": "completed",
+                "deduplicated": True,
+                "data": result.to_dict() if hasattr(result, "to_dict") else result,
+                "warnings": warnings,
+            }
+
+        return None
+
+    def _release(self, key: str, task_id: str) -> None:
+        current = self.redis.get(key)
+        if isinstance(current, bytes):
+            current = current.decode()
+        if current == task_id:
+            self.redis.delete(key)
+
+
+# Instância singleton
+eto_task_dedup = EToTaskDeduplicator()
@@ -0,0 +1,382 @@
+"""
+Serviço de listagem de localizações mundiais (paginação keyset + export).
+
+Substitui o padrão ``query.count()`` + ``OFFSET/LIMIT`` por:
+1. Paginação por cursor de ID (keyset): ``WHERE id > :after_id ORDER BY id``
+   usa o índice da PK e custa o mesmo na página 1 ou na página 500
+2. Totais aproximados em cache por filtro de país (TTL em memória)
+   - Sem filtro: estimativa do planner (``pg_class.reltuples``)
+   - Com filtro: ``COUNT(*)`` executado uma vez por TTL
+3. Export em streaming (NDJSON/CSV) via cursor server-side, com memória
+   constante independentemente do tamanho do catálogo
+4. Marcadores do mapa como uma única FeatureCollection (com a ETo do
+   dia), agrupada e estilizada no navegador; acima de ``MAX_MARKERS``
+   a coleção vem marcada como ``truncated`` (o cliente pede um ``bbox``)
+
+Exemplo:
+    page, next_cursor = fetch_location_page(db, limit=100, after_id=0)
+    total = location_count_cache.get_total(db, country_code="BRA")
+"""
+
+import csv
+import io
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import and_, text
+from sqlalchemy.orm import Session
+
+from backend.database.models.world_locations import EToWorldCache, WorldLocation
+
+# Colunas expostas na listagem (mesma ordem usada no CSV)
+LOCATION_FIELDS = (
+    "id",
+    "name",
+    "country",
+    "country_code",
+    "lat",
+    "lon",
+    "elevation_m",
+)
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Limite de marcadores por resposta do mapa
+MAX_MARKERS = 10000
+
+
+def _location_columns():
+    return (
+        WorldLocation.id,
+        WorldLocation.location_name,
+        WorldLocation.country,
+        WorldLocation.country_code,
+        WorldLocation.lat,
+        WorldLocation.lon,
+        WorldLocation.elevation_m,
+    )
+
+
+def serialize_location_row(row) -> Dict[str, Any]:
+    """
+    Converte uma linha (tupla de colunas) no dicionário público da API.
+
+    Args:
+        row: Linha com as colunas de ``_location_columns()``
+
+    Returns:
+        Dict com id, name, country, country_code, lat, lon, elevation_m
+    """
+    loc_id, name, country, country_code, lat, lon, elevation = row
+    return {
+        "id": loc_id,
+        "name": name,
+        "country": country,
+        "country_code": country_code,
+        "lat": round(lat, 4),
+        "lon": round(lon, 4),
+        "elevation_m": round(elevation, 1),
+    }
+
+
+def _filtered_query(db: Session, country_code: Optional[str]):
+    query = db.query(*_location_columns())
+    if country_code:
+        query = query.filter(
+            WorldLocation.country_code == country_code.upper()
+        )
+    return query
+
+
+def fetch_location_page(
+    db: Session,
+    limit: int,
+    after_id: Optional[int] = None,
+    country_code: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Busca uma página de localizações ordenada por ID.
+
+    Com ``after_id`` usa keyset (``id > after_id``), que não degrada com a
+    profundidade da página. ``offset`` é mantido apenas para clientes
+    legados e é ignorado quando ``after_id`` é informado.
+
+    Args:
+        db: Sessão do banco de dados
+        limit: Tamanho da página
+        after_id: Último ID recebido na página anterior (cursor)
+        country_code: Filtro opcional por código do país
+        offset: Offset legado (evitar em páginas profundas)
+
+    Returns:
+        Tuple (linhas serializadas, próximo cursor ou None se acabou)
+    """
+    query = _filtered_query(db, country_code).order_by(WorldLocation.id)
+
+    if after_id is not None:
+        query = query.filter(WorldLocation.id > after_id)
+    elif offset:
+        query = query.offset(offset)
+
+    # Busca limit + 1 para saber se há próxima página sem COUNT extra
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    page = [serialize_location_row(row) for row in rows]
+    next_cursor = page[-1]["id"] if has_more and page else None
+    return page, next_cursor
+
+
+class LocationCountCache:
+    """
+    Cache em memória de totais aproximados por filtro de país.
+
+    O total é apenas informativo (cabeçalho ``X-Total-Count``), então uma
+    estimativa com alguns minutos de atraso é aceitável e evita recontar a
+    tabela a cada página.
+    """
+
+    def __init__(self, ttl_seconds: int = 600):
+        """
+        Args:
+            ttl_seconds: Tempo de vida de cada total em cache (default 10 min)
+        """
+        self.ttl = ttl_seconds
+        self._totals: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(country_code: Optional[str]) -> str:
+        return country_code.upper() if country_code else "*"
+
+    def get_total(
+        self, db: Session, country_code: Optional[str] = None
+    ) -> int:
+        """
+        Retorna o total (aproximado) de localizações para o filtro.
+
+        Args:
+            db: Sessão do banco de dados
+            country_code: Filtro opcional por código do país
+
+        Returns:
+            Número de localizações
+        """
+        key = self._key(country_code)
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._totals.get(key)
+        if cached and now - cached[1] < self.ttl:
+            return cached[0]
+
+        total = self._compute_total(db, country_code)
+        with self._lock:
+            self._totals[key] = (total, now)
+        return total
+
+    def _compute_total(
+        self, db: Session, country_code: Optional[str]
+    ) -> int:
+        if not country_code:
+            # Estimativa do planner: O(1), atualizada por ANALYSE/autovacuum
+            estimate = db.execute(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = to_regclass(:table)"
+                ),
+                {"table": WorldLocation.__tablename__},
+            ).scalar()
+            # -1 (nunca analisada) ou 0 (possivelmente ainda não
+            # analisada): estimativa desconhecida, conta de verdade
+            if estimate is not None and estimate > 0:
+                return int(estimate)
+
+        return _filtered_query(db, country_code).order_by(None).count()
+
+    def invalidate(self, country_code: Optional[str] = None) -> None:
+        """
+        Remove totais em cache (todos, se ``country_code`` não informado).
+
+        Deve ser chamado após cargas em massa em ``world_locations``.
+        """
+        with self._lock:
+            if country_code is None:
+                self._totals.clear()
+            else:
+                self._totals.pop(self._key(country_code), None)
+
+
+location_count_cache = LocationCountCache()
+
+
+def iter_locations(
+    db: Session,
+    country_code: Optional[str] = None,
+    chunk_size: int = 2000,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Itera sobre todas as localizações usando cursor server-side.
+
+    ``yield_per`` ativa ``stream_results`` no psycopg2, então apenas
+    ``chunk_size`` linhas ficam em memória por vez.
+
+    Args:
+        db: Sessão do banco de dados
+        country_code: Filtro opcional por código do país
+        chunk_size: Linhas buscadas por round trip
+
+    Yields:
+        Dict serializado de cada localização
+    """
+    query = (
+        _filtered_query(db, country_code)
+        .order_by(WorldLocation.id)
+        .yield_per(chunk_size)
+    )
+    for row in query:
+        yield serialize_location_row(row)
+
+
+def stream_locations_ndjson(
+    db: Session,
+    country_code: Optional[str] = None,
+    chunk_size: int = 2000,
+) -> Iterator[bytes]:
+    """
+    Gera o export em NDJSON (um objeto JSON por linha).
+
+    Yields:
+        Blocos de bytes com até ``chunk_size`` linhas cada
+    """
+    buffer: List[str] = []
+    count = 0
+    for item in iter_locations(db, country_code, chunk_size):
+        buffer.append(json.dumps(item, ensure_ascii=False))
+        count += 1
+        if len(buffer) >= chunk_size:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer.clear()
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode("utf-8")
+    logger.info(f"NDJSON export finished: {count} locations")
+
+
+def stream_locations_csv(
+    db: Session,
+    country_code: Optional[str] = None,
+    chunk_size: int = 2000,
+) -> Iterator[bytes]:
+    """
+    Gera o export em CSV com cabeçalho.
+
+    Yields:
+        Blocos de bytes com até ``chunk_size`` linhas cada
+    """
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=LOCATION_FIELDS)
+    writer.writeheader()
+
+    count = 0
+    pending = 0
+    for item in iter_locations(db, country_code, chunk_size):
+        writer.writerow(item)
+        count += 1
+        pending += 1
+        if pending >= chunk_size:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate(0)
+            pending = 0
+
+    remaining = out.getvalue()
+    if remaining:
+        yield remaining.encode("utf-8")
+    logger.info(f"CSV export finished: {count} locations")
+
+
+def marker_feature(row) -> Dict[str, Any]:
+    """
+    Converte uma linha de marcador em Feature GeoJSON.
+
+    Args:
+        row: (id, location_name, country_code, lat, lon, eto_mm)
+
+    Returns:
+        Feature com ``id``, ``name``, ``country_code`` e ``eto``
+        (None sem cálculo do dia) nas propriedades
+    """
+    loc_id, name, country_code, lat, lon, eto = row
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(lon, 4), round(lat, 4)]},
+        "properties": {
+            "id": loc_id,
+            "name": name,
+            "country_code": country_code,
+            "eto": round(eto, 2) if eto is not None else None,
+        },
+    }
+
+
+def fetch_marker_collection(
+    db: Session,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    limit: int = MAX_MARKERS,
+) -> Dict[str, Any]:
+    """
+    Marcadores do mapa como FeatureCollection, com a ETo do dia.
+
+    Os pontos saem ordenados por ID, então o recorte por ``limit`` é
+    estável entre requisições; ``truncated`` indica que havia mais pontos
+    (o cliente deve restringir a área com ``bbox``).
+
+    Args:
+        db: Sessão do banco de dados
+        bbox: (west, south, east, north) opcional
+        limit: Máximo de marcadores
+
+    Returns:
+        FeatureCollection de pontos, com ``truncated`` e ``limit``
+    """
+    # Intervalo semiaberto do dia: usa o índice (location_id, calculation_date)
+    day_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    day_end = day_start + timedelta(days=1)
+    query = db.query(
+        WorldLocation.id,
+        WorldLocation.location_name,
+        WorldLocation.country_code,
+        WorldLocation.lat,
+        WorldLocation.lon,
+        EToWorldCache.eto_mm,
+    ).outerjoin(
+        EToWorldCache,
+        and_(
+            EToWorldCache.location_id == WorldLocation.id,
+            EToWorldCache.calculation_date >= day_start,
+            EToWorldCache.calculation_date < day_end,
+        ),
+    )
+    if bbox:
+        west, south, east, north = bbox
+        query = query.filter(
+            WorldLocation.lon >= west,
+            WorldLocation.lon <= east,
+            WorldLocation.lat >= south,
+            WorldLocation.lat <= north,
+        )
+
+    rows = query.order_by(WorldLocation.id).limit(limit + 1).all()
+    truncated = len(rows) > limit
+    return {
+        "type": "FeatureCollection",
+        "features": [marker_feature(row) for row in rows[:limit]],
+        "truncated": truncated,
+        "limit": limit,
+    }
@@ -0,0 +1,456 @@
+"""
+Camadas GeoJSON do mapa simplificadas por faixa de zoom e pré-comprimidas.
+
+O mapa inicial embutia ``BR_UF_2024.geojson`` (~570 KB, resolução total)
+e as cidades MATOPIBA no layout Dash enviado a cada navegador. Este
+módulo gera, para cada camada, uma variante por faixa de zoom
+(``ZOOM_BANDS``):
+
+- polígonos simplificados por Douglas-Peucker sobre os *arcos* da
+  cobertura (trechos entre junções): fronteiras compartilhadas entre
+  estados são simplificadas uma única vez, sem lacunas nem sobreposições
+- coordenadas arredondadas conforme a faixa
+- JSON compacto + gzip (e brotli, quando instalado) + ETag
+
+As variantes são servidas por ``GET /api/v1/map-layers/{layer}/{band}.geojson``
+com cache longo; a URL publicada leva ``?v=<etag>``, então um novo
+build gera novas URLs. O mapa busca a variante pela URL e troca de faixa
+conforme o zoom, sem dados no layout.
+
+Build (opcional; sem ele as variantes são geradas em memória no
+primeiro acesso):
+
+    python -m backend.api.services.map_layers [data/geojson/build]
+
+Exemplo:
+    variant = map_layer_store.get("br_uf", band_for_zoom(4))
+    url = map_layer_store.url("br_uf", "low")
+"""
+
+import csv
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli é opcional
+    brotli = None
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_BUILD_DIR = os.getenv("MAP_LAYERS_DIR", str(PROJECT_ROOT / "data" / "geojson" / "build"))
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Faixas de zoom: (nome, zoom mínimo, tolerância em graus, casas decimais);
+# a tolerância é ~1 pixel no maior zoom da faixa (360° / 256px / 2^zoom)
+ZOOM_BANDS = (
+    ("low", 0, 0.04, 3),
+    ("mid", 6, 0.005, 4),
+    ("high", 9, 0.0, 5),
+)
+BAND_NAMES = tuple(band[0] for band in ZOOM_BANDS)
+
+# URLs são versionadas pelo ETag, então o conteúdo é imutável
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+MEDIA_TYPE = "application/geo+json"
+
+Point = Tuple[float, float]
+
+
+# ============================================================================
+# FONTES
+# ============================================================================
+
+def _load_geojson_file(filename: str) -> Callable[[], Dict]:
+    def load() -> Dict:
+        path = PROJECT_ROOT / "data" / "geojson" / filename
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    return load
+
+
+def _load_matopiba_cities() -> Dict:
+    """Cidades MATOPIBA (CSV) como FeatureCollection de pontos."""
+    path = PROJECT_ROOT / "data" / "csv" / "CITIES_MATOPIBA_337.csv"
+    features = []
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                lat, lon = float(row["LATITUDE"]), float(row["LONGITUDE"])
+                elevation = float(row["HEIGHT"])
+            except (KeyError, ValueError):
+                continue
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": {
+                    "name": row["CITY"],
+                    "uf": row["UF"],
+                    "elevation": elevation,
+                },
+            })
+    return {"type": "FeatureCollection", "features": features}
+
+
+LAYER_SOURCES: Dict[str, Callable[[], Dict]] = {
+    "br_uf": _load_geojson_file("BR_UF_2024.geojson"),
+    "matopiba_perimetro": _load_geojson_file("Matopiba_Perimetro.geojson"),
+    "matopiba_cities": _load_matopiba_cities,
+}
+
+
+def band_for_zoom(zoom: float) -> str:
+    """Faixa de detalhe para um nível de zoom do Leaflet."""
+    name = BAND_NAMES[0]
+    for band, min_zoom, _, _ in ZOOM_BANDS:
+        if zoom >= min_zoom:
+            name = band
+    return name
+
+
+# ============================================================================
+# SIMPLIFICAÇÃO
+# ============================================================================
+
+def _segment_distance2(p: Point, a: Point, b: Point) -> float:
+    """Quadrado da distância de ``p`` ao segmento ``a``-``b``."""
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    if dx == 0 and dy == 0:
+        return (p[0] - a[0]) ** 2 + (p[1] - a[1]) ** 2
+    t = ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / (dx * dx + dy * dy)
+    t = max(0.0, min(1.0, t))
+    x, y = a[0] + t * dx, a[1] + t * dy
+    return (p[0] - x) ** 2 + (p[1] - y) ** 2
+
+
+def douglas_peucker(points: Sequence[Point], tolerance: float) -> List[Point]:
+    """Douglas-Peucker iterativo (mantém sempre as extremidades)."""
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    tol2 = tolerance * tolerance
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        best, index = 0.0, None
+        for i in range(first + 1, last):
+            d = _segment_distance2(points[i], points[first], points[last])
+            if d > best:
+                best, index = d, i
+        if index is not None and best > tol2:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, k in zip(points, keep) if k]
+
+
+def _polygons(geometry: Dict) -> List[List[List[Point]]]:
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return []
+    return [[[tuple(p[:2]) for p in ring] for ring in polygon] for polygon in polygons]
+
+
+def simplify_coverage(geometries: List[Dict], tolerance: float) -> List[Dict]:
+    """
+    Simplifica uma cobertura de polígonos preservando a topologia.
+
+    Cada anel é dividido em arcos nas junções (vértices com mais de dois
+    vizinhos distintos); cada arco é simplificado uma única vez, em
+    direção canônica, e reutilizado pelos anéis que o compartilham.
+
+    Args:
+        geometries: Geometrias GeoJSON (Polygon/MultiPolygon; outras
+            são devolvidas sem alteração)
+        tolerance: Tolerância em graus
+
+    Returns:
+        Geometrias simplificadas, na mesma ordem
+    """
+    parsed = [_polygons(g) for g in geometries]
+
+    neighbors: Dict[Point, set] = defaultdict(set)
+    for polygons in parsed:
+        for polygon in polygons:
+            for ring in polygon:
+                pts = ring[:-1]
+                n = len(pts)
+                for i, p in enumerate(pts):
+                    neighbors[p].add(pts[i - 1])
+                    neighbors[p].add(pts[(i + 1) % n])
+    junctions = {p for p, nb in neighbors.items() if len(nb) != 2}
+
+    arcs: Dict[Tuple[Point, ...], List[Point]] = {}
+
+    def simplify_arc(arc: Tuple[Point, ...]) -> List[Point]:
+        reverse = arc[::-1]
+        key = min(arc, reverse)
+        if key not in arcs:
+            arcs[key] = douglas_peucker(key, tolerance)
+        return arcs[key] if key is arc else arcs[key][::-1]
+
+    def simplify_ring(ring: List[Point]) -> Optional[List[Point]]:
+        pts = ring[:-1] if ring[0] == ring[-1] else ring
+        n = len(pts)
+        if n < 3:
+            return None
+        cuts = [i for i, p in enumerate(pts) if p in junctions]
+        if not cuts:
+            # Anel isolado (ilhas): descartado se menor que a tolerância;
+            # senão corta no menor vértice e no mais distante dele
+            # (escolha canônica, igual para anéis idênticos)
+            xs, ys = [p[0] for p in pts], [p[1] for p in pts]
+            if max(max(xs) - min(xs), max(ys) - min(ys)) < tolerance:
+                return None
+            start = min(range(n), key=pts.__getitem__)
+            far = max(range(n), key=lambda i: (pts[i][0] - pts[start][0]) ** 2
+                      + (pts[i][1] - pts[start][1]) ** 2)
+            cuts = sorted({start, far})
+        start = cuts[0]
+        pts = pts[start:] + pts[:start]
+        cuts = [c - start for c in cuts] + [n]
+        closed = pts + [pts[0]]
+        out: List[Point] = []
+        for a, b in zip(cuts, cuts[1:]):
+            out.extend(simplify_arc(tuple(closed[a:b + 1]))[:-1])
+        out.append(out[0])
+        return out if len(out) >= 4 else None
+
+    result = []
+    for geometry, polygons in zip(geometries, parsed):
+        if not polygons:
+            result.append(geometry)
+            continue
+        simplified = []
+        for polygon in polygons:
+            shell = simplify_ring(polygon[0])
+            if shell is None:
+                continue
+            holes = [h for h in (simplify_ring(r) for r in polygon[1:]) if h]
+            simplified.append([shell] + holes)
+        if not simplified:
+            # Geometria inteira abaixo da tolerância: mantém a original
+            result.append(geometry)
+        elif len(simplified) == 1 and geometry["type"] == "Polygon":
+            result.append({"type": "Polygon", "coordinates": simplified[0]})
+        else:
+            result.append({"type": "MultiPolygon", "coordinates": simplified})
+    return result
+
+
+def _round_coords(coords: Any, decimals: int) -> Any:
+    """Arredonda coordenadas, removendo vértices consecutivos repetidos."""
+    if coords and isinstance(coords[0], (int, float)):
+        return [round(c, decimals) for c in coords]
+    rounded = [_round_coords(c, decimals) for c in coords]
+    if rounded and isinstance(rounded[0], list) and rounded[0] and \
+            isinstance(rounded[0][0], (int, float)):
+        deduped = [rounded[0]]
+        for p in rounded[1:]:
+            if p != deduped[-1]:
+                deduped.append(p)
+        return deduped
+    return rounded
+
+
+def build_variant(geojson: Dict, tolerance: float, decimals: int) -> Dict:
+    """Variante de uma FeatureCollection para uma faixa de zoom."""
+    features = geojson.get("features", [])
+    geometries = [f["geometry"] for f in features]
+    if tolerance > 0:
+        geometries = simplify_coverage(geometries, tolerance)
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": g["type"],
+                    "coordinates": _round_coords(g["coordinates"], decimals),
+                },
+                "properties": f.get("properties") or {},
+            }
+            for f, g in zip(features, geometries)
+        ],
+    }
+
+
+# ============================================================================
+# CODIFICAÇÃO E ARMAZENAMENTO
+# ============================================================================
+
+@dataclass
+class LayerVariant:
+    """Corpo de uma variante e suas versões pré-comprimidas."""
+    body: bytes
+    gzip: bytes
+    brotli: Optional[bytes]
+    etag: str
+
+    @classmethod
+    def encode(cls, geojson: Dict) -> "LayerVariant":
+        body = json.dumps(geojson, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        return cls(
+            body=body,
+            gzip=gzip.compress(body, compresslevel=9, mtime=0),
+            brotli=brotli.compress(body, quality=11) if brotli else None,
+            etag=hashlib.sha256(body).hexdigest()[:16],
+        )
+
+    def negotiate(self, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+        """Escolhe a codificação (br > gzip > identidade) aceita pelo cliente."""
+        accepted = set()
+        for token in accept_encoding.lower().split(","):
+            name, _, params = token.strip().partition(";")
+            if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                accepted.add(name.strip())
+        if self.brotli is not None and ("br" in accepted or "*" in accepted):
+            return "br", self.brotli
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip", self.gzip
+        return None, self.body
+
+
+class MapLayerStore:
+    """Variantes das camadas: lidas do build ou geradas em memória."""
+
+    def __init__(self, build_dir: str = DEFAULT_BUILD_DIR,
+                 sources: Optional[Dict[str, Callable[[], Dict]]] = None):
+        """
+        Args:
+            build_dir: Diretório do build (``manifest.json`` + arquivos)
+            sources: Camadas disponíveis (nome -> carregador do GeoJSON)
+        """
+        self.build_dir = Path(build_dir)
+        self.sources = sources if sources is not None else LAYER_SOURCES
+        self._variants: Dict[Tuple[str, str], LayerVariant] = {}
+        self._lock = threading.Lock()
+
+    def layers(self) -> List[str]:
+        return list(self.sources)
+
+    def get(self, layer: str, band: str) -> Optional[LayerVariant]:
+        """Variante de ``layer`` na faixa ``band`` (None se inexistente)."""
+        if layer not in self.sources or band not in BAND_NAMES:
+            return None
+        key = (layer, band)
+        variant = self._variants.get(key)
+        if variant is not None:
+            return variant
+        with self._lock:
+            if key not in self._variants:
+                loaded = self._load_built(layer)
+                if loaded is None:
+                    loaded = self._build_layer(layer)
+                    logger.info(f"Camada {layer} simplificada em memória (sem build)")
+                self._variants.update(
+                    {(layer, name): v for name, v in loaded.items()}
+                )
+            return self._variants[key]
+
+    def url(self, layer: str, band: str, prefix: str = "/api/v1") -> Optional[str]:
+        """URL versionada (``?v=<etag>``) de uma variante."""
+        variant = self.get(layer, band)
+        if variant is None:
+            return None
+        return f"{prefix}/map-layers/{layer}/{band}.geojson?v={variant.etag}"
+
+    def urls(self, prefix: str = "/api/v1") -> Dict[str, Dict[str, str]]:
+        """URLs de todas as camadas, por faixa."""
+        return {
+            layer: {band: self.url(layer, band, prefix) for band in BAND_NAMES}
+            for layer in self.sources
+        }
+
+    def reload(self) -> None:
+        """Descarta as variantes carregadas (relidas no próximo acesso)."""
+        with self._lock:
+            self._variants.clear()
+
+    def _build_layer(self, layer: str) -> Dict[str, LayerVariant]:
+        geojson = self.sources[layer]()
+        return {
+            band: LayerVariant.encode(build_variant(geojson, tolerance, decimals))
+            for band, _, tolerance, decimals in ZOOM_BANDS
+        }
+
+    def _load_built(self, layer: str) -> Optional[Dict[str, LayerVariant]]:
+        manifest_path = self.build_dir / MANIFEST_FILE
+        if not manifest_path.exists():
+            return None
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            etags = manifest["layers"][layer]
+            variants = {}
+            for band in BAND_NAMES:
+                base = self.build_dir / f"{layer}.{band}.geojson"
+                br_path = base.with_name(base.name + ".br")
+                variants[band] = LayerVariant(
+                    body=base.read_bytes(),
+                    gzip=base.with_name(base.name + ".gz").read_bytes(),
+                    brotli=br_path.read_bytes() if br_path.exists() else None,
+                    etag=etags[band],
+                )
+            return variants
+        except (KeyError, OSError, ValueError) as e:
+            logger.warning(f"Build de {layer} indisponível em {self.build_dir}: {e}")
+            return None
+
+    def build(self, target_dir: Optional[str] = None,
+              layers: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Gera as variantes em disco (``.geojson``, ``.gz``, ``.br``) e o manifesto.
+
+        Returns:
+            Manifesto gravado
+        """
+        target = Path(target_dir) if target_dir else self.build_dir
+        target.mkdir(parents=True, exist_ok=True)
+        manifest: Dict[str, Any] = {"version": MANIFEST_VERSION, "layers": {}}
+        for layer in layers or self.sources:
+            manifest["layers"][layer] = {}
+            for band, variant in self._build_layer(layer).items():
+                base = target / f"{layer}.{band}.geojson"
+                base.write_bytes(variant.body)
+                base.with_name(base.name + ".gz").write_bytes(variant.gzip)
+                if variant.brotli is not None:
+                    base.with_name(base.name + ".br").write_bytes(variant.brotli)
+                manifest["layers"][layer][band] = variant.etag
+                logger.info(
+                    f"{layer}/{band}: {len(variant.body) / 1024:.0f} KB "
+                    f"(gzip {len(variant.gzip) / 1024:.0f} KB)"
+                )
+        (target / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        self.reload()
+        return manifest
+
+
+# Instância singleton
+map_layer_store = MapLayerStore()
+
+
+if __name__ == "__main__":
+    """
+    Gera as variantes simplificadas e pré-comprimidas das camadas.
+
+    Uso:
+    python -m backend.api.services.map_layers [data/geojson/build]
+    """
+    target_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_BUILD_DIR
+    built = map_layer_store.build(target_dir)
+    logger.info(f"Camadas do mapa geradas em {target_dir}: {', '.join(built['layers'])}")
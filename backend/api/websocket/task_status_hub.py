@@ -0,0 +1,202 @@
+"""
+Hub de status de tarefas por processo (Redis pub/sub assíncrono).
+
+Uma única conexão ``redis.asyncio`` com assinatura por padrão
+(``task_status:*``) recebe todos os eventos de tarefas publicados pelos
+workers Celery (``publish_progress`` e sinais de ciclo de vida) e os
+distribui para quantos WebSockets locais estiverem acompanhando cada
+tarefa, via filas ``asyncio`` limitadas.
+
+Backpressure: cada assinante tem uma fila de ``QUEUE_MAXSIZE`` mensagens;
+se o cliente não acompanhar, as mensagens mais antigas são descartadas
+(o status mais recente sempre chega, inclusive o terminal).
+
+Exemplo:
+    queue = await task_status_hub.subscribe(task_id)
+    try:
+        message = await queue.get()
+    finally:
+        task_status_hub.unsubscribe(task_id, queue)
+"""
+
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import redis.asyncio as aioredis
+from loguru import logger
+
+from config.settings import get_settings
+
+CHANNEL_PREFIX = "task_status:"
+CHANNEL_PATTERN = f"{CHANNEL_PREFIX}*"
+
+# Mensagens pendentes por WebSocket antes de descartar as mais antigas
+QUEUE_MAXSIZE = 64
+
+# Último status de tarefas recentes (para assinantes que chegam depois)
+LAST_STATUS_CACHE_SIZE = 10000
+
+# Campos guardados no último status; o resultado completo de uma tarefa
+# concluída vem do result backend (estado inicial do WebSocket)
+LAST_STATUS_FIELDS = ("status", "info", "error", "timestamp")
+
+# Status que encerram o acompanhamento de uma tarefa
+TERMINAL_STATUSES = frozenset({"SUCCESS", "FAILURE", "REVOKED"})
+
+RECONNECT_DELAY_SECONDS = 1.0
+MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+
+def subscriber_url(redis_url: str) -> str:
+    """
+    URL do Redis para o leitor pub/sub, sem ``socket_timeout``.
+
+    O leitor fica bloqueado em ``listen()`` enquanto não há eventos; um
+    timeout de leitura derrubaria a conexão a cada período ocioso.
+    """
+    parts = urlsplit(redis_url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != "socket_timeout"]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class TaskStatusHub:
+    """Multiplexa eventos de tarefas de uma conexão Redis para filas locais."""
+
+    def __init__(self, redis_url: Optional[str] = None, queue_maxsize: int = QUEUE_MAXSIZE):
+        """
+        Args:
+            redis_url: URL do Redis (default: ``REDIS_URL`` das settings,
+                a mesma conexão autenticada usada pelos workers para publicar)
+            queue_maxsize: Mensagens pendentes por assinante
+        """
+        self._redis_url = redis_url
+        self.queue_maxsize = queue_maxsize
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._last_status: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._reader: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    @property
+    def redis_url(self) -> str:
+        if self._redis_url is None:
+            self._redis_url = subscriber_url(get_settings().REDIS_URL)
+        return self._redis_url
+
+    @property
+    def running(self) -> bool:
+        return self._reader is not None and not self._reader.done()
+
+    async def start(self) -> None:
+        """Inicia o leitor (idempotente); aguarda a assinatura ser confirmada."""
+        if not self.running:
+            self._ready = asyncio.Event()
+            self._reader = asyncio.create_task(self._run(), name="task-status-hub")
+        await self._ready.wait()
+
+    async def stop(self) -> None:
+        """Encerra o leitor e a conexão Redis."""
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+
+    async def subscribe(self, task_id: str) -> asyncio.Queue:
+        """
+        Registra um assinante local para a tarefa.
+
+        Se já houver um status conhecido da tarefa, ele é a primeira
+        mensagem da fila.
+        """
+        await self.start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_maxsize)
+        self._subscribers.setdefault(task_id, set()).add(queue)
+        last = self._last_status.get(task_id)
+        if last is not None:
+            queue.put_nowait(last)
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue) -> None:
+        """Remove um assinante (e a tarefa, se era o último)."""
+        queues = self._subscribers.get(task_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[task_id]
+
+    def subscriber_count(self, task_id: Optional[str] = None) -> int:
+        if task_id is not None:
+            return len(self._subscribers.get(task_id, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def dispatch(self, task_id: str, message: Dict[str, Any]) -> None:
+        """Entrega uma mensagem a todos os assinantes locais da tarefa."""
+        self._last_status[task_id] = {
+            key: message[key] for key in LAST_STATUS_FIELDS if key in message
+        }
+        self._last_status.move_to_end(task_id)
+        while len(self._last_status) > LAST_STATUS_CACHE_SIZE:
+            self._last_status.popitem(last=False)
+
+        for queue in self._subscribers.get(task_id, ()):
+            while queue.full():
+                # Cliente lento: descarta a mensagem mais antiga
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def _run(self) -> None:
+        """Leitor único: assina o padrão e despacha até ser cancelado."""
+        delay = RECONNECT_DELAY_SECONDS
+        while True:
+            client = aioredis.Redis.from_url(self.redis_url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(CHANNEL_PATTERN)
+                logger.info(f"TaskStatusHub assinando {CHANNEL_PATTERN}")
+                self._ready.set()
+                delay = RECONNECT_DELAY_SECONDS
+
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    self._handle(message)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"TaskStatusHub: conexão Redis perdida ({e}); "
+                    f"reconectando em {delay:.0f}s"
+                )
+                # Assinantes não ficam bloqueados esperando a reconexão
+                self._ready.set()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+            finally:
+                try:
+                    await pubsub.close()
+                    await client.close()
+                except Exception:
+                    pass
+
+    def _handle(self, message: Dict[str, Any]) -> None:
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        task_id = channel[len(CHANNEL_PREFIX):]
+        try:
+            payload = json.loads(message["data"])
+        except (TypeError, ValueError):
+            logger.warning(f"TaskStatusHub: mensagem inválida em {channel}")
+            return
+        self.dispatch(task_id, payload)
+
+
+# Instância do processo
+task_status_hub = TaskStatusHub()
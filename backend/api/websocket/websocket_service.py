@@ -1,112 +1,85 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from celery.result import AsyncResult
 from loguru import logger
+from starlette.concurrency import run_in_threadpool
 import asyncio
-import redis
-import json
 from datetime import datetime
-import os
+from typing import Dict
+
+from backend.api.websocket.task_status_hub import (QUEUE_MAXSIZE,
+                                                   TERMINAL_STATUSES,
+                                                   task_status_hub)
 
 # Criar roteador
 router = APIRouter()
 
-# Conexão com Redis
-REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
-redis_client = redis.Redis.from_url(REDIS_URL)
+# Tempo máximo de acompanhamento de uma tarefa
+TASK_MONITOR_TIMEOUT_MINUTES = 30
 
-async def broadcast_to_task_subscribers(task_id: str, message: dict):
-    """
-    Publica mensagem no canal Redis correspondente ao task_id.
-    """
-    channel = f"task_status:{task_id}"
-    redis_client.publish(channel, json.dumps(message))
+# Tarefas acompanhadas simultaneamente por um socket multiplexado
+MAX_SUBSCRIPTIONS_PER_SOCKET = 1000
 
-async def monitor_task_timeout(websocket: WebSocket, task_id: str, timeout_minutes: int = 30):
+
+def _initial_state(task_id: str) -> dict:
     """
-    Monitora o timeout da tarefa e fecha a conexão se exceder o limite.
+    Estado atual da tarefa no result backend (consultado uma única vez).
+
+    Tarefas já concluídas retornam a mensagem terminal completa; as demais
+    são acompanhadas pelos eventos publicados pelos workers.
     """
-    try:
-        await asyncio.sleep(timeout_minutes * 60)
-        await websocket.send_json({
-            "status": "TIMEOUT",
-            "error": f"Monitoramento excedeu {timeout_minutes} minutos"
-        })
-        await websocket.close()
-    except Exception as e:
-        logger.error(f"Erro no monitor de timeout: {str(e)}")
+    task = AsyncResult(task_id)
+    state = task.state
+    message = {"status": state, "timestamp": datetime.now().isoformat()}
+
+    if state == "SUCCESS":
+        task_result = task.result
+        result, warnings = task_result if task_result else (None, None)
+        message["result"] = result.to_dict() if hasattr(result, "to_dict") else result
+        message["warnings"] = warnings
+    elif state in ("FAILURE", "REVOKED"):
+        message["error"] = str(task.info)
+    else:
+        message["info"] = task.info if isinstance(task.info, dict) else {}
+    return message
+
 
 @router.websocket("/task_status/{task_id}")
 async def websocket_endpoint(websocket: WebSocket, task_id: str):
     """
     Endpoint WebSocket para monitorar status de tarefas Celery.
-    
+
+    Os eventos chegam pelo ``TaskStatusHub`` do processo (uma conexão
+    Redis assíncrona para todos os sockets); não há polling do Redis nem
+    do result backend.
+
     Args:
         websocket: Conexão WebSocket
         task_id: ID da tarefa Celery a ser monitorada
     """
     await websocket.accept()
-    
-    # Assinar canal Redis para o task_id
-    pubsub = redis_client.pubsub()
-    channel = f"task_status:{task_id}"
-    pubsub.subscribe(channel)
-    
-    # Iniciar monitor de timeout
-    timeout_task = asyncio.create_task(monitor_task_timeout(websocket, task_id))
-    
+
+    # Assina antes de consultar o estado inicial para não perder eventos
+    queue = await task_status_hub.subscribe(task_id)
+    deadline = asyncio.get_running_loop().time() + TASK_MONITOR_TIMEOUT_MINUTES * 60
+
     try:
-        task = AsyncResult(task_id)
-        
-        # Enviar estado inicial
-        current_state = {
-            "status": task.state,
-            "info": task.info or {},
-            "timestamp": datetime.now().isoformat()
-        }
+        current_state = await run_in_threadpool(_initial_state, task_id)
         await websocket.send_json(current_state)
-        await broadcast_to_task_subscribers(task_id, current_state)
-        
-        # Monitorar mensagens do Redis
-        async def listen_redis():
-            while True:
-                message = pubsub.get_message(timeout=1.0)
-                if message and message["type"] == "message":
-                    await websocket.send_json(json.loads(message["data"]))
-                await asyncio.sleep(0.1)
-        
-        # Monitorar tarefa Celery
-        async def monitor_task():
-            while not task.ready():
-                if task.state == 'PROGRESS':
-                    current_state = {
-                        "status": "PROGRESS",
-                        "info": task.info or {},
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    await broadcast_to_task_subscribers(task_id, current_state)
-                await asyncio.sleep(1)
-            
-            if task.failed():
-                error_info = {
-                    "status": "FAILURE",
-                    "error": str(task.info),
-                    "timestamp": datetime.now().isoformat()
-                }
-                await broadcast_to_task_subscribers(task_id, error_info)
-            else:
-                task_result = task.get()
-                result, warnings = task_result if task_result else (None, None)
-                success_info = {
-                    "status": "SUCCESS",
-                    "result": result.to_dict() if hasattr(result, 'to_dict') else result,
-                    "warnings": warnings,
-                    "timestamp": datetime.now().isoformat()
-                }
-                await broadcast_to_task_subscribers(task_id, success_info)
-        
-        # Executar monitoramento do Redis e da tarefa em paralelo
-        await asyncio.gather(listen_redis(), monitor_task())
-    
+        status = current_state["status"]
+
+        while status not in TERMINAL_STATUSES:
+            remaining = deadline - asyncio.get_running_loop().time()
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                await websocket.send_json({
+                    "status": "TIMEOUT",
+                    "error": f"Monitoramento excedeu {TASK_MONITOR_TIMEOUT_MINUTES} minutos"
+                })
+                break
+            await websocket.send_json(message)
+            status = message.get("status")
+
     except WebSocketDisconnect:
         logger.info(f"Cliente desconectado do monitoramento da tarefa {task_id}")
     except Exception as e:
@@ -120,6 +93,97 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
         except Exception:
             logger.error(f"Erro ao enviar mensagem de erro para o cliente: {str(e)}")
     finally:
-        timeout_task.cancel()
-        pubsub.close()
-        await websocket.close()
+        task_status_hub.unsubscribe(task_id, queue)
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+
+async def _forward_task(task_id: str, outbox: asyncio.Queue) -> None:
+    """Encaminha os eventos de uma tarefa para a fila de saída do socket."""
+    queue = await task_status_hub.subscribe(task_id)
+    deadline = asyncio.get_running_loop().time() + TASK_MONITOR_TIMEOUT_MINUTES * 60
+    try:
+        message = await run_in_threadpool(_initial_state, task_id)
+        while True:
+            await outbox.put({"task_id": task_id, **message})
+            if message.get("status") in TERMINAL_STATUSES:
+                break
+            remaining = deadline - asyncio.get_running_loop().time()
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                await outbox.put({
+                    "task_id": task_id,
+                    "status": "TIMEOUT",
+                    "error": f"Monitoramento excedeu {TASK_MONITOR_TIMEOUT_MINUTES} minutos"
+                })
+                break
+    finally:
+        task_status_hub.unsubscribe(task_id, queue)
+
+
+@router.websocket("/task_status")
+async def multiplexed_websocket_endpoint(websocket: WebSocket):
+    """
+    WebSocket multiplexado: várias tarefas em uma única conexão.
+
+    O cliente envia ``{"action": "subscribe" | "unsubscribe", "task_id": ...}``
+    e recebe as mesmas mensagens do endpoint por tarefa, acrescidas de
+    ``task_id``. Cada tarefa deixa de ser acompanhada ao chegar a um
+    status terminal (ou ao timeout).
+
+    Args:
+        websocket: Conexão WebSocket
+    """
+    await websocket.accept()
+
+    # Fila de saída limitada: cliente lento faz as filas do hub
+    # descartarem as mensagens mais antigas de cada tarefa
+    outbox: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+    forwarders: Dict[str, asyncio.Task] = {}
+
+    async def sender() -> None:
+        while True:
+            await websocket.send_json(await outbox.get())
+
+    sender_task = asyncio.create_task(sender())
+    try:
+        while True:
+            command = await websocket.receive_json()
+            action = command.get("action")
+            task_id = command.get("task_id")
+            if not task_id:
+                continue
+
+            if action == "subscribe":
+                if task_id in forwarders and not forwarders[task_id].done():
+                    continue
+                if len(forwarders) >= MAX_SUBSCRIPTIONS_PER_SOCKET:
+                    # Remove as tarefas já encerradas antes de recusar
+                    for done_id in [t for t, f in forwarders.items() if f.done()]:
+                        del forwarders[done_id]
+                if len(forwarders) >= MAX_SUBSCRIPTIONS_PER_SOCKET:
+                    await outbox.put({
+                        "task_id": task_id,
+                        "status": "ERROR",
+                        "error": "Limite de tarefas por conexão atingido"
+                    })
+                    continue
+                forwarders[task_id] = asyncio.create_task(_forward_task(task_id, outbox))
+            elif action == "unsubscribe" and task_id in forwarders:
+                forwarders.pop(task_id).cancel()
+
+    except WebSocketDisconnect:
+        logger.info(f"Cliente multiplexado desconectado ({len(forwarders)} tarefas)")
+    except Exception as e:
+        logger.error(f"Erro no WebSocket multiplexado: {str(e)}")
+    finally:
+        for forwarder in forwarders.values():
+            forwarder.cancel()
+        sender_task.cancel()
+        try:
+            await websocket.close()
+        except Exception:
+            pass
@@ -0,0 +1,3 @@
+"""
+Núcleo de domínio do backend (cálculo de ETo e processamento de dados).
+"""
@@ -0,0 +1,3 @@
+"""
+Processamento de dados climáticos (fusão, filtragem e controle de qualidade).
+"""
@@ -0,0 +1,209 @@
+"""
+Tabela pré-calculada dos termos astronômicos do Penman-Monteith (FAO-56).
+
+Radiação extraterrestre (Ra), ângulo horário do pôr do sol (ωs) e
+duração astronômica do dia (N) dependem só da latitude e do dia do ano.
+Em vez de recalcular a trigonometria por ponto e por dia, os termos são
+tabelados uma vez em uma grade de 0.01° de latitude × 366 dias e lidos
+com interpolação linear na latitude:
+
+    data/astronomy/astronomical_terms.npy    float32 (n_latitudes, 366, 3)
+
+O arquivo é aberto com ``mmap_mode='r'`` (compartilhado entre workers) e
+gerado automaticamente no primeiro uso se não existir. A radiação de céu
+claro (Rso, eq. 37) é derivada de Ra e da elevação, sem trigonometria.
+
+Uso:
+    python -m backend.core.data_processing.astronomy [caminho]
+
+    table = get_astronomy_table()
+    ra = table.extraterrestrial_radiation(lats[:, None], doy[None, :])
+"""
+
+import os
+import sys
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+from loguru import logger
+
+DEFAULT_TABLE_PATH = os.getenv(
+    "ASTRONOMY_TABLE_PATH", "data/astronomy/astronomical_terms.npy"
+)
+
+# Resolução da grade de latitudes (graus)
+LAT_STEP = 0.01
+DAYS_IN_TABLE = 366
+
+# Eixo de termos da tabela
+TERMS = ("ra", "sunset_hour_angle", "daylight_hours")
+TERM_INDEX = {name: i for i, name in enumerate(TERMS)}
+
+SOLAR_CONSTANT = 0.0820  # MJ m⁻² min⁻¹
+
+
+def compute_astronomical_terms(latitudes: Any, day_of_year: Any) -> Dict[str, np.ndarray]:
+    """
+    Termos astronômicos diretamente pelas equações FAO-56 (21, 23-25, 34).
+
+    Usado para gerar a tabela e como referência; arrays são propagados
+    pelas regras de broadcasting do NumPy.
+
+    Returns:
+        {"ra": MJ m⁻² dia⁻¹, "sunset_hour_angle": rad, "daylight_hours": h}
+    """
+    phi = np.radians(np.asarray(latitudes, dtype=float))
+    angle = 2.0 * np.pi * np.asarray(day_of_year, dtype=float) / 365.0
+    dr = 1.0 + 0.033 * np.cos(angle)
+    delta = 0.409 * np.sin(angle - 1.39)
+    omega_s = np.arccos(np.clip(-np.tan(phi) * np.tan(delta), -1.0, 1.0))
+    ra = (24.0 * 60.0 / np.pi) * SOLAR_CONSTANT * dr * (
+        omega_s * np.sin(phi) * np.sin(delta)
+        + np.cos(phi) * np.cos(delta) * np.sin(omega_s)
+    )
+    return {
+        "ra": np.maximum(ra, 0.0),
+        "sunset_hour_angle": omega_s,
+        "daylight_hours": 24.0 / np.pi * omega_s,
+    }
+
+
+class AstronomyTable:
+    """Termos astronômicos tabelados por (latitude, dia do ano)."""
+
+    def __init__(self, values: np.ndarray):
+        """
+        Args:
+            values: Array (n_latitudes, 366, len(TERMS)) de -90° a 90°
+        """
+        self.values = values
+        self.lat_step = 180.0 / (values.shape[0] - 1)
+
+    @classmethod
+    def build(cls, lat_step: float = LAT_STEP) -> "AstronomyTable":
+        """Calcula a tabela em memória (~80 MB em float32 a 0.01°)."""
+        n_lat = int(round(180.0 / lat_step)) + 1
+        latitudes = np.linspace(-90.0, 90.0, n_lat)[:, None]
+        days = np.arange(1, DAYS_IN_TABLE + 1)[None, :]
+        terms = compute_astronomical_terms(latitudes, days)
+        values = np.empty((n_lat, DAYS_IN_TABLE, len(TERMS)), dtype=np.float32)
+        for name, i in TERM_INDEX.items():
+            values[:, :, i] = terms[name]
+        return cls(values)
+
+    def save(self, path: str) -> None:
+        """
+        Grava a tabela (troca atômica do arquivo).
+
+        O arquivo temporário é único por processo: vários workers podem
+        gerar a tabela ao mesmo tempo no primeiro uso.
+        """
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp.npy")
+        try:
+            np.save(tmp_path, np.ascontiguousarray(self.values, dtype=np.float32))
+            os.replace(tmp_path, target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @classmethod
+    def open(cls, path: str) -> "AstronomyTable":
+        """Abre uma tabela gravada por ``save`` (memory-mapped)."""
+        values = np.load(path, mmap_mode="r")
+        if values.ndim != 3 or values.shape[1:] != (DAYS_IN_TABLE, len(TERMS)):
+            raise ValueError(f"Tabela astronômica incompatível em {path}: {values.shape}")
+        return cls(values)
+
+    @classmethod
+    def load_or_build(cls, path: str = DEFAULT_TABLE_PATH) -> "AstronomyTable":
+        """Abre a tabela do disco; gera e grava se não existir ou for inválida."""
+        try:
+            return cls.open(path)
+        except (FileNotFoundError, ValueError) as e:
+            logger.info(f"Tabela astronômica indisponível ({e}); gerando em {path}")
+
+        table = cls.build()
+        try:
+            table.save(path)
+            return cls.open(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Não foi possível gravar a tabela astronômica: {e}")
+            return table
+
+    def lookup(self, latitudes: Any, day_of_year: Any, term: str) -> np.ndarray:
+        """
+        Um termo interpolado linearmente na latitude.
+
+        Args:
+            latitudes: Latitudes em graus
+            day_of_year: Dia do ano (1-366), propagado com ``latitudes``
+            term: Nome do termo (ver ``TERMS``)
+        """
+        position = (np.clip(np.asarray(latitudes, dtype=float), -90.0, 90.0) + 90.0) / self.lat_step
+        lower = np.minimum(np.floor(position).astype(np.intp), self.values.shape[0] - 2)
+        weight = position - lower
+        day_idx = np.clip(np.asarray(day_of_year, dtype=np.intp), 1, DAYS_IN_TABLE) - 1
+        lower, day_idx = np.broadcast_arrays(lower, day_idx)
+        weight = np.broadcast_to(weight, lower.shape)
+
+        k = TERM_INDEX[term]
+        below = self.values[lower, day_idx, k]
+        above = self.values[lower + 1, day_idx, k]
+        return below + weight * (above - below)
+
+    def extraterrestrial_radiation(self, latitudes: Any, day_of_year: Any) -> np.ndarray:
+        """Ra (MJ m⁻² dia⁻¹)."""
+        return self.lookup(latitudes, day_of_year, "ra")
+
+    def daylight_hours(self, latitudes: Any, day_of_year: Any) -> np.ndarray:
+        """N (horas)."""
+        return self.lookup(latitudes, day_of_year, "daylight_hours")
+
+    def sunset_hour_angle(self, latitudes: Any, day_of_year: Any) -> np.ndarray:
+        """ωs (rad)."""
+        return self.lookup(latitudes, day_of_year, "sunset_hour_angle")
+
+    def clear_sky_radiation(
+        self, latitudes: Any, day_of_year: Any, elevations: Optional[Any] = None
+    ) -> np.ndarray:
+        """Rso = (0.75 + 2e-5·z)·Ra (FAO-56 eq. 37), em MJ m⁻² dia⁻¹."""
+        ra = self.extraterrestrial_radiation(latitudes, day_of_year)
+        if elevations is None:
+            return 0.75 * ra
+        z = np.nan_to_num(np.asarray(elevations, dtype=float))
+        return (0.75 + 2e-5 * z) * ra
+
+
+_table: Optional[AstronomyTable] = None
+_table_lock = threading.Lock()
+
+
+def get_astronomy_table() -> AstronomyTable:
+    """Tabela compartilhada do processo (aberta/gerada no primeiro uso)."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = AstronomyTable.load_or_build(DEFAULT_TABLE_PATH)
+    return _table
+
+
+def clear_sky_radiation(
+    latitudes: Any, day_of_year: Any, elevations: Optional[Any] = None
+) -> np.ndarray:
+    """Atalho para ``get_astronomy_table().clear_sky_radiation``."""
+    return get_astronomy_table().clear_sky_radiation(latitudes, day_of_year, elevations)
+
+
+if __name__ == "__main__":
+    """
+    Uso:
+    python -m backend.core.data_processing.astronomy [caminho]
+    """
+    output = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TABLE_PATH
+    AstronomyTable.build().save(output)
+    logger.info(f"Tabela astronômica gravada em {output}")
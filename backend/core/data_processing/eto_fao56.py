@@ -0,0 +1,114 @@
+"""
+ETo diário FAO-56 Penman-Monteith vetorizado.
+
+Calcula blocos inteiros (localizações × dias) de uma vez. Os termos
+astronômicos (Ra e Rso) vêm da tabela pré-calculada de
+``astronomy``, de modo que o laço quente se resume a exponenciais e
+aritmética sobre arrays.
+
+Unidades: °C, %, m/s (a 2 m), MJ m⁻² dia⁻¹, metros. Resultado em mm/dia.
+
+Exemplo:
+    eto = penman_monteith_daily(
+        tmax, tmin, rh, wind_2m, rs,            # (n_locais, n_dias)
+        elevation=elev[:, None],
+        latitude=lats[:, None],
+        day_of_year=doy[None, :],
+    )
+"""
+
+from typing import Any, Optional
+
+import numpy as np
+
+from backend.core.data_processing.astronomy import (AstronomyTable,
+                                                    get_astronomy_table)
+
+STEFAN_BOLTZMANN = 4.903e-9  # MJ K⁻⁴ m⁻² dia⁻¹
+ALBEDO = 0.23
+
+
+def saturation_vapour_pressure(temperature: Any) -> np.ndarray:
+    """e°(T) em kPa (FAO-56 eq. 11)."""
+    temperature = np.asarray(temperature, dtype=float)
+    return 0.6108 * np.exp(17.27 * temperature / (temperature + 237.3))
+
+
+def wind_to_2m(speed: Any, height: float = 10.0) -> np.ndarray:
+    """Converte a velocidade do vento medida a ``height`` metros para 2 m (eq. 47)."""
+    return np.asarray(speed, dtype=float) * 4.87 / np.log(67.8 * height - 5.42)
+
+
+def penman_monteith_daily(
+    tmax: Any,
+    tmin: Any,
+    rh_mean: Any,
+    wind_2m: Any,
+    radiation: Any,
+    elevation: Any,
+    latitude: Any,
+    day_of_year: Any,
+    rh_max: Optional[Any] = None,
+    rh_min: Optional[Any] = None,
+    table: Optional[AstronomyTable] = None,
+) -> np.ndarray:
+    """
+    ETo de referência diário (FAO-56 eq. 6), com G = 0.
+
+    Todos os argumentos são propagados por broadcasting; NaN em qualquer
+    entrada resulta em NaN no dia correspondente.
+
+    Args:
+        tmax, tmin: Temperaturas máxima e mínima (°C)
+        rh_mean: Umidade relativa média (%), usada se ``rh_max``/``rh_min``
+            não forem informadas
+        wind_2m: Vento a 2 m (m/s)
+        radiation: Radiação solar global Rs (MJ m⁻² dia⁻¹)
+        elevation: Elevação (m)
+        latitude: Latitude (graus)
+        day_of_year: Dia do ano (1-366)
+        rh_max, rh_min: Umidade relativa máxima e mínima (%)
+        table: Tabela astronômica (default: compartilhada do processo)
+
+    Returns:
+        ETo (mm/dia), nunca negativo
+    """
+    table = table or get_astronomy_table()
+    tmax = np.asarray(tmax, dtype=float)
+    tmin = np.asarray(tmin, dtype=float)
+    wind_2m = np.asarray(wind_2m, dtype=float)
+    radiation = np.asarray(radiation, dtype=float)
+    elevation = np.nan_to_num(np.asarray(elevation, dtype=float))
+
+    tmean = (tmax + tmin) / 2.0
+    pressure = 101.3 * ((293.0 - 0.0065 * elevation) / 293.0) ** 5.26
+    gamma = 0.000665 * pressure
+    delta = 4098.0 * saturation_vapour_pressure(tmean) / (tmean + 237.3) ** 2
+
+    e_tmax = saturation_vapour_pressure(tmax)
+    e_tmin = saturation_vapour_pressure(tmin)
+    es = (e_tmax + e_tmin) / 2.0
+    if rh_max is not None and rh_min is not None:
+        ea = (
+            e_tmin * np.asarray(rh_max, dtype=float) / 100.0
+            + e_tmax * np.asarray(rh_min, dtype=float) / 100.0
+        ) / 2.0
+    else:
+        ea = es * np.asarray(rh_mean, dtype=float) / 100.0
+
+    rso = table.clear_sky_radiation(latitude, day_of_year, elevation)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        relative_radiation = np.clip(np.where(rso > 0, radiation / rso, 1.0), 0.3, 1.0)
+    rns = (1.0 - ALBEDO) * radiation
+    rnl = (
+        STEFAN_BOLTZMANN
+        * ((tmax + 273.16) ** 4 + (tmin + 273.16) ** 4) / 2.0
+        * (0.34 - 0.14 * np.sqrt(np.maximum(ea, 0.0)))
+        * (1.35 * relative_radiation - 0.35)
+    )
+    rn = rns - rnl
+
+    eto = (
+        0.408 * delta * rn + gamma * 900.0 / (tmean + 273.0) * wind_2m * (es - ea)
+    ) / (delta + gamma * (1.0 + 0.34 * wind_2m))
+    return np.maximum(eto, 0.0)
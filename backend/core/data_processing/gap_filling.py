@@ -0,0 +1,276 @@
+"""
+Preenchimento vetorizado de lacunas em séries de provedores.
+
+Opera sobre arrays (localizações × dias), por variável, em duas etapas:
+
+1. Interpolação das lacunas internas curtas:
+   - ``"linear"``: entre o último e o próximo valor válido
+   - ``"climatology"``: interpola a anomalia em relação à climatologia
+     (ex: média diária do mês) e soma a climatologia de volta, o que
+     preserva o ciclo sazonal em lacunas mais longas
+2. Substituição por outras fontes (ex: Open-Meteo cobrindo os dias de
+   atraso do NASA POWER), com correção do viés médio de cada localização
+   nos dias em que ambas têm dado
+
+Cada valor preenchido recebe um bit ``FILL_*`` na máscara de saída, para
+que o ETo calculado sobre janelas completas possa ser rastreado.
+
+Exemplo:
+    result = fill_block(
+        {"T2M_MAX": nasa_tmax},
+        substitutes={"openmeteo": {"T2M_MAX": openmeteo_tmax}},
+    )
+    tmax = result.values["T2M_MAX"]
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.core.data_processing.quality_control import VARIABLES
+
+FILL_INTERPOLATED = 1
+FILL_CLIMATOLOGY = 2
+FILL_SUBSTITUTED = 4
+
+FILL_NAMES = {
+    FILL_INTERPOLATED: "interpolated",
+    FILL_CLIMATOLOGY: "climatology",
+    FILL_SUBSTITUTED: "substituted",
+}
+
+# Variáveis de ETo (não passam pelo QC, mas podem ser preenchidas)
+ETO_VARIABLES = ("ETo", "eto", "et0_fao_evapotranspiration")
+
+# Método de interpolação por grandeza (None = só substituição por outra
+# fonte: precipitação não é interpolável)
+DEFAULT_METHODS: Dict[str, Optional[str]] = {
+    "temperature": "climatology",
+    "humidity": "linear",
+    "wind": "linear",
+    "radiation": "climatology",
+    "precipitation": None,
+    "eto": "climatology",
+}
+
+# Maior lacuna interna (dias consecutivos) preenchida por interpolação
+MAX_GAP_DAYS = {"linear": 3, "climatology": 7}
+
+# Grandezas sem correção de viés na substituição (multiplicativas/intermitentes)
+NO_BIAS_KINDS = ("precipitation",)
+
+
+def variable_kind(variable: str) -> Optional[str]:
+    """Grandeza de uma variável (``None`` se desconhecida)."""
+    if variable in ETO_VARIABLES:
+        return "eto"
+    kind_role = VARIABLES.get(variable)
+    return kind_role[0] if kind_role else None
+
+
+def interpolate_gaps(values: np.ndarray, max_gap_days: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interpolação linear das lacunas internas de cada linha.
+
+    Lacunas nas bordas (sem valor válido antes ou depois) e lacunas com
+    mais de ``max_gap_days`` dias permanecem NaN.
+
+    Returns:
+        (valores preenchidos, máscara dos valores interpolados)
+    """
+    values = np.array(values, dtype=float, ndmin=2)
+    n_rows, n_cols = values.shape
+    valid = ~np.isnan(values)
+    days = np.arange(n_cols)
+
+    # Índice do último/próximo valor válido de cada posição
+    prev_idx = np.maximum.accumulate(np.where(valid, days, -1), axis=1)
+    next_idx = np.minimum.accumulate(
+        np.where(valid, days, n_cols)[:, ::-1], axis=1
+    )[:, ::-1]
+
+    fill = (
+        ~valid
+        & (prev_idx >= 0)
+        & (next_idx < n_cols)
+        & (next_idx - prev_idx - 1 <= max_gap_days)
+    )
+    if not fill.any():
+        return values, fill
+
+    rows = np.arange(n_rows)[:, None]
+    prev_val = values[rows, np.clip(prev_idx, 0, n_cols - 1)]
+    next_val = values[rows, np.clip(next_idx, 0, n_cols - 1)]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fraction = (days - prev_idx) / (next_idx - prev_idx)
+    filled = np.where(fill, prev_val + fraction * (next_val - prev_val), values)
+    return filled, fill
+
+
+def fill_gaps(
+    values: Any,
+    method: Optional[str] = "linear",
+    climatology: Optional[Any] = None,
+    substitutes: Sequence[Any] = (),
+    max_gap_days: Optional[int] = None,
+    bias_correct: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Preenche as lacunas de uma variável (localizações × dias).
+
+    Args:
+        values: Valores da fonte principal (NaN = ausente)
+        method: ``"linear"``, ``"climatology"`` ou None (só substituição);
+            ``"climatology"`` sem ``climatology`` recai em ``"linear"``
+        climatology: Valor esperado de cada célula (mesmo shape)
+        substitutes: Arrays de outras fontes, em ordem de preferência
+        max_gap_days: Maior lacuna interpolada (default: ``MAX_GAP_DAYS``)
+        bias_correct: Corrige o viés médio da fonte substituta
+
+    Returns:
+        (valores preenchidos, máscara uint8 com bits ``FILL_*``)
+    """
+    filled = np.array(values, dtype=float, ndmin=2)
+    flags = np.zeros(filled.shape, dtype=np.uint8)
+
+    if method == "climatology" and climatology is None:
+        method = "linear"
+    if method is not None:
+        max_gap = MAX_GAP_DAYS[method] if max_gap_days is None else max_gap_days
+        if method == "climatology":
+            expected = np.broadcast_to(np.asarray(climatology, dtype=float), filled.shape)
+            anomalies, interpolated = interpolate_gaps(filled - expected, max_gap)
+            interpolated &= ~np.isnan(expected)
+            filled = np.where(interpolated, anomalies + expected, filled)
+            flags[interpolated] |= FILL_CLIMATOLOGY
+        else:
+            filled, interpolated = interpolate_gaps(filled, max_gap)
+            flags[interpolated] |= FILL_INTERPOLATED
+
+    for substitute in substitutes:
+        other = np.broadcast_to(np.array(substitute, dtype=float, ndmin=2), filled.shape)
+        missing = np.isnan(filled) & ~np.isnan(other)
+        if not missing.any():
+            continue
+        bias = np.zeros((filled.shape[0], 1))
+        if bias_correct:
+            overlap = ~np.isnan(filled) & ~np.isnan(other)
+            diff = np.where(overlap, filled - other, 0.0).sum(axis=1)
+            count = overlap.sum(axis=1)
+            bias[count > 0, 0] = diff[count > 0] / count[count > 0]
+        filled = np.where(missing, other + bias, filled)
+        flags[missing] |= FILL_SUBSTITUTED
+
+    return filled, flags
+
+
+@dataclass
+class GapFillResult:
+    """Valores preenchidos e máscaras ``FILL_*`` por variável."""
+
+    values: Dict[str, np.ndarray] = field(default_factory=dict)
+    flags: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def complete(self, variables: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Dias (locais × dias) com todas as variáveis disponíveis."""
+        selected = [self.values[v] for v in (variables or self.values) if v in self.values]
+        return np.logical_and.reduce([~np.isnan(v) for v in selected])
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Contagem de valores preenchidos por variável e método."""
+        return {
+            variable: {
+                name: int(((flags & bit) != 0).sum())
+                for bit, name in FILL_NAMES.items()
+                if ((flags & bit) != 0).any()
+            }
+            for variable, flags in self.flags.items()
+            if flags.any()
+        }
+
+
+def fill_block(
+    block: Dict[str, Any],
+    substitutes: Optional[Dict[str, Dict[str, Any]]] = None,
+    climatology: Optional[Dict[str, Any]] = None,
+    methods: Optional[Dict[str, Optional[str]]] = None,
+) -> GapFillResult:
+    """
+    Preenche todas as variáveis de um bloco (localizações × dias).
+
+    Args:
+        block: {variável: array} da fonte principal
+        substitutes: {fonte: {variável: array}} em ordem de preferência
+        climatology: {variável: valor esperado por célula}
+        methods: Sobrescreve ``DEFAULT_METHODS`` por variável ou grandeza
+
+    Returns:
+        GapFillResult
+    """
+    substitutes = substitutes or {}
+    climatology = climatology or {}
+    methods = methods or {}
+
+    result = GapFillResult()
+    for variable, values in block.items():
+        kind = variable_kind(variable)
+        method = methods.get(variable, methods.get(kind, DEFAULT_METHODS.get(kind, "linear")))
+        filled, flags = fill_gaps(
+            values,
+            method=method,
+            climatology=climatology.get(variable),
+            substitutes=[
+                source_block[variable]
+                for source_block in substitutes.values()
+                if variable in source_block
+            ],
+            bias_correct=kind not in NO_BIAS_KINDS,
+        )
+        result.values[variable] = filled
+        result.flags[variable] = flags
+    return result
+
+
+def _as_float_row(values: Any) -> Any:
+    return [np.nan if v is None else v for v in values]
+
+
+def fill_series(
+    climate_data: Dict[str, Any],
+    climatology: Optional[Dict[str, Any]] = None,
+    date_field: str = "dates",
+    substitutes: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Tuple[Dict[str, Any], GapFillResult]:
+    """
+    Preenche uma série pontual no formato colunar (``{"dates": [...], var: [...]}``).
+
+    Args:
+        climate_data: Série da fonte principal
+        climatology: {variável: valor esperado por dia}
+        date_field: Campo com as datas
+        substitutes: {fonte: {variável: valores alinhados às datas}}
+
+    Returns:
+        (cópia de ``climate_data`` preenchida, resultado)
+    """
+    n_days = len(climate_data.get(date_field) or [])
+    block = {
+        variable: _as_float_row(values)
+        for variable, values in climate_data.items()
+        if variable_kind(variable) and len(values) == n_days
+    }
+    substitutes = {
+        source: {
+            variable: _as_float_row(values)
+            for variable, values in source_block.items()
+            if len(values) == n_days
+        }
+        for source, source_block in (substitutes or {}).items()
+    }
+    result = fill_block(block, substitutes=substitutes, climatology=climatology)
+
+    filled = dict(climate_data)
+    for variable, values in result.values.items():
+        filled[variable] = [None if np.isnan(v) else float(v) for v in values[0]]
+    return filled, result
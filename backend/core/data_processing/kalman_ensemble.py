@@ -0,0 +1,604 @@
+"""
+Kalman Ensemble - fusão e suavização de séries climáticas.
+
+Componentes:
+- ``kalman_step``: passo do filtro de Kalman escalar, vetorizado em NumPy
+  (funciona com escalares ou arrays de estados independentes)
+- ``KalmanEnsembleStrategy``: N filtros independentes, um por série
+  (localização × variável), avançados juntos em uma única chamada, com
+  medições faltantes mascaradas por NaN e histórico opcional em buffer
+  circular
+- ``SimpleKalmanFilter``: filtro escalar sem climatologia
+- ``AdaptiveKalmanFilter``: filtro escalar inicializado pelas normais
+  mensais, com ruído ajustado pela confiança da estação e rejeição de
+  inovações anômalas
+- ``ClimateKalmanFusion``: orquestrador por variável (uma estação ou
+  várias estações ponderadas pela distância)
+
+Exemplo (lote mundial):
+    ensemble = KalmanEnsembleStrategy.from_normals(normals, stds)
+    for day_values in daily_matrix:          # shape (n_series,)
+        estimates = ensemble.update(day_values)
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+# Tamanho padrão do histórico em buffer circular (0 = sem histórico)
+DEFAULT_HISTORY_SIZE = 365
+
+# Limiar (em desvios da inovação) a partir do qual a medição é atenuada
+DEFAULT_GATE_SIGMA = 3.0
+
+# Parâmetros do filtro adaptado, como frações da variância histórica
+ADAPTIVE_PROCESS_FRACTION = 0.1
+ADAPTIVE_MEASUREMENT_FRACTION = 0.5
+
+# Desvio da medição (fração do desvio histórico) na fusão de estações
+STATION_MEASUREMENT_STD_FRACTION = 0.1
+
+
+def kalman_step(
+    estimate: ArrayLike,
+    error: ArrayLike,
+    measurement: ArrayLike,
+    process_variance: ArrayLike,
+    measurement_variance: ArrayLike,
+    gate_sigma: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Um passo predição + atualização para estados escalares independentes.
+
+    Medições NaN (ou com variância infinita/NaN) mantêm o estado anterior,
+    sem somar a variância do processo.
+
+    Args:
+        estimate: Estimativa a posteriori anterior
+        error: Variância do erro a posteriori anterior
+        measurement: Medições (NaN = faltante)
+        process_variance: Variância do processo (Q)
+        measurement_variance: Variância da medição (R)
+        gate_sigma: Se informado, inovações acima de ``gate_sigma`` desvios
+            têm R inflado proporcionalmente ao quadrado do excesso
+
+    Returns:
+        (nova estimativa, nova variância do erro, máscara de medições usadas)
+    """
+    estimate = np.asarray(estimate, dtype=float)
+    error = np.asarray(error, dtype=float)
+    measurement = np.asarray(measurement, dtype=float)
+    r = np.asarray(measurement_variance, dtype=float)
+
+    valid = np.isfinite(measurement) & np.isfinite(r)
+    z = np.where(valid, measurement, 0.0)
+
+    prior_error = error + process_variance
+    innovation = z - estimate
+
+    if gate_sigma is not None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            normalized = innovation**2 / (prior_error + r)
+        r = r * np.maximum(1.0, normalized / gate_sigma**2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gain = prior_error / (prior_error + r)
+
+    new_estimate = np.where(valid, estimate + gain * innovation, estimate)
+    new_error = np.where(valid, (1.0 - gain) * prior_error, error)
+    return new_estimate, new_error, valid
+
+
+class KalmanEnsembleStrategy:
+    """
+    Ensemble vetorizado de filtros de Kalman escalares.
+
+    Cada posição dos arrays é uma série independente (por exemplo,
+    localização × variável). ``update`` avança todas as séries com uma
+    única sequência de operações NumPy, sem loops em Python.
+
+    Séries com estimativa inicial NaN são inicializadas pela primeira
+    medição válida.
+    """
+
+    def __init__(
+        self,
+        n_series: int,
+        initial_estimate: ArrayLike = np.nan,
+        initial_error: ArrayLike = 1.0,
+        process_variance: ArrayLike = 1e-4,
+        measurement_variance: ArrayLike = 0.1,
+        gate_sigma: Optional[float] = None,
+        history_size: int = 0,
+    ):
+        """
+        Args:
+            n_series: Número de séries
+            initial_estimate: Estimativa inicial (escalar ou por série)
+            initial_error: Variância inicial do erro
+            process_variance: Q (escalar ou por série)
+            measurement_variance: R (escalar ou por série)
+            gate_sigma: Limiar de rejeição de inovações (None = desativado)
+            history_size: Passos mantidos no buffer circular (0 = nenhum)
+        """
+        shape = (n_series,)
+        self.estimate = np.array(np.broadcast_to(initial_estimate, shape), dtype=float)
+        self.error = np.array(np.broadcast_to(initial_error, shape), dtype=float)
+        self.process_variance = np.array(np.broadcast_to(process_variance, shape), dtype=float)
+        self.measurement_variance = np.array(
+            np.broadcast_to(measurement_variance, shape), dtype=float
+        )
+        self.initial_error = self.error.copy()
+        self.gate_sigma = gate_sigma
+
+        self.history_size = history_size
+        self._history = np.full((history_size, n_series), np.nan) if history_size else None
+        self._history_pos = 0
+        self._history_len = 0
+        self.n_updates = np.zeros(n_series, dtype=np.int64)
+
+    @classmethod
+    def from_normals(
+        cls,
+        monthly_normals: ArrayLike,
+        historical_stds: ArrayLike,
+        station_confidence: ArrayLike = 0.8,
+        gate_sigma: Optional[float] = DEFAULT_GATE_SIGMA,
+        history_size: int = 0,
+    ) -> "KalmanEnsembleStrategy":
+        """
+        Ensemble adaptado: parâmetros derivados das normais de cada série.
+
+        Mesma parametrização de ``AdaptiveKalmanFilter``, por série.
+        """
+        normals = np.asarray(monthly_normals, dtype=float)
+        process_variance, measurement_variance, initial_error = adaptive_parameters(
+            historical_stds, station_confidence
+        )
+        return cls(
+            n_series=normals.size,
+            initial_estimate=normals.ravel(),
+            initial_error=np.ravel(np.broadcast_to(initial_error, normals.shape)),
+            process_variance=np.ravel(np.broadcast_to(process_variance, normals.shape)),
+            measurement_variance=np.ravel(np.broadcast_to(measurement_variance, normals.shape)),
+            gate_sigma=gate_sigma,
+            history_size=history_size,
+        )
+
+    def __len__(self) -> int:
+        return self.estimate.size
+
+    def update(
+        self,
+        measurements: ArrayLike,
+        weights: Optional[ArrayLike] = None,
+    ) -> np.ndarray:
+        """
+        Avança todas as séries com uma medição cada.
+
+        Args:
+            measurements: Array (n_series,) com NaN onde não há medição
+            weights: Peso da medição por série (R efetivo = R / peso);
+                peso 0 equivale a medição faltante
+
+        Returns:
+            Cópia das estimativas a posteriori
+        """
+        measurements = np.asarray(measurements, dtype=float)
+
+        # Séries ainda sem estado adotam a primeira medição válida
+        uninitialized = np.isnan(self.estimate) & np.isfinite(measurements)
+        if uninitialized.any():
+            self.estimate[uninitialized] = measurements[uninitialized]
+            self.n_updates[uninitialized] += 1
+
+        r = self.measurement_variance
+        if weights is not None:
+            with np.errstate(divide="ignore"):
+                r = r / np.asarray(weights, dtype=float)
+            r = np.where(np.isfinite(r), r, np.nan)
+
+        pending = np.where(uninitialized, np.nan, measurements)
+        self.estimate, self.error, used = kalman_step(
+            self.estimate,
+            self.error,
+            pending,
+            self.process_variance,
+            r,
+            self.gate_sigma,
+        )
+        self.n_updates += used
+
+        if self._history is not None:
+            self._history[self._history_pos] = np.where(
+                used | uninitialized, self.estimate, np.nan
+            )
+            self._history_pos = (self._history_pos + 1) % self.history_size
+            self._history_len = min(self._history_len + 1, self.history_size)
+
+        return self.estimate.copy()
+
+    def run(
+        self,
+        series: ArrayLike,
+        weights: Optional[ArrayLike] = None,
+    ) -> np.ndarray:
+        """
+        Processa uma matriz (n_passos, n_series) passo a passo.
+
+        Returns:
+            Matriz (n_passos, n_series) com as estimativas após cada passo
+        """
+        series = np.asarray(series, dtype=float)
+        out = np.empty_like(series)
+        for t in range(series.shape[0]):
+            step_weights = None if weights is None else np.asarray(weights)[t]
+            out[t] = self.update(series[t], step_weights)
+        return out
+
+    def history(self) -> np.ndarray:
+        """Histórico (n_passos, n_series) em ordem cronológica (NaN = sem medição)."""
+        if self._history is None:
+            return np.empty((0, self.estimate.size))
+        start = (self._history_pos - self._history_len) % self.history_size
+        order = (start + np.arange(self._history_len)) % self.history_size
+        return self._history[order]
+
+    def confidence_interval(self, z: float = 1.96) -> Tuple[np.ndarray, np.ndarray]:
+        """Intervalo de confiança (default 95%) de cada série."""
+        half_width = z * np.sqrt(self.error)
+        return self.estimate - half_width, self.estimate + half_width
+
+    def reset(self, mask: Optional[np.ndarray] = None) -> None:
+        """Reinicia as séries selecionadas (todas, se ``mask`` for None)."""
+        mask = np.ones(self.estimate.size, dtype=bool) if mask is None else np.asarray(mask)
+        self.estimate[mask] = np.nan
+        self.error[mask] = self.initial_error[mask]
+        self.n_updates[mask] = 0
+        if self._history is not None:
+            self._history[:, mask] = np.nan
+
+
+def adaptive_parameters(
+    historical_std: ArrayLike,
+    station_confidence: ArrayLike,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parâmetros do filtro adaptado a partir da climatologia.
+
+    Quanto maior a confiança nas normais da estação, menor a variância do
+    processo: o filtro se afasta menos da climatologia a cada medição.
+
+    Returns:
+        (variância do processo, variância da medição, erro inicial)
+    """
+    std = np.asarray(historical_std, dtype=float)
+    confidence = np.clip(np.asarray(station_confidence, dtype=float), 0.0, 1.0)
+    variance = std**2
+    process_variance = ADAPTIVE_PROCESS_FRACTION * (1.0 - confidence) * variance
+    measurement_variance = ADAPTIVE_MEASUREMENT_FRACTION * variance
+    # Erro inicial igual ao desvio histórico (incerteza da normal)
+    return process_variance, measurement_variance, std
+
+
+@dataclass
+class KalmanState:
+    """Estado de um filtro escalar."""
+
+    posterior_estimate: float
+    posterior_error_estimate: float
+    history: Deque[float] = field(
+        default_factory=lambda: deque(maxlen=DEFAULT_HISTORY_SIZE)
+    )
+
+
+class SimpleKalmanFilter:
+    """Filtro de Kalman escalar sem informação climatológica."""
+
+    def __init__(
+        self,
+        process_variance: float = 1e-4,
+        measurement_variance: float = 0.1,
+        initial_value: float = 0.0,
+        initial_error: float = 1.0,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+    ):
+        """
+        Args:
+            process_variance: Variância do processo (Q)
+            measurement_variance: Variância da medição (R)
+            initial_value: Estimativa inicial
+            initial_error: Variância inicial do erro
+            history_size: Tamanho do histórico circular (0 = sem histórico)
+        """
+        self.process_variance = process_variance
+        self.measurement_variance = measurement_variance
+        self.gate_sigma: Optional[float] = None
+        self.state = KalmanState(
+            posterior_estimate=float(initial_value),
+            posterior_error_estimate=float(initial_error),
+            history=deque(maxlen=history_size),
+        )
+
+    def update(self, measurement: Optional[float], weight: float = 1.0) -> float:
+        """
+        Incorpora uma medição.
+
+        Args:
+            measurement: Valor medido (None/NaN = faltante)
+            weight: Peso da medição (R efetivo = R / peso)
+
+        Returns:
+            Estimativa a posteriori
+        """
+        if measurement is None or weight <= 0:
+            return self.state.posterior_estimate
+
+        estimate, error, used = kalman_step(
+            self.state.posterior_estimate,
+            self.state.posterior_error_estimate,
+            measurement,
+            self.process_variance,
+            self.measurement_variance / weight,
+            self.gate_sigma,
+        )
+        if used:
+            self.state.posterior_estimate = float(estimate)
+            self.state.posterior_error_estimate = float(error)
+            self.state.history.append(self.state.posterior_estimate)
+        return self.state.posterior_estimate
+
+    def get_state(self) -> Dict[str, Any]:
+        """Estado atual serializável."""
+        return {
+            "estimate": self.state.posterior_estimate,
+            "error_estimate": self.state.posterior_error_estimate,
+            "history_length": len(self.state.history),
+        }
+
+
+class AdaptiveKalmanFilter(SimpleKalmanFilter):
+    """
+    Filtro escalar inicializado pela normal mensal da estação.
+
+    - Estimativa inicial = normal mensal; erro inicial = desvio histórico
+    - Q diminui com a confiança nas normais da estação
+    - Inovações acima de ``gate_sigma`` desvios têm o peso reduzido
+      (medições anômalas movem pouco o filtro)
+    """
+
+    def __init__(
+        self,
+        monthly_normal: Optional[float] = None,
+        historical_std: Optional[float] = None,
+        station_confidence: float = 0.8,
+        gate_sigma: float = DEFAULT_GATE_SIGMA,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+    ):
+        """
+        Args:
+            monthly_normal: Normal climatológica do mês (default 0.0)
+            historical_std: Desvio padrão diário histórico (default 1.0)
+            station_confidence: Confiança (0-1) nas normais da estação
+            gate_sigma: Limiar de rejeição de inovações
+            history_size: Tamanho do histórico circular (0 = sem histórico)
+        """
+        self.monthly_normal = 0.0 if monthly_normal is None else float(monthly_normal)
+        self.historical_std = 1.0 if historical_std is None else float(historical_std)
+        self.station_confidence = station_confidence
+
+        process_variance, measurement_variance, initial_error = adaptive_parameters(
+            self.historical_std, station_confidence
+        )
+        super().__init__(
+            process_variance=float(process_variance),
+            measurement_variance=float(measurement_variance),
+            initial_value=self.monthly_normal,
+            initial_error=float(initial_error),
+            history_size=history_size,
+        )
+        self.gate_sigma = gate_sigma
+
+    def get_state(self) -> Dict[str, Any]:
+        """Estado atual com anomalia e intervalo de confiança de 95%."""
+        state = super().get_state()
+        half_width = 1.96 * np.sqrt(self.state.posterior_error_estimate)
+        state.update(
+            {
+                "monthly_normal": self.monthly_normal,
+                "anomaly": self.state.posterior_estimate - self.monthly_normal,
+                "confidence_interval_95": (
+                    self.state.posterior_estimate - half_width,
+                    self.state.posterior_estimate + half_width,
+                ),
+            }
+        )
+        return state
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+class ClimateKalmanFusion:
+    """
+    Orquestrador de filtros por variável.
+
+    Mantém um filtro por variável entre chamadas (série temporal). Um
+    filtro criado em ``fuse_adaptive`` continua sendo usado por
+    ``fuse_simple`` para a mesma variável.
+    """
+
+    def __init__(self):
+        self.filters: Dict[str, SimpleKalmanFilter] = {}
+        self.fusion_strategy: Optional[str] = None
+
+    def _update(self, variable: str, value: Any, quality: str, result: Dict[str, Any]):
+        kalman = self.filters.get(variable)
+        if _is_missing(value):
+            result[variable] = kalman.state.posterior_estimate if kalman else None
+            result[f"{variable}_quality"] = "missing"
+            return None
+        result[variable] = kalman.update(float(value))
+        result[f"{variable}_quality"] = quality
+        return kalman
+
+    def fuse_simple(
+        self,
+        measurements: Dict[str, Any],
+        station_confidence: float = 0.8,
+    ) -> Dict[str, Any]:
+        """
+        Fusão sem climatologia: a primeira medição inicializa o filtro.
+
+        Returns:
+            Dict com o valor filtrado e ``<variável>_quality`` por variável
+        """
+        self.fusion_strategy = "simple"
+        result: Dict[str, Any] = {}
+        for variable, value in measurements.items():
+            if variable not in self.filters and not _is_missing(value):
+                self.filters[variable] = SimpleKalmanFilter(initial_value=float(value))
+            self._update(variable, value, "simple_kalman", result)
+        return result
+
+    def fuse_adaptive(
+        self,
+        measurements: Dict[str, Any],
+        monthly_normals: Dict[str, float],
+        historical_stds: Dict[str, float],
+        station_confidence: float = 0.8,
+    ) -> Dict[str, Any]:
+        """
+        Fusão com climatologia (normais e desvios por variável).
+
+        Variáveis sem normal usam o filtro simples.
+
+        Returns:
+            Dict com valor filtrado, ``<variável>_anomaly`` e
+            ``<variável>_quality`` por variável
+        """
+        self.fusion_strategy = "adaptive"
+        result: Dict[str, Any] = {}
+        for variable, value in measurements.items():
+            normal = monthly_normals.get(variable)
+            if variable not in self.filters:
+                if normal is not None:
+                    self.filters[variable] = AdaptiveKalmanFilter(
+                        monthly_normal=normal,
+                        historical_std=historical_stds.get(variable),
+                        station_confidence=station_confidence,
+                    )
+                elif not _is_missing(value):
+                    self.filters[variable] = SimpleKalmanFilter(initial_value=float(value))
+
+            quality = "adaptive_kalman" if normal is not None else "simple_kalman"
+            kalman = self._update(variable, value, quality, result)
+            if kalman is not None and normal is not None:
+                result[f"{variable}_anomaly"] = result[variable] - normal
+        return result
+
+    def fuse_multiple_stations(
+        self,
+        stations_data: List[Dict[str, Any]],
+        distance_weights: Optional[Sequence[float]] = None,
+        has_historical_data: bool = False,
+        monthly_normals: Optional[Dict[str, float]] = None,
+        historical_stds: Optional[Dict[str, float]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fusão estática de várias estações no mesmo instante.
+
+        Equivale a uma atualização de Kalman com uma medição por estação
+        (R_i = R / peso_i), vetorizada para todas as variáveis:
+        - Sem histórico: prior não informativo → média ponderada
+        - Com histórico: prior = normal mensal com variância = desvio²,
+          e R = (STATION_MEASUREMENT_STD_FRACTION × desvio)²
+
+        Args:
+            stations_data: Lista de dicts {variável: valor} por estação
+            distance_weights: Peso de cada estação (default: iguais)
+            has_historical_data: Usa normais/desvios como prior
+            monthly_normals: Normais por variável
+            historical_stds: Desvios diários por variável
+
+        Returns:
+            Dict com valor fundido, ``<variável>_uncertainty``,
+            ``<variável>_n_stations`` e ``<variável>_quality``
+        """
+        self.fusion_strategy = "multi_station"
+        variables = list(dict.fromkeys(v for station in stations_data for v in station))
+        if not variables:
+            return {}
+
+        values = np.array(
+            [
+                [np.nan if _is_missing(station.get(v)) else float(station[v]) for v in variables]
+                for station in stations_data
+            ],
+            dtype=float,
+        )  # (estações, variáveis)
+        weights = np.ones(len(stations_data)) if distance_weights is None else np.asarray(distance_weights, dtype=float)
+        w = np.where(np.isnan(values), 0.0, weights[:, None])
+        weight_sum = w.sum(axis=0)
+        observed = np.nan_to_num(values)
+
+        monthly_normals = monthly_normals or {}
+        historical_stds = historical_stds or {}
+        use_prior = np.array(
+            [
+                has_historical_data
+                and monthly_normals.get(v) is not None
+                and bool(historical_stds.get(v))
+                for v in variables
+            ]
+        )
+        prior_mean = np.array([monthly_normals.get(v) or 0.0 for v in variables], dtype=float)
+        prior_std = np.array([historical_stds.get(v) or 1.0 for v in variables], dtype=float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Precisão: prior 1/σ², medições w_i / (f·σ)²
+            measurement_precision = w / (STATION_MEASUREMENT_STD_FRACTION * prior_std) ** 2
+            prior_precision = np.where(use_prior, 1.0 / prior_std**2, 0.0)
+            total_precision = prior_precision + measurement_precision.sum(axis=0)
+            adaptive_value = (
+                prior_precision * prior_mean + (measurement_precision * observed).sum(axis=0)
+            ) / total_precision
+            simple_value = (w * observed).sum(axis=0) / weight_sum
+            simple_spread = np.sqrt(
+                (w * (observed - simple_value) ** 2).sum(axis=0) / weight_sum
+            )
+            fused = np.where(use_prior, adaptive_value, simple_value)
+            uncertainty = np.where(use_prior, np.sqrt(1.0 / total_precision), simple_spread)
+
+        n_stations = (w > 0).sum(axis=0)
+        result: Dict[str, Any] = {}
+        for i, variable in enumerate(variables):
+            if n_stations[i] == 0:
+                result[variable] = None
+                result[f"{variable}_quality"] = "missing"
+                continue
+            result[variable] = float(fused[i])
+            result[f"{variable}_uncertainty"] = float(uncertainty[i])
+            result[f"{variable}_n_stations"] = int(n_stations[i])
+            result[f"{variable}_quality"] = (
+                "multi_station_adaptive" if use_prior[i] else "multi_station_simple"
+            )
+            if use_prior[i]:
+                result[f"{variable}_anomaly"] = float(fused[i] - prior_mean[i])
+        return result
+
+    def reset(self, variable: Optional[str] = None) -> None:
+        """Remove o filtro de uma variável (ou de todas)."""
+        if variable is None:
+            self.filters.clear()
+        else:
+            self.filters.pop(variable, None)
+
+    def get_all_states(self) -> Dict[str, Dict[str, Any]]:
+        """Estado de todos os filtros por variável."""
+        return {variable: kalman.get_state() for variable, kalman in self.filters.items()}
@@ -0,0 +1,349 @@
+"""
+Persistência incremental do estado dos filtros de Kalman.
+
+Guarda o posterior de cada série (localização × variável × fonte) no
+Redis, em formato binário compacto, para que cada novo dia seja
+incorporado em O(1): carrega o estado, aplica um passo do filtro e grava
+de volta, sem reprocessar o histórico da localização.
+
+Layout no Redis:
+    kalman:v<versão>:<fonte>:<lat>:<lng>     (hash)
+        <variável> -> struct '<4dqi' (44 bytes)
+            estimativa, erro, Q, R, n_updates, último dia (dias desde 1970)
+
+A versão combina ``STATE_SCHEMA_VERSION`` com uma impressão digital dos
+parâmetros do filtro: mudar a parametrização troca o namespace e o estado
+antigo deixa de ser lido (e expira pelo TTL ou via ``purge_stale``).
+
+Exemplo (job diário em lote):
+    store = KalmanStateStore()
+    keys = [(lat, lng, "eto", "nasa_power") for lat, lng in points]
+    ensemble, last_days = store.load_ensemble(keys, normals, stds)
+    ensemble.update(today_values)
+    store.save_ensemble(keys, ensemble, today)
+"""
+
+import hashlib
+import struct
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from backend.core.data_processing import kalman_ensemble
+from backend.core.data_processing.kalman_ensemble import \
+    KalmanEnsembleStrategy
+from backend.database.data_storage import COORD_PRECISION, DEFAULT_SOURCE
+
+# Incrementar quando o layout binário mudar
+STATE_SCHEMA_VERSION = 1
+
+KEY_PREFIX = "kalman"
+
+# estimativa, erro, Q, R (float64), n_updates (int64), último dia (int32)
+_RECORD = struct.Struct("<4dqi")
+NO_DAY = -1
+
+# Estado sem atualização por mais de ~13 meses expira
+DEFAULT_TTL_SECONDS = 400 * 86400
+
+# (lat, lng, variável, fonte)
+StateKey = Tuple[float, float, str, str]
+
+
+def parameters_fingerprint() -> str:
+    """Impressão digital dos parâmetros que definem o significado do estado."""
+    params = (
+        STATE_SCHEMA_VERSION,
+        kalman_ensemble.ADAPTIVE_PROCESS_FRACTION,
+        kalman_ensemble.ADAPTIVE_MEASUREMENT_FRACTION,
+        kalman_ensemble.DEFAULT_GATE_SIGMA,
+    )
+    return hashlib.sha1(repr(params).encode()).hexdigest()[:8]
+
+
+def day_number(day: Any) -> int:
+    """Data (date, datetime64 ou 'YYYY-MM-DD') -> dias desde 1970-01-01."""
+    if isinstance(day, date):
+        day = day.isoformat()[:10]
+    return int(np.datetime64(day, "D").astype(np.int64))
+
+
+def pack_state(
+    estimate: float,
+    error: float,
+    process_variance: float,
+    measurement_variance: float,
+    n_updates: int,
+    last_day: int = NO_DAY,
+) -> bytes:
+    """Serializa o estado de uma série (44 bytes)."""
+    return _RECORD.pack(
+        estimate, error, process_variance, measurement_variance, int(n_updates), int(last_day)
+    )
+
+
+def unpack_state(raw: bytes) -> Dict[str, Any]:
+    """Desserializa o estado de uma série."""
+    estimate, error, q, r, n_updates, last_day = _RECORD.unpack(raw)
+    return {
+        "estimate": estimate,
+        "error": error,
+        "process_variance": q,
+        "measurement_variance": r,
+        "n_updates": n_updates,
+        "last_day": last_day,
+    }
+
+
+class KalmanStateStore:
+    """
+    Estado dos filtros por (localização, variável, fonte) no Redis.
+
+    As variáveis de uma mesma localização/fonte ficam no mesmo hash, então
+    carregar ou gravar todas as variáveis de um ponto é um único comando;
+    operações em lote usam pipeline (um round trip por lote).
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        version: Optional[str] = None,
+    ):
+        """
+        Args:
+            redis_client: Cliente Redis síncrono (default: pool compartilhado)
+            ttl_seconds: Expiração do estado sem atualização
+            version: Namespace do estado (default: schema + parâmetros)
+        """
+        if redis_client is None:
+            from backend.database.redis_pool import get_redis_client
+
+            redis_client = get_redis_client()
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.version = version or f"{STATE_SCHEMA_VERSION}-{parameters_fingerprint()}"
+
+    def _hash_key(self, lat: float, lng: float, source: str) -> str:
+        return (
+            f"{KEY_PREFIX}:v{self.version}:{source}:"
+            f"{round(float(lat), COORD_PRECISION)}:{round(float(lng), COORD_PRECISION)}"
+        )
+
+    def _group(self, keys: Sequence[StateKey]) -> Dict[str, List[Tuple[int, str]]]:
+        """Agrupa as chaves por hash: {hash: [(posição, variável)]}."""
+        groups: Dict[str, List[Tuple[int, str]]] = {}
+        for i, (lat, lng, variable, source) in enumerate(keys):
+            groups.setdefault(self._hash_key(lat, lng, source), []).append((i, variable))
+        return groups
+
+    def load_many(self, keys: Sequence[StateKey]) -> Dict[str, np.ndarray]:
+        """
+        Carrega o estado de várias séries em um round trip.
+
+        Returns:
+            Arrays alinhados com ``keys``: estimate, error, process_variance,
+            measurement_variance, n_updates, last_day e found
+        """
+        n = len(keys)
+        state = {
+            "estimate": np.full(n, np.nan),
+            "error": np.full(n, np.nan),
+            "process_variance": np.full(n, np.nan),
+            "measurement_variance": np.full(n, np.nan),
+            "n_updates": np.zeros(n, dtype=np.int64),
+            "last_day": np.full(n, NO_DAY, dtype=np.int64),
+            "found": np.zeros(n, dtype=bool),
+        }
+        if not n:
+            return state
+
+        groups = self._group(keys)
+        pipe = self.redis.pipeline(transaction=False)
+        for hash_key, members in groups.items():
+            pipe.hmget(hash_key, [variable for _, variable in members])
+        for members, raws in zip(groups.values(), pipe.execute()):
+            for (i, _), raw in zip(members, raws):
+                if raw is None:
+                    continue
+                record = unpack_state(raw)
+                for field, value in record.items():
+                    state[field][i] = value
+                state["found"][i] = True
+        return state
+
+    def save_many(
+        self,
+        keys: Sequence[StateKey],
+        estimate: np.ndarray,
+        error: np.ndarray,
+        process_variance: np.ndarray,
+        measurement_variance: np.ndarray,
+        n_updates: np.ndarray,
+        last_day: Any,
+    ) -> int:
+        """
+        Grava o estado de várias séries em um round trip.
+
+        Séries sem nenhuma atualização (estimativa NaN) não são gravadas.
+
+        Args:
+            last_day: Data da última medição incorporada, ou array de
+                números de dia (``day_number``) por série
+
+        Returns:
+            Número de séries gravadas
+        """
+        if isinstance(last_day, np.ndarray):
+            last_days = last_day.astype(np.int64)
+        else:
+            last_days = np.full(len(keys), day_number(last_day), dtype=np.int64)
+        pipe = self.redis.pipeline(transaction=False)
+        saved = 0
+        for hash_key, members in self._group(keys).items():
+            mapping = {
+                variable: pack_state(
+                    estimate[i],
+                    error[i],
+                    process_variance[i],
+                    measurement_variance[i],
+                    n_updates[i],
+                    last_days[i],
+                )
+                for i, variable in members
+                if np.isfinite(estimate[i])
+            }
+            if not mapping:
+                continue
+            pipe.hset(hash_key, mapping=mapping)
+            pipe.expire(hash_key, self.ttl_seconds)
+            saved += len(mapping)
+        pipe.execute()
+        return saved
+
+    def load_ensemble(
+        self,
+        keys: Sequence[StateKey],
+        monthly_normals: Optional[Any] = None,
+        historical_stds: Optional[Any] = None,
+        station_confidence: Any = 0.8,
+        gate_sigma: Optional[float] = kalman_ensemble.DEFAULT_GATE_SIGMA,
+    ) -> Tuple[KalmanEnsembleStrategy, np.ndarray]:
+        """
+        Monta um ensemble com o estado persistido de cada série.
+
+        Séries sem estado são inicializadas pelas normais (se informadas)
+        ou pela primeira medição.
+
+        Returns:
+            (ensemble, último dia incorporado por série; -1 se nenhum)
+        """
+        n = len(keys)
+        if monthly_normals is not None:
+            ensemble = KalmanEnsembleStrategy.from_normals(
+                np.broadcast_to(np.asarray(monthly_normals, dtype=float), (n,)),
+                np.broadcast_to(np.asarray(historical_stds, dtype=float), (n,)),
+                station_confidence,
+                gate_sigma=gate_sigma,
+            )
+        else:
+            ensemble = KalmanEnsembleStrategy(n, gate_sigma=gate_sigma)
+
+        state = self.load_many(keys)
+        found = state["found"]
+        ensemble.estimate[found] = state["estimate"][found]
+        ensemble.error[found] = state["error"][found]
+        ensemble.process_variance[found] = state["process_variance"][found]
+        ensemble.measurement_variance[found] = state["measurement_variance"][found]
+        ensemble.n_updates[found] = state["n_updates"][found]
+
+        logger.debug(f"Kalman state: {int(found.sum())}/{n} séries restauradas")
+        return ensemble, state["last_day"]
+
+    def save_ensemble(
+        self,
+        keys: Sequence[StateKey],
+        ensemble: KalmanEnsembleStrategy,
+        last_day: Any,
+    ) -> int:
+        """Grava o estado corrente de um ensemble (ver ``save_many``)."""
+        return self.save_many(
+            keys,
+            ensemble.estimate,
+            ensemble.error,
+            ensemble.process_variance,
+            ensemble.measurement_variance,
+            ensemble.n_updates,
+            last_day,
+        )
+
+    def update_location(
+        self,
+        lat: float,
+        lng: float,
+        day: Any,
+        measurements: Dict[str, Optional[float]],
+        source: str = DEFAULT_SOURCE,
+        monthly_normals: Optional[Dict[str, float]] = None,
+        historical_stds: Optional[Dict[str, float]] = None,
+        station_confidence: float = 0.8,
+    ) -> Dict[str, Optional[float]]:
+        """
+        Incorpora as medições de um dia de uma localização.
+
+        Um HMGET, um passo do filtro e um HSET. Variáveis cujo estado já
+        incorporou ``day`` (ou um dia posterior) não são atualizadas de
+        novo, então reprocessar o mesmo dia é idempotente.
+
+        Returns:
+            {variável: estimativa a posteriori}
+        """
+        variables = list(measurements)
+        keys = [(lat, lng, variable, source) for variable in variables]
+        normals = None
+        stds = None
+        if monthly_normals:
+            normals = [monthly_normals.get(v, np.nan) for v in variables]
+            stds = [(historical_stds or {}).get(v, 1.0) for v in variables]
+
+        ensemble, last_days = self.load_ensemble(
+            keys, normals, stds, station_confidence
+        )
+        today = day_number(day)
+        values = np.array(
+            [np.nan if measurements[v] is None else measurements[v] for v in variables],
+            dtype=float,
+        )
+        values[last_days >= today] = np.nan
+
+        ensemble.update(values)
+        updated_days = np.where(np.isnan(values), last_days, today)
+        self.save_ensemble(keys, ensemble, updated_days)
+        return {
+            variable: (None if np.isnan(estimate) else float(estimate))
+            for variable, estimate in zip(variables, ensemble.estimate)
+        }
+
+    def purge_stale(self, batch_size: int = 1000) -> int:
+        """
+        Remove estados de versões anteriores (parâmetros antigos).
+
+        Returns:
+            Número de chaves removidas
+        """
+        current = f"{KEY_PREFIX}:v{self.version}:"
+        removed = 0
+        stale: List[bytes] = []
+        for key in self.redis.scan_iter(match=f"{KEY_PREFIX}:v*", count=batch_size):
+            name = key.decode() if isinstance(key, bytes) else key
+            if not name.startswith(current):
+                stale.append(key)
+            if len(stale) >= batch_size:
+                removed += self.redis.delete(*stale)
+                stale.clear()
+        if stale:
+            removed += self.redis.delete(*stale)
+        logger.info(f"Kalman state: {removed} chaves de versões antigas removidas")
+        return removed
@@ -0,0 +1,357 @@
+"""
+Controle de qualidade meteorológico vetorizado (antes do cálculo de ETo).
+
+Roda sobre blocos inteiros (localizações × dias) e devolve máscaras de
+flags em bits, em vez de lançar exceções valor a valor:
+
+- ``FLAG_RANGE``: fora dos limites físicos da variável
+- ``FLAG_CONSISTENCY``: inconsistência interna (Tmin > Tmax, média fora
+  de [mín, máx], UR mín > UR máx...)
+- ``FLAG_STEP``: variação de um dia para o outro acima do plausível
+- ``FLAG_PERSISTENCE``: mesmo valor repetido por ``PERSISTENCE_DAYS``
+  dias ou mais (sensor travado / preenchimento constante)
+- ``FLAG_RADIATION``: radiação acima do limite de céu claro (Rso,
+  FAO-56 eq. 37, da tabela astronômica pré-calculada) com tolerância
+
+Unidades esperadas: °C, %, m/s, MJ m⁻² dia⁻¹ e mm/dia. Aceita os nomes
+das variáveis do NASA POWER (``T2M_MAX``...), do Open-Meteo
+(``temperature_2m_max``...) e das colunas de ``eto_results``
+(``t2m_max``...).
+
+Exemplo (bloco mundial):
+    qc = run_quality_control(
+        {"T2M_MAX": tmax, "T2M_MIN": tmin},   # shape (n_locais, n_dias)
+        latitudes=lats,
+        dates=dates,
+    )
+    tmax_limpo = qc.apply({"T2M_MAX": tmax})["T2M_MAX"]
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from backend.core.data_processing.astronomy import clear_sky_radiation
+
+FLAG_RANGE = 1
+FLAG_CONSISTENCY = 2
+FLAG_STEP = 4
+FLAG_PERSISTENCE = 8
+FLAG_RADIATION = 16
+
+FLAG_NAMES = {
+    FLAG_RANGE: "range",
+    FLAG_CONSISTENCY: "consistency",
+    FLAG_STEP: "step",
+    FLAG_PERSISTENCE: "persistence",
+    FLAG_RADIATION: "clear_sky",
+}
+ALL_FLAGS = FLAG_RANGE | FLAG_CONSISTENCY | FLAG_STEP | FLAG_PERSISTENCE | FLAG_RADIATION
+
+# Nome da variável -> (grandeza, papel na consistência interna)
+VARIABLES: Dict[str, Tuple[str, Optional[str]]] = {
+    # Colunas de eto_results
+    "t2m_max": ("temperature", "max"),
+    "t2m_min": ("temperature", "min"),
+    "t2m_mean": ("temperature", "mean"),
+    "rh2m": ("humidity", "mean"),
+    "rh2m_max": ("humidity", "max"),
+    "rh2m_min": ("humidity", "min"),
+    "ws2m": ("wind", "mean"),
+    "radiation": ("radiation", None),
+    "precipitation": ("precipitation", None),
+    # NASA POWER
+    "T2M_MAX": ("temperature", "max"),
+    "T2M_MIN": ("temperature", "min"),
+    "T2M": ("temperature", "mean"),
+    "RH2M": ("humidity", "mean"),
+    "WS2M": ("wind", "mean"),
+    "ALLSKY_SFC_SW_DWN": ("radiation", None),
+    "PRECTOTCORR": ("precipitation", None),
+    # Open-Meteo
+    "temperature_2m_max": ("temperature", "max"),
+    "temperature_2m_min": ("temperature", "min"),
+    "temperature_2m_mean": ("temperature", "mean"),
+    "relative_humidity_2m_max": ("humidity", "max"),
+    "relative_humidity_2m_mean": ("humidity", "mean"),
+    "relative_humidity_2m_min": ("humidity", "min"),
+    "wind_speed_10m_max": ("wind", "max"),
+    "wind_speed_10m_mean": ("wind", "mean"),
+    "shortwave_radiation_sum": ("radiation", None),
+    "precipitation_sum": ("precipitation", None),
+}
+
+# Limites físicos por grandeza (inclusivos)
+RANGE_LIMITS = {
+    "temperature": (-90.0, 60.0),
+    "humidity": (0.0, 100.0),
+    "wind": (0.0, 60.0),
+    "radiation": (0.0, 45.0),
+    "precipitation": (0.0, 500.0),
+}
+
+# Variação máxima plausível entre dias consecutivos
+STEP_LIMITS = {
+    "temperature": 20.0,
+    "humidity": 60.0,
+    "wind": 20.0,
+}
+
+# Dias consecutivos com valor idêntico a partir dos quais a série é suspeita
+# (precipitação fica de fora: sequências de dias secos são legítimas)
+PERSISTENCE_DAYS = 5
+PERSISTENCE_KINDS = ("temperature", "humidity", "wind", "radiation")
+
+# Rs pode exceder Rso modelado em reanálises/satélite; tolerância relativa
+CLEAR_SKY_TOLERANCE = 1.1
+
+
+def _persistent_days(values: np.ndarray, n_days: int) -> np.ndarray:
+    """Dias pertencentes a sequências de ``n_days``+ valores idênticos."""
+    n_cols = values.shape[1]
+    if n_cols < n_days:
+        return np.zeros(values.shape, dtype=bool)
+
+    # NaN != NaN, então lacunas interrompem a sequência
+    equal = values[:, 1:] == values[:, :-1]
+    starts = sliding_window_view(equal, n_days - 1, axis=1).all(axis=2)
+
+    # Dia d é coberto se alguma sequência começa em [d - n_days + 1, d]
+    cumulative = np.concatenate(
+        [np.zeros((values.shape[0], 1), dtype=np.int64), np.cumsum(starts, axis=1)],
+        axis=1,
+    )
+    days = np.arange(n_cols)
+    upper = np.minimum(days + 1, starts.shape[1])
+    lower = np.clip(days - n_days + 1, 0, starts.shape[1])
+    return (cumulative[:, upper] - cumulative[:, lower]) > 0
+
+
+@dataclass
+class QualityControlResult:
+    """Máscaras de flags (bits ``FLAG_*``) por variável, (locais × dias)."""
+
+    flags: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def mask(self, variable: str, checks: int = ALL_FLAGS) -> np.ndarray:
+        """Máscara booleana dos valores reprovados em ``checks``."""
+        return (self.flags[variable] & checks) != 0
+
+    def apply(
+        self, block: Dict[str, Any], checks: int = ALL_FLAGS
+    ) -> Dict[str, np.ndarray]:
+        """Cópia do bloco com os valores reprovados substituídos por NaN."""
+        cleaned = {}
+        for variable, values in block.items():
+            array = np.array(values, dtype=float, ndmin=2)
+            if variable in self.flags:
+                array[self.mask(variable, checks)] = np.nan
+            cleaned[variable] = array
+        return cleaned
+
+    def any_flagged(self, variables: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Dias (locais × dias) com alguma das variáveis reprovada."""
+        selected = [self.flags[v] for v in (variables or self.flags) if v in self.flags]
+        if not selected:
+            return np.zeros((0, 0), dtype=bool)
+        return np.bitwise_or.reduce(selected) != 0
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Contagem de valores reprovados por variável e teste."""
+        return {
+            variable: {
+                name: int(((flags & bit) != 0).sum())
+                for bit, name in FLAG_NAMES.items()
+                if ((flags & bit) != 0).any()
+            }
+            for variable, flags in self.flags.items()
+            if flags.any()
+        }
+
+
+def run_quality_control(
+    block: Dict[str, Any],
+    latitudes: Optional[Any] = None,
+    dates: Optional[Sequence[Any]] = None,
+    elevations: Optional[Any] = None,
+) -> QualityControlResult:
+    """
+    Executa todos os testes sobre um bloco (localizações × dias).
+
+    Variáveis desconhecidas são ignoradas. O teste de céu claro só roda
+    se ``latitudes`` e ``dates`` forem informados.
+
+    Args:
+        block: {variável: array (n_locais, n_dias) ou (n_dias,)}
+        latitudes: Latitude de cada localização
+        dates: Data de cada coluna
+        elevations: Elevação (m) de cada localização
+
+    Returns:
+        QualityControlResult com as flags de cada variável conhecida
+    """
+    arrays = {
+        variable: np.array(values, dtype=float, ndmin=2)
+        for variable, values in block.items()
+        if variable in VARIABLES
+    }
+    flags = {
+        variable: np.zeros(array.shape, dtype=np.uint8)
+        for variable, array in arrays.items()
+    }
+
+    roles: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+    with np.errstate(invalid="ignore"):
+        for variable, values in arrays.items():
+            kind, role = VARIABLES[variable]
+            roles[kind][role].append(variable)
+
+            low, high = RANGE_LIMITS[kind]
+            flags[variable][(values < low) | (values > high)] |= FLAG_RANGE
+
+            step_limit = STEP_LIMITS.get(kind)
+            if step_limit is not None and values.shape[1] > 1:
+                jumps = np.abs(np.diff(values, axis=1)) > step_limit
+                flags[variable][:, 1:][jumps] |= FLAG_STEP
+
+            if kind in PERSISTENCE_KINDS:
+                flags[variable][_persistent_days(values, PERSISTENCE_DAYS)] |= FLAG_PERSISTENCE
+
+        # Consistência interna: mín <= média <= máx da mesma grandeza
+        for kind_roles in roles.values():
+            for low_var in kind_roles.get("min", []):
+                for high_var in kind_roles.get("max", []):
+                    bad = arrays[low_var] > arrays[high_var]
+                    flags[low_var][bad] |= FLAG_CONSISTENCY
+                    flags[high_var][bad] |= FLAG_CONSISTENCY
+            for mean_var in kind_roles.get("mean", []):
+                mean = arrays[mean_var]
+                bad = np.zeros(mean.shape, dtype=bool)
+                for low_var in kind_roles.get("min", []):
+                    bad |= mean < arrays[low_var]
+                for high_var in kind_roles.get("max", []):
+                    bad |= mean > arrays[high_var]
+                flags[mean_var][bad] |= FLAG_CONSISTENCY
+
+        # Radiação acima do limite de céu claro
+        radiation_vars = roles.get("radiation", {}).get(None, [])
+        if radiation_vars and latitudes is not None and dates is not None:
+            day_of_year = pd.DatetimeIndex(pd.to_datetime(list(dates))).dayofyear
+            rso = clear_sky_radiation(
+                np.atleast_1d(np.asarray(latitudes, dtype=float))[:, None],
+                day_of_year.to_numpy()[None, :],
+                None if elevations is None else np.asarray(elevations, dtype=float)[:, None],
+            )
+            for variable in radiation_vars:
+                flags[variable][arrays[variable] > CLEAR_SKY_TOLERANCE * rso] |= FLAG_RADIATION
+
+    return QualityControlResult(flags)
+
+
+def quality_control_series(
+    climate_data: Dict[str, Any],
+    latitude: float,
+    elevation: Optional[float] = None,
+    date_field: str = "dates",
+    dependent: Sequence[str] = (),
+) -> Tuple[Dict[str, Any], QualityControlResult]:
+    """
+    QC de uma série pontual no formato colunar (``{"dates": [...], var: [...]}``).
+
+    Args:
+        dependent: Campos derivados (ex: ``"et0_fao_evapotranspiration"``)
+            anulados nos dias com alguma variável reprovada
+
+    Returns:
+        (cópia de ``climate_data`` com valores reprovados como None, resultado)
+    """
+    dates = climate_data.get(date_field) or []
+    block = {
+        variable: values
+        for variable, values in climate_data.items()
+        if variable in VARIABLES and len(values) == len(dates)
+    }
+    result = run_quality_control(
+        block,
+        latitudes=[latitude],
+        dates=dates,
+        elevations=None if elevation is None else [elevation],
+    )
+
+    cleaned = dict(climate_data)
+    for variable, values in result.apply(block).items():
+        cleaned[variable] = [None if np.isnan(v) else float(v) for v in values[0]]
+    if block:
+        flagged_day = result.any_flagged()[0]
+        for name in dependent:
+            values = cleaned.get(name)
+            if values is not None and len(values) == len(dates):
+                cleaned[name] = [None if bad else v for v, bad in zip(values, flagged_day)]
+    return cleaned, result
+
+
+def quality_control_records(
+    records: List[Dict[str, Any]],
+    dependent: Sequence[str] = (),
+) -> Tuple[List[Dict[str, Any]], QualityControlResult]:
+    """
+    QC de registros por dia (lat, lng, date, variáveis...) de várias localizações.
+
+    Os registros são pivotados em um bloco (localizações × dias), verificados
+    de uma vez e devolvidos na ordem original.
+
+    Args:
+        records: Registros do pipeline (formato de ``bulk_save_eto_data``)
+        dependent: Campos derivados (ex: ``"ETo"``) anulados quando alguma
+            variável do mesmo dia for reprovada
+
+    Returns:
+        (cópias dos registros com valores reprovados como None, resultado)
+    """
+    if not records:
+        return [], QualityControlResult()
+
+    frame = pd.DataFrame.from_records(records)
+    frame["_day"] = pd.to_datetime(frame["date"]).dt.normalize()
+    locations, loc_index = np.unique(
+        frame[["lat", "lng"]].to_numpy(dtype=float), axis=0, return_inverse=True
+    )
+    days, day_index = np.unique(frame["_day"].to_numpy(), return_inverse=True)
+    loc_index = loc_index.ravel()
+
+    variables = [v for v in frame.columns if v in VARIABLES]
+    block = {}
+    for variable in variables:
+        grid = np.full((len(locations), len(days)), np.nan)
+        grid[loc_index, day_index] = pd.to_numeric(frame[variable], errors="coerce")
+        block[variable] = grid
+
+    elevations = None
+    elevation_column = next((c for c in ("elev", "elevation") if c in frame), None)
+    if elevation_column:
+        elevations = np.full(len(locations), np.nan)
+        elevations[loc_index] = pd.to_numeric(frame[elevation_column], errors="coerce")
+
+    result = run_quality_control(block, locations[:, 0], days, elevations)
+
+    flagged_day = (
+        result.any_flagged()[loc_index, day_index]
+        if variables
+        else np.zeros(len(records), dtype=bool)
+    )
+    cleaned = []
+    for i, record in enumerate(records):
+        record = dict(record)
+        for variable in variables:
+            if result.flags[variable][loc_index[i], day_index[i]]:
+                record[variable] = None
+        if flagged_day[i]:
+            for name in dependent:
+                if name in record:
+                    record[name] = None
+        cleaned.append(record)
+    return cleaned, result
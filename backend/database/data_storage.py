@@ -1,52 +1,248 @@
-import os
+import csv
+import io
+import math
+import time
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from loguru import logger
-from sqlalchemy import create_engine, text
 
-from .connection import get_db_context
+from .connection import engine
+
+# Precisão das coordenadas na chave natural (4 casas ≈ 11 m)
+COORD_PRECISION = 4
+
+# Chave natural de eto_results: (lat arredondada, lng arredondada, data, fonte)
+ETO_NATURAL_KEY = ("lat", "lng", "date", "source")
+
+ETO_COLUMNS = (
+    "lat",
+    "lng",
+    "elevation",
+    "date",
+    "t2m_max",
+    "t2m_min",
+    "rh2m",
+    "ws2m",
+    "radiation",
+    "precipitation",
+    "eto",
+    "source",
+)
+
+# Mapeamento coluna -> chave no dicionário produzido pelo pipeline NASA POWER
+RECORD_KEYS = {
+    "elevation": "elev",
+    "t2m_max": "T2M_MAX",
+    "t2m_min": "T2M_MIN",
+    "rh2m": "RH2M",
+    "ws2m": "WS2M",
+    "radiation": "ALLSKY_SFC_SW_DWN",
+    "precipitation": "PRECTOTCORR",
+    "eto": "ETo",
+}
+
+DEFAULT_SOURCE = "nasa_power"
+
+# Posição de ``eto`` (NOT NULL em eto_results) na linha do COPY
+_ETO_INDEX = ETO_COLUMNS.index("eto")
+
+
+def _clean_float(value: Any) -> Optional[float]:
+    """Converte para float, mapeando None/NaN para NULL."""
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def _record_to_row(record: Dict[str, Any], source: str) -> Optional[List[Any]]:
+    """
+    Converte um registro do pipeline em linha na ordem de ``ETO_COLUMNS``.
+
+    Aceita tanto as chaves do pipeline NASA POWER (``T2M_MAX``, ``ETo``...)
+    quanto os nomes das colunas (``t2m_max``, ``eto``...). Retorna None
+    para registros sem ETo (ex: dia reprovado no controle de qualidade),
+    que violariam o NOT NULL de ``eto_results.eto``.
+    """
+    row_date = record["date"]
+    if isinstance(row_date, (datetime, date)):
+        row_date = row_date.isoformat()
+
+    row: List[Any] = [
+        round(float(record["lat"]), COORD_PRECISION),
+        round(float(record["lng"]), COORD_PRECISION),
+    ]
+    for column in ETO_COLUMNS[2:-1]:
+        if column == "date":
+            row.append(row_date)
+            continue
+        key = RECORD_KEYS[column]
+        row.append(_clean_float(record.get(key, record.get(column))))
+    if row[_ETO_INDEX] is None:
+        return None
+    row.append(record.get("source") or source)
+    return row
+
+
+def _chunked(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ensure_eto_partitions(cursor, years: Iterable[int]) -> None:
+    """
+    Cria as partições anuais de ``eto_results`` que ainda não existem.
+
+    Args:
+        cursor: Cursor DB-API (psycopg2) dentro da transação corrente
+        years: Anos que precisam de partição
+    """
+    for year in sorted({int(y) for y in years}):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS eto_results_y{year} "
+            f"PARTITION OF eto_results "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+
+
+def bulk_save_eto_data(
+    records: Iterable[Dict[str, Any]],
+    source: str = DEFAULT_SOURCE,
+    chunk_size: int = 10000,
+) -> Dict[str, Any]:
+    """
+    Persiste resultados de ETo em massa via COPY + upsert.
+
+    Os registros são enviados em blocos por ``COPY`` para uma tabela
+    temporária e depois mesclados em ``eto_results`` com um único
+    ``INSERT ... ON CONFLICT`` na chave natural (lat, lng, date, source).
+    Reexecuções atualizam as linhas existentes em vez de duplicá-las.
+    Registros sem ETo são pulados (contados em ``skipped``): uma única
+    linha NULL abortaria o lote inteiro.
+
+    Args:
+        records: Iterável de dicionários (pode ser um gerador)
+        source: Fonte padrão quando o registro não traz ``source``
+        chunk_size: Linhas por bloco de COPY
+
+    Returns:
+        Dict com rows, skipped, upserted, seconds e rows_per_second
+    """
+    start = time.perf_counter()
+    columns = ", ".join(ETO_COLUMNS)
+    key = ", ".join(ETO_NATURAL_KEY)
+    updates = ", ".join(
+        f"{col} = EXCLUDED.{col}"
+        for col in ETO_COLUMNS
+        if col not in ETO_NATURAL_KEY
+    )
+
+    total_rows = 0
+    skipped = 0
+    upserted = 0
+
+    def persistable_rows() -> Iterator[List[Any]]:
+        nonlocal skipped
+        for record in records:
+            row = _record_to_row(record, source)
+            if row is None:
+                skipped += 1
+            else:
+                yield row
+
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            CREATE TEMP TABLE eto_results_staging (
+                lat double precision,
+                lng double precision,
+                elevation double precision,
+                date timestamp,
+                t2m_max double precision,
+                t2m_min double precision,
+                rh2m double precision,
+                ws2m double precision,
+                radiation double precision,
+                precipitation double precision,
+                eto double precision,
+                source varchar(50)
+            ) ON COMMIT DROP
+            """
+        )
+
+        for chunk in _chunked(persistable_rows(), chunk_size):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(chunk)
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY eto_results_staging ({columns}) "
+                f"FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+            total_rows += len(chunk)
+
+        if total_rows:
+            cursor.execute(
+                "SELECT DISTINCT extract(year FROM date)::int "
+                "FROM eto_results_staging"
+            )
+            ensure_eto_partitions(cursor, (row[0] for row in cursor.fetchall()))
+
+            # DISTINCT ON evita atualizar a mesma linha duas vezes
+            # quando o lote contém registros repetidos
+            cursor.execute(
+                f"""
+                INSERT INTO eto_results ({columns})
+                SELECT DISTINCT ON ({key}) {columns}
+                FROM eto_results_staging
+                ORDER BY {key}
+                ON CONFLICT ({key}) DO UPDATE SET {updates}
+                """
+            )
+            upserted = cursor.rowcount
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": total_rows,
+        "skipped": skipped,
+        "upserted": upserted,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(total_rows / elapsed, 1) if elapsed else 0.0,
+    }
+    logger.info(
+        f"Bulk ETo save: {total_rows} registros em {elapsed:.2f}s "
+        f"({stats['rows_per_second']} linhas/s, {skipped} sem ETo ignorados)"
+    )
+    return stats
 
 
 def save_eto_data(data: dict, db_path: str = None):
     """
     Salva dados de ETo no banco de dados PostgreSQL.
-    
+
+    Mantido por compatibilidade; delega para ``bulk_save_eto_data``.
+
     Args:
         data (dict): Dicionário com dados de ETo
         db_path (str, optional): Parâmetro mantido para compatibilidade, não é utilizado
     """
     try:
-        # Usa o context manager para obter uma sessão do banco
-        with get_db_context() as db:
-            # Prepara valores para inserção
-            values = []
-            for d in data:
-                values.append({
-                    "lat": d["lat"], 
-                    "lng": d["lng"], 
-                    "elevation": d["elev"], 
-                    "date": d["date"], 
-                    "t2m_max": d["T2M_MAX"], 
-                    "t2m_min": d["T2M_MIN"], 
-                    "rh2m": d["RH2M"], 
-                    "ws2m": d["WS2M"], 
-                    "radiation": d["ALLSKY_SFC_SW_DWN"], 
-                    "precipitation": d["PRECTOTCORR"], 
-                    "eto": d["ETo"]
-                })
-            
-            # Executa inserção
-            if values:
-                query = text("""
-                    INSERT INTO eto_results (lat, lng, elevation, date, t2m_max, t2m_min, 
-                                           rh2m, ws2m, radiation, precipitation, eto)
-                    VALUES (:lat, :lng, :elevation, :date, :t2m_max, :t2m_min, 
-                           :rh2m, :ws2m, :radiation, :precipitation, :eto)
-                """)
-                
-                for value in values:
-                    db.execute(query, value)
-                
-                db.commit()
-                logger.info(f"Dados salvos no PostgreSQL: {len(values)} registros")
+        stats = bulk_save_eto_data(data)
+        logger.info(f"Dados salvos no PostgreSQL: {stats['rows']} registros")
     except Exception as e:
         logger.error(f"Erro ao salvar dados no PostgreSQL: {e}")
@@ -1,7 +1,8 @@
 """
 Modelos de banco de dados para armazenamento de resultados ETo.
 """
-from sqlalchemy import Column, DateTime, Float, Integer
+from sqlalchemy import (BigInteger, Column, DateTime, Float, Index, String,
+                        UniqueConstraint)
 
 from ..connection import Base
 
@@ -9,14 +10,33 @@ from ..connection import Base
 class EToResults(Base):
     """
     Modelo para armazenamento de resultados de cálculo de ETo.
+
+    Chave natural: (lat, lng, date, source), com coordenadas arredondadas
+    para 4 casas decimais na gravação (ver ``data_storage.bulk_save_eto_data``).
+
+    A tabela é particionada por ano em ``date`` (partições
+    ``eto_results_yYYYY``, criadas sob demanda por
+    ``data_storage.ensure_eto_partitions``). Por isso ``date`` faz parte
+    da chave primária.
+
+    Indexes:
+        - uq_eto_results_natural_key: btree único, atende consultas por ponto
+        - idx_eto_results_date_brin: BRIN em date para intervalos de datas
+        - idx_eto_results_coords_brin: BRIN em (lat, lng) para bounding box
     """
     __tablename__ = "eto_results"
+    __table_args__ = (
+        UniqueConstraint(
+            "lat", "lng", "date", "source", name="uq_eto_results_natural_key"
+        ),
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     lat = Column(Float, nullable=False)
     lng = Column(Float, nullable=False)
     elevation = Column(Float, nullable=True)
-    date = Column(DateTime, nullable=False)
+    date = Column(DateTime, primary_key=True, nullable=False)
     t2m_max = Column(Float, nullable=True)  # Temperatura máxima
     t2m_min = Column(Float, nullable=True)  # Temperatura mínima
     rh2m = Column(Float, nullable=True)     # Umidade relativa
@@ -24,6 +44,23 @@ class EToResults(Base):
     radiation = Column(Float, nullable=True)  # Radiação solar
     precipitation = Column(Float, nullable=True)  # Precipitação
     eto = Column(Float, nullable=False)     # Evapotranspiração de referência
+    source = Column(String(50), nullable=False, server_default="nasa_power")  # Fonte dos dados
 
     def __repr__(self):
-        return f"<EToResult(id={self.id}, lat={self.lat}, lng={self.lng}, date={self.date}, eto={self.eto})>"
+        return f"<EToResult(id={self.id}, lat={self.lat}, lng={self.lng}, date={self.date}, source={self.source}, eto={self.eto})>"
+
+
+# Índices BRIN: poucos KB por partição, ideais para dados inseridos
+# em ordem aproximada de data
+Index(
+    'idx_eto_results_date_brin',
+    EToResults.date,
+    postgresql_using='brin'
+)
+
+Index(
+    'idx_eto_results_coords_brin',
+    EToResults.lat,
+    EToResults.lng,
+    postgresql_using='brin'
+)
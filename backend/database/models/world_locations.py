@@ -33,6 +33,7 @@ class WorldLocation(Base):
     Indexes:
         - idx_world_locations_coords: Índice espacial (lat, lon) para queries rápidas
         - idx_world_locations_country: Índice por país para filtragem
+        - uq_world_locations_natural_key: Único (location_name, country_code, lat, lon)
     """
 
     __tablename__ = "world_locations"
@@ -91,6 +92,16 @@ Index(
     postgresql_using='btree'
 )
 
+# Chave natural usada pelo upsert da carga em massa (scripts/load_data_to_pg.py)
+Index(
+    'uq_world_locations_natural_key',
+    WorldLocation.location_name,
+    WorldLocation.country_code,
+    WorldLocation.lat,
+    WorldLocation.lon,
+    unique=True
+)
+
 
 class EToWorldCache(Base):
     """
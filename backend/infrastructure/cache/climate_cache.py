@@ -5,7 +5,9 @@ Fornece cache inteligente com TTL dinâmico baseado na idade dos dados.
 Features:
 - TTL dinâmico: dados históricos (30d), recentes (1d), forecast (1h)
 - Métricas Prometheus integradas
-- Chaves únicas por fonte + coordenadas + período
+- Chaves únicas por fonte + coordenadas + período; fontes com registros
+  diários (``DAILY_SOURCES``) são guardadas por dia e fatiadas na leitura,
+  então qualquer janela dentro de um período já baixado é um HIT
 - Async/await para alta performance
 - Graceful degradation se Redis indisponível
 
@@ -20,8 +22,8 @@ Uso:
 """
 
 import pickle
-from datetime import datetime
-from typing import Any, Optional
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
 
 from loguru import logger
 from redis.asyncio import Redis
@@ -43,7 +45,14 @@ class ClimateCacheService:
     
     Chave do cache: {prefix}:{source}:{lat}:{lon}:{start}:{end}
     Exemplo: climate:nasa:48.86:2.35:20241001:20241008
+
+    Fontes em ``DAILY_SOURCES`` (lista de registros com ``date``) usam
+    uma chave por dia: {prefix}:{source}:{lat}:{lon}:{date}
+    Exemplo: climate:nasa:nasa_power:48.86:2.35:20241001
     """
+
+    # Fontes cujos dados são listas de registros diários (campo ``date``)
+    DAILY_SOURCES = frozenset({"nasa_power"})
     
     # TTL constants (em segundos)
     TTL_HISTORICAL = 2592000   # 30 dias
@@ -111,6 +120,34 @@ class ClimateCacheService:
         
         return f"{self.prefix}:{source}:{lat_r}:{lon_r}:{start_str}:{end_str}"
     
+    def _day_key(self, source: str, lat: float, lon: float, day: datetime) -> str:
+        """Chave de um dia de uma fonte diária."""
+        return f"{self.prefix}:{source}:{round(lat, 2)}:{round(lon, 2)}:{day:%Y%m%d}"
+
+    def _keys(
+        self,
+        source: str,
+        lat: float,
+        lon: float,
+        start: datetime,
+        end: datetime
+    ) -> List[str]:
+        """Chaves que compõem o período (uma por dia nas fontes diárias)."""
+        if source not in self.DAILY_SOURCES:
+            return [self._make_key(source, lat, lon, start, end)]
+        n_days = (end.date() - start.date()).days + 1
+        return [
+            self._day_key(source, lat, lon, start + timedelta(days=i))
+            for i in range(n_days)
+        ]
+
+    @staticmethod
+    def _record_day(record: Any) -> datetime:
+        value = record["date"] if isinstance(record, dict) else record.date
+        if isinstance(value, datetime):
+            return value
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+
     def _get_ttl(self, start_date: datetime) -> int:
         """
         Calcula TTL dinâmico baseado na idade dos dados.
@@ -171,7 +208,11 @@ class ClimateCacheService:
         key = self._make_key(source, lat, lon, start, end)
         
         try:
-            data = await self.redis.get(key)
+            if source in self.DAILY_SOURCES:
+                days = await self.redis.mget(self._keys(source, lat, lon, start, end))
+                data = None if any(d is None for d in days) else days
+            else:
+                data = await self.redis.get(key)
             
             if data:
                 logger.info(f"🎯 Cache HIT: {key}")
@@ -184,6 +225,8 @@ class ClimateCacheService:
                 except ImportError:
                     pass
                 
+                if source in self.DAILY_SOURCES:
+                    return [pickle.loads(day) for day in data]
                 return pickle.loads(data)
             
             logger.info(f"❌ Cache MISS: {key}")
@@ -232,8 +275,20 @@ class ClimateCacheService:
         ttl = self._get_ttl(start)
         
         try:
-            serialized = pickle.dumps(data)
-            await self.redis.setex(key, ttl, serialized)
+            if source in self.DAILY_SOURCES:
+                # Um registro por chave, com o TTL da idade daquele dia
+                pipe = self.redis.pipeline(transaction=False)
+                for record in data:
+                    day = self._record_day(record)
+                    if start.date() <= day.date() <= end.date():
+                        pipe.setex(
+                            self._day_key(source, lat, lon, day),
+                            self._get_ttl(day),
+                            pickle.dumps(record),
+                        )
+                await pipe.execute()
+            else:
+                await self.redis.setex(key, ttl, pickle.dumps(data))
             
             ttl_hours = ttl / 3600
             logger.info(f"💾 Cache SAVE: {key} (TTL: {ttl}s / {ttl_hours:.1f}h)")
@@ -279,7 +334,7 @@ class ClimateCacheService:
         key = self._make_key(source, lat, lon, start, end)
         
         try:
-            await self.redis.delete(key)
+            await self.redis.delete(*self._keys(source, lat, lon, start, end))
             logger.info(f"🗑️ Cache DELETE: {key}")
             return True
         
@@ -311,11 +366,10 @@ class ClimateCacheService:
         if not self.redis:
             return False
         
-        key = self._make_key(source, lat, lon, start, end)
+        keys = self._keys(source, lat, lon, start, end)
         
         try:
-            exists = await self.redis.exists(key)
-            return bool(exists)
+            return await self.redis.exists(*keys) == len(keys)
         
         except Exception as e:
             logger.error(f"Erro ao verificar cache: {e}")
@@ -333,15 +387,15 @@ class ClimateCacheService:
         Retorna TTL restante de uma chave em segundos.
         
         Returns:
-            int: Segundos restantes ou None se não existir
+            int: Segundos restantes (o menor entre os dias, nas fontes
+            diárias) ou None se não existir
         """
         if not self.redis:
             return None
         
-        key = self._make_key(source, lat, lon, start, end)
-        
         try:
-            ttl = await self.redis.ttl(key)
+            ttls = [await self.redis.ttl(k) for k in self._keys(source, lat, lon, start, end)]
+            ttl = min(ttls)
             return ttl if ttl > 0 else None
         
         except Exception as e:
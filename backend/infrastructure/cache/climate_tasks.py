@@ -3,7 +3,12 @@ Tasks Celery para pre-carregamento de dados climáticos populares.
 
 Estratégia de pre-fetch:
 - Cidades mundiais populares: 50 cidades, execução diária 03:00 BRT
-- Dados dos últimos 30 dias para cada localização
+- Refresh mundial (world_locations): execução diária 04:00 BRT
+- Dados dos últimos 30 dias para cada localização; o cache NASA guarda
+  um registro por dia, então qualquer janela de ETo dentro desse período
+  (worker de lotes, caminho rápido) é servida do cache
+- Localizações divididas em shards (chord na fila data_processing), cada
+  shard com retry independente e checkpoint de progresso no Redis
 
 Benefits:
 - Cache aquecido para requisições futuras
@@ -13,9 +18,12 @@ Benefits:
 """
 
 import asyncio
+import json
+import math
 from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Set, Tuple
 
-from celery import shared_task
+from celery import chord, group, shared_task
 from loguru import logger
 
 # Cidades mundiais mais populares (top 50)
@@ -80,99 +88,292 @@ POPULAR_WORLD_CITIES = [
 ]
 
 
+# Sharding dos refreshes: ~SHARD_TARGET_SIZE localizações por shard,
+# limitado a MAX_SHARDS tarefas por execução
+SHARD_TARGET_SIZE = 10
+MAX_SHARDS = 256
+
+# Downloads simultâneos dentro de um shard
+SHARD_CONCURRENCY = 4
+SHARD_MAX_RETRIES = 3
+SHARD_RETRY_COUNTDOWN = 120
+
+# Checkpoints no Redis:
+#   climate_refresh:<run_id>          hash shard -> progresso (JSON)
+#   climate_refresh:<run_id>:<shard>  set de índices já concluídos
+CHECKPOINT_PREFIX = "climate_refresh"
+CHECKPOINT_TTL_SECONDS = 2 * 24 * 3600
+
+PREFETCH_DAYS = 30
+
+
+def _redis():
+    from backend.database.redis_pool import get_redis_client
+
+    return get_redis_client()
+
+
+def plan_shards(locations: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Divide as localizações em shards contíguos de tamanho equilibrado.
+
+    O número de shards cresce com a quantidade de localizações
+    (``SHARD_TARGET_SIZE`` por shard) até ``MAX_SHARDS``.
+    """
+    if not locations:
+        return []
+    count = min(MAX_SHARDS, math.ceil(len(locations) / SHARD_TARGET_SIZE))
+    size, extra = divmod(len(locations), count)
+    shards, start = [], 0
+    for index in range(count):
+        stop = start + size + (1 if index < extra else 0)
+        shards.append(locations[start:stop])
+        start = stop
+    return shards
+
+
+def nasa_cells(locations: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Uma entrada por célula da grade NASA, no centro da célula.
+
+    É a coordenada consultada pelo worker de lotes de ETo e pelo caminho
+    rápido (``cell_key``), então o refresh aquece as mesmas chaves.
+    """
+    from backend.api.services.eto_task_dedup import PROVIDER_GRID, snap_to_grid
+
+    lat_step, lon_step = PROVIDER_GRID["nasa_power"]
+    cells: Dict[Tuple[float, float], Dict[str, Any]] = {}
+    for location in locations:
+        cell = (snap_to_grid(location["lat"], lat_step), snap_to_grid(location["lon"], lon_step))
+        cells.setdefault(cell, {"name": location["name"], "lat": cell[0], "lon": cell[1]})
+    return list(cells.values())
+
+
+def dispatch_nasa_refresh(
+    locations: List[Dict[str, Any]], label: str, days: int = PREFETCH_DAYS
+) -> Dict[str, Any]:
+    """
+    Dispara o refresh do cache NASA como chord de shards.
+
+    Args:
+        locations: [{"name", "lat", "lon", ...}]
+        label: Identificação da execução nos logs e checkpoints
+        days: Período (últimos N dias)
+
+    Returns:
+        dict: run_id, número de localizações e de shards
+    """
+    end = datetime.now()
+    start = end - timedelta(days=days)
+    run_id = f"{label}:{end:%Y%m%d%H%M%S}"
+    shards = plan_shards(locations)
+    if not shards:
+        return {"run_id": run_id, "locations": 0, "shards": 0}
+
+    header = group(
+        prefetch_nasa_shard.s(
+            run_id, index, shard, start.isoformat(), end.isoformat()
+        ).set(queue="data_processing")
+        for index, shard in enumerate(shards)
+    )
+    chord(header)(
+        summarize_nasa_refresh.s(run_id).set(queue="data_processing")
+    )
+
+    logger.info(
+        f"🚀 Refresh NASA POWER {run_id}: {len(locations)} localizações "
+        f"em {len(shards)} shards"
+    )
+    return {"run_id": run_id, "locations": len(locations), "shards": len(shards)}
+
+
+async def _prefetch_locations(
+    pending: List[Tuple[int, Dict[str, Any]]],
+    start: datetime,
+    end: datetime,
+    on_success,
+) -> List[str]:
+    """Baixa as localizações pendentes de um shard; retorna as que falharam."""
+    from backend.api.services.nasa_power_client import NASAPowerClient
+    from backend.infrastructure.cache.climate_cache import create_climate_cache
+
+    cache = create_climate_cache("nasa")
+    client = NASAPowerClient(cache=cache)
+    semaphore = asyncio.Semaphore(SHARD_CONCURRENCY)
+    failed: List[str] = []
+
+    async def fetch(index: int, location: Dict[str, Any]) -> None:
+        async with semaphore:
+            try:
+                data = await client.get_daily_data(
+                    lat=location["lat"], lon=location["lon"],
+                    start_date=start, end_date=end
+                )
+            except Exception as e:
+                logger.error(f"❌ Erro em {location.get('name')}: {str(e)[:100]}")
+                data = None
+        if data:
+            on_success(index)
+        else:
+            failed.append(location.get("name") or f"{location['lat']},{location['lon']}")
+
+    try:
+        await asyncio.gather(*(fetch(i, loc) for i, loc in pending))
+    finally:
+        await client.close()
+        await cache.close()
+    return failed
+
+
 @shared_task(
     bind=True,
-    max_retries=3,
-    name="backend.infrastructure.cache.climate_tasks.prefetch_nasa_popular_cities"
+    max_retries=SHARD_MAX_RETRIES,
+    name="backend.infrastructure.cache.climate_tasks.prefetch_nasa_shard"
 )
-def prefetch_nasa_popular_cities(self):
+def prefetch_nasa_shard(
+    self,
+    run_id: str,
+    shard_index: int,
+    locations: List[Dict[str, Any]],
+    start: str,
+    end: str,
+) -> Dict[str, Any]:
     """
-    Pre-carrega dados NASA POWER para 50 cidades mais populares.
+    Pre-carrega um shard de localizações no cache NASA POWER.
 
-    Execução: Diariamente às 03:00 BRT via Celery Beat
-    Período: Últimos 30 dias
-    Fontes: NASA POWER (domínio público)
+    Cada localização concluída entra no checkpoint do shard; em retry só
+    as pendentes são baixadas de novo. Esgotados os retries o shard
+    devolve o resultado parcial (não falha o chord).
+
+    Returns:
+        dict: Progresso do shard
+    """
+    r = _redis()
+    done_key = f"{CHECKPOINT_PREFIX}:{run_id}:{shard_index}"
+    progress_key = f"{CHECKPOINT_PREFIX}:{run_id}"
+
+    done: Set[int] = set()
+
+    def mark_done(index: int) -> None:
+        r.sadd(done_key, index)
+        done.add(index)
+
+    try:
+        done.update(int(i) for i in r.smembers(done_key))
+        pending = [(i, loc) for i, loc in enumerate(locations) if i not in done]
+        failed = asyncio.run(_prefetch_locations(
+            pending, datetime.fromisoformat(start), datetime.fromisoformat(end), mark_done
+        )) if pending else []
+        error = None
+    except Exception as e:
+        logger.error(f"💥 Shard {shard_index} de {run_id} falhou: {e}")
+        # Só as localizações ainda sem checkpoint contam como falhas
+        failed = [loc.get("name") for i, loc in enumerate(locations) if i not in done]
+        error = str(e)
+
+    retrying = bool(failed) and self.request.retries < self.max_retries
+    result = {
+        "shard": shard_index,
+        "total": len(locations),
+        "success": len(locations) - len(failed),
+        "failed": len(failed),
+        "failed_locations": failed[:10],
+        "attempt": self.request.retries + 1,
+        "status": "retrying" if retrying else ("partial" if failed else "success"),
+    }
+    if error:
+        result["error"] = error
+
+    try:
+        r.hset(progress_key, shard_index, json.dumps(result))
+        r.expire(progress_key, CHECKPOINT_TTL_SECONDS)
+        r.expire(done_key, CHECKPOINT_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Checkpoint do shard {shard_index} não gravado: {e}")
+
+    if retrying:
+        # Só este shard volta para a fila; os concluídos ficam no checkpoint
+        raise self.retry(countdown=SHARD_RETRY_COUNTDOWN * 2 ** self.request.retries)
+    return result
+
+
+@shared_task(name="backend.infrastructure.cache.climate_tasks.summarize_nasa_refresh")
+def summarize_nasa_refresh(results: List[Dict[str, Any]], run_id: str) -> Dict[str, Any]:
+    """
+    Callback do chord: consolida os shards de uma execução.
 
     Returns:
-        dict: Status e estatísticas do pre-fetch
+        dict: Status e estatísticas do refresh
     """
+    total = sum(r["total"] for r in results)
+    success = sum(r["success"] for r in results)
+    failed_locations = [name for r in results for name in r["failed_locations"]]
+    success_rate = (success / total) * 100 if total else 0.0
+
+    summary = {
+        "run_id": run_id,
+        "status": "success" if success > 0 else "failed",
+        "total_locations": total,
+        "success": success,
+        "failed": total - success,
+        "success_rate": f"{success_rate:.1f}%",
+        "shards": len(results),
+        "partial_shards": sum(1 for r in results if r["status"] != "success"),
+        "failed_locations": failed_locations[:10],  # Primeiras 10
+    }
+
     try:
-        logger.info("🚀 Iniciando pre-fetch NASA POWER (50 cidades)")
+        r = _redis()
+        r.hset(f"{CHECKPOINT_PREFIX}:{run_id}", "summary", json.dumps(summary))
+    except Exception as e:
+        logger.warning(f"Resumo do refresh {run_id} não gravado: {e}")
 
-        # Importa dentro da task para evitar circular imports
-        from backend.api.services.nasa_power_client import NASAPowerClient
-        from backend.infrastructure.cache.climate_cache import create_climate_cache
+    logger.info(
+        f"🎯 Refresh NASA POWER {run_id} completo: {success}/{total} "
+        f"localizações ({success_rate:.1f}%) em {len(results)} shards"
+    )
+    return summary
 
-        # Período: últimos 30 dias
-        end = datetime.now()
-        start = end - timedelta(days=30)
 
-        # Cria cache e cliente
-        cache = create_climate_cache("nasa")
-        client = NASAPowerClient(cache=cache)
+@shared_task(name="backend.infrastructure.cache.climate_tasks.prefetch_nasa_popular_cities")
+def prefetch_nasa_popular_cities():
+    """
+    Pre-carrega dados NASA POWER para 50 cidades mais populares.
 
-        success_count = 0
-        failed_cities = []
+    Execução: Diariamente às 03:00 BRT via Celery Beat
+    Período: Últimos 30 dias
+    Fontes: NASA POWER (domínio público)
 
-        # Pre-fetch cada cidade
-        for idx, city in enumerate(POPULAR_WORLD_CITIES, 1):
-            try:
-                # Usa asyncio para chamar método async
-                loop = asyncio.get_event_loop()
-                data = loop.run_until_complete(
-                    client.get_daily_data(
-                        lat=city["lat"],
-                        lon=city["lon"],
-                        start_date=start,
-                        end_date=end
-                    )
-                )
+    As cidades são divididas em shards (``prefetch_nasa_shard``) executados
+    em paralelo na fila ``data_processing``.
 
-                if data:
-                    success_count += 1
-                    logger.info(
-                        f"✅ [{idx}/{len(POPULAR_WORLD_CITIES)}] "
-                        f"{city['name']}, {city['country']}"
-                    )
-                else:
-                    failed_cities.append(city["name"])
-                    logger.warning(f"⚠️ Sem dados para {city['name']}")
+    Returns:
+        dict: run_id e dimensionamento da execução
+    """
+    return dispatch_nasa_refresh(nasa_cells(POPULAR_WORLD_CITIES), "popular_cities")
 
-            except Exception as e:
-                failed_cities.append(city["name"])
-                logger.error(
-                    f"❌ Erro em {city['name']}: {str(e)[:100]}"
-                )
 
-        # Estatísticas finais
-        total = len(POPULAR_WORLD_CITIES)
-        success_rate = (success_count / total) * 100
+@shared_task(name="backend.infrastructure.cache.climate_tasks.refresh_world_locations")
+def refresh_world_locations():
+    """
+    Refresh mundial do cache NASA POWER (tabela world_locations).
 
-        result = {
-            "status": "success" if success_count > 0 else "failed",
-            "total_cities": total,
-            "success": success_count,
-            "failed": len(failed_cities),
-            "success_rate": f"{success_rate:.1f}%",
-            "failed_cities": failed_cities[:10],  # Primeiras 10
-            "period": f"{start.date()} to {end.date()}"
-        }
+    Execução: Diariamente às 04:00 BRT via Celery Beat
 
-        logger.info(
-            f"🎯 Pre-fetch NASA POWER completo: "
-            f"{success_count}/{total} cidades ({success_rate:.1f}%)"
-        )
+    Localizações na mesma célula da grade NASA são baixadas uma única vez
+    (``nasa_cells``), com os últimos ``PREFETCH_DAYS`` dias. O worker de lotes de ETo e o caminho rápido leem a mesma célula
+    e fatiam do cache diário a janela de 7-15 dias pedida.
 
-        # Fecha conexões
-        loop.run_until_complete(cache.close())
-        loop.run_until_complete(client.close())
+    Returns:
+        dict: run_id e dimensionamento da execução
+    """
+    from backend.api.services.location_listing import iter_locations
+    from backend.database.connection import get_db_context
 
-        return result
+    with get_db_context() as db:
+        cells = nasa_cells(iter_locations(db))
 
-    except Exception as e:
-        logger.error(f"💥 Erro crítico no pre-fetch NASA: {e}")
-        # Retry com exponential backoff
-        raise self.retry(exc=e, countdown=300)  # 5 minutos
+    return dispatch_nasa_refresh(cells, "world")
 
 
 @shared_task(name="backend.infrastructure.cache.climate_tasks.cleanup_old_cache")
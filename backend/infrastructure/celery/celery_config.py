@@ -9,6 +9,8 @@ from datetime import datetime
 
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import (task_failure, task_prerun, task_revoked,
+                            task_success)
 from kombu import Queue
 from redis import Redis
 
@@ -29,28 +31,44 @@ celery_app = Celery(
 # Métricas Prometheus
 # As métricas são importadas do main.py para evitar duplicação
 
-# Classe base para tarefas com monitoramento e progresso
-class MonitoredProgressTask(celery_app.Task):
-    def publish_progress(self, task_id, progress, status="PROGRESS"):
-        """Publica progresso no canal Redis para WebSocket."""
-        try:
-            redis_client = Redis.from_url(
+# Cliente Redis compartilhado para publicação de status (lazy, por processo)
+_status_redis = None
+
+
+def publish_task_status(task_id, status, **fields):
+    """
+    Publica um evento de status no canal ``task_status:<task_id>``.
+
+    Consumido pelo ``TaskStatusHub`` da API, que repassa aos WebSockets;
+    falhas de publicação nunca interrompem a task.
+    """
+    global _status_redis
+    try:
+        if _status_redis is None:
+            _status_redis = Redis.from_url(
                 settings.CELERY_BROKER_URL,
                 decode_responses=True
             )
-            redis_client.publish(
-                f"task_status:{task_id}",
-                json.dumps({
+        _status_redis.publish(
+            f"task_status:{task_id}",
+            json.dumps(
+                {
                     "status": status,
-                    "info": progress,
+                    **fields,
                     "timestamp": datetime.now().isoformat()
-                })
+                },
+                default=str
             )
-            redis_client.close()
-        except Exception as e:
-            # Não bloqueia a task se falhar publicação de progresso
-            import logging
-            logging.warning(f"Falha ao publicar progresso: {e}")
+        )
+    except Exception as e:
+        logger.warning(f"Falha ao publicar status da tarefa {task_id}: {e}")
+
+
+# Classe base para tarefas com monitoramento e progresso
+class MonitoredProgressTask(celery_app.Task):
+    def publish_progress(self, task_id, progress, status="PROGRESS"):
+        """Publica progresso no canal Redis para WebSocket."""
+        publish_task_status(task_id, status, info=progress)
 
     def __call__(self, *args, **kwargs):
         """Rastreia duração e status da tarefa para Prometheus."""
@@ -88,6 +106,36 @@ class MonitoredProgressTask(celery_app.Task):
 # Definir classe base para todas as tarefas
 celery_app.Task = MonitoredProgressTask
 
+
+# Ciclo de vida das tarefas empurrado para os WebSockets (sem polling)
+@task_prerun.connect
+def _publish_task_started(task_id=None, **kwargs):
+    publish_task_status(task_id, "STARTED", info={})
+
+
+@task_success.connect
+def _publish_task_success(sender=None, result=None, **kwargs):
+    # Tasks de ETo retornam (resultado, avisos)
+    warnings = None
+    if isinstance(result, (list, tuple)) and len(result) == 2:
+        result, warnings = result
+    if hasattr(result, "to_dict"):
+        result = result.to_dict()
+    publish_task_status(
+        sender.request.id, "SUCCESS", result=result, warnings=warnings
+    )
+
+
+@task_failure.connect
+def _publish_task_failure(task_id=None, exception=None, **kwargs):
+    publish_task_status(task_id, "FAILURE", error=str(exception))
+
+
+@task_revoked.connect
+def _publish_task_revoked(request=None, **kwargs):
+    publish_task_status(request.id, "REVOKED", error="Tarefa cancelada")
+
+
 # Configurações principais
 celery_app.conf.update(
     # Serialização
@@ -103,8 +151,10 @@ celery_app.conf.update(
     task_default_queue="general",
     task_routes={
         "backend.core.eto_calculation.*": {"queue": "eto_processing"},
+        "backend.infrastructure.celery.tasks.eto_batch_tasks.*": {"queue": "eto_processing"},
         "backend.core.data_processing.data_download.*": {"queue": "data_download"},
         "backend.infrastructure.cache.*": {"queue": "data_processing"},
+        "backend.infrastructure.celery.tasks.*": {"queue": "data_processing"},
     },
     task_queues=(
         Queue("general"),
@@ -128,12 +178,24 @@ celery_app.conf.beat_schedule = {
         "schedule": crontab(hour=3, minute=0),
         "options": {"queue": "data_processing"}
     },
+    # Refresh mundial em shards (04:00 BRT)
+    "refresh-world-locations": {
+        "task": "backend.infrastructure.cache.climate_tasks.refresh_world_locations",
+        "schedule": crontab(hour=4, minute=0),
+        "options": {"queue": "data_processing"}
+    },
     # Estatísticas de cache (a cada hora)
     "generate-cache-stats": {
         "task": "backend.infrastructure.cache.climate_tasks.generate_cache_stats",
         "schedule": crontab(minute=0),  # Todo início de hora
         "options": {"queue": "data_processing"}
     },
+    # Reservas de lotes de ETo interrompidos voltam à fila (a cada minuto)
+    "requeue-stale-eto-batches": {
+        "task": "backend.infrastructure.celery.tasks.eto_batch_tasks.drain_eto_batches",
+        "schedule": crontab(minute="*"),
+        "options": {"queue": "eto_processing"}
+    },
     # Tasks legadas
     "cleanup-expired-data": {
         "task": "backend.infrastructure.cache.celery_tasks.cleanup_expired_data",
@@ -151,6 +213,8 @@ celery_app.conf.beat_schedule = {
 celery_app.autodiscover_tasks([
     "backend.infrastructure.cache.celery_tasks",
     "backend.infrastructure.cache.climate_tasks",
+    "backend.infrastructure.celery.tasks.eto_storage_tasks",
+    "backend.infrastructure.celery.tasks.eto_batch_tasks",
     "backend.core.eto_calculation",
     "backend.core.data_processing.data_download",
 ])
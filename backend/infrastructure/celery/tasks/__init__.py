@@ -1,8 +1,11 @@
 """
 Celery tasks package.
 
-Atualmente sem tasks ativas.
-Foco atual: Mapa Mundial com fusão EnKF.
+Tasks:
+- eto_storage_tasks.persist_eto_results: gravação em massa de eto_results
+- eto_batch_tasks.drain_eto_batches: micro-batching dos cálculos de ETo
 """
+from backend.infrastructure.celery.tasks.eto_batch_tasks import drain_eto_batches
+from backend.infrastructure.celery.tasks.eto_storage_tasks import persist_eto_results
 
-__all__ = []
+__all__ = ["drain_eto_batches", "persist_eto_results"]
@@ -0,0 +1,570 @@
+"""
+Micro-batching dos cálculos de ETo na fila ``eto_processing``.
+
+Em vez de uma task Celery por requisição, as requisições são empilhadas
+em uma lista Redis e um único ``drain_eto_batches`` por janela consome
+até ``BATCH_MAX_SIZE`` de uma vez:
+
+1. Agrupa por (fonte, data inicial, data final)
+2. Busca os dados uma vez por célula da grade do provedor (requisições
+   na mesma célula compartilham o download), com downloads concorrentes;
+   células com dias faltando (atraso de publicação do NASA POWER)
+   também buscam o Open-Meteo como fonte substituta
+3. Controle de qualidade, preenchimento de lacunas (interpolação e
+   substituição) e Penman-Monteith vetorizados sobre o bloco
+   (requisições × dias)
+4. Devolve o resultado de cada requisição no result backend com o
+   ``task_id`` dela e publica o status no canal do WebSocket
+
+Só uma task de drenagem é agendada por janela (``TICK_KEY`` com NX); se
+a fila atingir ``BATCH_MAX_SIZE`` a drenagem é disparada na hora.
+
+As requisições são reservadas com ``LMOVE`` para ``PROCESSING_KEY`` e só
+saem de lá depois que o resultado é gravado no result backend; se o
+worker morrer no meio do lote, a próxima drenagem (ou a do beat, a cada
+minuto) devolve as reservas vencidas à fila.
+
+Exemplo:
+    eto_batch_submitter.apply_async(kwargs=params, task_id=task_id)
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from celery import shared_task
+from loguru import logger
+
+PENDING_KEY = "eto_batch:pending"
+PROCESSING_KEY = "eto_batch:processing"
+RESERVED_KEY = "eto_batch:reserved"
+TICK_KEY = "eto_batch:tick"
+
+# Reservas mais antigas que isso (drenagem interrompida) voltam à fila;
+# fica abaixo do TTL das chaves de deduplicação (eto_task_dedup)
+RESERVATION_TIMEOUT_SECONDS = 600
+
+# Janela de agregação e tamanho máximo do lote
+BATCH_WINDOW_SECONDS = 0.5
+BATCH_MAX_SIZE = 64
+
+# Downloads simultâneos por lote
+MAX_CONCURRENT_FETCHES = 8
+
+# Variáveis do NASA POWER no formato do pipeline (ver data_storage)
+NASA_FIELDS = {
+    "T2M_MAX": "temp_max",
+    "T2M_MIN": "temp_min",
+    "RH2M": "humidity",
+    "WS2M": "wind_speed",
+    "ALLSKY_SFC_SW_DWN": "solar_radiation",
+    "PRECTOTCORR": "precipitation",
+}
+
+# Entradas do Penman-Monteith (precipitação não entra no ETo)
+ETO_INPUTS = ("T2M_MAX", "T2M_MIN", "RH2M", "WS2M", "ALLSKY_SFC_SW_DWN")
+
+# Fonte substituta para os dias sem dado do NASA POWER
+SUBSTITUTE_SOURCE = "openmeteo"
+OPENMETEO_FIELDS = {
+    "T2M_MAX": "temperature_2m_max",
+    "T2M_MIN": "temperature_2m_min",
+    "RH2M": "relative_humidity_2m_mean",
+    "WS2M": "wind_speed_10m_mean",
+    "ALLSKY_SFC_SW_DWN": "shortwave_radiation_sum",
+    "PRECTOTCORR": "precipitation_sum",
+}
+
+# Vento a 10 m -> 2 m (FAO-56, eq. 47)
+WIND_10M_TO_2M = 4.87 / np.log(67.8 * 10 - 5.42)
+
+# Período aceito pelo OpenMeteoSmartClient (dias)
+SUBSTITUTE_MIN_DAYS = 7
+SUBSTITUTE_MAX_DAYS = 30
+
+DRAIN_TASK_NAME = "backend.infrastructure.celery.tasks.eto_batch_tasks.drain_eto_batches"
+
+
+def _redis():
+    from backend.database.redis_pool import get_redis_client
+
+    return get_redis_client()
+
+
+def enqueue_eto_request(params: Dict[str, Any], task_id: str) -> None:
+    """Empilha uma requisição e agenda a drenagem da janela, se necessário."""
+    from backend.infrastructure.celery.celery_config import publish_task_status
+
+    redis = _redis()
+    pending = redis.rpush(PENDING_KEY, json.dumps({"task_id": task_id, "params": params}))
+    publish_task_status(task_id, "PROGRESS", info={"step": "queued", "batch_position": pending})
+
+    if pending >= BATCH_MAX_SIZE:
+        drain_eto_batches.apply_async()
+    elif redis.set(TICK_KEY, task_id, nx=True, ex=max(1, int(BATCH_WINDOW_SECONDS * 10))):
+        drain_eto_batches.apply_async(countdown=BATCH_WINDOW_SECONDS)
+
+
+class EToBatchSubmitter:
+    """Interface ``apply_async`` (como uma task Celery) que usa o micro-batching."""
+
+    name = "eto_batch"
+
+    def apply_async(self, kwargs: Dict[str, Any], task_id: str, **options) -> str:
+        enqueue_eto_request(kwargs, task_id)
+        return task_id
+
+
+eto_batch_submitter = EToBatchSubmitter()
+
+
+def cell_key(params: Dict[str, Any]) -> Tuple[float, float]:
+    """Centro da célula da grade do provedor que contém o ponto."""
+    from backend.api.services.eto_task_dedup import (DEFAULT_GRID,
+                                                     PROVIDER_GRID,
+                                                     snap_to_grid)
+
+    lat_step, lng_step = PROVIDER_GRID.get(params["database"], DEFAULT_GRID)
+    return snap_to_grid(params["lat"], lat_step), snap_to_grid(params["lng"], lng_step)
+
+
+async def _fetch_nasa_cells(
+    cells: Sequence[Tuple[float, float]], start: datetime, end: datetime
+) -> Dict[Tuple[float, float], Any]:
+    """
+    Baixa as séries de várias células com um cliente HTTP compartilhado.
+
+    As séries passam pelo cache ``climate:nasa``, o mesmo consultado pelo
+    caminho rápido em processo da API (``eto_fast_path``).
+    """
+    from backend.api.services.nasa_power_client import NASAPowerClient
+    from backend.infrastructure.cache.climate_cache import create_climate_cache
+
+    cache = create_climate_cache("nasa")
+    client = NASAPowerClient(cache=cache)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+    async def fetch(cell):
+        async with semaphore:
+            return await client.get_daily_data(cell[0], cell[1], start, end)
+
+    try:
+        results = await asyncio.gather(*(fetch(c) for c in cells), return_exceptions=True)
+    finally:
+        await client.close()
+        await cache.close()
+    return dict(zip(cells, results))
+
+
+def missing_days(series: Any, dates: Sequence[str]) -> int:
+    """Dias do período sem todas as entradas do ETo na série do NASA POWER."""
+    if isinstance(series, Exception) or not series:
+        return 0
+    complete = {
+        record.date
+        for record in series
+        if all(
+            getattr(record, NASA_FIELDS[name]) is not None
+            and getattr(record, NASA_FIELDS[name]) > -999
+            for name in ETO_INPUTS
+        )
+    }
+    return sum(day not in complete for day in dates)
+
+
+def substitute_window(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+    """
+    Período pedido à fonte substituta: o fim do período (onde fica o
+    atraso do NASA POWER), ajustado aos limites do Open-Meteo.
+    """
+    first = max(start, end - timedelta(days=SUBSTITUTE_MAX_DAYS - 1))
+    first = min(first, end - timedelta(days=SUBSTITUTE_MIN_DAYS - 1))
+    return first, end
+
+
+def openmeteo_to_nasa(
+    climate_data: Dict[str, Any], dates: Sequence[str]
+) -> Dict[str, np.ndarray]:
+    """
+    Série colunar do Open-Meteo nas variáveis do NASA POWER, alinhada a ``dates``.
+
+    Dias ausentes ficam NaN; o vento é convertido de 10 m para 2 m.
+    """
+    day_index = {d: i for i, d in enumerate(dates)}
+    positions = [
+        day_index.get(pd.Timestamp(d).strftime("%Y-%m-%d"))
+        for d in climate_data.get("dates") or []
+    ]
+    block = {}
+    for name, variable in OPENMETEO_FIELDS.items():
+        values = climate_data.get(variable)
+        if values is None or len(values) != len(positions):
+            continue
+        column = np.full(len(dates), np.nan)
+        for j, value in zip(positions, values):
+            if j is not None and value is not None:
+                column[j] = value
+        block[name] = column
+    if "WS2M" in block:
+        block["WS2M"] = block["WS2M"] * WIND_10M_TO_2M
+    return block
+
+
+async def fetch_substitute_cells(
+    cells: Sequence[Tuple[float, float]],
+    start: datetime,
+    end: datetime,
+    cache=None,
+    fetch_missing: bool = True,
+) -> Dict[Tuple[float, float], Dict[str, np.ndarray]]:
+    """
+    Séries do Open-Meteo para completar as células incompletas.
+
+    Args:
+        cells: Células com dias faltando no NASA POWER
+        start, end: Período das requisições
+        cache: ClimateCacheService (default: ``climate:openmeteo``)
+        fetch_missing: Baixa do Open-Meteo o que não estiver no cache
+            (o caminho rápido só consulta o cache)
+
+    Returns:
+        {célula: {variável NASA: array alinhado ao período}}; células sem
+        dado substituto ficam de fora
+    """
+    from backend.infrastructure.cache.climate_cache import create_climate_cache
+
+    own_cache = cache is None
+    if own_cache:
+        cache = create_climate_cache(SUBSTITUTE_SOURCE)
+    first, last = substitute_window(start, end)
+    dates = [d.strftime("%Y-%m-%d") for d in pd.date_range(start, end)]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    client = None
+
+    async def fetch(cell):
+        nonlocal client
+        climate_data = await cache.get(
+            source=SUBSTITUTE_SOURCE, lat=cell[0], lon=cell[1], start=first, end=last
+        )
+        if climate_data is None and fetch_missing:
+            if client is None:
+                from backend.api.services.openmeteo_smart_client import \
+                    OpenMeteoSmartClient
+
+                client = OpenMeteoSmartClient()
+            async with semaphore:
+                response = await client.get_climate_data(
+                    cell[0], cell[1], first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d")
+                )
+            climate_data = response.get("climate_data")
+            await cache.set(
+                source=SUBSTITUTE_SOURCE, lat=cell[0], lon=cell[1],
+                start=first, end=last, data=climate_data,
+            )
+        return openmeteo_to_nasa(climate_data, dates) if climate_data else None
+
+    try:
+        results = await asyncio.gather(*(fetch(c) for c in cells), return_exceptions=True)
+    finally:
+        if client is not None:
+            await client.close()
+        if own_cache:
+            await cache.close()
+
+    substitutes = {}
+    for cell, result in zip(cells, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Fonte substituta indisponível para {cell}: {result}")
+        elif result:
+            substitutes[cell] = result
+    return substitutes
+
+
+def _round_or_none(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 3)
+
+
+def build_eto_records(
+    requests: List[Dict[str, Any]],
+    series_by_cell: Dict[Tuple[float, float], Any],
+    dates: Sequence[str],
+    substitutes_by_cell: Optional[Dict[Tuple[float, float], Dict[str, Any]]] = None,
+) -> Dict[str, Tuple[Optional[List[Dict[str, Any]]], List[str]]]:
+    """
+    Calcula o ETo de um grupo de requisições em um único bloco.
+
+    Args:
+        requests: [{"task_id", "params"}] da mesma fonte e período
+        series_by_cell: {célula: [NASAPowerData] ou exceção}
+        dates: Datas do período (YYYY-MM-DD)
+        substitutes_by_cell: {célula: {variável: array alinhado a ``dates``}}
+            de outra fonte (``fetch_substitute_cells``), usado nos dias que
+            a interpolação não cobre
+
+    Returns:
+        {task_id: (registros no formato do pipeline ou None, avisos)}
+    """
+    from backend.core.data_processing.eto_fao56 import penman_monteith_daily
+    from backend.core.data_processing.gap_filling import (FILL_SUBSTITUTED,
+                                                          fill_block)
+    from backend.core.data_processing.quality_control import run_quality_control
+
+    day_index = {d: i for i, d in enumerate(dates)}
+    outcome: Dict[str, Tuple[Optional[List[Dict[str, Any]]], List[str]]] = {}
+
+    rows = []
+    for request in requests:
+        series = series_by_cell.get(cell_key(request["params"]))
+        if isinstance(series, Exception) or not series:
+            outcome[request["task_id"]] = (None, [f"Falha ao obter dados: {series}"])
+        else:
+            rows.append((request, series))
+    if not rows:
+        return outcome
+
+    # Bloco (requisições × dias); -999 do NASA POWER vira NaN
+    block = {name: np.full((len(rows), len(dates)), np.nan) for name in NASA_FIELDS}
+    for i, (_, series) in enumerate(rows):
+        for record in series:
+            j = day_index.get(record.date)
+            if j is None:
+                continue
+            for name, attribute in NASA_FIELDS.items():
+                value = getattr(record, attribute)
+                if value is not None and value > -999:
+                    block[name][i, j] = value
+
+    lats = np.array([float(r["params"]["lat"]) for r, _ in rows])
+    elevations = np.array([float(r["params"]["elevation"]) for r, _ in rows])
+    substitutes = {}
+    substitutes_by_cell = substitutes_by_cell or {}
+    if any(cell_key(r["params"]) in substitutes_by_cell for r, _ in rows):
+        other = {name: np.full((len(rows), len(dates)), np.nan) for name in NASA_FIELDS}
+        for i, (request, _) in enumerate(rows):
+            for name, values in substitutes_by_cell.get(cell_key(request["params"]), {}).items():
+                if name in other:
+                    other[name][i] = values
+        substitutes[SUBSTITUTE_SOURCE] = other
+
+    qc = run_quality_control(block, lats, dates, elevations)
+    filled = fill_block(qc.apply(block), substitutes=substitutes)
+    values = filled.values
+
+    day_of_year = pd.DatetimeIndex(pd.to_datetime(list(dates))).dayofyear.to_numpy()
+    eto = penman_monteith_daily(
+        values["T2M_MAX"],
+        values["T2M_MIN"],
+        values["RH2M"],
+        values["WS2M"],
+        values["ALLSKY_SFC_SW_DWN"],
+        elevation=elevations[:, None],
+        latitude=lats[:, None],
+        day_of_year=day_of_year[None, :],
+    )
+
+    qc_flagged = qc.any_flagged()
+    fill_bits = np.bitwise_or.reduce(list(filled.flags.values()))
+    fill_flagged = fill_bits != 0
+    substituted = (fill_bits & FILL_SUBSTITUTED) != 0
+    for i, (request, _) in enumerate(rows):
+        params = request["params"]
+        records = []
+        for j, day in enumerate(dates):
+            record = {
+                "lat": params["lat"],
+                "lng": params["lng"],
+                "elev": params["elevation"],
+                "date": day,
+            }
+            for name in NASA_FIELDS:
+                record[name] = _round_or_none(values[name][i, j])
+            record["ETo"] = _round_or_none(eto[i, j])
+            records.append(record)
+
+        warnings = []
+        if qc_flagged[i].any():
+            warnings.append(
+                f"{int(qc_flagged[i].sum())} dia(s) com valores reprovados "
+                f"no controle de qualidade"
+            )
+        if fill_flagged[i].any():
+            warnings.append(f"{int(fill_flagged[i].sum())} dia(s) com lacunas preenchidas")
+        no_data = np.isnan(eto[i])
+        if no_data.any():
+            warnings.append(
+                f"{int(no_data.sum())} dia(s) sem dados para o ETo "
+                f"(ainda não publicados pelo provedor ou lacunas longas)"
+            )
+        if substituted[i].any():
+            warnings.append(
+                f"{int(substituted[i].sum())} dia(s) completados com dados "
+                f"de {SUBSTITUTE_SOURCE}"
+            )
+        outcome[request["task_id"]] = (records, warnings)
+    return outcome
+
+
+def process_eto_batch(
+    requests: List[Dict[str, Any]],
+    ack: Optional[Callable[[str], None]] = None,
+) -> int:
+    """
+    Processa um lote: download por célula, cálculo vetorizado e fan-out.
+
+    Args:
+        requests: [{"task_id", "params"}]
+        ack: Chamado com o ``task_id`` depois que o resultado (sucesso ou
+            falha) da requisição foi gravado no result backend
+
+    Returns:
+        Número de requisições concluídas com sucesso
+    """
+    ack = ack or (lambda task_id: None)
+    from celery import current_app
+
+    from backend.infrastructure.celery.celery_config import publish_task_status
+    from backend.infrastructure.celery.tasks.eto_storage_tasks import \
+        persist_eto_results
+
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+    for request in requests:
+        params = request["params"]
+        key = (params["database"], params["d_inicial"], params["d_final"])
+        groups.setdefault(key, []).append(request)
+
+    succeeded = 0
+    for (database, d_inicial, d_final), group in groups.items():
+        task_ids = [r["task_id"] for r in group]
+        try:
+            if database != "nasa_power":
+                raise ValueError(f"Fonte sem suporte a lote: {database}")
+            for task_id in task_ids:
+                publish_task_status(
+                    task_id, "PROGRESS", info={"step": "downloading", "batch_size": len(group)}
+                )
+
+            start = datetime.strptime(d_inicial, "%Y-%m-%d")
+            end = datetime.strptime(d_final, "%Y-%m-%d")
+            dates = [d.strftime("%Y-%m-%d") for d in pd.date_range(start, end)]
+            cells = sorted({cell_key(r["params"]) for r in group})
+            series_by_cell = asyncio.run(_fetch_nasa_cells(cells, start, end))
+            incomplete = [c for c in cells if missing_days(series_by_cell[c], dates)]
+            substitutes = (
+                asyncio.run(fetch_substitute_cells(incomplete, start, end)) if incomplete else {}
+            )
+
+            outcome = build_eto_records(group, series_by_cell, dates, substitutes)
+        except Exception as e:
+            logger.error(f"❌ Lote de ETo ({database}, {d_inicial}..{d_final}) falhou: {e}")
+            for task_id in task_ids:
+                current_app.backend.mark_as_failure(task_id, e)
+                publish_task_status(task_id, "FAILURE", error=str(e))
+                ack(task_id)
+            continue
+
+        to_persist = []
+        for task_id in task_ids:
+            records, warnings = outcome[task_id]
+            if records is None:
+                error = RuntimeError("; ".join(warnings))
+                current_app.backend.mark_as_failure(task_id, error)
+                publish_task_status(task_id, "FAILURE", error=str(error))
+                ack(task_id)
+                continue
+            current_app.backend.store_result(task_id, [records, warnings], "SUCCESS")
+            ack(task_id)
+            publish_task_status(task_id, "SUCCESS", result=records, warnings=warnings)
+            # eto_results.eto é NOT NULL: dias sem ETo não são gravados
+            to_persist.extend(r for r in records if r["ETo"] is not None)
+            succeeded += 1
+
+        if to_persist:
+            persist_eto_results.delay(to_persist, source=database, quality_checked=True)
+        logger.info(
+            f"✅ Lote de ETo: {len(group)} requisições, {len(cells)} células "
+            f"({database}, {d_inicial}..{d_final})"
+        )
+    return succeeded
+
+
+def reserve_requests(redis, max_batch: int) -> List[Tuple[str, Any]]:
+    """
+    Move até ``max_batch`` requisições da fila para a lista de processamento.
+
+    Returns:
+        [(task_id, item bruto)] na ordem da fila
+    """
+    reserved = []
+    for _ in range(max_batch):
+        raw = redis.lmove(PENDING_KEY, PROCESSING_KEY, "LEFT", "RIGHT")
+        if raw is None:
+            break
+        task_id = json.loads(raw)["task_id"]
+        redis.hset(RESERVED_KEY, task_id, time.time())
+        reserved.append((task_id, raw))
+    return reserved
+
+
+def acknowledge_request(redis, task_id: str, raw: Any) -> None:
+    """Remove da lista de processamento uma requisição já respondida."""
+    redis.lrem(PROCESSING_KEY, 1, raw)
+    redis.hdel(RESERVED_KEY, task_id)
+
+
+def requeue_stale_reservations(
+    redis, timeout: float = RESERVATION_TIMEOUT_SECONDS
+) -> int:
+    """
+    Devolve à fila as reservas de drenagens que não terminaram.
+
+    Returns:
+        Número de requisições devolvidas
+    """
+    now = time.time()
+    requeued = 0
+    for raw in redis.lrange(PROCESSING_KEY, 0, -1):
+        task_id = json.loads(raw)["task_id"]
+        # Sem horário: reservada agora, entre o LMOVE e o HSET
+        redis.hsetnx(RESERVED_KEY, task_id, now)
+        if now - float(redis.hget(RESERVED_KEY, task_id)) < timeout:
+            continue
+        if redis.lrem(PROCESSING_KEY, 1, raw):
+            redis.rpush(PENDING_KEY, raw)
+            redis.hdel(RESERVED_KEY, task_id)
+            requeued += 1
+    if requeued:
+        logger.warning(f"⚠️ {requeued} requisições de ETo não concluídas voltaram à fila")
+    return requeued
+
+
+@shared_task(bind=True, name=DRAIN_TASK_NAME)
+def drain_eto_batches(self, max_batch: int = BATCH_MAX_SIZE) -> Dict[str, Any]:
+    """
+    Consome a fila de requisições em lotes de até ``max_batch``.
+
+    Returns:
+        dict: lotes processados, requisições concluídas e devolvidas à fila
+    """
+    redis = _redis()
+    # Libera o agendamento: requisições novas abrem a próxima janela
+    redis.delete(TICK_KEY)
+    requeued = requeue_stale_reservations(redis)
+
+    batches = 0
+    succeeded = 0
+    while True:
+        reserved = reserve_requests(redis, max_batch)
+        if not reserved:
+            break
+        raw_by_task = dict(reserved)
+        succeeded += process_eto_batch(
+            [json.loads(raw) for _, raw in reserved],
+            ack=lambda task_id: acknowledge_request(redis, task_id, raw_by_task[task_id]),
+        )
+        batches += 1
+
+    return {"batches": batches, "succeeded": succeeded, "requeued": requeued}
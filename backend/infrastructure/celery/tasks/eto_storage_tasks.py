@@ -0,0 +1,70 @@
+"""
+Tasks Celery para persistência em massa de resultados de ETo.
+
+O pipeline de ETo encadeia esta task ao final do cálculo para gravar
+os resultados em ``eto_results`` via COPY + upsert, sem bloquear a
+resposta ao usuário. Antes da gravação o bloco passa pelo controle de
+qualidade: valores reprovados são gravados como NULL e os dias cujo ETo
+foi anulado não são gravados (``eto_results.eto`` é NOT NULL). Registros
+de ``build_eto_records`` já passaram pelo controle e chegam com
+``quality_checked=True``.
+
+Exemplo:
+    persist_eto_results.delay(records, source="nasa_power")
+"""
+
+from typing import Any, Dict, List
+
+from celery import shared_task
+from loguru import logger
+
+
+@shared_task(
+    bind=True,
+    max_retries=3,
+    name="backend.infrastructure.celery.tasks.eto_storage_tasks.persist_eto_results"
+)
+def persist_eto_results(
+    self,
+    records: List[Dict[str, Any]],
+    source: str = "nasa_power",
+    chunk_size: int = 10000,
+    quality_checked: bool = False,
+) -> Dict[str, Any]:
+    """
+    Grava resultados de ETo em massa (idempotente pela chave natural).
+
+    Args:
+        records: Registros do pipeline (lat, lng, elev, date, T2M_MAX, ..., ETo)
+        source: Fonte dos dados climáticos
+        chunk_size: Linhas por bloco de COPY
+        quality_checked: Registros já controlados (não repete o controle)
+
+    Returns:
+        dict: rows, skipped, upserted, seconds e rows_per_second
+    """
+    # Importa dentro da task para evitar circular imports
+    from backend.core.data_processing.quality_control import \
+        quality_control_records
+    from backend.database.data_storage import bulk_save_eto_data
+
+    try:
+        qc_summary = {}
+        if not quality_checked:
+            records, qc = quality_control_records(records, dependent=("ETo", "eto"))
+            qc_summary = qc.summary()
+        if qc_summary:
+            logger.warning(f"⚠️ Controle de qualidade reprovou valores: {qc_summary}")
+
+        stats = bulk_save_eto_data(records, source=source, chunk_size=chunk_size)
+        logger.info(
+            f"💾 ETo persistido: {stats['rows']} registros "
+            f"({stats['rows_per_second']} linhas/s)"
+        )
+        if stats["skipped"]:
+            logger.warning(f"⚠️ {stats['skipped']} registros sem ETo não foram persistidos")
+        return {"status": "success", "quality_control": qc_summary, **stats}
+
+    except Exception as e:
+        logger.error(f"❌ Erro ao persistir ETo: {e}")
+        raise self.retry(exc=e, countdown=60)
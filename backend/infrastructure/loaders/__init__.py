@@ -0,0 +1,3 @@
+"""
+Carregadores de dados históricos (relatórios JSON e séries diárias).
+"""
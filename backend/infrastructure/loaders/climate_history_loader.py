@@ -1,270 +1,526 @@
 """
 Climate History Data Loader
-- Importa dados históricos dos CSVs/JSONs para PostgreSQL
+- Importa dados históricos dos JSONs (reports/cities) para PostgreSQL
 - Processa normais climáticas mensais
 - Calcula pesos de proximidade para estações
+
+Estratégia de carga (set-based):
+1. Os JSONs são lidos em paralelo (ProcessPoolExecutor) e convertidos
+   em linhas prontas para o banco
+2. As linhas são agrupadas em lotes colunares por tabela
+3. Cada tabela é gravada com COPY → tabela temporária → upsert
+   (INSERT ... ON CONFLICT), em uma única transação por tabela
+4. Distâncias cidade ↔ estação são calculadas no PostGIS, de uma vez
+
+Relatórios sem latitude/longitude têm as coordenadas resolvidas no
+catálogo de cidades (``data/csv``); cidades que não forem encontradas
+ficam de fora da carga.
+
+Recarregar todos os relatórios é idempotente.
 """
 
+import csv
+import io
 import json
-import warnings
-from datetime import datetime
+import os
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-import pandas as pd
-from geoalchemy2 import func as gis_func
 from loguru import logger
-from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
-warnings.filterwarnings('ignore')
+SCHEMA = "climate_history"
+
+CITY_COLUMNS = (
+    "city_name",
+    "country",
+    "state_province",
+    "latitude",
+    "longitude",
+    "elevation_m",
+    "reference_periods",
+)
+
+# Coluna em monthly_climate_normals -> chave no JSON mensal
+NORMAL_FIELDS = {
+    "eto_normal": "normal",
+    "eto_daily_mean": "daily_mean",
+    "eto_daily_median": "daily_median",
+    "eto_daily_std": "daily_std",
+    "eto_p01": "p01",
+    "eto_p05": "p05",
+    "eto_p10": "p10",
+    "eto_p25": "p25",
+    "eto_p75": "p75",
+    "eto_p90": "p90",
+    "eto_p95": "p95",
+    "eto_p99": "p99",
+    "eto_abs_min": "abs_min",
+    "eto_abs_max": "abs_max",
+    "precip_normal": "precip_normal",
+    "precip_daily_mean": "precip_daily_mean",
+    "precip_daily_median": "precip_daily_median",
+    "precip_daily_std": "precip_daily_std",
+    "precip_p95": "precip_p95",
+    "precip_p99": "precip_p99",
+    "precip_max": "precip_max",
+    "rain_days": "rain_days",
+    "dry_days": "dry_days",
+    "rain_probability": "rain_probability",
+    "precip_intensity": "precip_intensity",
+    "n_days": "n_days",
+}
+
+NORMAL_COLUMNS = ("city_name", "period_key", "month") + tuple(NORMAL_FIELDS)
+
+# Catálogos de cidades usados para relatórios sem coordenadas
+MATOPIBA_CATALOG = "data/csv/CITIES_MATOPIBA_337.csv"
+WORLD_CATALOG = "data/csv/worldcities_with_elevation.csv"
+
+
+def _normalize_name(name: str) -> str:
+    """Nome sem acentos, minúsculo e com espaços no lugar de hífens."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return " ".join(ascii_name.lower().replace("-", " ").split())
+
+
+def _read_catalog(path: str) -> List[Dict[str, str]]:
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    except OSError as e:
+        logger.warning(f"City catalog unavailable ({path}): {e}")
+        return []
+
+
+def resolve_city_coordinates(
+    city_keys: Sequence[str],
+    matopiba_catalog: str = MATOPIBA_CATALOG,
+    world_catalog: str = WORLD_CATALOG,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Coordenadas das cidades pelo identificador do relatório ("Nome_SUFIXO").
+
+    O sufixo é comparado à UF no catálogo do MATOPIBA e ao país no
+    catálogo mundial; sem país correspondente, o nome só é aceito se for
+    único no catálogo.
+
+    Returns:
+        {chave: {'lat', 'lon', 'alt'}} apenas para as cidades encontradas
+    """
+    matopiba = {
+        (_normalize_name(row["CITY"]), row["UF"]): row
+        for row in _read_catalog(matopiba_catalog)
+    }
+    world: Dict[str, List[Dict[str, str]]] = {}
+    for row in _read_catalog(world_catalog):
+        world.setdefault(_normalize_name(row["city"]), []).append(row)
+
+    resolved = {}
+    for city_key in city_keys:
+        parts = city_key.split("_")
+        if len(parts) < 2:
+            continue
+        name, suffix = _normalize_name(" ".join(parts[:-1])), parts[-1]
+
+        row = matopiba.get((name, suffix))
+        if row is not None:
+            resolved[city_key] = {
+                "lat": float(row["LATITUDE"]),
+                "lon": float(row["LONGITUDE"]),
+                "alt": float(row["HEIGHT"]) if row.get("HEIGHT") else None,
+            }
+            continue
+
+        candidates = world.get(name, [])
+        same_country = [
+            r for r in candidates if _normalize_name(r["country"]) == _normalize_name(suffix)
+        ]
+        if same_country:
+            candidates = same_country
+        if len(candidates) != 1:
+            continue
+        row = candidates[0]
+        resolved[city_key] = {
+            "lat": float(row["lat"]),
+            "lon": float(row["lng"]),
+            "alt": float(row["elevation"]) if row.get("elevation") else None,
+        }
+    return resolved
+
+
+def parse_city_info(
+    json_data: Dict,
+    city_coordinates: Optional[Dict[str, Dict[str, float]]] = None,
+) -> Tuple[str, str, Optional[str], Optional[float], Optional[float], Optional[float]]:
+    """
+    Extrai informações básicas da cidade
+
+    O identificador do relatório tem o formato "Nome_Da_Cidade_SUFIXO"
+    (ex: "Luiz_Eduardo_Magalhaes_BA", "Seville_Spain"): o último trecho é
+    a UF/região e o restante é o nome da cidade.
+
+    Args:
+        json_data: Conteúdo do relatório
+        city_coordinates: Coordenadas opcionais por chave da cidade
+            ({'Piracicaba_SP': {'lat': ..., 'lon': ..., 'alt': ...}}),
+            usadas quando o relatório não traz latitude/longitude
+
+    Returns: city_name, country, state, lat, lon, elevation (lat/lon None
+        se o relatório e o mapeamento não tiverem coordenadas)
+    """
+    city_full = json_data.get('city', 'Unknown')
+
+    parts = city_full.split('_')
+    if len(parts) >= 2:
+        city_name = ' '.join(parts[:-1])
+        state_province = parts[-1]
+    else:
+        city_name = city_full
+        state_province = None
+    country = json_data.get('country', 'Unknown')
+
+    # Tentar extrair coords do JSON, depois do mapeamento externo
+    latitude = json_data.get('latitude')
+    longitude = json_data.get('longitude')
+    elevation = json_data.get('elevation_m')
+
+    fallback = (city_coordinates or {}).get(city_full)
+    if (latitude is None or longitude is None) and fallback:
+        latitude = fallback.get('lat')
+        longitude = fallback.get('lon')
+        elevation = elevation if elevation is not None else fallback.get('alt')
+
+    if latitude is None or longitude is None:
+        return city_name, country, state_province, None, None, None
+
+    return city_name, country, state_province, latitude, longitude, elevation
+
+
+def parse_city_report(
+    json_path: str,
+    city_coordinates: Optional[Dict[str, Dict[str, float]]] = None,
+) -> Optional[Tuple[List[Any], List[List[Any]]]]:
+    """
+    Converte um relatório JSON em linhas de studied_cities e normais.
+
+    Função de módulo (picklable) executada nos processos do pool.
+
+    Returns:
+        (linha da cidade, linhas de normais mensais) ou None se falhar ou
+        se a cidade não tiver coordenadas
+    """
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        logger.error(f"Error loading JSON {json_path}: {e}")
+        return None
+
+    city_name, country, state, lat, lon, elevation = parse_city_info(
+        data, city_coordinates
+    )
+    if lat is None or lon is None:
+        logger.warning(f"Missing coordinates for {data.get('city')}; skipping {json_path}")
+        return None
+    periods = list(data.get('climate_normals_all_periods', {}).keys())
+    if not periods and data.get('reference_period_key'):
+        periods = [data['reference_period_key']]
+
+    city_row = [
+        city_name,
+        country,
+        state,
+        lat,
+        lon,
+        elevation,
+        json.dumps({"periods": periods}),
+    ]
+
+    normal_rows = []
+    for period_key, period_data in data.get('climate_normals_all_periods', {}).items():
+        for month_str, month_data in period_data.get('monthly', {}).items():
+            row = [city_name, period_key, int(month_str)]
+            row.extend(month_data.get(key) for key in NORMAL_FIELDS.values())
+            normal_rows.append(row)
+
+    return city_row, normal_rows
+
+
+def _to_columnar(rows: List[List[Any]], columns: Sequence[str]) -> Dict[str, List[Any]]:
+    """Transpõe linhas em lote colunar {coluna: [valores]}."""
+    return {name: [row[i] for row in rows] for i, name in enumerate(columns)}
+
+
+def _copy_columnar(cursor, table: str, batch: Dict[str, List[Any]]) -> int:
+    """Envia um lote colunar para ``table`` via COPY (formato CSV)."""
+    columns = list(batch.keys())
+    n_rows = len(batch[columns[0]]) if columns else 0
+    if not n_rows:
+        return 0
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(zip(*(batch[c] for c in columns)))
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+    return n_rows
 
 
 class ClimateHistoryLoader:
     """Carregador de dados históricos climáticos"""
 
-    def __init__(self, db_session: Session, reports_dir: str = "reports/cities"):
+    def __init__(
+        self,
+        db_session: Session,
+        reports_dir: str = "reports/cities",
+        city_coordinates: Optional[Dict[str, Dict[str, float]]] = None,
+        max_workers: Optional[int] = None,
+        nearby_radius_km: float = 100.0,
+        nearby_max_stations: int = 5,
+    ):
+        """
+        Args:
+            db_session: Sessão SQLAlchemy (síncrona)
+            reports_dir: Diretório com report_*.json
+            city_coordinates: Coordenadas para relatórios sem latitude/longitude
+                (default: resolvidas no catálogo de cidades)
+            max_workers: Processos para leitura dos JSONs (default: CPUs)
+            nearby_radius_km: Raio máximo para estações próximas
+            nearby_max_stations: Máximo de estações por cidade
+        """
         self.db_session = db_session
         self.reports_dir = Path(reports_dir)
+        self.city_coordinates = city_coordinates
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.nearby_radius_km = nearby_radius_km
+        self.nearby_max_stations = nearby_max_stations
         logger.info(f"ClimateHistoryLoader initialized with {reports_dir}")
 
-    def load_city_from_json(self, json_path: Path) -> Optional[Dict[str, Any]]:
+    def parse_reports(self) -> Tuple[Dict[str, List[Any]], Dict[str, List[Any]]]:
         """
-        Carrega dados de uma cidade a partir de JSON
-        
-        Estrutura esperada:
-        {
-            "city": "Piracicaba_SP",
-            "reference_period": ["1991-01-01", "2020-12-31"],
-            "reference_period_key": "1991-2020",
-            "latitude": -22.7191,
-            "longitude": -47.6383,
-            "elevation_m": 546,
-            "climate_normals_all_periods": {...}
-        }
+        Lê todos os relatórios em paralelo e monta os lotes colunares.
+
+        Returns:
+            (lote de studied_cities, lote de monthly_climate_normals)
         """
-        try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+        json_files = sorted(str(p) for p in self.reports_dir.glob("report_*.json"))
+        logger.info(f"Found {len(json_files)} JSON reports to load")
 
-            return data
+        city_rows: List[List[Any]] = []
+        normal_rows: List[List[Any]] = []
+        if not json_files:
+            return _to_columnar([], CITY_COLUMNS), _to_columnar([], NORMAL_COLUMNS)
 
-        except Exception as e:
-            logger.error(f"Error loading JSON {json_path}: {e}")
-            return None
+        city_coordinates = self.city_coordinates
+        if city_coordinates is None:
+            city_coordinates = resolve_city_coordinates(
+                [Path(path).stem[len("report_"):] for path in json_files]
+            )
 
-    def parse_city_info(self, json_data: Dict) -> Tuple[str, str, str, float, float, Optional[float]]:
-        """
-        Extrai informações básicas da cidade
-        
-        Returns: city_name, country, state, lat, lon, elevation
-        """
-        city_full = json_data.get('city', 'Unknown')
-        
-        # Parsear city_full (formato: "CityName_StateCountry" ou "CityName_Country")
-        parts = city_full.split('_')
-        
-        if len(parts) >= 2:
-            city_name = parts[0]
-            state_province = parts[1] if len(parts) == 2 else parts[1]
-            country = parts[-1] if len(parts) > 2 else 'Unknown'
-        else:
-            city_name = city_full
-            state_province = None
-            country = 'Unknown'
-
-        # Tentar extrair coords do JSON
-        latitude = json_data.get('latitude')
-        longitude = json_data.get('longitude')
-        elevation = json_data.get('elevation_m')
-
-        if latitude is None or longitude is None:
-            logger.warning(f"Missing coordinates for {city_full}")
-            return city_name, country, state_province, 0.0, 0.0, None
-
-        return city_name, country, state_province, latitude, longitude, elevation
-
-    async def insert_studied_city(
-        self,
-        json_data: Dict,
-    ) -> Optional[int]:
+        chunksize = max(1, len(json_files) // (self.max_workers * 4))
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            results = pool.map(
+                parse_city_report,
+                json_files,
+                [city_coordinates] * len(json_files),
+                chunksize=chunksize,
+            )
+            for result in results:
+                if result is None:
+                    continue
+                city_row, rows = result
+                city_rows.append(city_row)
+                normal_rows.extend(rows)
+
+        return (
+            _to_columnar(city_rows, CITY_COLUMNS),
+            _to_columnar(normal_rows, NORMAL_COLUMNS),
+        )
+
+    def _raw_cursor(self):
+        return self.db_session.connection().connection.cursor()
+
+    def upsert_studied_cities(self, batch: Dict[str, List[Any]]) -> int:
         """
-        Insere cidade estudada no BD
-        
-        Returns: city_id se sucesso, None se falha
+        Grava studied_cities em uma transação (COPY + upsert por city_name).
+
+        Returns: número de cidades gravadas
         """
+        cursor = self._raw_cursor()
         try:
-            city_name, country, state, lat, lon, elevation = self.parse_city_info(json_data)
-
-            # Verificar se já existe
-            existing = self.db_session.execute(
-                select(lambda c: c.id).select_from(
-                    f"""
-                    SELECT id FROM climate_history.studied_cities 
-                    WHERE city_name = '{city_name}' AND country = '{country}'
-                    LIMIT 1
-                    """
-                )
-            ).first()
-
-            if existing:
-                logger.info(f"City {city_name}, {country} already exists")
-                return existing[0]
-
-            # Referência de período
-            reference_periods = json_data.get('reference_period', [])
-            reference_key = json_data.get('reference_period_key', 'unknown')
-
-            # Inserir cidade com PostGIS
-            insert_stmt = insert(
-                lambda: f"""
-                INSERT INTO climate_history.studied_cities 
-                (city_name, country, state_province, latitude, longitude, elevation_m, 
-                 location, reference_periods, created_at, updated_at)
-                VALUES 
-                ('{city_name}', '{country}', '{state}', {lat}, {lon}, {elevation},
-                 ST_Point({lon}, {lat}), '{{"periods": ["{reference_key}"]}}'::jsonb,
-                 now(), now())
-                RETURNING id
+            cursor.execute(
+                """
+                CREATE TEMP TABLE studied_cities_staging (
+                    city_name varchar(150),
+                    country varchar(100),
+                    state_province varchar(100),
+                    latitude double precision,
+                    longitude double precision,
+                    elevation_m double precision,
+                    reference_periods jsonb
+                ) ON COMMIT DROP
                 """
             )
-
-            result = self.db_session.execute(insert_stmt).scalar()
+            _copy_columnar(cursor, "studied_cities_staging", batch)
+            cursor.execute(
+                f"""
+                INSERT INTO {SCHEMA}.studied_cities
+                    (city_name, country, state_province, latitude, longitude,
+                     elevation_m, location, reference_periods, created_at, updated_at)
+                SELECT city_name, country, state_province, latitude, longitude,
+                       elevation_m,
+                       ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography,
+                       reference_periods, now(), now()
+                FROM studied_cities_staging
+                ON CONFLICT (city_name) DO UPDATE SET
+                    country = EXCLUDED.country,
+                    state_province = EXCLUDED.state_province,
+                    latitude = EXCLUDED.latitude,
+                    longitude = EXCLUDED.longitude,
+                    elevation_m = EXCLUDED.elevation_m,
+                    location = EXCLUDED.location,
+                    reference_periods = EXCLUDED.reference_periods,
+                    updated_at = now()
+                """
+            )
+            count = cursor.rowcount
             self.db_session.commit()
-
-            logger.info(f"Inserted city {city_name} (ID: {result})")
-            return result
-
+            logger.info(f"Upserted {count} studied cities")
+            return count
         except Exception as e:
-            logger.error(f"Error inserting city: {e}")
+            logger.error(f"Error upserting studied cities: {e}")
             self.db_session.rollback()
-            return None
+            raise
 
-    async def insert_monthly_normals(
-        self,
-        city_id: int,
-        json_data: Dict,
-    ) -> int:
+    def upsert_monthly_normals(self, batch: Dict[str, List[Any]]) -> int:
         """
-        Insere normais mensais para uma cidade
-        
-        Returns: número de registros inseridos
+        Grava monthly_climate_normals em uma transação.
+
+        O city_id é resolvido no banco por junção com studied_cities.
+
+        Returns: número de normais gravadas
         """
+        value_columns = list(NORMAL_FIELDS)
+        staging_columns = ",\n".join(
+            f"{col} {'integer' if col in ('rain_days', 'dry_days', 'n_days') else 'double precision'}"
+            for col in value_columns
+        )
+        updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in value_columns)
+
+        cursor = self._raw_cursor()
         try:
-            normals_data = json_data.get('climate_normals_all_periods', {})
-            period_key = json_data.get('reference_period_key', 'unknown')
-            
-            inserted_count = 0
-
-            for period_str, periods_data in normals_data.items():
-                monthly_data = periods_data.get('monthly', {})
-
-                for month_str, month_data in monthly_data.items():
-                    try:
-                        month = int(month_str)
-
-                        # Preparar dados do mês
-                        normal_data = {
-                            'city_id': city_id,
-                            'period_key': period_key,
-                            'month': month,
-                            'eto_normal': month_data.get('normal'),
-                            'eto_daily_mean': month_data.get('daily_mean'),
-                            'eto_daily_median': month_data.get('daily_median'),
-                            'eto_daily_std': month_data.get('daily_std'),
-                            'eto_p01': month_data.get('p01'),
-                            'eto_p05': month_data.get('p05'),
-                            'eto_p10': month_data.get('p10'),
-                            'eto_p25': month_data.get('p25'),
-                            'eto_p75': month_data.get('p75'),
-                            'eto_p90': month_data.get('p90'),
-                            'eto_p95': month_data.get('p95'),
-                            'eto_p99': month_data.get('p99'),
-                            'eto_abs_min': month_data.get('abs_min'),
-                            'eto_abs_max': month_data.get('abs_max'),
-                            'precip_normal': month_data.get('precip_normal'),
-                            'precip_daily_mean': month_data.get('precip_daily_mean'),
-                            'precip_daily_median': month_data.get('precip_daily_median'),
-                            'precip_daily_std': month_data.get('precip_daily_std'),
-                            'precip_p95': month_data.get('precip_p95'),
-                            'precip_p99': month_data.get('precip_p99'),
-                            'precip_max': month_data.get('precip_max'),
-                            'rain_days': month_data.get('rain_days'),
-                            'dry_days': month_data.get('dry_days'),
-                            'rain_probability': month_data.get('rain_probability'),
-                            'precip_intensity': month_data.get('precip_intensity'),
-                            'n_days': month_data.get('n_days'),
-                        }
-
-                        # Verificar se já existe
-                        check_query = f"""
-                        SELECT id FROM climate_history.monthly_climate_normals
-                        WHERE city_id = {city_id} AND period_key = '{period_key}' 
-                        AND month = {month}
-                        LIMIT 1
-                        """
-                        existing = self.db_session.execute(check_query).first()
-
-                        if not existing:
-                            # Inserir registro
-                            columns = ', '.join(normal_data.keys())
-                            values = ', '.join([str(v) if v is not None else 'NULL' 
-                                               for v in normal_data.values()])
-                            
-                            insert_query = f"""
-                            INSERT INTO climate_history.monthly_climate_normals 
-                            ({columns}, created_at, updated_at)
-                            VALUES ({values}, now(), now())
-                            """
-                            
-                            self.db_session.execute(insert_query)
-                            inserted_count += 1
-
-                    except Exception as e:
-                        logger.warning(f"Error processing month {month_str}: {e}")
-                        continue
-
+            cursor.execute(
+                f"""
+                CREATE TEMP TABLE monthly_normals_staging (
+                    city_name varchar(150),
+                    period_key varchar(20),
+                    month integer,
+                    {staging_columns}
+                ) ON COMMIT DROP
+                """
+            )
+            _copy_columnar(cursor, "monthly_normals_staging", batch)
+            cursor.execute(
+                f"""
+                INSERT INTO {SCHEMA}.monthly_climate_normals
+                    (city_id, period_key, month, {', '.join(value_columns)},
+                     created_at, updated_at)
+                SELECT c.id, s.period_key, s.month,
+                       {', '.join('s.' + col for col in value_columns)},
+                       now(), now()
+                FROM monthly_normals_staging s
+                JOIN {SCHEMA}.studied_cities c ON c.city_name = s.city_name
+                ON CONFLICT (city_id, period_key, month) DO UPDATE SET
+                    {updates},
+                    updated_at = now()
+                """
+            )
+            count = cursor.rowcount
             self.db_session.commit()
-            logger.info(f"Inserted {inserted_count} monthly normals for city {city_id}")
-            return inserted_count
-
+            logger.info(f"Upserted {count} monthly normals")
+            return count
         except Exception as e:
-            logger.error(f"Error inserting monthly normals: {e}")
+            logger.error(f"Error upserting monthly normals: {e}")
             self.db_session.rollback()
-            return 0
+            raise
 
-    async def load_all_cities(self) -> int:
-        """
-        Carrega todas as cidades do diretório reports/cities
-        
-        Returns: número de cidades carregadas
+    def refresh_nearby_stations(self, city_names: List[str]) -> int:
         """
-        json_files = list(self.reports_dir.glob("report_*.json"))
-        logger.info(f"Found {len(json_files)} JSON reports to load")
+        Recalcula city_nearby_stations no PostGIS, em uma única instrução.
 
-        loaded_count = 0
+        Para cada cidade, seleciona as ``nearby_max_stations`` estações mais
+        próximas (KNN no índice GiST) dentro de ``nearby_radius_km``. As
+        relações anteriores das cidades são apagadas na mesma transação,
+        então estações que saíram do raio/top-k não ficam para trás.
 
-        for json_file in json_files:
-            try:
-                # Carregar JSON
-                json_data = self.load_city_from_json(json_file)
-                if not json_data:
-                    continue
+        Returns: número de relações gravadas
+        """
+        if not city_names:
+            return 0
 
-                # Inserir cidade
-                city_id = await self.insert_studied_city(json_data)
-                if not city_id:
-                    continue
+        params = {
+            "radius_m": self.nearby_radius_km * 1000.0,
+            "max_stations": self.nearby_max_stations,
+            "city_names": list(city_names),
+        }
+        cursor = self._raw_cursor()
+        try:
+            cursor.execute(
+                f"""
+                DELETE FROM {SCHEMA}.city_nearby_stations n
+                USING {SCHEMA}.studied_cities c
+                WHERE n.city_id = c.id AND c.city_name = ANY(%(city_names)s)
+                """,
+                params,
+            )
+            removed = cursor.rowcount
+            cursor.execute(
+                f"""
+                INSERT INTO {SCHEMA}.city_nearby_stations
+                    (city_id, station_id, distance_km, proximity_weight, created_at)
+                SELECT c.id, s.id, s.distance_m / 1000.0,
+                       1.0 / GREATEST(s.distance_m / 1000.0, 0.001),
+                       now()
+                FROM {SCHEMA}.studied_cities c
+                CROSS JOIN LATERAL (
+                    SELECT ws.id, ST_Distance(ws.location, c.location) AS distance_m
+                    FROM {SCHEMA}.weather_stations ws
+                    WHERE ST_DWithin(ws.location, c.location, %(radius_m)s)
+                    ORDER BY ws.location <-> c.location
+                    LIMIT %(max_stations)s
+                ) s
+                WHERE c.city_name = ANY(%(city_names)s)
+                """,
+                params,
+            )
+            count = cursor.rowcount
+            self.db_session.commit()
+            logger.info(f"Replaced {removed} city/station relations with {count}")
+            return count
+        except Exception as e:
+            logger.error(f"Error refreshing nearby stations: {e}")
+            self.db_session.rollback()
+            raise
 
-                # Inserir normais mensais
-                await self.insert_monthly_normals(city_id, json_data)
+    def load_all_cities(self) -> int:
+        """
+        Carrega todas as cidades do diretório reports/cities
 
-                loaded_count += 1
-                logger.info(f"✓ Loaded {json_file.name}")
+        Returns: número de cidades carregadas
+        """
+        cities, normals = self.parse_reports()
+        if not cities["city_name"]:
+            logger.warning("No reports to load")
+            return 0
 
-            except Exception as e:
-                logger.error(f"Error processing {json_file}: {e}")
-                continue
+        loaded_count = self.upsert_studied_cities(cities)
+        self.upsert_monthly_normals(normals)
+        self.refresh_nearby_stations(cities["city_name"])
 
         logger.info(f"\n✓ Successfully loaded {loaded_count} cities")
         return loaded_count
@@ -276,12 +532,7 @@ if __name__ == "__main__":
     Uso:
     python -m backend.infrastructure.loaders.climate_history_loader
     """
-    from backend.database.init_db import get_db
-
-    async def main():
-        async with get_db() as session:
-            loader = ClimateHistoryLoader(session)
-            await loader.load_all_cities()
+    from backend.database import get_db_context
 
-    import asyncio
-    asyncio.run(main())
+    with get_db_context() as session:
+        ClimateHistoryLoader(session).load_all_cities()
@@ -0,0 +1,295 @@
+"""
+Armazenamento colunar memory-mapped das séries diárias históricas.
+
+Converte ``data/csv/{BRASIL,MUNDO}/{ETo,pr}/<cidade>.csv`` em arquivos
+NumPy abertos com ``mmap_mode='r'``: abrir uma cidade não exige parse de
+CSV nem de datas, apenas o mapeamento do arquivo.
+
+Layout (``data/series_store``):
+    manifest.json                    # versão, cidades, fontes e assinaturas
+    <cidade>/days.npy                # int64, dias desde 1970-01-01 (contínuo)
+    <cidade>/ETo.npy                 # float32, NaN onde não há dado
+    <cidade>/precipitation.npy       # float32, NaN onde não há dado
+
+O build é incremental: só reconstrói cidades cujo CSV mudou
+(tamanho ou mtime diferentes dos registrados no manifesto).
+
+Uso:
+    python -m backend.infrastructure.loaders.climate_series_store data
+
+    store = ClimateSeriesStore.open("data/series_store")
+    eto = store.values("Piracicaba_SP", "ETo")      # np.memmap float32
+    dates = store.dates("Piracicaba_SP")            # datetime64[D]
+"""
+
+import json
+import os
+import shutil
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+STORE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DEFAULT_STORE_DIR = "series_store"
+
+# Pasta da região em data/csv -> nome da região usado no registro
+REGIONS = {"BRASIL": "brasil", "MUNDO": "global"}
+
+# Pasta da variável em data/csv/<REGIÃO> -> (nome da coluna no store, coluna no CSV)
+VARIABLES = {
+    "ETo": ("ETo", "ETo"),
+    "pr": ("precipitation", "pr"),
+}
+
+
+def _signature(path: Path) -> Dict[str, int]:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_series(csv_path: Path, value_column: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lê um CSV (Data, valor).
+
+    Returns:
+        (dias desde 1970-01-01 como int64 ordenados e únicos, valores float32)
+    """
+    df = pd.read_csv(csv_path)
+    date_column = "Data" if "Data" in df.columns else "date"
+    if value_column not in df.columns:
+        # Compatibilidade com nomes alternativos de precipitação
+        for alt in ("precipitation", "Precipitation"):
+            if alt in df.columns:
+                value_column = alt
+                break
+    days = (
+        pd.to_datetime(df[date_column]).to_numpy().astype("datetime64[D]").astype(np.int64)
+    )
+    values = df[value_column].to_numpy(dtype=np.float32)
+
+    # Datas repetidas: mantém a última ocorrência
+    order = np.argsort(days, kind="stable")[::-1]
+    unique_days, first = np.unique(days[order], return_index=True)
+    return unique_days, values[order][first]
+
+
+def discover_city_sources(data_directory: str) -> Dict[str, Dict]:
+    """
+    Lista os CSVs de cada cidade em ``<data_directory>/csv``.
+
+    Returns:
+        {cidade: {"region": ..., "sources": {variável: caminho}}}
+    """
+    csv_root = Path(data_directory) / "csv"
+    cities: Dict[str, Dict] = {}
+    for region_dir, region in REGIONS.items():
+        for var_dir, (variable, _) in VARIABLES.items():
+            folder = csv_root / region_dir / var_dir
+            if not folder.is_dir():
+                continue
+            for csv_path in sorted(folder.glob("*.csv")):
+                entry = cities.setdefault(
+                    csv_path.stem, {"region": region, "sources": {}}
+                )
+                entry["sources"][variable] = csv_path
+    return cities
+
+
+def _write_city(city_dir: Path, sources: Dict[str, Path]) -> Tuple[int, int]:
+    """Converte os CSVs de uma cidade em colunas alinhadas num eixo diário."""
+    series = {}
+    for variable, csv_path in sources.items():
+        csv_column = next(c for v, c in VARIABLES.values() if v == variable)
+        series[variable] = _read_series(csv_path, csv_column)
+
+    start_day = min(int(days[0]) for days, _ in series.values() if len(days))
+    end_day = max(int(days[-1]) for days, _ in series.values() if len(days))
+    n_days = end_day - start_day + 1
+
+    tmp_dir = city_dir.with_name(city_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    np.save(tmp_dir / "days.npy", np.arange(start_day, end_day + 1, dtype=np.int64))
+    for variable, (days, values) in series.items():
+        column = np.full(n_days, np.nan, dtype=np.float32)
+        column[days - start_day] = values
+        np.save(tmp_dir / f"{variable}.npy", column)
+
+    # Troca atômica do diretório da cidade
+    shutil.rmtree(city_dir, ignore_errors=True)
+    tmp_dir.rename(city_dir)
+    return start_day, n_days
+
+
+def build_series_store(
+    data_directory: str,
+    store_directory: Optional[str] = None,
+    force: bool = False,
+) -> Dict:
+    """
+    Constrói/atualiza o store a partir de ``<data_directory>/csv``.
+
+    Args:
+        data_directory: Diretório ``data`` do projeto
+        store_directory: Destino (default: ``<data_directory>/series_store``)
+        force: Reconstrói todas as cidades mesmo sem mudanças
+
+    Returns:
+        Manifesto atualizado
+    """
+    store_dir = Path(store_directory or Path(data_directory) / DEFAULT_STORE_DIR)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = store_dir / MANIFEST_NAME
+
+    manifest = {"version": STORE_VERSION, "cities": {}}
+    if manifest_path.exists() and not force:
+        previous = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if previous.get("version") == STORE_VERSION:
+            manifest = previous
+
+    rebuilt, kept = [], []
+    discovered = discover_city_sources(data_directory)
+    for city_key, info in discovered.items():
+        sources = info["sources"]
+        signatures = {v: _signature(p) for v, p in sources.items()}
+        current = manifest["cities"].get(city_key)
+        if (
+            current
+            and current.get("signatures") == signatures
+            and (store_dir / city_key).is_dir()
+        ):
+            kept.append(city_key)
+            continue
+
+        start_day, n_days = _write_city(store_dir / city_key, sources)
+        manifest["cities"][city_key] = {
+            "region": info["region"],
+            "start_day": start_day,
+            "n_days": n_days,
+            "variables": sorted(sources),
+            "sources": {v: str(p) for v, p in sources.items()},
+            "signatures": signatures,
+        }
+        rebuilt.append(city_key)
+
+    # Remove cidades cujos CSVs desapareceram
+    for city_key in set(manifest["cities"]) - set(discovered):
+        shutil.rmtree(store_dir / city_key, ignore_errors=True)
+        del manifest["cities"][city_key]
+
+    tmp_manifest = manifest_path.with_suffix(".json.tmp")
+    tmp_manifest.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_manifest, manifest_path)
+
+    logger.info(
+        f"Series store em {store_dir}: {len(rebuilt)} cidades reconstruídas, "
+        f"{len(kept)} sem alteração"
+    )
+    return manifest
+
+
+@dataclass(frozen=True)
+class CitySeries:
+    """Séries de uma cidade (arrays memory-mapped, somente leitura)."""
+
+    city_key: str
+    region: str
+    days: np.ndarray
+    columns: Dict[str, np.ndarray]
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Eixo diário como datetime64[D] (view, sem cópia)."""
+        return self.days.view("datetime64[D]")
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame indexado por data, no formato usado pelo registro."""
+        frame = pd.DataFrame(
+            {name: np.asarray(col) for name, col in self.columns.items()},
+            index=pd.DatetimeIndex(self.dates, name="Data"),
+        )
+        return frame
+
+
+class ClimateSeriesStore:
+    """Leitor do store colunar (abre arrays sob demanda e os mantém)."""
+
+    def __init__(self, store_directory: str, manifest: Dict):
+        self.store_dir = Path(store_directory)
+        self.manifest = manifest
+        self._cache: Dict[str, CitySeries] = {}
+
+    @classmethod
+    def open(cls, store_directory: str) -> "ClimateSeriesStore":
+        """
+        Abre o store (lê apenas o manifesto).
+
+        Raises:
+            FileNotFoundError: Se o manifesto não existir
+        """
+        manifest_path = Path(store_directory) / MANIFEST_NAME
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("version") != STORE_VERSION:
+            raise ValueError(
+                f"Versão do series store incompatível: {manifest.get('version')}"
+            )
+        return cls(store_directory, manifest)
+
+    @property
+    def cities(self) -> List[str]:
+        return list(self.manifest["cities"].keys())
+
+    def __contains__(self, city_key: str) -> bool:
+        return city_key in self.manifest["cities"]
+
+    def city(self, city_key: str) -> CitySeries:
+        """Retorna as séries de uma cidade (memory-mapped)."""
+        cached = self._cache.get(city_key)
+        if cached is not None:
+            return cached
+
+        info = self.manifest["cities"][city_key]
+        city_dir = self.store_dir / city_key
+        series = CitySeries(
+            city_key=city_key,
+            region=info["region"],
+            days=np.load(city_dir / "days.npy", mmap_mode="r"),
+            columns={
+                variable: np.load(city_dir / f"{variable}.npy", mmap_mode="r")
+                for variable in info["variables"]
+            },
+        )
+        self._cache[city_key] = series
+        return series
+
+    def open_all(self) -> Dict[str, CitySeries]:
+        """Abre todas as cidades (apenas mapeamento, sem leitura de dados)."""
+        return {city_key: self.city(city_key) for city_key in self.cities}
+
+    def values(self, city_key: str, variable: str) -> np.ndarray:
+        """Coluna float32 de uma variável (NaN onde não há dado)."""
+        return self.city(city_key).columns[variable]
+
+    def dates(self, city_key: str) -> np.ndarray:
+        """Eixo diário datetime64[D] de uma cidade."""
+        return self.city(city_key).dates
+
+    def iter_cities(self, city_keys: Optional[Iterable[str]] = None):
+        for city_key in city_keys or self.cities:
+            yield self.city(city_key)
+
+
+if __name__ == "__main__":
+    """
+    Uso:
+    python -m backend.infrastructure.loaders.climate_series_store [data] [--force]
+    """
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    build_series_store(args[0] if args else "data", force="--force" in sys.argv)
@@ -6,6 +6,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from backend.api.routes import api_router
+from backend.api.services.climate_normals_cube import normals_cube
+from backend.api.services.eto_fast_path import eto_fast_path
+from backend.api.websocket.task_status_hub import task_status_hub
 from backend.api.websocket.websocket_service import router as websocket_router
 from config.settings import get_settings
 from frontend.app import create_dash_app
@@ -53,6 +56,24 @@ def create_application() -> FastAPI:
     # Configurar métricas Prometheus
     Instrumentator().instrument(app).expose(app, endpoint="/metrics")
 
+    # Carregar cubo de normais climatológicas em memória
+    @app.on_event("startup")
+    def load_climate_normals_cube() -> None:
+        normals_cube.refresh(force=True)
+
+    # Hub único de status de tarefas para os WebSockets deste processo
+    @app.on_event("startup")
+    async def start_task_status_hub() -> None:
+        await task_status_hub.start()
+
+    @app.on_event("shutdown")
+    async def stop_task_status_hub() -> None:
+        await task_status_hub.stop()
+
+    @app.on_event("shutdown")
+    def stop_eto_fast_path() -> None:
+        eto_fast_path.shutdown()
+
     return app
 
 
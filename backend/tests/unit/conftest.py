@@ -0,0 +1,62 @@
+"""
+Fixtures compartilhadas dos testes unitários do backend
+- Tabela astronômica reduzida em memória
+- Séries diárias do NASA POWER (formato de ``NASAPowerClient.get_daily_data``)
+  e do Open-Meteo (formato colunar de ``OpenMeteoSmartClient``)
+"""
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from backend.core.data_processing import astronomy
+
+
+@pytest.fixture
+def small_astronomy_table(monkeypatch):
+    """Tabela astronômica reduzida em memória (sem gravar em data/)"""
+    monkeypatch.setattr(astronomy, "_table", astronomy.AstronomyTable.build(lat_step=0.5))
+
+
+@pytest.fixture
+def nasa_series():
+    """
+    Fábrica de séries NASA POWER, um registro por data.
+
+    ``skip`` marca dias com radiação ausente (-999 do provedor) e
+    ``missing`` dias que o provedor ainda não publicou (atraso).
+    """
+
+    def make(dates, skip=(), missing=()):
+        return [
+            SimpleNamespace(
+                date=day, temp_max=31.0 + i % 3, temp_min=19.0 + i % 2, humidity=65.0 + i,
+                wind_speed=1.5 + 0.1 * i,
+                solar_radiation=-999.0 if i in skip else 22.0 + i % 4,
+                precipitation=0.0,
+            )
+            for i, day in enumerate(dates)
+            if i not in missing
+        ]
+
+    return make
+
+
+@pytest.fixture
+def openmeteo_climate():
+    """Fábrica de séries colunares do Open-Meteo (``OpenMeteoSmartClient``)"""
+
+    def make(dates):
+        n = len(dates)
+        return {
+            "dates": list(pd.to_datetime(list(dates), utc=True)),
+            "temperature_2m_max": [32.0] * n,
+            "temperature_2m_min": [20.0] * n,
+            "relative_humidity_2m_mean": [70.0] * n,
+            "wind_speed_10m_mean": [2.5] * n,
+            "shortwave_radiation_sum": [23.0] * n,
+            "precipitation_sum": [0.0] * n,
+        }
+
+    return make
@@ -0,0 +1,93 @@
+"""
+Testes unitários para a tabela astronômica e o ETo FAO-56 vetorizado
+- Interpolação da tabela contra as equações FAO-56
+- Persistência memory-mapped
+- Exemplo 18 do FAO-56 (Bruxelas, 6 de julho)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from backend.core.data_processing.astronomy import (
+    AstronomyTable,
+    compute_astronomical_terms,
+)
+from backend.core.data_processing.eto_fao56 import penman_monteith_daily
+
+
+@pytest.fixture(scope="module")
+def table():
+    return AstronomyTable.build(lat_step=0.1)
+
+
+class TestAstronomyTable:
+    """Testes da tabela pré-calculada"""
+
+    def test_lookup_matches_equations(self, table):
+        """Interpolação na latitude reproduz as equações diretas"""
+        lats = np.array([-33.87, -22.725, 0.05, 50.8, 66.5])[:, None]
+        days = np.array([1, 80, 172, 187, 355])[None, :]
+
+        expected = compute_astronomical_terms(lats, days)
+
+        assert table.extraterrestrial_radiation(lats, days) == pytest.approx(
+            expected["ra"], abs=0.02
+        )
+        assert table.daylight_hours(lats, days) == pytest.approx(
+            expected["daylight_hours"], abs=0.02
+        )
+
+    def test_fao56_example_8_ra(self, table):
+        """Ra a 20°S em 3 de setembro ≈ 32.2 MJ m⁻² dia⁻¹"""
+        assert float(table.extraterrestrial_radiation(-20.0, 246)) == pytest.approx(32.2, abs=0.1)
+
+    def test_save_open_is_memory_mapped(self, table, tmp_path):
+        """A tabela gravada é reaberta memory-mapped"""
+        path = tmp_path / "astronomical_terms.npy"
+        table.save(path)
+
+        reopened = AstronomyTable.open(path)
+
+        assert isinstance(reopened.values, np.memmap)
+        assert reopened.lat_step == pytest.approx(0.1)
+
+    def test_concurrent_saves_use_distinct_temp_files(self, table, tmp_path):
+        """Gravações simultâneas não compartilham o arquivo temporário"""
+        path = tmp_path / "astronomical_terms.npy"
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: table.save(path), range(8)))
+
+        assert AstronomyTable.open(path).values.shape == table.values.shape
+        assert [p.name for p in tmp_path.iterdir()] == ["astronomical_terms.npy"]
+
+
+class TestPenmanMonteith:
+    """Testes do ETo vetorizado"""
+
+    def test_fao56_example_18(self, table):
+        """Bruxelas, 6 de julho: ETo ≈ 3.9 mm/dia"""
+        eto = penman_monteith_daily(
+            tmax=21.5, tmin=12.3, rh_mean=None, wind_2m=2.078, radiation=22.07,
+            elevation=100.0, latitude=50.8, day_of_year=187,
+            rh_max=84.0, rh_min=63.0, table=table,
+        )
+
+        assert float(eto) == pytest.approx(3.9, abs=0.1)
+
+    def test_block_with_missing_values(self, table):
+        """Blocos (locais × dias) propagam NaN sem afetar outros dias"""
+        tmax = np.array([[30.0, np.nan], [25.0, 26.0]])
+
+        eto = penman_monteith_daily(
+            tmax, tmax - 10.0, 60.0, 2.0, 20.0,
+            elevation=np.array([[500.0], [10.0]]),
+            latitude=np.array([[-22.7], [-5.0]]),
+            day_of_year=np.array([[10, 11]]),
+            table=table,
+        )
+
+        assert eto.shape == (2, 2)
+        assert np.isnan(eto[0, 1])
+        assert np.isfinite(eto[[0, 1, 1], [0, 0, 1]]).all()
@@ -0,0 +1,110 @@
+"""
+Testes unitários para o cache climático
+- Fontes diárias: uma chave por dia, fatiada na leitura
+- Fontes por período: uma chave por janela
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from backend.api.services.nasa_power_client import NASAPowerData
+from backend.infrastructure.cache.climate_cache import ClimateCacheService
+
+START = datetime(2025, 1, 1)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def setex(self, key, ttl, value):
+        self.ops.append((key, value))
+
+    async def execute(self):
+        for key, value in self.ops:
+            self.redis.data[key] = value
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    async def exists(self, *keys):
+        return sum(k in self.data for k in keys)
+
+
+def _cache():
+    cache = ClimateCacheService(prefix="climate:nasa")
+    cache.redis = _FakeRedis()
+    return cache
+
+
+def _records(days):
+    return [
+        NASAPowerData(date=(START + timedelta(days=i)).strftime("%Y-%m-%d"), temp_max=30.0 + i)
+        for i in range(days)
+    ]
+
+
+class TestDailyCache:
+    """Testes do cache fatiado por dia"""
+
+    def test_window_inside_refreshed_period_is_hit(self):
+        """Refresh de 30 dias serve uma janela de 10 dias dentro dele"""
+        async def scenario():
+            cache = _cache()
+            await cache.set("nasa_power", -22.5, -47.5, START,
+                            START + timedelta(days=29), _records(30))
+
+            window = await cache.get("nasa_power", -22.5, -47.5,
+                                     START + timedelta(days=5), START + timedelta(days=14))
+            outside = await cache.get("nasa_power", -22.5, -47.5,
+                                      START + timedelta(days=25), START + timedelta(days=34))
+            return cache, window, outside
+
+        cache, window, outside = asyncio.run(scenario())
+
+        assert [r.date for r in window] == [
+            (START + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(5, 15)
+        ]
+        assert window[0].temp_max == 35.0
+        assert outside is None
+        assert "climate:nasa:nasa_power:-22.5:-47.5:20250101" in cache.redis.data
+
+    def test_exists_requires_every_day(self):
+        """exists só é verdadeiro com todos os dias do período"""
+        async def scenario():
+            cache = _cache()
+            await cache.set("nasa_power", 0.0, 0.0, START, START + timedelta(days=6), _records(7))
+            return (
+                await cache.exists("nasa_power", 0.0, 0.0, START, START + timedelta(days=6)),
+                await cache.exists("nasa_power", 0.0, 0.0, START, START + timedelta(days=7)),
+            )
+
+        assert asyncio.run(scenario()) == (True, False)
+
+    def test_other_sources_keep_period_key(self):
+        """Fontes fora de DAILY_SOURCES continuam com uma chave por janela"""
+        async def scenario():
+            cache = _cache()
+            end = START + timedelta(days=6)
+            await cache.set("openmeteo", 0.0, 0.0, START, end, {"dates": ["2025-01-01"]})
+            return cache, await cache.get("openmeteo", 0.0, 0.0, START, end)
+
+        cache, data = asyncio.run(scenario())
+
+        assert data == {"dates": ["2025-01-01"]}
+        assert list(cache.redis.data) == ["climate:nasa:openmeteo:0.0:0.0:20250101:20250107"]
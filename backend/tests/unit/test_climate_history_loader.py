@@ -0,0 +1,115 @@
+"""
+Testes unitários para a carga dos relatórios climáticos
+- Coordenadas resolvidas no catálogo de cidades
+- Relatórios sem coordenadas ficam fora da carga
+- Refresh de estações próximas apaga as relações antigas na mesma transação
+"""
+
+import json
+
+from backend.infrastructure.loaders.climate_history_loader import (
+    ClimateHistoryLoader, parse_city_report, resolve_city_coordinates)
+
+
+def _write_catalogs(tmp_path):
+    matopiba = tmp_path / "matopiba.csv"
+    matopiba.write_text(
+        "CODE_CITY,CITY,UF,LATITUDE,LONGITUDE,HEIGHT,NM_UF\n"
+        "1,Balsas,MA,-7.53,-46.04,283,Maranhão\n"
+        "2,Luís Eduardo Magalhães,BA,-12.09,-45.79,769,Bahia\n",
+        encoding="utf-8",
+    )
+    world = tmp_path / "world.csv"
+    world.write_text(
+        "city,lat,lng,country,sigla,elevation\n"
+        "Paris,48.86,2.35,France,FR,35\n"
+        "Paris,33.66,-95.55,United States,US,180\n"
+        "Addis Ababa,9.03,38.74,Ethiopia,ET,2355\n",
+        encoding="utf-8",
+    )
+    return str(matopiba), str(world)
+
+
+def _write_report(tmp_path, city):
+    path = tmp_path / f"report_{city}.json"
+    path.write_text(json.dumps({"city": city, "normals": {}}), encoding="utf-8")
+    return str(path)
+
+
+class TestResolveCityCoordinates:
+    """Testes da resolução pelo catálogo"""
+
+    def test_matopiba_and_world_catalogs(self, tmp_path):
+        """UF no MATOPIBA, país ou nome único no catálogo mundial"""
+        matopiba, world = _write_catalogs(tmp_path)
+
+        resolved = resolve_city_coordinates(
+            ["Balsas_MA", "Paris_France", "Addis_Ababa_Ethiopia"], matopiba, world
+        )
+
+        assert resolved["Balsas_MA"] == {"lat": -7.53, "lon": -46.04, "alt": 283.0}
+        assert resolved["Paris_France"]["lat"] == 48.86
+        assert resolved["Addis_Ababa_Ethiopia"]["alt"] == 2355.0
+
+    def test_unknown_or_ambiguous_cities_are_left_out(self, tmp_path):
+        """Grafia diferente, cidade ausente ou homônimos sem país: não resolve"""
+        matopiba, world = _write_catalogs(tmp_path)
+
+        resolved = resolve_city_coordinates(
+            ["Luiz_Eduardo_Magalhaes_BA", "Wagga_Wagga_Australia", "Paris_Texas"],
+            matopiba, world,
+        )
+
+        assert resolved == {}
+
+
+class TestParseCityReport:
+    """Testes da conversão dos relatórios"""
+
+    def test_report_without_coordinates_is_skipped(self, tmp_path):
+        """Sem coordenadas no relatório nem no mapeamento: não vai para (0, 0)"""
+        path = _write_report(tmp_path, "Wagga_Wagga_Australia")
+
+        assert parse_city_report(path) is None
+
+    def test_catalog_coordinates_fill_the_report(self, tmp_path):
+        """Coordenadas do mapeamento entram na linha da cidade"""
+        path = _write_report(tmp_path, "Balsas_MA")
+        coordinates = {"Balsas_MA": {"lat": -7.53, "lon": -46.04, "alt": 283.0}}
+
+        city_row, _ = parse_city_report(path, coordinates)
+
+        assert city_row[:6] == ["Balsas", "Unknown", "MA", -7.53, -46.04, 283.0]
+
+
+class _FakeCursor:
+    def __init__(self, log):
+        self.log = log
+        self.rowcount = 2
+
+    def execute(self, sql, params=None):
+        self.log.append(" ".join(sql.split()).split(" ")[0])
+
+
+class _FakeSession:
+    def __init__(self):
+        self.log = []
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+
+class TestRefreshNearbyStations:
+    """Testes do recálculo das estações próximas"""
+
+    def test_stale_relations_are_deleted_before_commit(self, monkeypatch):
+        """DELETE e INSERT das cidades atualizadas saem em um único commit"""
+        session = _FakeSession()
+        loader = ClimateHistoryLoader(session)
+        monkeypatch.setattr(loader, "_raw_cursor", lambda: _FakeCursor(session.log))
+
+        assert loader.refresh_nearby_stations(["Balsas"]) == 2
+        assert session.log == ["DELETE", "INSERT", "COMMIT"]
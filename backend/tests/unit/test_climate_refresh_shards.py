@@ -0,0 +1,139 @@
+"""
+Testes unitários para o refresh em shards do cache NASA POWER
+- Dimensionamento dos shards pela quantidade de localizações
+- Checkpoint por shard: retry só baixa as localizações pendentes
+- Consolidação dos shards no callback do chord
+"""
+
+import json
+
+import pytest
+from celery.exceptions import Retry
+
+from backend.infrastructure.cache import climate_tasks
+from backend.infrastructure.cache.climate_tasks import (
+    MAX_SHARDS,
+    SHARD_TARGET_SIZE,
+    plan_shards,
+    prefetch_nasa_shard,
+    summarize_nasa_refresh,
+)
+
+LOCATIONS = [{"name": f"city-{i}", "lat": float(i), "lon": float(-i)} for i in range(3)]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.sets = {}
+        self.hashes = {}
+
+    def sadd(self, key, value):
+        self.sets.setdefault(key, set()).add(str(value))
+
+    def smembers(self, key):
+        return self.sets.get(key, set())
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[str(field)] = value
+
+    def expire(self, key, seconds):
+        return True
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = _FakeRedis()
+    monkeypatch.setattr(climate_tasks, "_redis", lambda: redis)
+    return redis
+
+
+class TestPlanShards:
+    """Testes do dimensionamento"""
+
+    def test_shard_count_follows_location_count(self):
+        """Shards equilibrados, cobrindo todas as localizações em ordem"""
+        locations = list(range(SHARD_TARGET_SIZE * 3 + 2))
+
+        shards = plan_shards(locations)
+
+        assert len(shards) == 4
+        assert sum(shards, []) == locations
+        assert max(map(len, shards)) - min(map(len, shards)) <= 1
+
+    def test_shard_count_is_capped(self):
+        """Catálogos grandes não passam de MAX_SHARDS tarefas"""
+        shards = plan_shards(list(range(SHARD_TARGET_SIZE * MAX_SHARDS * 4)))
+
+        assert len(shards) == MAX_SHARDS
+        assert plan_shards([]) == []
+
+
+class TestPrefetchNasaShard:
+    """Testes do shard com checkpoint"""
+
+    def test_retry_resumes_from_checkpoint(self, fake_redis, monkeypatch):
+        """Falha parcial reagenda o shard; o retry só baixa o pendente"""
+        calls = []
+
+        async def fake_prefetch(pending, start, end, on_success):
+            calls.append([i for i, _ in pending])
+            failed = []
+            for i, location in pending:
+                if i == 2 and len(calls) == 1:
+                    failed.append(location["name"])
+                else:
+                    on_success(i)
+            return failed
+
+        monkeypatch.setattr(climate_tasks, "_prefetch_locations", fake_prefetch)
+        args = ("run", 0, LOCATIONS, "2025-01-01T00:00:00", "2025-01-31T00:00:00")
+
+        with pytest.raises(Retry):
+            prefetch_nasa_shard(*args)
+        progress = json.loads(fake_redis.hashes["climate_refresh:run"]["0"])
+        assert progress["status"] == "retrying"
+        assert progress["failed_locations"] == ["city-2"]
+
+        result = prefetch_nasa_shard(*args)
+
+        assert calls == [[0, 1, 2], [2]]
+        assert result["status"] == "success"
+        assert result["success"] == 3
+
+    def test_crash_counts_only_unfinished_locations(self, fake_redis, monkeypatch):
+        """Erro no meio do shard: só as localizações sem checkpoint falham"""
+        async def crashing_prefetch(pending, start, end, on_success):
+            on_success(0)
+            raise RuntimeError("conexão perdida")
+
+        monkeypatch.setattr(climate_tasks, "_prefetch_locations", crashing_prefetch)
+        monkeypatch.setattr(prefetch_nasa_shard, "max_retries", 0)
+
+        result = prefetch_nasa_shard(
+            "run", 0, LOCATIONS, "2025-01-01T00:00:00", "2025-01-31T00:00:00"
+        )
+
+        assert result["success"] == 1
+        assert result["failed_locations"] == ["city-1", "city-2"]
+        assert result["error"] == "conexão perdida"
+
+
+class TestSummarizeNasaRefresh:
+    """Testes do callback do chord"""
+
+    def test_partial_shards_are_reported(self, fake_redis):
+        """Shards parciais entram no resumo sem derrubar a execução"""
+        results = [
+            {"shard": 0, "total": 5, "success": 5, "failed": 0,
+             "failed_locations": [], "status": "success"},
+            {"shard": 1, "total": 5, "success": 3, "failed": 2,
+             "failed_locations": ["a", "b"], "status": "partial"},
+        ]
+
+        summary = summarize_nasa_refresh(results, "run")
+
+        assert summary["status"] == "success"
+        assert summary["success"] == 8
+        assert summary["partial_shards"] == 1
+        assert summary["failed_locations"] == ["a", "b"]
+        assert "summary" in fake_redis.hashes["climate_refresh:run"]
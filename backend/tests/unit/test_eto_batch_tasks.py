@@ -0,0 +1,257 @@
+"""
+Testes unitários para o micro-batching de ETo
+- Requisições na mesma célula compartilham a série baixada
+- Falha de download afeta só as requisições da célula
+- Cálculo vetorizado produz ETo finito com lacunas preenchidas
+- Dias de atraso do NASA POWER completados com o Open-Meteo
+- Fila confiável: reservas só saem depois do resultado gravado
+- Gravação não repete o controle de qualidade do lote
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.core.data_processing import quality_control
+from backend.database import data_storage
+from backend.infrastructure.celery.tasks import eto_batch_tasks
+from backend.infrastructure.celery.tasks.eto_batch_tasks import (
+    PENDING_KEY,
+    PROCESSING_KEY,
+    RESERVED_KEY,
+    WIND_10M_TO_2M,
+    build_eto_records,
+    drain_eto_batches,
+    missing_days,
+    openmeteo_to_nasa,
+    requeue_stale_reservations,
+    substitute_window,
+)
+from backend.infrastructure.celery.tasks.eto_storage_tasks import persist_eto_results
+
+DATES = [d.strftime("%Y-%m-%d") for d in pd.date_range("2025-01-01", periods=10)]
+
+pytestmark = pytest.mark.usefixtures("small_astronomy_table")
+
+
+def _request(task_id, lat, lng):
+    return {
+        "task_id": task_id,
+        "params": {
+            "lat": lat, "lng": lng, "elevation": 546.0, "database": "nasa_power",
+            "d_inicial": DATES[0], "d_final": DATES[-1],
+        },
+    }
+
+
+class TestBuildEToRecords:
+    """Testes do cálculo do lote"""
+
+    def test_same_cell_shares_series(self, nasa_series):
+        """Pontos da mesma célula usam a mesma série (Ra pela latitude de cada um)"""
+        requests = [_request("a", -22.72, -47.63), _request("b", -22.60, -47.70)]
+
+        outcome = build_eto_records(requests, {(-22.5, -47.5): nasa_series(DATES)}, DATES)
+
+        records_a, warnings_a = outcome["a"]
+        records_b, _ = outcome["b"]
+        assert len(records_a) == len(DATES)
+        assert records_a[0]["lat"] == -22.72 and records_b[0]["lat"] == -22.60
+        assert [r["T2M_MAX"] for r in records_a] == [r["T2M_MAX"] for r in records_b]
+        assert [r["ETo"] for r in records_a] == pytest.approx(
+            [r["ETo"] for r in records_b], abs=0.05
+        )
+        assert all(2.0 < r["ETo"] < 8.0 for r in records_a)
+        assert warnings_a == []
+
+    def test_download_failure_isolated(self, nasa_series):
+        """Erro no download só falha as requisições daquela célula"""
+        requests = [_request("ok", -22.72, -47.63), _request("fail", -10.0, -45.0)]
+        series = {(-22.5, -47.5): nasa_series(DATES), (-10.0, -45.0): TimeoutError("timeout")}
+
+        outcome = build_eto_records(requests, series, DATES)
+
+        assert outcome["ok"][0] is not None
+        records, warnings = outcome["fail"]
+        assert records is None
+        assert "timeout" in warnings[0]
+
+    def test_missing_days_are_filled(self, nasa_series):
+        """Valores -999 viram lacunas e são preenchidos antes do ETo"""
+        outcome = build_eto_records(
+            [_request("a", -22.72, -47.63)], {(-22.5, -47.5): nasa_series(DATES, skip={4})}, DATES
+        )
+
+        records, warnings = outcome["a"]
+        assert np.isfinite(records[4]["ALLSKY_SFC_SW_DWN"])
+        assert np.isfinite(records[4]["ETo"])
+        assert any("lacunas" in w for w in warnings)
+
+
+class TestSubstituteSource:
+    """Testes da substituição pelo Open-Meteo nos dias de atraso"""
+
+    def test_lag_tail_completed_with_substitute(self, nasa_series, openmeteo_climate):
+        """Últimos dias sem NASA POWER recebem ETo a partir do Open-Meteo"""
+        series = nasa_series(DATES, missing={7, 8, 9})
+        substitutes = {(-22.5, -47.5): openmeteo_to_nasa(openmeteo_climate(DATES), DATES)}
+
+        assert missing_days(series, DATES) == 3
+        outcome = build_eto_records(
+            [_request("a", -22.72, -47.63)], {(-22.5, -47.5): series}, DATES, substitutes
+        )
+
+        records, warnings = outcome["a"]
+        assert all(np.isfinite(r["ETo"]) for r in records)
+        assert any("3 dia(s) completados com dados de openmeteo" in w for w in warnings)
+
+    def test_openmeteo_aligned_to_period(self, openmeteo_climate):
+        """Datas fora do período são ignoradas e o vento vai de 10 m para 2 m"""
+        block = openmeteo_to_nasa(openmeteo_climate(DATES[5:] + ["2025-01-11"]), DATES)
+
+        assert np.isnan(block["T2M_MAX"][:5]).all()
+        assert block["T2M_MAX"][5:].tolist() == [32.0] * 5
+        assert block["WS2M"][9] == pytest.approx(2.5 * WIND_10M_TO_2M)
+
+    def test_substitute_window_within_openmeteo_limits(self):
+        """Janela da fonte substituta fica entre 7 e 30 dias, no fim do período"""
+        start, end = pd.Timestamp("2025-01-01"), pd.Timestamp("2025-03-31")
+
+        assert substitute_window(start, end) == (pd.Timestamp("2025-03-02"), end)
+        assert substitute_window(end - pd.Timedelta(days=2), end) == (
+            pd.Timestamp("2025-03-25"), end
+        )
+
+
+class TestLagWithoutSubstitute:
+    """Dias que nenhuma etapa consegue preencher"""
+
+    def test_unfilled_days_warned_and_left_out(self, nasa_series):
+        """Cauda sem dados: ETo None e aviso com a contagem de dias"""
+        outcome = build_eto_records(
+            [_request("a", -22.72, -47.63)],
+            {(-22.5, -47.5): nasa_series(DATES, missing={7, 8, 9})},
+            DATES,
+        )
+
+        records, warnings = outcome["a"]
+        assert [r["ETo"] is None for r in records] == [False] * 7 + [True] * 3
+        assert any(w.startswith("3 dia(s) sem dados para o ETo") for w in warnings)
+
+
+class _ListRedis:
+    """Listas e hashes Redis mínimos para a fila de lotes"""
+
+    def __init__(self):
+        self.lists, self.hashes = {}, {}
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+        return len(self.lists[key])
+
+    def lmove(self, source, destination, src_side, dest_side):
+        items = self.lists.get(source)
+        if not items:
+            return None
+        value = items.pop(0)
+        self.lists.setdefault(destination, []).append(value)
+        return value
+
+    def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def lrem(self, key, count, value):
+        items = self.lists.get(key, [])
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hsetnx(self, key, field, value):
+        self.hashes.setdefault(key, {}).setdefault(field, value)
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(field, None)
+
+
+class TestReliableQueue:
+    """Reserva com LMOVE e confirmação depois do resultado gravado"""
+
+    @pytest.fixture
+    def redis(self, monkeypatch):
+        redis = _ListRedis()
+        monkeypatch.setattr(eto_batch_tasks, "_redis", lambda: redis)
+        for task_id in ("a", "b", "c"):
+            redis.rpush(PENDING_KEY, json.dumps(_request(task_id, -22.72, -47.63)))
+        return redis
+
+    def test_acknowledged_requests_leave_processing(self, redis, monkeypatch):
+        """Só as requisições respondidas saem da lista de processamento"""
+
+        def answer_first(requests, ack):
+            ack(requests[0]["task_id"])
+            return 1
+
+        monkeypatch.setattr(eto_batch_tasks, "process_eto_batch", answer_first)
+
+        result = drain_eto_batches.run(max_batch=2)
+
+        assert result == {"batches": 2, "succeeded": 2, "requeued": 0}
+        assert [json.loads(r)["task_id"] for r in redis.lists[PROCESSING_KEY]] == ["b"]
+        assert redis.lists[PENDING_KEY] == []
+
+    def test_interrupted_batch_is_requeued(self, redis, monkeypatch):
+        """Reservas de uma drenagem que morreu voltam à fila quando vencem"""
+
+        def crash(requests, ack):
+            raise SystemExit("worker morto")
+
+        monkeypatch.setattr(eto_batch_tasks, "process_eto_batch", crash)
+        with pytest.raises(SystemExit):
+            drain_eto_batches.run()
+        assert len(redis.lists[PROCESSING_KEY]) == 3
+
+        assert requeue_stale_reservations(redis) == 0
+        assert requeue_stale_reservations(redis, timeout=0) == 3
+        assert [json.loads(r)["task_id"] for r in redis.lists[PENDING_KEY]] == ["a", "b", "c"]
+        assert redis.lists[PROCESSING_KEY] == [] and redis.hashes[RESERVED_KEY] == {}
+
+
+class TestPersistEToResults:
+    """Testes da gravação em eto_results"""
+
+    def test_checked_records_skip_quality_control(self, nasa_series, monkeypatch):
+        """Registros de build_eto_records passam pelo controle uma vez só"""
+        outcome = build_eto_records(
+            [_request("a", -22.72, -47.63)], {(-22.5, -47.5): nasa_series(DATES)}, DATES
+        )
+        records, _ = outcome["a"]
+        qc_calls, saved = [], []
+
+        def fake_qc(records, dependent=()):
+            qc_calls.append(len(records))
+            raise AssertionError("controle de qualidade repetido")
+
+        monkeypatch.setattr(quality_control, "quality_control_records", fake_qc)
+        monkeypatch.setattr(
+            data_storage, "bulk_save_eto_data",
+            lambda records, source, chunk_size: saved.append(records)
+            or {"rows": len(records), "skipped": 0, "rows_per_second": 0},
+        )
+
+        result = persist_eto_results(records, quality_checked=True)
+
+        assert qc_calls == []
+        assert saved == [records]
+        assert result["quality_control"] == {}
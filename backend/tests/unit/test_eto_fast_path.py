@@ -0,0 +1,145 @@
+"""
+Testes unitários para o caminho rápido em processo do ETo
+- Cache quente: resultado inline
+- Cache frio, período longo ou pool cheio: segue para o Celery
+- Vaga do pool liberada só quando o cálculo termina
+- Dias de atraso completados pela fonte substituta em cache
+"""
+
+import asyncio
+import threading
+import pandas as pd
+import pytest
+
+from backend.api.services.eto_fast_path import EToFastPath
+
+DATES = [d.strftime("%Y-%m-%d") for d in pd.date_range("2025-01-01", periods=10)]
+
+PARAMS = {
+    "lat": -22.72, "lng": -47.63, "elevation": 546.0, "database": "nasa_power",
+    "d_inicial": DATES[0], "d_final": DATES[-1], "estado": "", "cidade": "",
+}
+
+pytestmark = pytest.mark.usefixtures("small_astronomy_table")
+
+
+@pytest.fixture(autouse=True)
+def no_persistence(monkeypatch):
+    """A gravação em eto_results não é agendada nos testes"""
+    monkeypatch.setattr(EToFastPath, "_persist", staticmethod(lambda records, source: None))
+
+
+class _FakeCache:
+    def __init__(self, series=None):
+        self.series = series
+        self.requested = []
+
+    async def get(self, source, lat, lon, start, end):
+        self.requested.append((source, lat, lon))
+        return self.series
+
+
+class TestEToFastPath:
+    """Testes da decisão inline × Celery"""
+
+    def test_cache_hit_returns_inline_result(self, nasa_series):
+        """Série da célula no cache: resultado completo na resposta"""
+        cache = _FakeCache(nasa_series(DATES))
+        fast_path = EToFastPath(cache=cache, max_workers=2)
+
+        response = asyncio.run(fast_path.try_run(PARAMS))
+        fast_path.shutdown()
+
+        assert response["status"] == "completed"
+        assert response["execution"] == "inline"
+        assert len(response["data"]) == len(DATES)
+        assert all(r["ETo"] > 0 for r in response["data"])
+        assert cache.requested == [("nasa_power", -22.5, -47.5)]
+
+    def test_lag_days_completed_from_substitute_cache(self, nasa_series, openmeteo_climate):
+        """Dias ainda não publicados pelo NASA POWER vêm do Open-Meteo em cache"""
+        substitute = _FakeCache(openmeteo_climate(DATES))
+        fast_path = EToFastPath(
+            cache=_FakeCache(nasa_series(DATES, missing={8, 9})),
+            substitute_cache=substitute,
+        )
+
+        response = asyncio.run(fast_path.try_run(PARAMS))
+        fast_path.shutdown()
+
+        assert all(r["ETo"] > 0 for r in response["data"])
+        assert substitute.requested == [("openmeteo", -22.5, -47.5)]
+        assert any("openmeteo" in w for w in response["warnings"])
+
+    def test_cache_miss_falls_back(self):
+        """Cache frio devolve None (o endpoint usa o Celery)"""
+        fast_path = EToFastPath(cache=_FakeCache(None))
+
+        assert asyncio.run(fast_path.try_run(PARAMS)) is None
+        assert fast_path.stats["cache_miss"] == 1
+
+    def test_ineligible_requests_skip_cache(self, nasa_series):
+        """Fonte sem suporte ou período longo nem consultam o cache"""
+        cache = _FakeCache(nasa_series(DATES))
+        fast_path = EToFastPath(cache=cache)
+
+        long_period = {**PARAMS, "d_final": "2025-02-01"}
+        other_source = {**PARAMS, "database": "open_meteo"}
+
+        assert asyncio.run(fast_path.try_run(long_period)) is None
+        assert asyncio.run(fast_path.try_run(other_source)) is None
+        assert cache.requested == []
+
+    def test_full_pool_falls_back(self, nasa_series):
+        """Sem vaga no pool a requisição vai direto ao Celery"""
+        fast_path = EToFastPath(cache=_FakeCache(nasa_series(DATES)), max_workers=1)
+        fast_path._in_flight = 1
+
+        assert asyncio.run(fast_path.try_run(PARAMS)) is None
+        assert fast_path.stats["busy"] == 1
+
+    def test_slot_held_until_job_finishes(self, nasa_series, monkeypatch):
+        """Cancelar quem aguarda não libera a vaga enquanto o cálculo roda no pool"""
+        from backend.infrastructure.celery.tasks import eto_batch_tasks
+
+        started, release = threading.Event(), threading.Event()
+        build = eto_batch_tasks.build_eto_records
+
+        def slow_build(*args):
+            started.set()
+            release.wait(5)
+            return build(*args)
+
+        monkeypatch.setattr(eto_batch_tasks, "build_eto_records", slow_build)
+        fast_path = EToFastPath(cache=_FakeCache(nasa_series(DATES)), max_workers=1)
+
+        async def cancel_while_running():
+            task = asyncio.create_task(fast_path.try_run(PARAMS))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return await fast_path.try_run(PARAMS)
+
+        assert asyncio.run(cancel_while_running()) is None
+        assert fast_path.stats["busy"] == 1
+
+        release.set()
+        fast_path.executor.shutdown(wait=True)
+        assert fast_path._in_flight == 0
+
+    def test_cache_timeout_releases_slot(self, monkeypatch):
+        """Cache lento: desiste antes de submeter o cálculo e libera a vaga"""
+        from backend.api.services import eto_fast_path
+
+        class _SlowCache(_FakeCache):
+            async def get(self, *args, **kwargs):
+                await asyncio.sleep(1)
+
+        monkeypatch.setattr(eto_fast_path, "FAST_PATH_TIMEOUT_SECONDS", 0.01)
+        fast_path = EToFastPath(cache=_SlowCache(), max_workers=1)
+
+        assert asyncio.run(fast_path.try_run(PARAMS)) is None
+        assert fast_path.stats["failed"] == 1
+        assert fast_path._in_flight == 0
+        assert fast_path._executor is None
@@ -0,0 +1,82 @@
+"""
+Testes unitários para o reaproveitamento de eto_results
+- Período completo devolvido no formato do pipeline
+- Período incompleto ou recente segue para o cálculo
+"""
+
+from datetime import date, timedelta
+
+from backend.api.services.eto_history_service import (SETTLED_AFTER_DAYS,
+                                                      EToHistoryService)
+
+START = date(2025, 1, 1)
+END = date(2025, 1, 7)
+TODAY = END + timedelta(days=SETTLED_AFTER_DAYS)
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class _FakeSession:
+    """Sessão que devolve as linhas gravadas no intervalo consultado."""
+
+    def __init__(self, days):
+        self.days = days
+        self.queries = 0
+
+    def execute(self, statement, params):
+        self.queries += 1
+        return _FakeResult([
+            (day, 4.0 + i, 31.0, 19.0, 70.0, 2.0, 22.0, 0.0)
+            for i, day in enumerate(self.days)
+            if params["start"] <= day < params["end_excl"]
+        ])
+
+
+def _days(start, end):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+class TestStoredRecords:
+    """Testes de get_stored_records"""
+
+    def test_complete_period_is_reused(self):
+        """Todos os dias gravados viram registros do pipeline"""
+        service = EToHistoryService(_FakeSession(_days(START, END)))
+
+        records = service.get_stored_records(
+            -22.72, -47.63, 546.4, "2025-01-01", "2025-01-07", today=TODAY
+        )
+
+        assert len(records) == 7
+        assert records[0] == {
+            "lat": -22.72, "lng": -47.63, "elev": 546.4, "date": "2025-01-01",
+            "ETo": 4.0, "T2M_MAX": 31.0, "T2M_MIN": 19.0, "RH2M": 70.0,
+            "WS2M": 2.0, "ALLSKY_SFC_SW_DWN": 22.0, "PRECTOTCORR": 0.0,
+        }
+        assert records[-1]["ETo"] == 10.0
+
+    def test_missing_day_falls_through(self):
+        """Um dia ausente devolve None (período recalculado)"""
+        days = [d for d in _days(START, END) if d != date(2025, 1, 4)]
+        service = EToHistoryService(_FakeSession(days))
+
+        assert service.get_stored_records(
+            -22.72, -47.63, 546.4, START, END, today=TODAY
+        ) is None
+
+    def test_recent_period_is_not_reused(self):
+        """Dias ainda sujeitos ao atraso do NASA POWER não consultam o banco"""
+        db = _FakeSession(_days(START, END))
+
+        records = EToHistoryService(db).get_stored_records(
+            -22.72, -47.63, 546.4, START, END, today=TODAY - timedelta(days=1)
+        )
+
+        assert records is None
+        assert db.queries == 0
@@ -0,0 +1,108 @@
+"""
+Testes unitários para a deduplicação de tarefas de ETo
+- Normalização dos parâmetros na grade do provedor
+- Reaproveitamento de tarefas em andamento e resultados recentes
+- Nova submissão após falha
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.api.services import eto_task_dedup as dedup_module
+from backend.api.services.eto_task_dedup import (
+    EToTaskDeduplicator,
+    request_key,
+)
+
+PARAMS = {
+    "lat": -22.72, "lng": -47.63, "elevation": 546.4, "database": "nasa_power",
+    "d_inicial": "2025-01-01", "d_final": "2025-01-10", "estado": "", "cidade": "",
+}
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+
+class _FakeTask:
+    def __init__(self):
+        self.submitted = []
+
+    def apply_async(self, kwargs, task_id):
+        self.submitted.append(task_id)
+
+
+class _FakeResult:
+    states = {}
+
+    def __init__(self, task_id):
+        self.state, self.result = self.states.get(task_id, ("PENDING", None))
+        self.date_done = datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def dedup(monkeypatch):
+    _FakeResult.states = {}
+    monkeypatch.setattr(dedup_module, "AsyncResult", _FakeResult)
+    return EToTaskDeduplicator(_FakeRedis())
+
+
+class TestEToTaskDedup:
+    """Testes da camada de idempotência"""
+
+    def test_same_grid_cell_shares_key(self):
+        """Pontos na mesma célula NASA POWER geram a mesma chave"""
+        nearby = dict(PARAMS, lat=-22.60, lng=-47.70, elevation=546.0, cidade="X")
+
+        assert request_key(nearby) == request_key(PARAMS)
+        assert request_key(dict(PARAMS, d_final="2025-01-11")) != request_key(PARAMS)
+
+    def test_in_flight_task_is_attached(self, dedup):
+        """Requisição duplicada recebe o task_id da tarefa em andamento"""
+        task = _FakeTask()
+
+        first = dedup.submit(PARAMS, task)
+        second = dedup.submit(PARAMS, task)
+
+        assert second["task_id"] == first["task_id"]
+        assert second["deduplicated"] is True
+        assert len(task.submitted) == 1
+
+    def test_fresh_result_is_returned_inline(self, dedup):
+        """Resultado concluído e recente é devolvido sem nova tarefa"""
+        task = _FakeTask()
+        first = dedup.submit(PARAMS, task)
+        _FakeResult.states[first["task_id"]] = ("SUCCESS", ({"eto": [4.1]}, ["aviso"]))
+
+        response = dedup.submit(PARAMS, task)
+
+        assert response["status"] == "completed"
+        assert response["data"] == {"eto": [4.1]}
+        assert response["warnings"] == ["aviso"]
+        assert len(task.submitted) == 1
+
+    def test_failed_task_is_resubmitted(self, dedup):
+        """Falha libera a reserva e dispara uma nova tarefa"""
+        task = _FakeTask()
+        first = dedup.submit(PARAMS, task)
+        _FakeResult.states[first["task_id"]] = ("FAILURE", None)
+
+        response = dedup.submit(PARAMS, task)
+
+        assert response["task_id"] != first["task_id"]
+        assert response["deduplicated"] is False
+        assert len(task.submitted) == 2
@@ -0,0 +1,84 @@
+"""
+Testes unitários para o preenchimento vetorizado de lacunas
+- Interpolação linear e ancorada na climatologia
+- Substituição por outra fonte com correção de viés
+"""
+
+import numpy as np
+import pytest
+
+from backend.core.data_processing.gap_filling import (
+    FILL_CLIMATOLOGY,
+    FILL_INTERPOLATED,
+    FILL_SUBSTITUTED,
+    fill_block,
+    fill_gaps,
+    fill_series,
+)
+
+nan = np.nan
+
+
+class TestFillGaps:
+    """Testes do preenchimento por variável"""
+
+    def test_linear_respects_max_gap_and_edges(self):
+        """Só lacunas internas curtas são interpoladas"""
+        values = [[1.0, nan, 3.0, nan, nan, nan, nan, 8.0, nan]]
+
+        filled, flags = fill_gaps(values, "linear", max_gap_days=3)
+
+        assert filled[0, 1] == pytest.approx(2.0)
+        assert np.isnan(filled[0, 3:7]).all()
+        assert np.isnan(filled[0, 8])
+        assert flags[0].tolist() == [0, FILL_INTERPOLATED, 0, 0, 0, 0, 0, 0, 0]
+
+    def test_climatology_interpolates_anomaly(self):
+        """A lacuna segue o ciclo climatológico mais a anomalia interpolada"""
+        climatology = [[10.0, 20.0, 10.0]]
+
+        filled, flags = fill_gaps([[11.0, nan, 11.0]], "climatology", climatology)
+
+        assert filled[0, 1] == pytest.approx(21.0)
+        assert flags[0, 1] == FILL_CLIMATOLOGY
+
+    def test_substitution_corrects_bias(self):
+        """Dias de atraso da fonte principal vêm da substituta sem viés"""
+        nasa = [[30.0, 31.0, 32.0, nan, nan]]
+        openmeteo = [[29.0, 30.0, 31.0, 31.5, 33.0]]
+
+        result = fill_block(
+            {"T2M_MAX": nasa}, substitutes={"openmeteo": {"T2M_MAX": openmeteo}}
+        )
+
+        assert result.values["T2M_MAX"][0, 3:].tolist() == pytest.approx([32.5, 34.0])
+        assert (result.flags["T2M_MAX"][0, 3:] == FILL_SUBSTITUTED).all()
+        assert result.complete().all()
+
+    def test_precipitation_is_not_interpolated(self):
+        """Precipitação só é preenchida por substituição"""
+        result = fill_block({"PRECTOTCORR": [[0.0, nan, 5.0]]})
+
+        assert np.isnan(result.values["PRECTOTCORR"][0, 1])
+        assert result.summary() == {}
+
+    def test_fill_series_columnar(self):
+        """Séries colunares voltam com None apenas onde não há preenchimento"""
+        data = {"dates": ["2024-01-01", "2024-01-02", "2024-01-03"],
+                "wind_speed_10m_mean": [2.0, None, 4.0]}
+
+        filled, result = fill_series(data)
+
+        assert filled["wind_speed_10m_mean"] == [2.0, 3.0, 4.0]
+        assert result.summary() == {"wind_speed_10m_mean": {"interpolated": 1}}
+
+    def test_fill_series_substitutes_tail(self):
+        """Dias finais sem dado são completados pela fonte substituta"""
+        data = {"dates": ["2024-01-01", "2024-01-02", "2024-01-03"],
+                "temperature_2m_max": [30.0, 31.0, None]}
+        other = {"temperature_2m_max": [29.0, 30.0, 32.0]}
+
+        filled, result = fill_series(data, substitutes={"nasa_power": other})
+
+        assert filled["temperature_2m_max"] == [30.0, 31.0, 33.0]
+        assert result.summary() == {"temperature_2m_max": {"substituted": 1}}
@@ -13,6 +13,7 @@ import pytest
 from backend.core.data_processing.kalman_ensemble import (
     AdaptiveKalmanFilter,
     ClimateKalmanFusion,
+    KalmanEnsembleStrategy,
     SimpleKalmanFilter,
 )
 
@@ -320,6 +321,59 @@ class TestClimateKalmanFusion:
         assert states["temperature"]["estimate"] == 25.0
 
 
+class TestKalmanEnsembleStrategy:
+    """Testes para KalmanEnsembleStrategy (lote vetorizado)"""
+
+    def test_matches_scalar_filters(self):
+        """Lote deve reproduzir filtros escalares independentes"""
+        series = np.array([
+            [5.0, 20.0],
+            [5.5, 21.0],
+            [15.0, 19.5],
+        ])
+        ensemble = KalmanEnsembleStrategy.from_normals(
+            monthly_normals=[5.0, 22.0],
+            historical_stds=[1.0, 2.0],
+            station_confidence=0.8,
+        )
+        batch = ensemble.run(series)
+
+        scalar = [
+            AdaptiveKalmanFilter(monthly_normal=5.0, historical_std=1.0),
+            AdaptiveKalmanFilter(monthly_normal=22.0, historical_std=2.0),
+        ]
+        expected = [[kf.update(v) for kf, v in zip(scalar, row)] for row in series]
+
+        np.testing.assert_allclose(batch, expected)
+
+    def test_nan_measurements_keep_state(self):
+        """NaN mantém o estado apenas na série afetada"""
+        ensemble = KalmanEnsembleStrategy(n_series=2, initial_estimate=[1.0, 1.0])
+        ensemble.update([np.nan, 2.0])
+
+        assert ensemble.estimate[0] == 1.0
+        assert ensemble.error[0] == 1.0
+        assert ensemble.estimate[1] > 1.0
+
+    def test_first_measurement_initializes(self):
+        """Estimativa inicial NaN adota a primeira medição"""
+        ensemble = KalmanEnsembleStrategy(n_series=3)
+        estimates = ensemble.update([4.0, np.nan, 6.0])
+
+        assert estimates[0] == 4.0
+        assert np.isnan(estimates[1])
+        assert estimates[2] == 6.0
+
+    def test_ring_buffer_history(self):
+        """Histórico circular mantém apenas os últimos passos"""
+        ensemble = KalmanEnsembleStrategy(n_series=1, history_size=3)
+        ensemble.run(np.arange(5, dtype=float).reshape(-1, 1))
+
+        history = ensemble.history()
+        assert history.shape == (3, 1)
+        assert np.all(np.diff(history[:, 0]) > 0)
+
+
 # Testes de Integração
 class TestKalmanIntegration:
     """Testes de integração entre componentes"""
@@ -0,0 +1,95 @@
+"""
+Testes unitários para KalmanStateStore
+- Serialização compacta do estado
+- Atualização incremental idempotente
+- Versionamento do namespace
+"""
+
+import numpy as np
+import pytest
+
+from backend.core.data_processing.kalman_ensemble import AdaptiveKalmanFilter
+from backend.core.data_processing.kalman_state_store import (
+    KalmanStateStore,
+    pack_state,
+    unpack_state,
+)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def hmget(self, key, fields):
+        self.calls.append(lambda: [self.redis.data.get(key, {}).get(f) for f in fields])
+
+    def hset(self, key, mapping):
+        self.calls.append(lambda: self.redis.data.setdefault(key, {}).update(mapping))
+
+    def expire(self, key, seconds):
+        self.calls.append(lambda: True)
+
+    def execute(self):
+        return [call() for call in self.calls]
+
+
+class _FakeRedis:
+    """Redis em memória com o subconjunto usado pelo store"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+
+@pytest.fixture
+def store():
+    return KalmanStateStore(redis_client=_FakeRedis(), version="test")
+
+
+class TestKalmanStateStore:
+    """Testes para persistência do estado"""
+
+    def test_pack_roundtrip(self):
+        """Estado compacto (44 bytes) deve ser reversível"""
+        raw = pack_state(4.2, 0.3, 0.01, 0.5, 12, 19000)
+
+        assert len(raw) == 44
+        state = unpack_state(raw)
+        assert state["estimate"] == 4.2
+        assert state["n_updates"] == 12
+        assert state["last_day"] == 19000
+
+    def test_incremental_matches_continuous_filter(self, store):
+        """Atualizar dia a dia via store = filtro contínuo em memória"""
+        measurements = [5.0, 5.5, 6.0]
+        kf = AdaptiveKalmanFilter(monthly_normal=5.0, historical_std=1.0)
+        expected = [kf.update(m) for m in measurements]
+
+        results = [
+            store.update_location(
+                -22.7, -47.6, f"2025-01-0{day + 1}", {"eto": value},
+                monthly_normals={"eto": 5.0}, historical_stds={"eto": 1.0},
+            )["eto"]
+            for day, value in enumerate(measurements)
+        ]
+
+        np.testing.assert_allclose(results, expected)
+
+    def test_same_day_is_idempotent(self, store):
+        """Reprocessar o mesmo dia não deve aplicar a medição duas vezes"""
+        first = store.update_location(-22.7, -47.6, "2025-01-01", {"eto": 4.0})
+        again = store.update_location(-22.7, -47.6, "2025-01-01", {"eto": 9.0})
+
+        assert again == first
+
+    def test_version_isolates_state(self):
+        """Outra versão de parâmetros não enxerga o estado antigo"""
+        redis = _FakeRedis()
+        KalmanStateStore(redis, version="a").update_location(0.0, 0.0, "2025-01-01", {"eto": 4.0})
+
+        state = KalmanStateStore(redis, version="b").load_many([(0.0, 0.0, "eto", "nasa_power")])
+
+        assert not state["found"][0]
@@ -0,0 +1,177 @@
+"""
+Testes unitários para a listagem de localizações mundiais
+- Paginação keyset: continuidade do cursor e última página
+- Filtro por país e total (COUNT com filtro, estimativa sem filtro)
+- Framing dos exports CSV e NDJSON
+- Marcadores do mapa: ETo do dia, ordem estável e truncamento
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from backend.api.services.location_listing import (LOCATION_FIELDS,
+                                                   LocationCountCache,
+                                                   fetch_location_page,
+                                                   fetch_marker_collection,
+                                                   stream_locations_csv,
+                                                   stream_locations_ndjson)
+
+# 7 localizações: ids 1..7, país alternando entre BRA e FRA
+LOCATIONS = [
+    (i, f"City {i}", "Brazil" if i % 2 else "France", "BRA" if i % 2 else "FRA",
+     -10.0 + i, -45.0 + i, 100.0 * i)
+    for i in range(1, 8)
+]
+
+
+@pytest.fixture
+def db():
+    """Sessão SQLite só com as colunas lidas pela listagem"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE world_locations (id INTEGER PRIMARY KEY, "
+            "location_name TEXT, country TEXT, country_code TEXT, "
+            "lat REAL, lon REAL, elevation_m REAL)"
+        ))
+        conn.execute(
+            text("INSERT INTO world_locations VALUES (:id, :n, :c, :cc, :lat, :lon, :el)"),
+            [dict(zip(("id", "n", "c", "cc", "lat", "lon", "el"), row, strict=True))
+             for row in LOCATIONS],
+        )
+        conn.execute(text(
+            "CREATE TABLE eto_world_cache (id INTEGER PRIMARY KEY, "
+            "location_id INTEGER, calculation_date TIMESTAMP, eto_mm REAL)"
+        ))
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        conn.execute(
+            text("INSERT INTO eto_world_cache (location_id, calculation_date, eto_mm) "
+                 "VALUES (:loc, :day, :eto)"),
+            [
+                # Mesmo formato de texto que o SQLAlchemy usa no SQLite
+                {"loc": loc, "day": day.isoformat(sep=" ", timespec="microseconds"),
+                 "eto": eto}
+                for loc, day, eto in (
+                    (1, today + timedelta(hours=6), 4.123),
+                    (2, today - timedelta(days=1), 3.0),
+                    (3, today + timedelta(days=1), 5.0),
+                )
+            ],
+        )
+    with Session(engine) as session:
+        yield session
+
+
+class _EstimateSession:
+    """Sessão que responde a estimativa do planner e delega o resto"""
+
+    def __init__(self, db, estimate):
+        self.db = db
+        self.estimate = estimate
+
+    def execute(self, statement, params=None):
+        estimate = self.estimate
+        return type("Result", (), {"scalar": lambda _: estimate})()
+
+    def query(self, *columns):
+        return self.db.query(*columns)
+
+
+class TestFetchLocationPage:
+    """Testes da paginação keyset"""
+
+    def test_cursor_walks_every_location_once(self, db):
+        """Seguir next_cursor percorre todas as linhas, sem repetir nem pular"""
+        ids, cursor, pages = [], None, 0
+        while True:
+            page, cursor = fetch_location_page(db, limit=3, after_id=cursor)
+            ids.extend(item["id"] for item in page)
+            pages += 1
+            if cursor is None:
+                break
+
+        assert ids == [1, 2, 3, 4, 5, 6, 7]
+        assert pages == 3
+
+    def test_last_page_has_no_cursor(self, db):
+        """Página exatamente no fim não devolve cursor (limit + 1 sem COUNT)"""
+        page, cursor = fetch_location_page(db, limit=3, after_id=4)
+
+        assert [item["id"] for item in page] == [5, 6, 7]
+        assert cursor is None
+
+    def test_country_filter_and_count(self, db):
+        """Filtro por país na página e no total (COUNT com filtro)"""
+        page, cursor = fetch_location_page(db, limit=2, country_code="fra")
+
+        assert [item["id"] for item in page] == [2, 4]
+        assert cursor == 4
+        assert LocationCountCache().get_total(db, country_code="fra") == 3
+
+
+class TestLocationCountCache:
+    """Testes do total aproximado"""
+
+    @pytest.mark.parametrize("estimate", [-1, 0, None])
+    def test_unknown_estimate_falls_back_to_count(self, db, estimate):
+        """reltuples <= 0 (tabela não analisada) conta as linhas"""
+        assert LocationCountCache().get_total(_EstimateSession(db, estimate)) == 7
+
+    def test_positive_estimate_is_used(self, db):
+        """Com estatísticas, o total vem do planner"""
+        assert LocationCountCache().get_total(_EstimateSession(db, 6.8)) == 6
+
+
+class TestExportFraming:
+    """Testes dos exports em streaming"""
+
+    def test_csv_header_once_and_chunked_rows(self, db):
+        """Cabeçalho só no primeiro bloco; blocos de até chunk_size linhas"""
+        chunks = list(stream_locations_csv(db, chunk_size=3))
+
+        assert len(chunks) == 3
+        assert chunks[0].decode().startswith(",".join(LOCATION_FIELDS) + "\r\n")
+        assert sum(c.decode().count(",".join(LOCATION_FIELDS)) for c in chunks) == 1
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        assert [int(r["id"]) for r in rows] == [1, 2, 3, 4, 5, 6, 7]
+
+    def test_ndjson_one_object_per_line(self, db):
+        """Cada bloco termina em quebra de linha e cada linha é um objeto"""
+        chunks = list(stream_locations_ndjson(db, country_code="BRA", chunk_size=3))
+
+        assert all(c.endswith(b"\n") for c in chunks)
+        lines = b"".join(chunks).decode().splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 3, 5, 7]
+
+
+class TestFetchMarkerCollection:
+    """Testes dos marcadores do mapa"""
+
+    def test_only_todays_eto_is_joined(self, db):
+        """Cálculos de ontem ou de amanhã não entram (intervalo semiaberto)"""
+        collection = fetch_marker_collection(db)
+
+        etos = {f["properties"]["id"]: f["properties"]["eto"] for f in collection["features"]}
+        assert etos[1] == 4.12
+        assert etos[2] is None and etos[3] is None
+        assert collection["truncated"] is False
+
+    def test_truncation_is_stable_and_flagged(self, db):
+        """Acima do limite: primeiros IDs e coleção marcada como truncada"""
+        collection = fetch_marker_collection(db, limit=3)
+
+        assert [f["properties"]["id"] for f in collection["features"]] == [1, 2, 3]
+        assert collection["truncated"] is True
+        assert collection["limit"] == 3
+
+    def test_bbox_filters_markers(self, db):
+        """bbox (west, south, east, north) restringe os pontos"""
+        collection = fetch_marker_collection(db, bbox=(-43.5, -8.0, -40.0, 0.0))
+
+        assert [f["properties"]["id"] for f in collection["features"]] == [2, 3, 4, 5]
@@ -0,0 +1,103 @@
+"""
+Testes unitários para as camadas GeoJSON simplificadas do mapa
+- Simplificação por arcos: fronteiras compartilhadas continuam idênticas
+- Faixas de zoom
+- Pré-compressão, negociação de codificação e build em disco
+"""
+
+import gzip
+import json
+
+from backend.api.services.map_layers import (
+    LayerVariant,
+    MapLayerStore,
+    band_for_zoom,
+    build_variant,
+    simplify_coverage,
+)
+
+# Fronteira sinuosa (desvios de 0.001°) entre dois quadrados vizinhos
+BORDER = [(1.0, y / 10) for y in range(11)]
+BORDER = [(x + (0.001 if i % 2 else 0.0), y) for i, (x, y) in enumerate(BORDER)]
+
+
+def _square(left: bool) -> dict:
+    if left:
+        ring = [(0.0, 0.0)] + BORDER + [(0.0, 1.0), (0.0, 0.0)]
+    else:
+        ring = BORDER[::-1] + [(2.0, 0.0), (2.0, 1.0), BORDER[-1]]
+    return {"type": "Polygon", "coordinates": [[list(p) for p in ring]]}
+
+
+def _border_vertices(geometry: dict) -> set:
+    return {tuple(p) for p in geometry["coordinates"][0] if 0.9 <= p[0] <= 1.1}
+
+
+class TestSimplifyCoverage:
+    """Testes da simplificação que preserva a topologia."""
+
+    def test_fronteira_compartilhada_simplificada_igual(self):
+        """Os dois vizinhos ficam com exatamente os mesmos vértices na fronteira."""
+        left, right = simplify_coverage([_square(True), _square(False)], tolerance=0.01)
+
+        assert _border_vertices(left) == _border_vertices(right)
+        assert len(_border_vertices(left)) < len(BORDER)
+
+    def test_ilhas_menores_que_tolerancia_descartadas(self):
+        """Anéis isolados menores que a tolerância somem na faixa baixa."""
+        island = [[0.0, 0.0], [0.001, 0.0], [0.001, 0.001], [0.0, 0.001], [0.0, 0.0]]
+        geometry = {
+            "type": "MultiPolygon",
+            "coordinates": [[[list(p) for p in _square(True)["coordinates"][0]]], [island]],
+        }
+        (simplified,) = simplify_coverage([geometry], tolerance=0.01)
+
+        assert simplified["type"] == "MultiPolygon"
+        assert len(simplified["coordinates"]) == 1
+
+    def test_pontos_so_arredondados(self):
+        """Camadas de pontos não são simplificadas, só arredondadas."""
+        geojson = {"type": "FeatureCollection", "features": [{
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [-49.16243755, -9.62179071]},
+            "properties": {"name": "Abreulândia"},
+        }]}
+        variant = build_variant(geojson, tolerance=0.04, decimals=3)
+
+        assert variant["features"][0]["geometry"]["coordinates"] == [-49.162, -9.622]
+
+
+class TestLayerVariants:
+    """Testes das variantes pré-comprimidas e do build."""
+
+    def test_faixas_de_zoom(self):
+        assert band_for_zoom(2) == "low"
+        assert band_for_zoom(6) == "mid"
+        assert band_for_zoom(13) == "high"
+
+    def test_negociacao_de_codificacao(self):
+        variant = LayerVariant.encode({"type": "FeatureCollection", "features": []})
+
+        encoding, body = variant.negotiate("gzip, deflate")
+        assert encoding == "gzip"
+        assert json.loads(gzip.decompress(body)) == json.loads(variant.body)
+        assert variant.negotiate("gzip;q=0") == (None, variant.body)
+
+    def test_build_em_disco_recarregado(self, tmp_path):
+        """O store usa o build (mesmos ETags) sem reprocessar a fonte."""
+        calls = []
+
+        def source():
+            calls.append(1)
+            return {"type": "FeatureCollection", "features": [
+                {"type": "Feature", "geometry": _square(True), "properties": {}},
+                {"type": "Feature", "geometry": _square(False), "properties": {}},
+            ]}
+
+        manifest = MapLayerStore(str(tmp_path), {"uf": source}).build()
+        store = MapLayerStore(str(tmp_path), {"uf": source})
+
+        assert store.get("uf", "mid").etag == manifest["layers"]["uf"]["mid"]
+        assert store.url("uf", "low", "/api/v1").endswith(f"?v={manifest['layers']['uf']['low']}")
+        assert store.get("uf", "ultra") is None
+        assert len(calls) == 1
@@ -0,0 +1,128 @@
+"""
+Testes unitários para o controle de qualidade vetorizado
+- Limites físicos e consistência interna
+- Variação brusca e persistência
+- Limite de radiação de céu claro
+"""
+
+import pandas as pd
+import pytest
+
+from backend.core.data_processing.astronomy import clear_sky_radiation
+from backend.core.data_processing.quality_control import (
+    FLAG_CONSISTENCY,
+    FLAG_PERSISTENCE,
+    FLAG_RADIATION,
+    FLAG_RANGE,
+    FLAG_STEP,
+    quality_control_records,
+    quality_control_series,
+    run_quality_control,
+)
+
+pytestmark = pytest.mark.usefixtures("small_astronomy_table")
+
+
+class TestRunQualityControl:
+    """Testes dos checks sobre blocos (localizações × dias)"""
+
+    def test_range_and_consistency(self):
+        """UR > 100 e Tmin > Tmax são sinalizados"""
+        qc = run_quality_control({
+            "T2M_MAX": [[30.0, 20.0, 31.0]],
+            "T2M_MIN": [[18.0, 22.0, 19.0]],
+            "RH2M": [[60.0, 104.0, 70.0]],
+        })
+
+        assert qc.flags["RH2M"][0].tolist() == [0, FLAG_RANGE, 0]
+        assert qc.mask("T2M_MIN", FLAG_CONSISTENCY)[0].tolist() == [False, True, False]
+        assert qc.mask("T2M_MAX", FLAG_CONSISTENCY)[0, 1]
+
+    def test_step_and_persistence(self):
+        """Saltos bruscos e valores repetidos são sinalizados por localização"""
+        qc = run_quality_control({
+            "temperature_2m_max": [
+                [25.0, 26.0, 50.0, 27.0, 26.0, 25.0],
+                [21.5, 21.5, 21.5, 21.5, 21.5, 22.0],
+            ],
+        })
+        flags = qc.flags["temperature_2m_max"]
+
+        assert (flags[0] & FLAG_STEP).nonzero()[0].tolist() == [2, 3]
+        assert qc.mask("temperature_2m_max", FLAG_PERSISTENCE)[1].tolist() == [
+            True, True, True, True, True, False
+        ]
+
+    def test_clear_sky_bound(self):
+        """Radiação acima de Rso (com tolerância) é sinalizada"""
+        dates = pd.date_range("2024-06-20", periods=2)
+        rso = clear_sky_radiation(60.0, dates.dayofyear)
+
+        qc = run_quality_control(
+            {"shortwave_radiation_sum": [[rso[0] * 0.9, rso[1] * 1.3]]},
+            latitudes=[60.0],
+            dates=dates,
+        )
+
+        assert qc.mask("shortwave_radiation_sum", FLAG_RADIATION)[0].tolist() == [
+            False, True
+        ]
+
+    def test_records_nullify_flagged_values_and_eto(self):
+        """Registros reprovados têm a variável e o ETo do dia anulados"""
+        records = [
+            {"lat": -22.7, "lng": -47.6, "date": "2024-01-01", "RH2M": 80.0, "ETo": 4.0},
+            {"lat": -22.7, "lng": -47.6, "date": "2024-01-02", "RH2M": 130.0, "ETo": 9.0},
+            {"lat": 10.0, "lng": 10.0, "date": "2024-01-02", "RH2M": 50.0, "ETo": 5.0},
+        ]
+
+        cleaned, qc = quality_control_records(records, dependent=("ETo",))
+
+        assert [r["RH2M"] for r in cleaned] == [80.0, None, 50.0]
+        assert [r["ETo"] for r in cleaned] == [4.0, None, 5.0]
+        assert qc.summary() == {"RH2M": {"range": 1}}
+        assert records[1]["RH2M"] == 130.0
+
+    def test_series_nullify_provider_eto(self):
+        """Série colunar: o ETo do provedor é anulado nos dias reprovados"""
+        climate_data = {
+            "dates": ["2024-01-01", "2024-01-02", "2024-01-03"],
+            "relative_humidity_2m_mean": [70.0, 130.0, 72.0],
+            "et0_fao_evapotranspiration": [4.1, 6.3, 4.0],
+        }
+
+        cleaned, qc = quality_control_series(
+            climate_data, -22.7, dependent=("et0_fao_evapotranspiration",)
+        )
+
+        assert cleaned["relative_humidity_2m_mean"] == [70.0, None, 72.0]
+        assert cleaned["et0_fao_evapotranspiration"] == [4.1, None, 4.0]
+        assert climate_data["et0_fao_evapotranspiration"][1] == 6.3
+
+
+class TestQualityControlPersistence:
+    """Saída do QC contra o NOT NULL de eto_results.eto"""
+
+    def test_flagged_days_skipped_before_copy(self):
+        """Dias com ETo anulado não viram linhas; os demais seguem intactos"""
+        from backend.database.data_storage import ETO_COLUMNS, _record_to_row
+
+        # UR travada em 100% por 7 dias: reprovada por persistência
+        records = [
+            {"lat": -22.7, "lng": -47.6, "date": f"2024-01-0{d}",
+             "RH2M": 100.0, "T2M_MIN": 18.0 + d / 10, "ETo": 4.0}
+            for d in range(1, 8)
+        ]
+        records.append(
+            {"lat": 10.0, "lng": 10.0, "date": "2024-01-01", "RH2M": 60.0, "ETo": 5.0}
+        )
+
+        cleaned, qc = quality_control_records(records, dependent=("ETo", "eto"))
+        rows = [_record_to_row(r, "nasa_power") for r in cleaned]
+
+        assert qc.summary()["RH2M"]["persistence"] == 7
+        assert rows[:7] == [None] * 7
+        assert rows[7][ETO_COLUMNS.index("eto")] == 5.0
+        assert all(
+            row[ETO_COLUMNS.index("eto")] is not None for row in rows if row is not None
+        )
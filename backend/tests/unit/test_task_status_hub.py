@@ -0,0 +1,94 @@
+"""
+Testes unitários para o TaskStatusHub
+- Distribuição para vários assinantes da mesma tarefa
+- Backpressure (descarte das mensagens mais antigas)
+- Último status entregue a assinantes tardios
+- Conexão do leitor a partir das settings
+"""
+
+import asyncio
+
+from backend.api.websocket.task_status_hub import (TaskStatusHub,
+                                                   subscriber_url)
+
+
+def _hub(queue_maxsize=64):
+    hub = TaskStatusHub(queue_maxsize=queue_maxsize)
+
+    async def _started():
+        return None
+
+    # Sem Redis: as mensagens são injetadas via dispatch/_handle
+    hub.start = _started
+    return hub
+
+
+class TestTaskStatusHub:
+    """Testes do multiplexador de status"""
+
+    def test_fan_out_to_all_subscribers(self):
+        """Uma mensagem chega a todos os sockets da tarefa, e só deles"""
+        async def scenario():
+            hub = _hub()
+            first = await hub.subscribe("abc")
+            second = await hub.subscribe("abc")
+            other = await hub.subscribe("xyz")
+
+            hub._handle({"channel": b"task_status:abc", "data": '{"status": "PROGRESS"}'})
+
+            assert first.get_nowait() == {"status": "PROGRESS"}
+            assert second.get_nowait() == {"status": "PROGRESS"}
+            assert other.empty()
+
+            hub.unsubscribe("abc", first)
+            hub.unsubscribe("abc", second)
+            assert hub.subscriber_count() == 1
+
+        asyncio.run(scenario())
+
+    def test_slow_subscriber_keeps_latest_messages(self):
+        """Fila cheia descarta as mais antigas; o status terminal sempre chega"""
+        async def scenario():
+            hub = _hub(queue_maxsize=2)
+            queue = await hub.subscribe("abc")
+
+            for step in range(5):
+                hub.dispatch("abc", {"status": "PROGRESS", "info": {"step": step}})
+            hub.dispatch("abc", {"status": "SUCCESS"})
+
+            assert queue.get_nowait()["info"] == {"step": 4}
+            assert queue.get_nowait() == {"status": "SUCCESS"}
+
+        asyncio.run(scenario())
+
+    def test_late_subscriber_receives_last_status(self):
+        """Quem assina depois do evento recebe o último status conhecido"""
+        async def scenario():
+            hub = _hub()
+            hub.dispatch("abc", {"status": "SUCCESS"})
+
+            queue = await hub.subscribe("abc")
+
+            assert queue.get_nowait() == {"status": "SUCCESS"}
+
+        asyncio.run(scenario())
+
+    def test_last_status_keeps_only_status_fields(self):
+        """O cache de último status não guarda o resultado completo"""
+        async def scenario():
+            hub = _hub()
+            queue = await hub.subscribe("abc")
+            hub.dispatch("abc", {"status": "SUCCESS", "result": [{"ETo": 4.2}] * 100})
+
+            assert len(queue.get_nowait()["result"]) == 100
+            assert hub._last_status["abc"] == {"status": "SUCCESS"}
+
+        asyncio.run(scenario())
+
+    def test_subscriber_url_keeps_credentials(self):
+        """Senha e demais opções são mantidas; só o timeout de leitura sai"""
+        url = subscriber_url(
+            "redis://:secret@redis:6379/0?socket_timeout=10&socket_connect_timeout=5"
+        )
+
+        assert url == "redis://:secret@redis:6379/0?socket_connect_timeout=5"
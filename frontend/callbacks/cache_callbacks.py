@@ -2,7 +2,8 @@
 Callbacks para integração de cache entre frontend (Dash) e backend (FastAPI).
 
 Features:
-- Busca dados via GET /api/cache/climate/{location_id}
+- Busca dados do serviço de cache (GET /cache/climate/{location_id}) via
+  ``service_facade`` (in-process ou HTTP)
 - Armazena resposta em `climate-cache-store` (localStorage)
 - Usa `app-session-id` para Session-ID header
 - Gerencia TTL de cache (expiração automática)
@@ -12,10 +13,11 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
-import requests
 from dash import Input, Output, State, callback, ctx, dcc, html
 from dash.exceptions import PreventUpdate
 
+from frontend.utils.service_facade import service_facade
+
 logger = logging.getLogger(__name__)
 
 # Constantes de Cache
@@ -76,11 +78,8 @@ def sync_climate_cache(location_data: dict, session_id: str, cache_data: dict):
         session_id = f"sess_{uuid.uuid4().hex}"
 
     # Cache miss → buscar do backend
-    url = f"http://localhost:8000/api/cache/climate/{location_id}"
-    headers = {"Session-ID": session_id}
-
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = service_facade.get_cached_climate(location_id, session_id)
         if resp.status_code == 200:
             payload = resp.json()
             
@@ -8,6 +8,8 @@ from typing import List
 from dash import Input, Output, State, callback, html
 from dash.exceptions import PreventUpdate
 
+from frontend.utils.render_cache import callback_cache
+
 
 @callback(
     Output("single-source-selector", "style"),
@@ -37,6 +39,7 @@ def toggle_single_source_dropdown(mode: str) -> dict:
     State({"type": "source-checkbox", "source": "nws_usa"}, "value"),
     prevent_initial_call=True
 )
+@callback_cache.memoize()
 def update_fusion_info(
     mode: str,
     nasa_power: bool,
@@ -113,6 +116,7 @@ def update_download_formats(selected_source: str) -> tuple:
     Input({"type": "source-checkbox", "source": "nws_usa"}, "value"),
     prevent_initial_call=True
 )
+@callback_cache.memoize()
 def update_attribution(
     nasa_power: bool,
     met_norway: bool,
@@ -187,6 +191,7 @@ def update_attribution(
     Input("selected-location-store", "data"),
     prevent_initial_call=True
 )
+@callback_cache.memoize(namespace="climate_sources", ttl=3600)
 def detect_available_sources(location_data: dict) -> dict:
     """
     Detecta fontes de dados climáticos disponíveis para a localização
@@ -1,16 +1,17 @@
 """
 Callbacks para integração de favoritos entre frontend (Dash) e backend (FastAPI).
 
-- Toggle favorito (POST / DELETE)
+- Toggle favorito (POST / DELETE) via ``service_facade``
 - Atualiza `favorites-store` no localStorage
 - Atualiza botão visual (★ vs ☆)
 """
 import logging
 
-import requests
 from dash import ALL, Input, Output, State, callback, ctx
 from dash.exceptions import PreventUpdate
 
+from frontend.utils.service_facade import service_facade
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,8 +45,7 @@ def toggle_favorite(n_clicks_list, current_favorites, session_id):
     try:
         if is_favorited:
             # DELETE
-            url = f"http://localhost:8000/api/favorites/{location_id}"
-            resp = requests.delete(url, headers={"Session-ID": session_id}, timeout=10)
+            resp = service_facade.remove_favorite(location_id, session_id)
             if resp.status_code == 200:
                 updated = [f for f in current_favorites if f != location_id]
                 return updated
@@ -54,8 +54,7 @@ def toggle_favorite(n_clicks_list, current_favorites, session_id):
                 raise PreventUpdate
         else:
             # POST
-            url = f"http://localhost:8000/api/favorites"
-            resp = requests.post(url, params={"location_id": location_id}, headers={"Session-ID": session_id}, timeout=10)
+            resp = service_facade.add_favorite(location_id, session_id)
             if resp.status_code in (200, 201):
                 return list(set(current_favorites) | {location_id})
             else:
@@ -7,9 +7,8 @@ from typing import Dict, List, Optional
 
 import dash
 import dash_bootstrap_components as dbc
-import dash_leaflet as dl
 from dash import dcc, html
-from dash.dependencies import Input, Output, State
+from dash.dependencies import ClientsideFunction, Input, Output, State
 from loguru import logger
 from pytz import timezone
 from timezonefinderL import TimezoneFinder
@@ -48,56 +47,39 @@ def register_map_callbacks(app: dash.Dash):
     
     Inclui:
     - Adição de markers (geolocalização e cliques)
-    - Atualização de markers dinâmicos
+    - Atualização de markers dinâmicos (clientside)
+    - Seleção de cidades nas camadas agrupadas (clientside)
     - Atualização do alerta de informações (coordenadas e erros)
     - Toggle automático de camadas baseado em zoom
     """
     
-    @app.callback(
-        Output('dynamic-markers', 'children'),
-        Input('markers-store', 'data'),
-        prevent_initial_call=False  # Permitir chamada inicial
+    # Markers dinâmicos: markers-store vira a FeatureCollection de uma
+    # única camada GeoJSON (ícones e popups montados no navegador)
+    app.clientside_callback(
+        ClientsideFunction(namespace='map', function_name='markersToGeoJSON'),
+        Output('dynamic-markers', 'data'),
+        Input('markers-store', 'data')
+    )
+
+    # Resolução da camada Brasil conforme o zoom (sem round trip; as URLs
+    # versionadas ficam no cache HTTP)
+    app.clientside_callback(
+        ClientsideFunction(namespace='map', function_name='brasilLayerUrl'),
+        Output('brasil-layer', 'url'),
+        Input('map', 'zoom'),
+        State('map-layer-urls', 'data'),
+        State('brasil-layer', 'url'),
+        prevent_initial_call=True
+    )
+
+    # Clique em uma cidade (MATOPIBA ou mundial) seleciona a localização
+    app.clientside_callback(
+        ClientsideFunction(namespace='map', function_name='selectFeature'),
+        Output('selected-location-store', 'data'),
+        Input('matopiba-layer', 'clickData'),
+        Input('world-locations-layer', 'clickData'),
+        prevent_initial_call=True
     )
-    def update_dynamic_markers(markers_data: List[Dict]) -> List[dl.Marker]:
-        """Atualiza os markers dinâmicos no mapa."""
-        if not markers_data:
-            return []
-        
-        markers = []
-        for marker in markers_data:
-            try:
-                if marker.get('type') == 'user':
-                    # Marker de geolocalização (azul)
-                    markers.append(
-                        dl.Marker(
-                            position=marker['position'],
-                            children=dl.Popup(marker['popup']),
-                            icon={
-                                'iconUrl': 'https://raw.githubusercontent.com/pointhi/leaflet-color-markers/master/img/marker-icon-2x-blue.png',
-                                'iconSize': [25, 41],
-                                'iconAnchor': [12, 41]
-                            }
-                        )
-                    )
-                elif marker.get('type') == 'click':
-                    # Marker de clique (vermelho)
-                    markers.append(
-                        dl.Marker(
-                            position=marker['position'],
-                            children=dl.Popup(marker['popup']),
-                            icon={
-                                'iconUrl': 'https://raw.githubusercontent.com/pointhi/leaflet-color-markers/master/img/marker-icon-2x-red.png',
-                                'iconSize': [25, 41],
-                                'iconAnchor': [12, 41]
-                            }
-                        )
-                    )
-            except Exception as e:
-                logger.error(f"Erro ao criar marker: {e}")
-                continue
-        
-        logger.debug(f"Renderizados {len(markers)} markers")
-        return markers
 
     @app.callback(
         Output('markers-store', 'data'),
@@ -136,18 +118,16 @@ def register_map_callbacks(app: dash.Dash):
         lat, lon = position.get('lat', 0), position.get('lon', 0)
         
         lat_fmt, lng_fmt = format_coordinates(lat, lon)
-        popup_content = [
-            html.H6("📍 Sua localização atual",
-                    style={'marginBottom': '8px', 'textAlign': 'center'}),
-            html.Div([html.B("Latitude: "), lat_fmt]),
-            html.Div([html.B("Longitude: "), lng_fmt]),
-            html.Div([html.B("Altitude: "), "N/A (obtida no cálculo do ETo)"])
-        ]
         
         new_marker = {
             'id': 'user-location-marker',
             'position': [lat, lon],
-            'popup': popup_content,
+            'title': "📍 Sua localização atual",
+            'details': [
+                ["Latitude", lat_fmt],
+                ["Longitude", lng_fmt],
+                ["Altitude", "N/A (obtida no cálculo do ETo)"]
+            ],
             'type': 'user',
             'timestamp': datetime.now().isoformat()
         }
@@ -168,38 +148,26 @@ def register_map_callbacks(app: dash.Dash):
         tz_name = tf.timezone_at(lng=lng, lat=lat)
         
         lat_fmt, lng_fmt = format_coordinates(lat, lng)
-        popup_content = [
-            html.H6("📍 Localização selecionada",
-                    style={'color': '#2d5016', 'marginBottom': '8px',
-                           'textAlign': 'center'}),
-            html.Div([html.B("Latitude: "), lat_fmt], style={'fontSize': '13px'}),
-            html.Div([html.B("Longitude: "), lng_fmt], style={'fontSize': '13px'}),
-            html.Div([html.B("Altitude: "), "N/A (obtida no cálculo do ETo)"], 
-                    style={'fontSize': '13px'})
+        details = [
+            ["Latitude", lat_fmt],
+            ["Longitude", lng_fmt],
+            ["Altitude", "N/A (obtida no cálculo do ETo)"]
         ]
         
         # Adicionar fuso horário se disponível
         if tz_name:
             tz = timezone(tz_name)
             current_time = datetime.now(tz).strftime('%Y-%m-%d %H:%M:%S')
-            popup_content.extend([
-                html.Div([html.B("Fuso horário: "), tz_name], 
-                        style={'fontSize': '13px'}),
-                html.Div([html.B("Hora local: "), current_time], 
-                        style={'fontSize': '13px'})
+            details.extend([
+                ["Fuso horário", tz_name],
+                ["Hora local", current_time]
             ])
         
-        popup_content.extend([
-            html.Hr(style={'margin': '8px 0'}),
-            html.Div("⚡ Ações rápidas: use os botões acima do mapa",
-                    style={'fontSize': '12px', 'fontWeight': 'bold',
-                           'marginBottom': '4px', 'color': '#2d5016'})
-        ])
-        
         new_marker = {
             'id': f'click-marker-{datetime.now().timestamp()}',
             'position': [lat, lng],
-            'popup': popup_content,
+            'title': "📍 Localização selecionada",
+            'details': details,
             'type': 'click',
             'lat': lat,
             'lng': lng,
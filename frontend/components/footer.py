@@ -10,6 +10,8 @@ import dash_bootstrap_components as dbc
 from dash import html
 from loguru import logger
 
+from frontend.utils.render_cache import memoize_layout
+
 
 class FooterManager:
     """Gerencia dados e configurações do rodapé com cache."""
@@ -134,6 +136,7 @@ class FooterManager:
 footer_manager = FooterManager()
 
 
+@memoize_layout
 def render_footer(lang: str = "pt") -> html.Footer:
     """
     Cria um rodapé responsivo otimizado para produção.
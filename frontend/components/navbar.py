@@ -9,6 +9,7 @@ from dash import dcc, html
 from loguru import logger
 
 from frontend.components.language_switcher import create_language_switcher
+from frontend.utils.render_cache import memoize_layout
 
 
 class NavbarManager:
@@ -81,6 +82,7 @@ class NavbarManager:
 navbar_manager = NavbarManager()
 
 
+@memoize_layout
 def render_navbar(settings, current_lang: str = 'en', enable_analytics: bool = True) -> dbc.Navbar:
     """
     Cria uma barra de navegação responsiva otimizada para produção.
@@ -19,6 +19,8 @@ import dash_leaflet as dl
 from dash import dcc, html
 from loguru import logger
 
+from frontend.utils.render_cache import invalidate_layouts, memoize_layout
+
 # Importar utilitário de MATOPIBA otimizado
 try:
     from frontend.utils.matopiba import get_matopiba_geojson_with_clustering
@@ -26,6 +28,27 @@ except ImportError as e:
     logger.warning(f"MATOPIBA utils não disponíveis: {e}")
     get_matopiba_geojson_with_clustering = None
 
+# Camadas servidas por URL (simplificadas por zoom e pré-comprimidas)
+try:
+    from backend.api.services.map_layers import BAND_NAMES, ZOOM_BANDS, map_layer_store
+    from config.settings import get_settings
+except ImportError as e:
+    logger.warning(f"Camadas por URL indisponíveis, usando GeoJSON embutido: {e}")
+    map_layer_store = None
+
+# Estilo das cidades pela ETo do dia (mm/dia), aplicado no navegador por
+# assets/js/map_layers.js: cor ``colorscale[i]`` a partir de ``classes[i]``
+ETO_HIDEOUT = {
+    'classes': [0, 2, 3, 4, 5, 6],
+    'colorscale': ['#1a9850', '#91cf60', '#d9ef8b', '#fee08b', '#fc8d59', '#d73027'],
+    'neutralColor': '#6c757d',
+}
+
+
+def _js(function_name: str) -> Dict[str, str]:
+    """Referência a uma função de assets/js/map_layers.js para props Leaflet."""
+    return {'variable': f'dashExtensions.map.{function_name}'}
+
 
 class GeoJSONManager:
     """Gerencia carregamento e cache de arquivos GeoJSON."""
@@ -124,6 +147,31 @@ def load_geojson(filename: str) -> Optional[Dict]:
     return geojson_manager.load_geojson(filename)
 
 
+def get_map_layer_config() -> Optional[Dict]:
+    """
+    URLs versionadas das camadas por faixa de zoom.
+
+    Returns:
+        Dict com ``bands`` e ``layers`` ou None (camadas embutidas no layout)
+    """
+    if map_layer_store is None:
+        return None
+    try:
+        prefix = get_settings().API_V1_PREFIX
+        return {
+            'bands': [{'name': name, 'min_zoom': min_zoom} for name, min_zoom, _, _ in ZOOM_BANDS],
+            'layers': {
+                layer: {band: map_layer_store.url(layer, band, prefix) for band in BAND_NAMES}
+                for layer in ('br_uf', 'matopiba_cities')
+            },
+            'world_markers': f"{prefix}/world-locations/markers.geojson",
+        }
+    except Exception as e:
+        logger.warning(f"⚠️ Camadas por URL indisponíveis: {e}")
+        return None
+
+
+@memoize_layout
 def create_world_map_layout(lang: str = "pt") -> html.Div:
     """
     Cria layout completo com mapa mundial Leaflet interativo otimizado.
@@ -141,7 +189,8 @@ def create_world_map_layout(lang: str = "pt") -> html.Div:
     
     try:
         # Carregar camadas GeoJSON de forma otimizada
-        map_children = _create_map_layers()
+        layer_config = get_map_layer_config()
+        map_children = _create_map_layers(layer_config)
         
         return html.Div([
             # Stores para estado da aplicação
@@ -152,6 +201,7 @@ def create_world_map_layout(lang: str = "pt") -> html.Div:
                 'zoom': 4,
                 'loaded_layers': ['base', 'brasil', 'matopiba']
             }),
+            dcc.Store(id='map-layer-urls', data=layer_config),
             
             # Geolocalização
             dcc.Geolocation(
@@ -260,8 +310,14 @@ def _get_map_texts(lang: str) -> Dict:
     return texts.get(lang, texts["pt"])
 
 
-def _create_map_layers() -> List:
-    """Cria e configura todas as camadas do mapa."""
+def _create_map_layers(layer_config: Optional[Dict] = None) -> List:
+    """
+    Cria e configura todas as camadas do mapa.
+    
+    Args:
+        layer_config: URLs das camadas (``get_map_layer_config``); sem
+            ele, os GeoJSON são embutidos no layout
+    """
     map_children = []
     
     # 1. Camada base principal com fallbacks
@@ -285,22 +341,26 @@ def _create_map_layers() -> List:
     
     map_children.extend(base_layers)
     
-    # 2. Camada Brasil (GeoJSON)
-    brasil_geojson = geojson_manager.load_geojson('BR_UF_2024.geojson')
-    if brasil_geojson:
+    # 2. Camada Brasil (GeoJSON por URL; a faixa acompanha o zoom via
+    # callback clientside, partindo da faixa do zoom inicial)
+    if layer_config:
+        brasil_source = {'url': layer_config['layers']['br_uf']['low']}
+    else:
+        brasil_source = {'data': geojson_manager.load_geojson('BR_UF_2024.geojson')}
+    if any(brasil_source.values()):
         map_children.append(
             dl.GeoJSON(
                 id='brasil-layer',
-                data=brasil_geojson,
+                **brasil_source,
                 options={
                     'style': {
                         'color': '#28a745',
                         'weight': 2,
                         'fillColor': '#28a745',
                         'fillOpacity': 0.1
-                    },
-                    'onEachFeature': _create_brasil_popup
+                    }
                 },
+                onEachFeature=_js('bindStatePopup'),
                 hoverStyle={
                     'color': '#218838', 
                     'fillColor': '#218838',
@@ -311,17 +371,33 @@ def _create_map_layers() -> List:
         logger.debug("✅ Camada Brasil carregada")
     
     # 3. Camada MATOPIBA com clustering otimizado
-    matopiba_data = _load_matopiba_layer()
-    if matopiba_data:
+    matopiba_data = _load_matopiba_layer(layer_config)
+    if matopiba_data is not None:
         map_children.append(matopiba_data)
         logger.debug("✅ Camada MATOPIBA carregada")
     
+    # 3b. Cidades mundiais (uma camada GeoJSON agrupada no navegador).
+    # Sem bbox a API devolve no máximo MAX_MARKERS pontos (por ID) e marca
+    # a coleção como truncated (cabeçalho X-Markers-Truncated)
+    map_children.append(
+        _create_city_cluster_layer(
+            'world-locations-layer',
+            {'url': layer_config['world_markers']} if layer_config else {},
+            cluster_radius=80
+        )
+    )
+    
     # 4. Marcador especial Piracicaba/ESALQ
     map_children.append(_create_piracicaba_marker())
     
-    # 5. Layer group para markers dinâmicos
+    # 5. Markers dinâmicos (geolocalização/cliques): uma camada GeoJSON
+    # preenchida por callback clientside
     map_children.append(
-        dl.LayerGroup(id='dynamic-markers', children=[])
+        dl.GeoJSON(
+            id='dynamic-markers',
+            data={'type': 'FeatureCollection', 'features': []},
+            pointToLayer=_js('selectionMarker')
+        )
     )
     
     # 6. Controles do mapa
@@ -331,50 +407,52 @@ def _create_map_layers() -> List:
     return map_children
 
 
-def _create_brasil_popup(feature, layer):
-    """Cria popup para features do Brasil."""
-    if feature.get('properties'):
-        props = feature['properties']
-        state_name = props.get('NM_ESTADO', 'Estado')
-        state_uf = props.get('SIGLA_UF', 'UF')
-        
-        popup_content = f"""
-        <div style="min-width: 150px;">
-            <h6 style="margin: 0 0 8px 0; color: #2d5016;">{state_name}</h6>
-            <hr style="margin: 4px 0;">
-            <p style="margin: 0; font-size: 12px;">
-                <strong>UF:</strong> {state_uf}<br>
-                <strong>Região:</strong> {props.get('NM_REGIAO', 'N/A')}
-            </p>
-        </div>
-        """
-        layer.bindPopup(popup_content)
-
-
-def _load_matopiba_layer() -> Optional[dl.GeoJSON]:
+def _load_matopiba_layer(layer_config: Optional[Dict] = None) -> Optional[dl.GeoJSON]:
     """Carrega camada MATOPIBA com tratamento de erro."""
-    if not get_matopiba_geojson_with_clustering:
-        return None
-    
     try:
-        matopiba_geojson = get_matopiba_geojson_with_clustering()
-        if matopiba_geojson and matopiba_geojson.get('features'):
-            return dl.GeoJSON(
-                id='matopiba-layer',
-                data=matopiba_geojson,
-                cluster=True,
-                clusterOptions={
-                    'maxClusterRadius': 50,
-                    'disableClusteringAtZoom': 12
-                },
-                zoomToBoundsOnClick=True
-            )
+        if layer_config:
+            # Pontos não são simplificados; a faixa "mid" só arredonda (~10 m)
+            matopiba_source = {'url': layer_config['layers']['matopiba_cities']['mid']}
+        elif get_matopiba_geojson_with_clustering:
+            matopiba_geojson = get_matopiba_geojson_with_clustering()
+            if not (matopiba_geojson and matopiba_geojson.get('features')):
+                return None
+            matopiba_source = {'data': matopiba_geojson}
+        else:
+            return None
+        
+        return _create_city_cluster_layer('matopiba-layer', matopiba_source)
     except Exception as e:
         logger.error(f"❌ Erro ao carregar MATOPIBA: {e}")
     
     return None
 
 
+def _create_city_cluster_layer(layer_id: str, source: Dict,
+                               cluster_radius: int = 50) -> dl.GeoJSON:
+    """
+    Camada de cidades agrupada no navegador (supercluster).
+    
+    Pontos e clusters são desenhados por assets/js/map_layers.js,
+    coloridos pela propriedade ``eto`` quando presente.
+    
+    Args:
+        layer_id: ID do componente
+        source: ``{'url': ...}`` ou ``{'data': ...}``
+        cluster_radius: Raio de agrupamento em pixels
+    """
+    return dl.GeoJSON(
+        id=layer_id,
+        **source,
+        cluster=True,
+        superClusterOptions={'radius': cluster_radius, 'maxZoom': 11},
+        zoomToBoundsOnClick=True,
+        pointToLayer=_js('pointToLayer'),
+        clusterToLayer=_js('clusterToLayer'),
+        hideout=ETO_HIDEOUT
+    )
+
+
 def _create_piracicaba_marker() -> dl.Marker:
     """Cria marcador especial para Piracicaba/ESALQ."""
     return dl.Marker(
@@ -693,4 +771,5 @@ def get_map_performance_stats() -> Dict:
 def clear_geojson_cache():
     """Limpa cache de GeoJSON (útil para desenvolvimento)."""
     geojson_manager._cache.clear()
+    invalidate_layouts()
     logger.info("🗑️ Cache de GeoJSON limpo")
@@ -6,6 +6,8 @@ from typing import Dict
 import dash_bootstrap_components as dbc
 from dash import html
 
+from frontend.utils.render_cache import memoize_layout
+
 # Textos internacionalizados
 ABOUT_TEXTS = {
     "pt": {
@@ -46,6 +48,7 @@ ABOUT_TEXTS = {
 }
 
 
+@memoize_layout
 def about_dash(lang: str = "pt") -> dbc.Container:
     """
     Cria o layout da página About otimizado.
@@ -1,14 +1,17 @@
 """
 EVAonline ETo Calculator Page - Otimizada para produção.
 """
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Any, Dict
 
 import dash_bootstrap_components as dbc
 from dash import dcc, html
 from loguru import logger
 
+from frontend.utils.render_cache import memoize_layout
 
+
+@memoize_layout(vary_by=date.today)
 def eto_calculator_dash(lang: str = "pt") -> dbc.Container:
     """
     Cria o layout da página ETo Calculator otimizado.
@@ -2,12 +2,15 @@
 Página de Documentação do EVAonline - Otimizada para SEO e performance.
 """
 import json
-from datetime import datetime
+from datetime import date, datetime
 
 import dash_bootstrap_components as dbc
 from dash import html
 
+from frontend.utils.render_cache import memoize_layout
 
+
+@memoize_layout(vary_by=date.today)
 def documentation_layout() -> dbc.Container:
     """
     Layout da página de documentação otimizado para produção.
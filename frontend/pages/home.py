@@ -6,6 +6,8 @@ import dash_bootstrap_components as dbc
 from dash import html
 from loguru import logger
 
+from frontend.utils.render_cache import memoize_layout
+
 # Importar layout do mapa mundial com tratamento de erro
 try:
     from frontend.components.world_map_tabs import create_world_map_layout
@@ -14,6 +16,7 @@ except ImportError as e:
     create_world_map_layout = None
 
 
+@memoize_layout
 def home_layout():
     """
     Retorna o layout da página inicial.
@@ -0,0 +1,291 @@
+"""
+Memoização de layouts e cache de saídas de callbacks Dash.
+
+Layouts (``memoize_layout``):
+    Páginas e componentes estáticos (mapa mundial, navbar, footer,
+    páginas) são montados uma vez por combinação de argumentos (idioma)
+    e versão de dados; navegações seguintes reutilizam a árvore pronta.
+    A versão de dados é ``DASH_DATA_VERSION`` mais uma geração local
+    incrementada por ``invalidate_layouts()``.
+
+Callbacks (``callback_cache.memoize``):
+    Saídas de callbacks determinísticos são guardadas por hash das
+    entradas em um LRU em processo com TTL e, se ``DASH_CALLBACK_CACHE_REDIS_URL``
+    estiver definido, também no Redis (compartilhado entre workers).
+    ``callback_cache.invalidate(namespace)`` incrementa a geração do
+    namespace e ``invalidate()`` a geração global (no Redis, quando
+    habilitado), invalidando as entradas de todos os processos. As duas
+    gerações compõem a chave: dash_cb:{global}:{namespace}:{geração}:{hash}.
+    ``PreventUpdate`` e exceções não são cacheados.
+
+Exemplo:
+    @memoize_layout
+    def about_dash(lang="pt"): ...
+
+    @memoize_layout(vary_by=date.today)
+    def eto_calculator_dash(lang="pt"): ...
+
+    @callback(Output(...), Input(...))
+    @callback_cache.memoize(ttl=600)
+    def update_fusion_info(mode, nasa, met, nws): ...
+"""
+
+import functools
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from loguru import logger
+
+DATA_VERSION = os.getenv("DASH_DATA_VERSION", "1")
+
+LAYOUT_CACHE_SIZE = 64
+
+CALLBACK_CACHE_SIZE = 1024
+CALLBACK_CACHE_TTL_SECONDS = 300
+CALLBACK_CACHE_REDIS_URL = os.getenv("DASH_CALLBACK_CACHE_REDIS_URL")
+CALLBACK_KEY_PREFIX = "dash_cb"
+
+
+class LRUCache:
+    """LRU thread-safe com TTL opcional por entrada."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (entry[0] and entry[0] < time.monotonic()):
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else 0.0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _freeze(value: Any) -> Hashable:
+    """Chave estável para argumentos (não hasheáveis viram repr)."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+# ============================================================================
+# LAYOUTS
+# ============================================================================
+
+_layout_cache = LRUCache(LAYOUT_CACHE_SIZE)
+_layout_generation = 0
+
+
+def data_version() -> str:
+    """Versão de dados que compõe a chave dos layouts memoizados."""
+    return f"{DATA_VERSION}.{_layout_generation}"
+
+
+def memoize_layout(func: Optional[Callable] = None, *,
+                   vary_by: Optional[Callable[[], Hashable]] = None):
+    """
+    Memoiza um construtor de layout por argumentos e versão de dados.
+
+    Args:
+        func: Construtor do layout
+        vary_by: Componente extra da chave (ex.: ``date.today`` para
+            páginas com limites de data)
+    """
+    def decorator(builder: Callable) -> Callable:
+        @functools.wraps(builder)
+        def wrapper(*args, **kwargs):
+            key = (
+                builder.__module__,
+                builder.__qualname__,
+                tuple(_freeze(a) for a in args),
+                tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())),
+                vary_by() if vary_by else None,
+                data_version(),
+            )
+            found, layout = _layout_cache.get(key)
+            if not found:
+                layout = builder(*args, **kwargs)
+                _layout_cache.set(key, layout)
+            return layout
+
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+def invalidate_layouts() -> None:
+    """Descarta todos os layouts memoizados (ex.: GeoJSON ou textos mudaram)."""
+    global _layout_generation
+    _layout_generation += 1
+    _layout_cache.clear()
+    logger.info(f"Layouts invalidados (versão {data_version()})")
+
+
+# ============================================================================
+# CALLBACKS
+# ============================================================================
+
+class CallbackCache:
+    """Cache de saídas de callbacks: LRU em processo + Redis opcional."""
+
+    def __init__(
+        self,
+        maxsize: int = CALLBACK_CACHE_SIZE,
+        ttl: float = CALLBACK_CACHE_TTL_SECONDS,
+        redis_url: Optional[str] = CALLBACK_CACHE_REDIS_URL,
+    ):
+        """
+        Args:
+            maxsize: Entradas no LRU em processo
+            ttl: Tempo de vida padrão (segundos)
+            redis_url: URL do Redis compartilhado (None = só em processo)
+        """
+        self.ttl = ttl
+        self.redis_url = redis_url
+        self._local = LRUCache(maxsize)
+        self._generations: Dict[str, int] = {}
+        self._global_generation = 0
+        self._redis = None
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url:
+            import redis
+
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=0.5)
+        return self._redis
+
+    def _generations_for(self, namespace: str) -> Tuple[str, str]:
+        """Gerações (global, namespace), lidas do Redis em uma ida só."""
+        if self.redis is not None:
+            try:
+                values = self.redis.mget(
+                    f"{CALLBACK_KEY_PREFIX}:gen",
+                    f"{CALLBACK_KEY_PREFIX}:{namespace}:gen",
+                )
+                return tuple(v.decode() if v else "0" for v in values)
+            except Exception as e:
+                logger.warning(f"Cache de callbacks sem Redis ({e}); usando só o local")
+        return str(self._global_generation), str(self._generations.get(namespace, 0))
+
+    def make_key(self, namespace: str, args: tuple, kwargs: dict) -> str:
+        payload = json.dumps([args, kwargs], sort_keys=True, default=repr)
+        digest = hashlib.sha1(payload.encode()).hexdigest()
+        global_gen, namespace_gen = self._generations_for(namespace)
+        return f"{CALLBACK_KEY_PREFIX}:{global_gen}:{namespace}:{namespace_gen}:{digest}"
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        found, value = self._local.get(key)
+        if found or self.redis is None:
+            return found, value
+        try:
+            raw = self.redis.get(key)
+        except Exception:
+            return False, None
+        if raw is None:
+            return False, None
+        value = pickle.loads(raw)
+        self._local.set(key, value, self.ttl)
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = ttl or self.ttl
+        self._local.set(key, value, ttl)
+        if self.redis is not None:
+            try:
+                self.redis.set(key, pickle.dumps(value), ex=int(ttl))
+            except Exception as e:
+                logger.warning(f"Falha ao gravar saída de callback no Redis: {e}")
+
+    def memoize(self, namespace: Optional[str] = None, ttl: Optional[float] = None):
+        """
+        Decorator para callbacks determinísticos (mesmas entradas, mesma saída).
+
+        Args:
+            namespace: Grupo de invalidação (default: módulo.função)
+            ttl: Tempo de vida das saídas (default: ``self.ttl``)
+        """
+        def decorator(func: Callable) -> Callable:
+            name = namespace or f"{func.__module__}.{func.__qualname__}"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = self.make_key(name, args, kwargs)
+                found, output = self.get(key)
+                if found:
+                    return output
+                output = func(*args, **kwargs)
+                self.set(key, output, ttl)
+                return output
+
+            wrapper.cache_namespace = name
+            return wrapper
+
+        return decorator
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        """
+        Invalida um namespace (ou tudo, com ``namespace=None``).
+
+        Com Redis, a nova geração vale para todos os processos, inclusive
+        para namespaces que este processo ainda não usou.
+        """
+        if namespace is None:
+            self._local.clear()
+            self._global_generation += 1
+            if self.redis is not None:
+                try:
+                    self.redis.incr(f"{CALLBACK_KEY_PREFIX}:gen")
+                except Exception as e:
+                    logger.warning(f"Falha ao invalidar cache de callbacks no Redis: {e}")
+            return
+
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        if self.redis is not None:
+            try:
+                self.redis.incr(f"{CALLBACK_KEY_PREFIX}:{namespace}:gen")
+            except Exception as e:
+                logger.warning(f"Falha ao invalidar {namespace} no Redis: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._local),
+            "hits": self._local.hits,
+            "misses": self._local.misses,
+            "redis": self.redis_url is not None,
+        }
+
+
+# Instância singleton
+callback_cache = CallbackCache()
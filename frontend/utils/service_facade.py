@@ -0,0 +1,237 @@
+"""
+Fachada de serviços do backend para os callbacks Dash.
+
+O Dash roda montado no mesmo processo do FastAPI (``backend.main``);
+chamar a própria API por HTTP em ``localhost`` custa um loopback, duas
+serializações JSON e uma thread bloqueada por clique. A fachada chama
+as mesmas funções de rota diretamente:
+
+- ``inprocess`` (padrão): executa a corrotina da rota na própria
+  thread do worker Dash (``asyncio.run``), com uma sessão de banco
+  própria; as rotas fazem I/O síncrono (SQLAlchemy, Redis), então não
+  podem ocupar o loop compartilhado do WebSocket. As validações e o
+  formato da resposta são os das rotas, e ``HTTPException`` vira
+  ``ServiceResponse`` com o mesmo status/detail
+- ``http``: para implantações separadas (Dash e API em processos
+  distintos), usa ``requests`` contra ``DASH_API_URL``
+
+Os dois modos devolvem ``ServiceResponse`` (``status_code``, ``ok``,
+``json()``), então os callbacks não mudam ao trocar de modo.
+
+Exemplo:
+    resp = service_facade.add_favorite(42, session_id)
+    if resp.ok:
+        total = resp.json()["total_favorites"]
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import requests
+from loguru import logger
+
+SERVICE_MODES = ("inprocess", "http")
+
+SERVICE_MODE = os.getenv("DASH_SERVICE_MODE", "inprocess").lower()
+API_URL = os.getenv("DASH_API_URL", "http://localhost:8000/api/v1")
+
+REQUEST_TIMEOUT_SECONDS = 10
+
+
+@dataclass
+class ServiceResponse:
+    """Resposta de um serviço (mesma interface usada de ``requests.Response``)."""
+    status_code: int
+    data: Any
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    def json(self) -> Any:
+        return self.data
+
+
+class ServiceFacade:
+    """Cache, favoritos, localizações e ETo para os callbacks Dash."""
+
+    def __init__(self, mode: str = SERVICE_MODE, api_url: str = API_URL):
+        """
+        Args:
+            mode: "inprocess" ou "http"
+            api_url: URL base da API (somente no modo http)
+        """
+        if mode not in SERVICE_MODES:
+            raise ValueError(f"Modo de serviço inválido: {mode} (use {SERVICE_MODES})")
+        self.mode = mode
+        self.api_url = api_url.rstrip("/")
+        logger.info(f"ServiceFacade em modo {mode}")
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def _call(self, handler, *, with_db: bool = True, **kwargs) -> ServiceResponse:
+        """
+        Executa uma função de rota na thread do chamador.
+
+        Cada chamada tem o próprio event loop; estourado o timeout, a
+        corrotina é cancelada (não segue rodando em segundo plano).
+        """
+        from fastapi import HTTPException
+        from fastapi.encoders import jsonable_encoder
+
+        from backend.database.connection import get_db_context
+
+        async def run():
+            if not with_db:
+                return await handler(**kwargs)
+            with get_db_context() as db:
+                return await handler(db=db, **kwargs)
+
+        try:
+            result = asyncio.run(asyncio.wait_for(run(), REQUEST_TIMEOUT_SECONDS))
+        except HTTPException as e:
+            return ServiceResponse(e.status_code, {"detail": e.detail})
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout em {handler.__name__} (in-process)")
+            return ServiceResponse(504, {"detail": "Tempo limite excedido"})
+        except Exception as e:
+            logger.error(f"Erro em {handler.__name__} (in-process): {e}")
+            return ServiceResponse(500, {"detail": str(e)})
+        return ServiceResponse(200, jsonable_encoder(result))
+
+    def _request(self, method: str, path: str, session_id: Optional[str] = None,
+                 **kwargs) -> ServiceResponse:
+        """Executa a mesma operação por HTTP (implantações separadas)."""
+        headers = {"Session-ID": session_id} if session_id else None
+        try:
+            resp = requests.request(
+                method, f"{self.api_url}{path}", headers=headers,
+                timeout=REQUEST_TIMEOUT_SECONDS, **kwargs
+            )
+        except requests.RequestException as e:
+            logger.error(f"Erro em {method} {path}: {e}")
+            return ServiceResponse(503, {"detail": str(e)})
+        try:
+            data = resp.json()
+        except ValueError:
+            data = {"detail": resp.text}
+        return ServiceResponse(resp.status_code, data)
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def get_cached_climate(self, location_id: int, session_id: Optional[str],
+                           force_refresh: bool = False) -> ServiceResponse:
+        """GET /cache/climate/{location_id}"""
+        if self.mode == "http":
+            return self._request(
+                "GET", f"/cache/climate/{location_id}", session_id,
+                params={"force_refresh": force_refresh}
+            )
+        from backend.api.routes.cache_routes import get_cached_climate
+
+        return self._call(
+            get_cached_climate, location_id=location_id,
+            session_id=session_id, force_refresh=force_refresh
+        )
+
+    # ------------------------------------------------------------------
+    # Favoritos
+    # ------------------------------------------------------------------
+
+    def list_favorites(self, session_id: str) -> ServiceResponse:
+        """GET /favorites"""
+        if self.mode == "http":
+            return self._request("GET", "/favorites", session_id)
+        from backend.api.routes.favorites_routes import list_favorites
+
+        return self._call(list_favorites, session_id=session_id)
+
+    def add_favorite(self, location_id: int, session_id: str,
+                     notes: Optional[str] = None) -> ServiceResponse:
+        """POST /favorites?location_id=..."""
+        if self.mode == "http":
+            params: Dict[str, Any] = {"location_id": location_id}
+            if notes:
+                params["notes"] = notes
+            return self._request("POST", "/favorites", session_id, params=params)
+        from backend.api.routes.favorites_routes import add_favorite
+
+        return self._call(
+            add_favorite, location_id=location_id, session_id=session_id, notes=notes
+        )
+
+    def remove_favorite(self, location_id: int, session_id: str) -> ServiceResponse:
+        """DELETE /favorites/{location_id}"""
+        if self.mode == "http":
+            return self._request("DELETE", f"/favorites/{location_id}", session_id)
+        from backend.api.routes.favorites_routes import remove_favorite
+
+        return self._call(remove_favorite, location_id=location_id, session_id=session_id)
+
+    def favorite_exists(self, location_id: int, session_id: str) -> ServiceResponse:
+        """GET /favorites/{location_id}/exists"""
+        if self.mode == "http":
+            return self._request("GET", f"/favorites/{location_id}/exists", session_id)
+        from backend.api.routes.favorites_routes import check_favorite_exists
+
+        return self._call(
+            check_favorite_exists, location_id=location_id, session_id=session_id
+        )
+
+    # ------------------------------------------------------------------
+    # Localizações
+    # ------------------------------------------------------------------
+
+    def get_location(self, location_id: int) -> ServiceResponse:
+        """GET /world-locations/{location_id}"""
+        if self.mode == "http":
+            return self._request("GET", f"/world-locations/{location_id}")
+        from backend.api.routes.locations_detail import get_location_details
+
+        return self._call(get_location_details, location_id=location_id)
+
+    def find_nearest_location(self, lat: float, lon: float,
+                              max_results: int = 1) -> ServiceResponse:
+        """GET /world-locations/nearest"""
+        params = {"lat": lat, "lon": lon, "max_results": max_results}
+        if self.mode == "http":
+            return self._request("GET", "/world-locations/nearest", params=params)
+
+        # Mesmos limites dos Query() da rota (não aplicados na chamada direta)
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180 and 1 <= max_results <= 10):
+            return ServiceResponse(422, {"detail": "Parâmetros fora dos limites"})
+        from backend.api.routes.locations_search import find_nearest_location
+
+        return self._call(find_nearest_location, **params)
+
+    # ------------------------------------------------------------------
+    # ETo
+    # ------------------------------------------------------------------
+
+    def calculate_eto(self, lat: float, lng: float, elevation: float, database: str,
+                      start_date: str, end_date: str, estado: Optional[str] = None,
+                      cidade: Optional[str] = None) -> ServiceResponse:
+        """POST /internal/eto/eto_calculate"""
+        params = {
+            "lat": lat, "lng": lng, "elevation": elevation, "database": database,
+            "start_date": start_date, "end_date": end_date,
+            "estado": estado, "cidade": cidade,
+        }
+        if self.mode == "http":
+            return self._request(
+                "POST", "/internal/eto/eto_calculate",
+                params={k: v for k, v in params.items() if v is not None}
+            )
+        from backend.api.routes.eto_routes import calculate_eto_endpoint
+
+        return self._call(calculate_eto_endpoint, with_db=False, **params)
+
+
+# Instância singleton
+service_facade = ServiceFacade()
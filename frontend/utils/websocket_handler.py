@@ -2,25 +2,45 @@
 Gerenciador de conexões WebSocket para callbacks Dash.
 
 Este módulo fornece abstrações para trabalhar com WebSocket em um contexto
-de callbacks síncronos do Dash, usando threading para receber mensagens
-em background.
+de callbacks síncronos do Dash. Todas as tarefas acompanhadas pelo
+processo compartilham:
+
+- um único event loop em background (``utils.websocket_client``)
+- uma única conexão com o endpoint multiplexado ``/ws/task_status``
+  (mensagens ``subscribe``/``unsubscribe`` por ``task_id``)
+
+Cada tarefa tem um buffer limitado (``MESSAGE_BUFFER_SIZE``) e é removida
+automaticamente ``COMPLETED_TTL_SECONDS`` após chegar a um status final,
+então threads e memória não crescem com o número de usuários.
 
 Classes:
-    WebSocketConnectionManager: Gerencia conexões WebSocket por task_id
+    WebSocketConnectionManager: Gerencia as assinaturas por task_id
     WebSocketMessage: Estrutura de dados para mensagens WebSocket
 """
 
 import asyncio
 import json
 import threading
-from dataclasses import asdict, dataclass, field
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional
 
 import websockets
 from loguru import logger
-from websockets.exceptions import ConnectionClosed
+
+from utils.websocket_client import get_background_loop
+
+# Mensagens guardadas por tarefa (as mais antigas são descartadas)
+MESSAGE_BUFFER_SIZE = 50
+
+# Tempo que uma tarefa encerrada fica disponível para leitura pelo Dash
+COMPLETED_TTL_SECONDS = 300
+
+RECONNECT_DELAY_SECONDS = 1.0
+MAX_RECONNECT_DELAY_SECONDS = 30.0
 
 
 class MessageType(Enum):
@@ -31,13 +51,25 @@ class MessageType(Enum):
     TIMEOUT = "TIMEOUT"
 
 
+# Status do backend (Celery) -> tipo de mensagem
+_STATUS_TYPES = {
+    "SUCCESS": MessageType.SUCCESS,
+    "FAILURE": MessageType.ERROR,
+    "REVOKED": MessageType.ERROR,
+    "ERROR": MessageType.ERROR,
+    "TIMEOUT": MessageType.TIMEOUT,
+}
+
+FINAL_TYPES = (MessageType.SUCCESS, MessageType.ERROR, MessageType.TIMEOUT)
+
+
 @dataclass
 class WebSocketMessage:
     """Estrutura de mensagem WebSocket."""
     type: MessageType
     data: Dict[str, Any]
     timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
-    
+
     def to_dict(self) -> Dict[str, Any]:
         """Converte para dicionário."""
         return {
@@ -46,281 +78,303 @@ class WebSocketMessage:
             "timestamp": self.timestamp
         }
 
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "WebSocketMessage":
+        """Cria a mensagem a partir do JSON do backend (``status`` + campos)."""
+        status = payload.get("type") or payload.get("status") or "PROGRESS"
+        data = payload.get("data")
+        if data is None:
+            data = {k: v for k, v in payload.items() if k not in ("task_id", "type")}
+        return cls(type=_STATUS_TYPES.get(status, MessageType.PROGRESS), data=data)
+
 
 class WebSocketConnectionManager:
     """
-    Gerencia conexões WebSocket para múltiplas tarefas em paralelo.
-    
-    Usa threading para receber mensagens em background, permitindo
-    que callbacks Dash síncronos acessem dados sem bloquear.
-    
+    Gerencia as assinaturas de tarefas sobre uma conexão multiplexada.
+
+    Os callbacks Dash (síncronos) registram e consultam tarefas; o
+    recebimento acontece no loop compartilhado do processo.
+
     Exemplo:
         ```python
         manager = WebSocketConnectionManager()
-        
-        # Conectar a uma tarefa
-        await manager.connect(task_id="abc123", 
+
+        # Acompanhar uma tarefa
+        manager.connect_sync(task_id="abc123",
                              on_message=lambda msg: print(f"Msg: {msg}"))
-        
+
         # Acessar mensagens recebidas
         messages = manager.get_messages(task_id="abc123")
-        
-        # Desconectar
+
+        # Parar de acompanhar
         manager.disconnect(task_id="abc123")
         ```
     """
-    
-    def __init__(self, ws_base_url: str = "ws://localhost:8000/ws/task_status"):
+
+    def __init__(
+        self,
+        ws_base_url: str = "ws://localhost:8000/ws/task_status",
+        buffer_size: int = MESSAGE_BUFFER_SIZE,
+        completed_ttl: float = COMPLETED_TTL_SECONDS,
+    ):
         """
         Inicializa o gerenciador.
-        
+
         Args:
-            ws_base_url: URL base para conexão WebSocket (sem task_id)
+            ws_base_url: URL do endpoint WebSocket multiplexado
+            buffer_size: Mensagens guardadas por tarefa
+            completed_ttl: Segundos até remover uma tarefa encerrada
         """
         self.ws_base_url = ws_base_url
+        self.buffer_size = buffer_size
+        self.completed_ttl = completed_ttl
         self.connections: Dict[str, Dict[str, Any]] = {}
         self.lock = threading.Lock()
+        self._ws = None
+        self._upstream: Optional[asyncio.Task] = None
         logger.info(f"📊 WebSocketConnectionManager inicializado: {ws_base_url}")
-    
-    def connect_sync(self, task_id: str, 
+
+    def connect_sync(self, task_id: str,
                      on_message: Optional[Callable[[WebSocketMessage], None]] = None) -> Dict[str, Any]:
         """
-        Conecta a um WebSocket (bloqueante, executa em thread separada).
-        
+        Passa a acompanhar uma tarefa (não bloqueante).
+
         Args:
-            task_id: ID da tarefa para conectar
-            on_message: Callback chamado ao receber mensagens
-            
+            task_id: ID da tarefa
+            on_message: Callback chamado ao receber mensagens (no loop
+                compartilhado; deve ser rápido)
+
         Returns:
-            Dict com status da conexão
+            Dict com status da assinatura
         """
         with self.lock:
             if task_id in self.connections:
                 logger.warning(f"⚠️ Conexão {task_id} já existe")
                 return {"status": "already_connected", "task_id": task_id}
-            
-            # Iniciar thread de conexão
-            thread = threading.Thread(
-                target=self._connect_thread,
-                args=(task_id, on_message),
-                daemon=True,
-                name=f"WS-{task_id[:8]}"
-            )
-            
+
             self.connections[task_id] = {
-                "thread": thread,
-                "messages": [],
+                "messages": deque(maxlen=self.buffer_size),
                 "status": "connecting",
-                "on_message": on_message
+                "on_message": on_message,
+                "message_count": 0,
+                "finished_at": None,
             }
-            
-            thread.start()
-            logger.info(f"🔗 Thread de conexão WebSocket iniciada: {task_id}")
-        
+
+        asyncio.run_coroutine_threadsafe(self._subscribe(task_id), get_background_loop())
+        logger.info(f"🔗 Tarefa registrada no WebSocket multiplexado: {task_id}")
         return {"status": "connecting", "task_id": task_id}
-    
-    def _connect_thread(self, task_id: str, 
-                        on_message: Optional[Callable[[WebSocketMessage], None]]):
-        """
-        Executa em thread separada para receber mensagens.
-        
-        Args:
-            task_id: ID da tarefa
-            on_message: Callback para mensagens
-        """
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
+
+    def _active_task_ids(self) -> List[str]:
+        with self.lock:
+            return [
+                task_id for task_id, conn in self.connections.items()
+                if conn["finished_at"] is None
+            ]
+
+    async def _subscribe(self, task_id: str) -> None:
+        """Envia a assinatura (ou sobe a conexão, que assina as ativas)."""
+        if self._ws is not None:
+            try:
+                await self._ws.send(json.dumps({"action": "subscribe", "task_id": task_id}))
+                self._set_status(task_id, "connected")
+                return
+            except Exception as e:
+                logger.warning(f"Falha ao assinar {task_id}: {e}")
+        if self._upstream is None or self._upstream.done():
+            self._upstream = asyncio.ensure_future(self._run_upstream())
+
+    async def _unsubscribe(self, task_id: str) -> None:
+        if self._ws is not None:
+            try:
+                await self._ws.send(json.dumps({"action": "unsubscribe", "task_id": task_id}))
+            except Exception:
+                pass
+
+    async def _run_upstream(self) -> None:
+        """Conexão única; reconecta com backoff enquanto houver tarefas ativas."""
+        delay = RECONNECT_DELAY_SECONDS
+        while self._active_task_ids():
+            try:
+                async with websockets.connect(self.ws_base_url, ping_interval=20) as websocket:
+                    self._ws = websocket
+                    delay = RECONNECT_DELAY_SECONDS
+                    logger.info(f"✅ WebSocket multiplexado conectado: {self.ws_base_url}")
+
+                    for task_id in self._active_task_ids():
+                        await websocket.send(json.dumps({"action": "subscribe", "task_id": task_id}))
+                        self._set_status(task_id, "connected")
+
+                    async for raw in websocket:
+                        self._handle(raw)
+                        if not self._active_task_ids():
+                            break
+
+            except Exception as e:
+                logger.warning(
+                    f"WebSocket multiplexado indisponível ({e}); "
+                    f"reconectando em {delay:.0f}s"
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+            finally:
+                self._ws = None
+
+        logger.info("🔴 WebSocket multiplexado encerrado (sem tarefas ativas)")
+
+    def _handle(self, raw: str) -> None:
+        """Roteia uma mensagem recebida para o buffer da tarefa."""
         try:
-            loop.run_until_complete(
-                self._receive_messages(task_id, on_message)
+            payload = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.error(f"Erro ao fazer parse JSON: {e}")
+            return
+
+        task_id = payload.get("task_id")
+        msg = WebSocketMessage.from_payload(payload)
+
+        with self.lock:
+            conn = self.connections.get(task_id)
+            if conn is None:
+                return
+            conn["messages"].append(msg)
+            conn["message_count"] += 1
+            on_message = conn["on_message"]
+            if msg.type in FINAL_TYPES:
+                conn["status"] = msg.type.value
+                conn["finished_at"] = time.monotonic()
+
+        if on_message:
+            try:
+                on_message(msg)
+            except Exception as e:
+                logger.error(f"Erro no callback de mensagem: {e}")
+
+        logger.debug(f"📨 Mensagem {msg.type.value}: {task_id}")
+
+        if msg.type in FINAL_TYPES:
+            logger.info(f"✅ Tarefa finalizada: {task_id} ({msg.type.value})")
+            asyncio.get_running_loop().call_later(
+                self.completed_ttl, self._expire, task_id
             )
-        except Exception as e:
-            logger.error(f"❌ Erro em thread WebSocket {task_id}: {e}")
-            with self.lock:
-                if task_id in self.connections:
-                    self.connections[task_id]["status"] = "error"
-                    self.connections[task_id]["error"] = str(e)
-        finally:
-            loop.close()
-    
-    async def _receive_messages(self, task_id: str, 
-                               on_message: Optional[Callable[[WebSocketMessage], None]]):
-        """
-        Conecta e recebe mensagens do WebSocket.
-        
-        Args:
-            task_id: ID da tarefa
-            on_message: Callback para mensagens
-        """
-        url = f"{self.ws_base_url}/{task_id}"
-        logger.info(f"🔗 Conectando WebSocket: {url}")
-        
-        try:
-            async with websockets.connect(url) as websocket:
-                with self.lock:
-                    if task_id in self.connections:
-                        self.connections[task_id]["status"] = "connected"
-                
-                logger.info(f"✅ WebSocket conectado: {task_id}")
-                
-                # Receber mensagens
-                async for message_str in websocket:
-                    try:
-                        # Parse JSON
-                        data = json.loads(message_str)
-                        
-                        # Criar estrutura de mensagem
-                        msg_type = MessageType(data.get("type", "PROGRESS"))
-                        msg = WebSocketMessage(
-                            type=msg_type,
-                            data=data.get("data", {})
-                        )
-                        
-                        # Armazenar mensagem
-                        with self.lock:
-                            if task_id in self.connections:
-                                self.connections[task_id]["messages"].append(msg)
-                        
-                        # Chamar callback
-                        if on_message:
-                            try:
-                                on_message(msg)
-                            except Exception as e:
-                                logger.error(f"Erro no callback de mensagem: {e}")
-                        
-                        # Log de debug
-                        logger.debug(
-                            f"📨 Mensagem {msg_type.value}: {task_id} "
-                            f"(step: {msg.data.get('step', 'N/A')}, "
-                            f"progress: {msg.data.get('progress', 'N/A')})"
-                        )
-                        
-                        # Se for SUCCESS/ERROR/TIMEOUT, parar loop
-                        if msg_type in [MessageType.SUCCESS, MessageType.ERROR, 
-                                       MessageType.TIMEOUT]:
-                            logger.info(f"✅ Tarefa finalizada: {task_id} ({msg_type.value})")
-                            with self.lock:
-                                if task_id in self.connections:
-                                    self.connections[task_id]["status"] = msg_type.value
-                            break
-                    
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Erro ao fazer parse JSON: {e}")
-                    except Exception as e:
-                        logger.error(f"Erro ao processar mensagem: {e}")
-        
-        except ConnectionClosed:
-            logger.info(f"🔴 WebSocket desconectado: {task_id}")
-            with self.lock:
-                if task_id in self.connections:
-                    self.connections[task_id]["status"] = "closed"
-        
-        except Exception as e:
-            logger.error(f"❌ Erro na conexão WebSocket {task_id}: {e}")
-            with self.lock:
-                if task_id in self.connections:
-                    self.connections[task_id]["status"] = "error"
-                    self.connections[task_id]["error"] = str(e)
-    
+
+    def _expire(self, task_id: str) -> None:
+        """Remove uma tarefa encerrada após o TTL."""
+        with self.lock:
+            conn = self.connections.get(task_id)
+            if conn is not None and conn["finished_at"] is not None:
+                del self.connections[task_id]
+
+    def _set_status(self, task_id: str, status: str) -> None:
+        with self.lock:
+            conn = self.connections.get(task_id)
+            if conn is not None and conn["finished_at"] is None:
+                conn["status"] = status
+
     def get_messages(self, task_id: str) -> List[WebSocketMessage]:
         """
-        Retorna todas as mensagens recebidas para uma tarefa.
-        
+        Retorna as mensagens em buffer de uma tarefa.
+
         Args:
             task_id: ID da tarefa
-            
+
         Returns:
-            Lista de mensagens recebidas
+            Lista de mensagens (no máximo ``buffer_size``)
         """
         with self.lock:
             if task_id in self.connections:
-                return self.connections[task_id].get("messages", []).copy()
+                return list(self.connections[task_id]["messages"])
         return []
-    
+
     def get_status(self, task_id: str) -> str:
         """
         Retorna status da conexão.
-        
+
         Args:
             task_id: ID da tarefa
-            
+
         Returns:
-            Status: "connecting", "connected", "SUCCESS", "ERROR", "closed", etc
+            Status: "connecting", "connected", "SUCCESS", "ERROR", "TIMEOUT", etc
         """
         with self.lock:
             if task_id in self.connections:
                 return self.connections[task_id].get("status", "unknown")
         return "not_found"
-    
+
     def get_latest_message(self, task_id: str) -> Optional[WebSocketMessage]:
         """
         Retorna a última mensagem recebida.
-        
+
         Args:
             task_id: ID da tarefa
-            
+
         Returns:
             Última mensagem ou None
         """
-        messages = self.get_messages(task_id)
-        return messages[-1] if messages else None
-    
+        with self.lock:
+            conn = self.connections.get(task_id)
+            if conn and conn["messages"]:
+                return conn["messages"][-1]
+        return None
+
     def disconnect(self, task_id: str) -> Dict[str, Any]:
         """
-        Desconecta de um WebSocket.
-        
+        Para de acompanhar uma tarefa.
+
         Args:
             task_id: ID da tarefa
-            
+
         Returns:
             Dict com resumo da desconexão
         """
         with self.lock:
-            if task_id not in self.connections:
-                return {"status": "not_found", "task_id": task_id}
-            
-            conn_data = self.connections[task_id]
-            messages = conn_data.get("messages", [])
-            status = conn_data.get("status", "unknown")
-            
-            # Remover do dicionário
-            del self.connections[task_id]
-            
-            logger.info(
-                f"🔌 Desconectado {task_id}: "
-                f"status={status}, mensagens={len(messages)}"
+            conn_data = self.connections.pop(task_id, None)
+        if conn_data is None:
+            return {"status": "not_found", "task_id": task_id}
+
+        if conn_data["finished_at"] is None:
+            asyncio.run_coroutine_threadsafe(
+                self._unsubscribe(task_id), get_background_loop()
             )
-        
+
+        messages = conn_data["messages"]
+        status = conn_data.get("status", "unknown")
+        logger.info(
+            f"🔌 Desconectado {task_id}: "
+            f"status={status}, mensagens={conn_data['message_count']}"
+        )
+
         return {
             "task_id": task_id,
             "status": status,
-            "message_count": len(messages),
+            "message_count": conn_data["message_count"],
             "last_message": messages[-1].to_dict() if messages else None
         }
-    
+
     def disconnect_all(self) -> Dict[str, Any]:
-        """Desconecta todos os WebSockets."""
+        """Para de acompanhar todas as tarefas (a conexão é encerrada)."""
         with self.lock:
             count = len(self.connections)
             self.connections.clear()
-        
+
         logger.info(f"🔌 Desconectados {count} WebSockets")
         return {"disconnected_count": count}
-    
+
     def get_connection_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas de conexões."""
         with self.lock:
             stats = {
                 "active_connections": len(self.connections),
+                "upstream_connected": self._ws is not None,
                 "connections_by_status": {},
-                "total_messages": 0
+                "total_messages": 0,
+                "buffered_messages": 0,
             }
-            
+
             for task_id, conn_data in self.connections.items():
                 status = conn_data.get("status", "unknown")
                 stats["connections_by_status"][status] = \
                     stats["connections_by_status"].get(status, 0) + 1
-                stats["total_messages"] += len(conn_data.get("messages", []))
-            
+                stats["total_messages"] += conn_data["message_count"]
+                stats["buffered_messages"] += len(conn_data["messages"])
+
             return stats
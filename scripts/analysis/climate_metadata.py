@@ -1,11 +1,62 @@
 # analysis/climate_metadata.py
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 from scipy import stats
 
+# Permite importar o store colunar do backend quando executado como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+try:
+    from backend.infrastructure.loaders.climate_series_store import ClimateSeriesStore
+except ImportError:  # backend indisponível: usa apenas os CSVs
+    ClimateSeriesStore = None
+
+
+# Chave do cache de ajustes gamma do SPI: (cidade, assinatura da série, escala, mês)
+GammaKey = Tuple[str, str, int, int]
+
+GAMMA_PARAMS_FILENAME = 'spi_gamma_params.json'
+
+
+def series_signature(precip_data: pd.Series) -> str:
+    """Assinatura de uma série de precipitação (muda quando os dados mudam)."""
+    if len(precip_data) == 0:
+        return '0'
+    return (f"{len(precip_data)}:{precip_data.index[0]:%Y%m%d}:"
+            f"{precip_data.index[-1]:%Y%m%d}:{float(precip_data.sum()):.3f}")
+
+
+def load_gamma_params(path: str) -> Dict[GammaKey, Tuple]:
+    """Ajustes gamma gravados por ``save_gamma_params`` ({} se ausente/inválido)."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    params = {}
+    for key, value in raw.items():
+        city_key, signature, scale, month = key.rsplit('|', 3)
+        params[(city_key, signature, int(scale), int(month))] = tuple(value)
+    return params
+
+
+def save_gamma_params(params: Dict[GammaKey, Tuple], path: str) -> None:
+    """Grava os ajustes gamma (alpha, loc, beta, p_zero) por cidade/escala/mês."""
+    raw = {
+        f"{city_key}|{signature}|{scale}|{month}": [float(v) for v in value]
+        for (city_key, signature, scale, month), value in params.items()
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(raw, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
 
 class ScientificClimateMetadataRegistry:
     """
@@ -28,15 +79,37 @@ class ScientificClimateMetadataRegistry:
         '1991-2020': ('1991-01-01', '2020-12-31')
     }
     
-    def __init__(self, data_directory: str, reference_period: str = '1991-2020'):
+    def __init__(self, data_directory: str, reference_period: str = '1991-2020',
+                 series_store_dir: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 gamma_params_path: Optional[str] = None):
         """
         Inicializa o registro de metadados climáticos.
         
         Args:
             data_directory: Diretório com dados climáticos
             reference_period: Período de referência ('1961-1990', '1981-2010', '1991-2020')
+            series_store_dir: Store colunar memory-mapped (default:
+                <data_directory>/series_store, se existir). Gerado por
+                ``python -m backend.infrastructure.loaders.climate_series_store``
+            max_workers: Processos usados no cálculo por cidade (default:
+                número de CPUs; 1 = sequencial)
+            gamma_params_path: Ajustes gamma do SPI persistidos entre
+                execuções (default: <data_directory>/spi_gamma_params.json)
         """
         self.data_directory = data_directory
+        self.series_store = self._open_series_store(series_store_dir)
+        
+        self.max_workers = max_workers or os.cpu_count() or 1
+        
+        # Parâmetros gamma do SPI por (cidade, assinatura, escala, mês),
+        # reaproveitados entre execuções enquanto a série não mudar
+        self.gamma_params_path = gamma_params_path or os.path.join(
+            data_directory, GAMMA_PARAMS_FILENAME)
+        self.gamma_params: Dict[GammaKey, Tuple] = load_gamma_params(self.gamma_params_path)
+        
+        # Índice mensal ordenado para classificação em lote (construído sob demanda)
+        self._monthly_index = None
         
         # Valida período de referência
         if reference_period not in self.REFERENCE_PERIODS:
@@ -57,6 +130,9 @@ class ScientificClimateMetadataRegistry:
             self.extreme_thresholds = {}
             self.spi_classification = {}
             self.hydrological_regimes = {}
+        elif self.max_workers > 1 and len(self.historical_data) > 1:
+            # Cidades são independentes: calcula tudo em paralelo
+            self.compute_all_metadata_parallel()
         else:
             # Calcula normais para todos os períodos INMET
             self.all_period_normals = self.compute_inmet_normals()
@@ -70,6 +146,21 @@ class ScientificClimateMetadataRegistry:
             self.spi_classification = self.compute_spi_classification()
             self.hydrological_regimes = self.classify_hydrological_years()
         
+        if self.historical_data:
+            # Só os ajustes das séries atuais (versões antigas são descartadas)
+            current = {
+                (city_key, series_signature(data['precipitation'].dropna()))
+                for city_key, data in self.historical_data.items()
+                if 'precipitation' in data.columns
+            }
+            self.gamma_params = {
+                key: params for key, params in self.gamma_params.items() if key[:2] in current
+            }
+            try:
+                save_gamma_params(self.gamma_params, self.gamma_params_path)
+            except OSError as e:
+                print(f"⚠️  Ajustes gamma do SPI não gravados: {e}")
+        
     def create_cities_config(self) -> Dict:
         """Cria configuração das cidades internamente"""
         return {
@@ -106,6 +197,39 @@ class ScientificClimateMetadataRegistry:
             }
         }
     
+    def _open_series_store(self, series_store_dir: Optional[str]):
+        """Abre o store colunar se disponível (sem parse de CSV)"""
+        if ClimateSeriesStore is None:
+            return None
+        store_dir = series_store_dir or os.path.join(self.data_directory, 'series_store')
+        if not os.path.exists(os.path.join(store_dir, 'manifest.json')):
+            return None
+        try:
+            store = ClimateSeriesStore.open(store_dir)
+            print(f"⚡ Series store aberto: {store_dir} ({len(store.cities)} cidades)")
+            return store
+        except Exception as e:
+            print(f"⚠️  Series store ignorado ({e}); usando CSVs")
+            return None
+    
+    def load_city_from_store(self, city_key: str, region: str) -> pd.DataFrame:
+        """Carrega ETo + precipitação do store memory-mapped"""
+        city_config = self.cities_config[region][city_key]
+        df = self.series_store.city(city_key).to_frame()
+        
+        if 'ETo' not in df.columns:
+            return pd.DataFrame()
+        df = df[df['ETo'].notna()]
+        if 'precipitation' not in df.columns:
+            df['precipitation'] = np.nan
+        
+        df['city'] = city_key
+        df['region'] = region
+        df['lat'] = city_config['lat']
+        df['lon'] = city_config['lon']
+        df['alt'] = city_config['alt']
+        return df
+    
     def load_city_eto_data(self, city_key: str, region: str) -> pd.DataFrame:
         """Carrega dados de ETo de uma cidade específica"""
         city_config = self.cities_config[region][city_key]
@@ -222,6 +346,12 @@ class ScientificClimateMetadataRegistry:
     
     def load_city_combined_data(self, city_key: str, region: str) -> pd.DataFrame:
         """Combina dados de ETo e precipitação para uma cidade"""
+        if self.series_store is not None and city_key in self.series_store:
+            combined_data = self.load_city_from_store(city_key, region)
+            if not combined_data.empty:
+                print(f"⚡ {city_key} aberto do series store - {len(combined_data)} registros")
+                return combined_data
+        
         eto_data = self.load_city_eto_data(city_key, region)
         
         if eto_data.empty:
@@ -303,34 +433,13 @@ class ScientificClimateMetadataRegistry:
                 print(f"  📍 Processando {city_key}...")
                 
                 try:
-                    # Filtra dados do período
-                    start_date, end_date = period_range
-                    period_data = data[
-                        (data.index >= start_date) & 
-                        (data.index <= end_date)
-                    ].copy()
-                    
-                    if len(period_data) == 0:
-                        print(f"  ⚠️  Sem dados para {city_key} no período {period_name}")
-                        continue
+                    city_normals = self._compute_city_period_normals(data, period_name, period_range)
                     
-                    # Calcula normais mensais e anuais
-                    monthly_normals = self._compute_monthly_normals_inmet(period_data, period_name)
-                    annual_normals = self._compute_annual_normals_inmet(period_data, period_name)
-                    
-                    if monthly_normals:
-                        period_normals[city_key] = {
-                            'monthly': monthly_normals,
-                            'annual': annual_normals,
-                            'metadata': {
-                                'period': period_name,
-                                'years_available': annual_normals.get('valid_years', 0),
-                                'completeness': annual_normals.get('completeness_ratio', 0)
-                            }
-                        }
-                        print(f"  ✅ {city_key}: {annual_normals.get('valid_years', 0)} anos válidos")
+                    if city_normals:
+                        period_normals[city_key] = city_normals
+                        print(f"  ✅ {city_key}: {city_normals['metadata']['years_available']} anos válidos")
                     else:
-                        print(f"  ⚠️  Dados insuficientes para {city_key}")
+                        print(f"  ⚠️  Dados insuficientes para {city_key} no período {period_name}")
                         
                 except Exception as e:
                     print(f"  ❌ Erro em {city_key}: {e}")
@@ -341,7 +450,38 @@ class ScientificClimateMetadataRegistry:
         
         return all_period_normals
 
-    def _compute_monthly_normals_inmet(self, data: pd.DataFrame, period_name: str) -> Dict:
+    @staticmethod
+    def _compute_city_period_normals(data: pd.DataFrame, period_name: str,
+                                     period_range: Tuple[str, str]) -> Optional[Dict]:
+        """Normais mensais e anuais de uma cidade em um período (None se sem dados)"""
+        start_date, end_date = period_range
+        period_data = data[
+            (data.index >= start_date) & 
+            (data.index <= end_date)
+        ]
+        
+        if len(period_data) == 0:
+            return None
+        
+        # Calcula normais mensais e anuais
+        monthly_normals = ScientificClimateMetadataRegistry._compute_monthly_normals_inmet(period_data, period_name)
+        annual_normals = ScientificClimateMetadataRegistry._compute_annual_normals_inmet(period_data, period_name)
+        
+        if not monthly_normals:
+            return None
+        
+        return {
+            'monthly': monthly_normals,
+            'annual': annual_normals,
+            'metadata': {
+                'period': period_name,
+                'years_available': annual_normals.get('valid_years', 0),
+                'completeness': annual_normals.get('completeness_ratio', 0)
+            }
+        }
+
+    @staticmethod
+    def _compute_monthly_normals_inmet(data: pd.DataFrame, period_name: str) -> Dict:
         """
         Calcula normais mensais: Diários → Mensais
         """
@@ -430,7 +570,8 @@ class ScientificClimateMetadataRegistry:
         
         return monthly_stats
 
-    def _compute_annual_normals_inmet(self, data: pd.DataFrame, period_name: str) -> Dict:
+    @staticmethod
+    def _compute_annual_normals_inmet(data: pd.DataFrame, period_name: str) -> Dict:
         """
         Calcula normais anuais: Mensais → Anuais
         Fórmula INMET: n(X) = Σ_j X_ij / m_i, onde m_i = anos válidos
@@ -511,56 +652,9 @@ class ScientificClimateMetadataRegistry:
             print(f"📊 Calculando extremos ETCCDI para {city_key}...")
             
             try:
-                # Usa período de referência para consistência
-                ref_data = data[
-                    (data.index >= self.reference_period[0]) & 
-                    (data.index <= self.reference_period[1])
-                ]
-                
-                if len(ref_data) == 0:
-                    continue
-                
-                city_thresholds = {
-                    'ETo': {
-                        # Índices de extremos de temperatura (adaptados para ETo)
-                        'TXx': ref_data['ETo'].max(),  # Máximo da máxima mensal
-                        'TNn': ref_data['ETo'].min(),  # Mínimo da mínima mensal
-                        
-                        # Percentis para dias extremos (ETCCDI)
-                        'p01': ref_data['ETo'].quantile(0.01),  # Dias extremamente frios
-                        'p99': ref_data['ETo'].quantile(0.99),  # Dias extremamente quentes
-                        
-                        # Limiares absolutos
-                        'absolute_max': ref_data['ETo'].max(),
-                        'absolute_min': ref_data['ETo'].min(),
-                        
-                        # Estatísticas de base
-                        'mean': ref_data['ETo'].mean(),
-                        'std': ref_data['ETo'].std()
-                    }
-                }
-                
-                # Índices de precipitação se disponível
-                if 'precipitation' in ref_data.columns and not ref_data['precipitation'].isna().all():
-                    precip_data = ref_data['precipitation'].dropna()
-                    
-                    city_thresholds['precipitation'] = {
-                        # Índices de extremos de precipitação (ETCCDI)
-                        'RX1day': precip_data.max(),  # Máximo de 1 dia
-                        'R95p': precip_data.quantile(0.95),  # Percentil 95
-                        'R99p': precip_data.quantile(0.99),  # Percentil 99
-                        
-                        # Índices de duração
-                        'CDD': self._calculate_cdd(precip_data),  # Máximo de dias secos consecutivos
-                        'CWD': self._calculate_cwd(precip_data),  # Máximo de dias úmidos consecutivos
-                        
-                        # Estatísticas básicas
-                        'mean': precip_data.mean(),
-                        'std': precip_data.std(),
-                        'rain_probability': (precip_data > 0.1).mean()
-                    }
-                
-                thresholds[city_key] = city_thresholds
+                city_thresholds = self._compute_city_etccdi(data, self.reference_period)
+                if city_thresholds:
+                    thresholds[city_key] = city_thresholds
                 
             except Exception as e:
                 print(f"❌ Erro ao calcular extremos para {city_key}: {e}")
@@ -568,23 +662,80 @@ class ScientificClimateMetadataRegistry:
         
         return thresholds
     
-    def _calculate_cdd(self, precip_data: pd.Series) -> int:
-        """Calcula CDD (Consecutive Dry Days) conforme ETCCDI"""
-        try:
-            dry_days = (precip_data < 1.0)  # < 1mm = dia seco (ETCCDI)
-            dry_spells = dry_days.astype(int).groupby((~dry_days).cumsum()).sum()
-            return dry_spells.max() if len(dry_spells) > 0 else 0
-        except:
+    @staticmethod
+    def _compute_city_etccdi(data: pd.DataFrame, reference_period: Tuple[str, str]) -> Optional[Dict]:
+        """Limiares ETCCDI de uma cidade no período de referência"""
+        # Usa período de referência para consistência
+        ref_data = data[
+            (data.index >= reference_period[0]) & 
+            (data.index <= reference_period[1])
+        ]
+        
+        if len(ref_data) == 0:
+            return None
+        
+        city_thresholds = {
+            'ETo': {
+                # Índices de extremos de temperatura (adaptados para ETo)
+                'TXx': ref_data['ETo'].max(),  # Máximo da máxima mensal
+                'TNn': ref_data['ETo'].min(),  # Mínimo da mínima mensal
+                
+                # Percentis para dias extremos (ETCCDI)
+                'p01': ref_data['ETo'].quantile(0.01),  # Dias extremamente frios
+                'p99': ref_data['ETo'].quantile(0.99),  # Dias extremamente quentes
+                
+                # Limiares absolutos
+                'absolute_max': ref_data['ETo'].max(),
+                'absolute_min': ref_data['ETo'].min(),
+                
+                # Estatísticas de base
+                'mean': ref_data['ETo'].mean(),
+                'std': ref_data['ETo'].std()
+            }
+        }
+        
+        # Índices de precipitação se disponível
+        if 'precipitation' in ref_data.columns and not ref_data['precipitation'].isna().all():
+            precip_data = ref_data['precipitation'].dropna()
+            
+            city_thresholds['precipitation'] = {
+                # Índices de extremos de precipitação (ETCCDI)
+                'RX1day': precip_data.max(),  # Máximo de 1 dia
+                'R95p': precip_data.quantile(0.95),  # Percentil 95
+                'R99p': precip_data.quantile(0.99),  # Percentil 99
+                
+                # Índices de duração
+                'CDD': ScientificClimateMetadataRegistry._calculate_cdd(precip_data),  # Máximo de dias secos consecutivos
+                'CWD': ScientificClimateMetadataRegistry._calculate_cwd(precip_data),  # Máximo de dias úmidos consecutivos
+                
+                # Estatísticas básicas
+                'mean': precip_data.mean(),
+                'std': precip_data.std(),
+                'rain_probability': (precip_data > 0.1).mean()
+            }
+        
+        return city_thresholds
+    
+    @staticmethod
+    def _max_run_length(mask: np.ndarray) -> int:
+        """Maior sequência de True consecutivos (vetorizado)"""
+        if not mask.any():
             return 0
+        padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+        edges = np.flatnonzero(np.diff(padded))
+        return int((edges[1::2] - edges[::2]).max())
+    
+    @staticmethod
+    def _calculate_cdd(precip_data: pd.Series) -> int:
+        """Calcula CDD (Consecutive Dry Days) conforme ETCCDI"""
+        values = np.asarray(precip_data, dtype=float)
+        return ScientificClimateMetadataRegistry._max_run_length(values < 1.0)  # < 1mm = dia seco (ETCCDI)
     
-    def _calculate_cwd(self, precip_data: pd.Series) -> int:
+    @staticmethod
+    def _calculate_cwd(precip_data: pd.Series) -> int:
         """Calcula CWD (Consecutive Wet Days) conforme ETCCDI"""
-        try:
-            wet_days = (precip_data >= 1.0)  # ≥ 1mm = dia úmido (ETCCDI)
-            wet_spells = wet_days.astype(int).groupby((~wet_days).cumsum()).sum()
-            return wet_spells.max() if len(wet_spells) > 0 else 0
-        except:
-            return 0
+        values = np.asarray(precip_data, dtype=float)
+        return ScientificClimateMetadataRegistry._max_run_length(values >= 1.0)  # ≥ 1mm = dia úmido (ETCCDI)
     
     def compute_spi_classification(self) -> Dict:
         """
@@ -593,49 +744,10 @@ class ScientificClimateMetadataRegistry:
         spi_data = {}
         
         for city_key, data in self.historical_data.items():
-            if 'precipitation' not in data.columns:
-                continue
-                
             try:
-                precip_data = data['precipitation'].dropna()
-                
-                if len(precip_data) < 365:  # Mínimo 1 ano de dados
-                    continue
-                    
-                # Calcula SPI para escala de 12 meses (anual)
-                spi_12 = self._calculate_spi(precip_data, scale=12)
-                
-                if len(spi_12) == 0:
-                    continue
-                
-                # CORREÇÃO: Agrupa por ano corretamente
-                # Cria DataFrame temporário para agrupamento
-                spi_df = pd.DataFrame({'spi': spi_12, 'year': spi_12.index.year})
-                
-                # Calcula média anual do SPI
-                yearly_spi = spi_df.groupby('year')['spi'].mean()
-                
-                classification = {}
-                for year, spi in yearly_spi.items():
-                    if np.isnan(spi):
-                        continue
-                        
-                    if spi >= 2.0:
-                        classification[year] = 'extremely_wet'
-                    elif spi >= 1.5:
-                        classification[year] = 'very_wet'
-                    elif spi >= 1.0:
-                        classification[year] = 'moderately_wet'
-                    elif spi >= -0.99:
-                        classification[year] = 'near_normal'
-                    elif spi >= -1.49:
-                        classification[year] = 'moderately_dry'
-                    elif spi >= -1.99:
-                        classification[year] = 'severely_dry'
-                    else:
-                        classification[year] = 'extremely_dry'
-                
-                spi_data[city_key] = classification
+                classification = self._compute_city_spi(city_key, data, self.gamma_params)
+                if classification is not None:
+                    spi_data[city_key] = classification
                 
             except Exception as e:
                 print(f"❌ Erro ao calcular SPI para {city_key}: {e}")
@@ -643,8 +755,87 @@ class ScientificClimateMetadataRegistry:
         
         return spi_data
 
-    def _calculate_spi(self, precip_data: pd.Series, scale: int = 12) -> pd.Series:
-        """Calcula SPI conforme McKee et al. (1993)"""
+    @staticmethod
+    def _compute_city_spi(city_key: str, data: pd.DataFrame,
+                          gamma_cache: Optional[Dict] = None) -> Optional[Dict]:
+        """Classificação anual do SPI-12 de uma cidade (None se sem dados)"""
+        if 'precipitation' not in data.columns:
+            return None
+        
+        precip_data = data['precipitation'].dropna()
+        
+        if len(precip_data) < 365:  # Mínimo 1 ano de dados
+            return None
+            
+        # Calcula SPI para escala de 12 meses (anual)
+        spi_12 = ScientificClimateMetadataRegistry._calculate_spi(
+            precip_data, scale=12, gamma_cache=gamma_cache, city_key=city_key,
+            signature=series_signature(precip_data)
+        )
+        
+        if len(spi_12) == 0:
+            return None
+        
+        # Calcula média anual do SPI
+        yearly_spi = spi_12.groupby(spi_12.index.year).mean()
+        
+        classification = {}
+        for year, spi in yearly_spi.items():
+            if np.isnan(spi):
+                continue
+                
+            if spi >= 2.0:
+                classification[year] = 'extremely_wet'
+            elif spi >= 1.5:
+                classification[year] = 'very_wet'
+            elif spi >= 1.0:
+                classification[year] = 'moderately_wet'
+            elif spi >= -0.99:
+                classification[year] = 'near_normal'
+            elif spi >= -1.49:
+                classification[year] = 'moderately_dry'
+            elif spi >= -1.99:
+                classification[year] = 'severely_dry'
+            else:
+                classification[year] = 'extremely_dry'
+        
+        return classification
+
+    @staticmethod
+    def _fit_gamma(values: np.ndarray) -> Tuple:
+        """
+        Ajusta distribuição gamma mista (McKee et al. 1993)
+        
+        Returns:
+            (alpha, loc, beta, p_zero): gamma ajustada aos valores
+            positivos e probabilidade de acumulado zero
+        """
+        positive = values[values > 0]
+        p_zero = 1.0 - len(positive) / len(values)
+        if len(positive) < 2:
+            return (np.nan, np.nan, np.nan, p_zero)
+        # Usamos método MLE (Maximum Likelihood Estimation)
+        try:
+            alpha, loc, beta = stats.gamma.fit(positive, method='MLE')
+        except Exception:
+            # Fallback para método MM (Method of Moments)
+            alpha, loc, beta = stats.gamma.fit(positive, method='MM')
+        return (alpha, loc, beta, p_zero)
+
+    @staticmethod
+    def _calculate_spi(precip_data: pd.Series, scale: int = 12,
+                       gamma_cache: Optional[Dict] = None,
+                       city_key: Optional[str] = None,
+                       signature: str = '') -> pd.Series:
+        """
+        Calcula SPI conforme McKee et al. (1993)
+        
+        A gamma é ajustada separadamente para cada mês do calendário
+        (acumulados zero entram como ``p_zero``). Com ``gamma_cache`` e
+        ``city_key``, os parâmetros ficam em cache por (cidade,
+        ``signature``, escala, mês) e não são reajustados enquanto a
+        série não mudar.
+        """
         try:
             # Agrega precipitação no scale mensal
             precip_roll = precip_data.rolling(window=scale, min_periods=scale).sum()
@@ -655,16 +846,27 @@ class ScientificClimateMetadataRegistry:
             if len(precip_roll) == 0:
                 return pd.Series([], dtype=float)
             
-            # Ajusta distribuição gamma (McKee et al. 1993)
-            # Usamos método MLE (Maximum Likelihood Estimation)
-            try:
-                params = stats.gamma.fit(precip_roll, method='MLE')
-            except:
-                # Fallback para método MM (Method of Moments)
-                params = stats.gamma.fit(precip_roll, method='MM')
+            values = precip_roll.to_numpy(dtype=float)
+            months = precip_roll.index.month.to_numpy()
+            cdf = np.full(len(values), np.nan)
             
-            # Calcula probabilidade acumulada
-            cdf = stats.gamma.cdf(precip_roll, *params)
+            for month in np.unique(months):
+                in_month = months == month
+                cache_key = (city_key, signature, scale, int(month))
+                params = gamma_cache.get(cache_key) if gamma_cache is not None and city_key else None
+                if params is None:
+                    params = ScientificClimateMetadataRegistry._fit_gamma(values[in_month])
+                    if gamma_cache is not None and city_key:
+                        gamma_cache[cache_key] = params
+                
+                # Calcula probabilidade acumulada (distribuição mista)
+                alpha, loc, beta, p_zero = params
+                month_values = values[in_month]
+                cdf[in_month] = np.where(
+                    month_values > 0,
+                    p_zero + (1.0 - p_zero) * stats.gamma.cdf(month_values, alpha, loc, beta),
+                    p_zero,
+                )
             
             # Evita valores 0 ou 1 que causam problemas com ppf
             cdf = np.clip(cdf, 0.0001, 0.9999)
@@ -672,10 +874,7 @@ class ScientificClimateMetadataRegistry:
             # Transforma para distribuição normal padrão
             spi_values = stats.norm.ppf(cdf)
             
-            # CORREÇÃO: Retorna como Series do pandas mantendo o índice original
-            spi_series = pd.Series(spi_values, index=precip_roll.index, name='SPI')
-            
-            return spi_series
+            return pd.Series(spi_values, index=precip_roll.index, name='SPI')
             
         except Exception as e:
             print(f"❌ Erro no cálculo do SPI: {e}")
@@ -688,28 +887,10 @@ class ScientificClimateMetadataRegistry:
         regimes = {}
         
         for city_key, data in self.historical_data.items():
-            if 'precipitation' not in data.columns:
-                continue
-                
             try:
-                # Agrupa por ano hidrológico (outubro a setembro)
-                hydrological_years = self._calculate_hydrological_years(data)
-                annual_precip = hydrological_years.groupby('hydrological_year')['precipitation'].sum()
-                
-                # Classificação baseada em percentis (Wilks, 2011)
-                dry_threshold = annual_precip.quantile(0.33)  # Percentil 33
-                wet_threshold = annual_precip.quantile(0.67)  # Percentil 67
-                
-                year_regimes = {}
-                for year, precip in annual_precip.items():
-                    if precip <= dry_threshold:
-                        year_regimes[year] = 'dry'
-                    elif precip >= wet_threshold:
-                        year_regimes[year] = 'wet'
-                    else:
-                        year_regimes[year] = 'normal'
-                
-                regimes[city_key] = year_regimes
+                year_regimes = self._compute_city_hydrological_regimes(data)
+                if year_regimes is not None:
+                    regimes[city_key] = year_regimes
                 
             except Exception as e:
                 print(f"❌ Erro ao classificar anos hidrológicos para {city_key}: {e}")
@@ -717,13 +898,87 @@ class ScientificClimateMetadataRegistry:
         
         return regimes
     
-    def _calculate_hydrological_years(self, data: pd.DataFrame) -> pd.DataFrame:
+    @staticmethod
+    def _compute_city_hydrological_regimes(data: pd.DataFrame) -> Optional[Dict]:
+        """Regime (seco/normal/úmido) de cada ano hidrológico de uma cidade"""
+        if 'precipitation' not in data.columns:
+            return None
+        
+        # Agrupa por ano hidrológico (outubro a setembro)
+        hydrological_years = ScientificClimateMetadataRegistry._calculate_hydrological_years(data)
+        annual_precip = hydrological_years.groupby('hydrological_year')['precipitation'].sum()
+        
+        # Classificação baseada em percentis (Wilks, 2011)
+        dry_threshold = annual_precip.quantile(0.33)  # Percentil 33
+        wet_threshold = annual_precip.quantile(0.67)  # Percentil 67
+        
+        year_regimes = {}
+        for year, precip in annual_precip.items():
+            if precip <= dry_threshold:
+                year_regimes[year] = 'dry'
+            elif precip >= wet_threshold:
+                year_regimes[year] = 'wet'
+            else:
+                year_regimes[year] = 'normal'
+        
+        return year_regimes
+    
+    @staticmethod
+    def _calculate_hydrological_years(data: pd.DataFrame) -> pd.DataFrame:
         """Calcula anos hidrológicos (outubro a setembro)"""
         data_copy = data.copy()
         data_copy['hydrological_year'] = data_copy.index.year
         data_copy.loc[data_copy.index.month >= 10, 'hydrological_year'] += 1
         return data_copy
     
+    def compute_all_metadata_parallel(self, max_workers: Optional[int] = None) -> None:
+        """
+        Calcula normais, extremos ETCCDI, SPI e regimes hidrológicos
+        distribuindo as cidades entre processos.
+        
+        Equivale a chamar ``compute_inmet_normals``,
+        ``compute_etccdi_thresholds``, ``compute_spi_classification`` e
+        ``classify_hydrological_years`` em sequência.
+        """
+        max_workers = max_workers or self.max_workers
+        city_keys = list(self.historical_data.keys())
+        print(f"\n⚙️  Calculando metadados de {len(city_keys)} cidades em {max_workers} processos")
+        
+        self.all_period_normals = {period_name: {} for period_name in self.REFERENCE_PERIODS}
+        self.extreme_thresholds = {}
+        self.spi_classification = {}
+        self.hydrological_regimes = {}
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                _compute_city_metadata,
+                city_keys,
+                (self.historical_data[city_key] for city_key in city_keys),
+                [self.REFERENCE_PERIODS] * len(city_keys),
+                [self.reference_period] * len(city_keys),
+                ({key: params for key, params in self.gamma_params.items() if key[0] == city_key}
+                 for city_key in city_keys),
+            )
+            for city_key, city_result in zip(city_keys, results):
+                for error in city_result['errors']:
+                    print(f"❌ {city_key}: {error}")
+                for period_name, city_normals in city_result['normals'].items():
+                    self.all_period_normals[period_name][city_key] = city_normals
+                if city_result['etccdi']:
+                    self.extreme_thresholds[city_key] = city_result['etccdi']
+                if city_result['spi'] is not None:
+                    self.spi_classification[city_key] = city_result['spi']
+                if city_result['hydrological'] is not None:
+                    self.hydrological_regimes[city_key] = city_result['hydrological']
+                self.gamma_params.update(city_result['gamma_params'])
+        
+        for period_name, period_normals in self.all_period_normals.items():
+            print(f"  🎯 {len(period_normals)} cidades processadas para {period_name}")
+        
+        self.annual_normals = self.compute_annual_normals()
+        self.climate_normals = self.all_period_normals.get(self.reference_period_key, {})
+        self._monthly_index = None
+    
     def is_climate_extreme(self, city_key: str, variable: str, value: float, date: str) -> Dict:
         """
         Verifica se um valor é extremo climático ou outlier com base científico
@@ -818,40 +1073,188 @@ class ScientificClimateMetadataRegistry:
 
 
     
+    def classify_extremes_batch(self, city_keys, variables, dates, values) -> Dict[str, np.ndarray]:
+        """
+        Versão vetorizada de ``is_climate_extreme`` para muitos valores.
+        
+        Os valores são agrupados por (cidade, variável, mês) e comparados
+        com os valores históricos ordenados do mês por busca binária,
+        sem varrer o histórico a cada valor. Aplica os mesmos critérios
+        da versão escalar:
+        - Outlier estatístico: |z| > 3.5 em relação à média/desvio diários
+          do mês (Wilks, 2011)
+        - Extremo climático: fora de [p01, p99] da variável (ETCCDI)
+        - Precipitação zero nunca é extremo nem outlier
+        
+        Args:
+            city_keys: Sequência de chaves de cidade (ou uma única chave)
+            variables: Sequência de variáveis ('ETo'/'precipitation') ou uma única
+            dates: Sequência de datas (str, datetime ou datetime64)
+            values: Sequência de valores
+        
+        Returns:
+            Dict de arrays alinhados com a entrada:
+            - z_score: |valor - média| / desvio (NaN sem normais)
+            - percentile: percentil no histórico do mês (50 sem histórico)
+            - is_extreme: extremo climático ETCCDI
+            - is_outlier: outlier estatístico
+            - direction: +1 (acima de p99), -1 (abaixo de p01), 0
+            - similar_events: eventos históricos similares no mês
+            - valid: havia normais e limiares para classificar o valor
+        """
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        city_keys = np.broadcast_to(np.asarray(city_keys, dtype=object), (n,))
+        variables = np.broadcast_to(np.asarray(variables, dtype=object), (n,))
+        months = pd.DatetimeIndex(pd.to_datetime(dates)).month.to_numpy()
+        
+        result = {
+            'z_score': np.full(n, np.nan),
+            'percentile': np.full(n, 50.0),
+            'is_extreme': np.zeros(n, dtype=bool),
+            'is_outlier': np.zeros(n, dtype=bool),
+            'direction': np.zeros(n, dtype=np.int8),
+            'similar_events': np.zeros(n, dtype=np.int64),
+            'valid': np.zeros(n, dtype=bool),
+        }
+        if n == 0:
+            return result
+        
+        monthly_index = self._get_monthly_index()
+        pair_codes, pairs = pd.factorize(pd.MultiIndex.from_arrays([city_keys, variables]))
+        
+        for code, (city_key, variable) in enumerate(pairs):
+            entry = monthly_index.get((city_key, variable))
+            if entry is None:
+                continue
+            pair_rows = np.flatnonzero(pair_codes == code)
+            pair_months = months[pair_rows]
+            pair_values = values[pair_rows]
+            
+            # Estatísticas mensais por linha (lookup vetorizado por mês)
+            means = entry['mean'][pair_months]
+            stds = entry['std'][pair_months]
+            has_stats = np.isfinite(means) & np.isfinite(stds) & (stds != 0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z_scores = np.where(has_stats, np.abs(pair_values - means) / stds, np.nan)
+            
+            dry_day = (pair_values == 0) if variable == 'precipitation' else np.zeros(len(pair_rows), dtype=bool)
+            classifiable = has_stats & ~dry_day & entry['has_thresholds']
+            outliers = classifiable & (z_scores > 3.5)
+            high = classifiable & ~outliers & (pair_values > entry['p99'])
+            low = classifiable & ~outliers & (pair_values < entry['p01'])
+            
+            percentiles = np.full(len(pair_rows), 50.0)
+            similar = np.zeros(len(pair_rows), dtype=np.int64)
+            for month in np.unique(pair_months):
+                sorted_values = entry['sorted'][month]
+                if len(sorted_values) == 0:
+                    continue
+                in_month = pair_months == month
+                month_values = pair_values[in_month]
+                percentiles[in_month] = self._rank_percentile(sorted_values, month_values)
+                similar[in_month] = np.where(
+                    high[in_month],
+                    len(sorted_values) - np.searchsorted(sorted_values, month_values * 0.95, side='left'),
+                    np.where(
+                        low[in_month],
+                        np.searchsorted(sorted_values, month_values * 1.05, side='right'),
+                        0,
+                    ),
+                )
+            
+            result['z_score'][pair_rows] = z_scores
+            result['percentile'][pair_rows] = percentiles
+            result['is_extreme'][pair_rows] = high | low
+            result['is_outlier'][pair_rows] = outliers
+            result['direction'][pair_rows] = high.astype(np.int8) - low.astype(np.int8)
+            result['similar_events'][pair_rows] = similar
+            result['valid'][pair_rows] = (has_stats | dry_day) & entry['has_thresholds']
+        
+        return result
+    
     def _count_similar_events(self, city_key: str, variable: str, value: float, month: int, direction: str) -> int:
-        """Conta eventos similares no histórico"""
+        """Conta eventos similares no histórico (busca binária no índice mensal)"""
         try:
-            data = self.historical_data[city_key]
-            month_data = data[data.index.month == month]
-            
+            sorted_values = self._get_monthly_index()[(city_key, variable)]['sorted'][month]
             if direction == 'high':
-                similar = month_data[month_data[variable] >= value * 0.95]
-            else:  # low
-                similar = month_data[month_data[variable] <= value * 1.05]
-            
-            return len(similar)
-        except:
+                return int(len(sorted_values) - np.searchsorted(sorted_values, value * 0.95, side='left'))
+            # low
+            return int(np.searchsorted(sorted_values, value * 1.05, side='right'))
+        except KeyError:
             return 0
     
     def _calculate_percentile(self, city_key: str, variable: str, value: float, month: int) -> float:
         """Calcula o percentil do valor no histórico mensal"""
-        try:
-            data = self.historical_data[city_key]
-            month_data = data[data.index.month == month]
+        entry = self._get_monthly_index().get((city_key, variable))
+        if entry is None or len(entry['sorted'][month]) == 0:
+            return 50.0
+        return float(self._rank_percentile(entry['sorted'][month], np.asarray([value]))[0])
+    
+    @staticmethod
+    def _rank_percentile(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """
+        Percentil equivalente a ``stats.percentileofscore(kind='rank')``
+        calculado por busca binária para um vetor de valores.
+        """
+        left = np.searchsorted(sorted_values, values, side='left')
+        right = np.searchsorted(sorted_values, values, side='right')
+        return (left + right + (right > left)) * 50.0 / len(sorted_values)
+    
+    def _get_monthly_index(self) -> Dict[Tuple[str, str], Dict]:
+        """
+        Índice por (cidade, variável) usado na classificação de extremos.
+        
+        Para cada par guarda:
+        - sorted: lista indexada pelo mês (1-12) com os valores diários
+          históricos ordenados (sem NaN), para percentis e contagens por
+          busca binária
+        - mean/std: vetores de 13 posições com média e desvio diários
+          mensais das normais do período de referência
+        - p01/p99: limiares ETCCDI da variável
+        """
+        if self._monthly_index is not None:
+            return self._monthly_index
+        
+        index = {}
+        normal_keys = {
+            'ETo': ('daily_mean', 'daily_std'),
+            'precipitation': ('precip_daily_mean', 'precip_daily_std'),
+        }
+        for city_key, data in self.historical_data.items():
+            months = data.index.month.to_numpy()
+            monthly_normals = self.climate_normals.get(city_key, {}).get('monthly', {})
+            city_thresholds = self.extreme_thresholds.get(city_key, {})
             
-            if variable == 'ETo':
-                series_data = month_data['ETo']
-            elif variable == 'precipitation' and 'precipitation' in month_data.columns:
-                series_data = month_data['precipitation'].dropna()
-            else:
-                return 50.0
+            for variable, (mean_key, std_key) in normal_keys.items():
+                if variable not in data.columns:
+                    continue
+                values = data[variable].to_numpy(dtype=float)
+                valid = ~np.isnan(values)
                 
-            if len(series_data) == 0:
-                return 50.0
+                sorted_by_month = [np.empty(0)] * 13
+                means = np.full(13, np.nan)
+                stds = np.full(13, np.nan)
+                for month in range(1, 13):
+                    sorted_by_month[month] = np.sort(values[valid & (months == month)])
+                    month_normals = monthly_normals.get(month, {})
+                    if month_normals.get(mean_key) is not None:
+                        means[month] = month_normals[mean_key]
+                    if month_normals.get(std_key) is not None:
+                        stds[month] = month_normals[std_key]
                 
-            return stats.percentileofscore(series_data, value)
-        except:
-            return 50.0
+                thresholds = city_thresholds.get(variable, {})
+                index[(city_key, variable)] = {
+                    'sorted': sorted_by_month,
+                    'mean': means,
+                    'std': stds,
+                    'p01': thresholds.get('p01', -np.inf),
+                    'p99': thresholds.get('p99', np.inf),
+                    'has_thresholds': bool(thresholds),
+                }
+        
+        self._monthly_index = index
+        return index
     
     def _get_month_name(self, month: int) -> str:
         """Retorna nome do mês em português"""
@@ -879,8 +1282,12 @@ class ScientificClimateMetadataRegistry:
                         'completeness': period_annual.get('completeness_ratio')
                     }
             
+            city_config = self._get_city_config(city_key)
             report = {
                 'city': city_key,
+                'latitude': city_config.get('lat'),
+                'longitude': city_config.get('lon'),
+                'elevation_m': city_config.get('alt'),
                 'reference_period': self.reference_period,
                 'reference_period_key': self.reference_period_key,
                 'total_records': len(self.historical_data[city_key]),
@@ -928,6 +1335,13 @@ class ScientificClimateMetadataRegistry:
         except Exception as e:
             return {'error': f'Erro ao gerar relatório: {str(e)}'}
     
+    def _get_city_config(self, city_key: str) -> Dict:
+        """Retorna lat/lon/alt da cidade (vazio se desconhecida)"""
+        for region_cities in self.cities_config.values():
+            if city_key in region_cities:
+                return region_cities[city_key]
+        return {}
+    
     def _calculate_quality_metrics(self, city_key: str) -> Dict:
         """Calcula métricas de qualidade dos dados"""
         data = self.historical_data[city_key]
@@ -948,4 +1362,45 @@ class ScientificClimateMetadataRegistry:
         variables = ['ETo']  # ETo sempre disponível
         if 'precipitation' in self.historical_data[city_key].columns:
             variables.append('precipitation')
-        return variables
\ No newline at end of file
+        return variables
+
+
+def _compute_city_metadata(city_key: str, data: pd.DataFrame,
+                           reference_periods: Dict[str, Tuple[str, str]],
+                           reference_period: Tuple[str, str],
+                           gamma_params: Optional[Dict[GammaKey, Tuple]] = None) -> Dict:
+    """
+    Calcula todos os metadados de uma cidade (executado em processo separado).
+    
+    Função de módulo para ser serializável pelo ProcessPoolExecutor.
+    ``gamma_params`` traz os ajustes já conhecidos da cidade; os novos
+    voltam em ``result['gamma_params']``.
+    """
+    registry = ScientificClimateMetadataRegistry
+    result = {'normals': {}, 'etccdi': None, 'spi': None,
+              'hydrological': None, 'gamma_params': dict(gamma_params or {}), 'errors': []}
+    
+    for period_name, period_range in reference_periods.items():
+        try:
+            city_normals = registry._compute_city_period_normals(data, period_name, period_range)
+            if city_normals:
+                result['normals'][period_name] = city_normals
+        except Exception as e:
+            result['errors'].append(f"normais {period_name}: {e}")
+    
+    try:
+        result['etccdi'] = registry._compute_city_etccdi(data, reference_period)
+    except Exception as e:
+        result['errors'].append(f"extremos ETCCDI: {e}")
+    
+    try:
+        result['spi'] = registry._compute_city_spi(city_key, data, result['gamma_params'])
+    except Exception as e:
+        result['errors'].append(f"SPI: {e}")
+    
+    try:
+        result['hydrological'] = registry._compute_city_hydrological_regimes(data)
+    except Exception as e:
+        result['errors'].append(f"anos hidrológicos: {e}")
+    
+    return result
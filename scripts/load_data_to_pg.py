@@ -1,7 +1,10 @@
+import csv
+import io
 import json
 import os
 import time
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
 import pandas as pd
@@ -105,8 +108,6 @@ def create_tables():
     Base.metadata.create_all(bind=engine)
     logger.info("✅ Tabelas criadas/verificadas no PostgreSQL")
 
-create_tables()
-
 # ===========================================
 # FUNÇÃO PARA CARREGAR CSVs (Otimizada com chunks e multi)
 # ===========================================
@@ -128,6 +129,132 @@ def load_csv_to_table(csv_path, table_class, if_exists='append'):
     except Exception as e:
         logger.error(f"❌ Erro ao carregar {csv_path}: {e}")
 
+# ===========================================
+# FUNÇÃO PARA CARREGAR CIDADES MUNDIAIS (Streaming COPY + Upsert)
+# ===========================================
+# Colunas do CSV (worldcities*.csv) -> colunas de world_locations
+WORLD_CSV_COLUMNS = {
+    'city': 'location_name',
+    'country': 'country',
+    'sigla': 'country_code',
+    'lat': 'lat',
+    'lng': 'lon',
+    'elevation': 'elevation_m',
+}
+WORLD_STAGING_COLUMNS = ('location_name', 'country', 'country_code', 'lat', 'lon', 'elevation_m')
+WORLD_NATURAL_KEY = 'location_name, country_code, lat, lon'
+
+
+def _iter_world_rows(csv_path):
+    """Lê o CSV linha a linha (sem carregar o arquivo inteiro)."""
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        for record in csv.DictReader(f):
+            yield [
+                record.get(src) or None
+                for src in WORLD_CSV_COLUMNS
+            ]
+
+
+def _world_merge_sql(has_elevation):
+    """
+    Upsert de world_locations_staging em world_locations.
+
+    Os índices de world_locations continuam no lugar: o INSERT ... ON
+    CONFLICT só pega ROW EXCLUSIVE, então leituras seguem durante a carga.
+    Sem elevação no CSV, preserva a elevação já gravada.
+    """
+    elevation_update = (
+        "EXCLUDED.elevation_m" if has_elevation else "world_locations.elevation_m"
+    )
+    return f"""
+        INSERT INTO world_locations
+            (location_name, country, country_code, lat, lon, elevation_m, geometry)
+        SELECT DISTINCT ON ({WORLD_NATURAL_KEY})
+            location_name, country, upper(country_code), lat, lon,
+            COALESCE(elevation_m, 0.0),
+            ST_SetSRID(ST_MakePoint(lon, lat), 4326)
+        FROM world_locations_staging
+        WHERE lat IS NOT NULL AND lon IS NOT NULL
+        ORDER BY {WORLD_NATURAL_KEY}
+        ON CONFLICT ({WORLD_NATURAL_KEY}) DO UPDATE SET
+            country = EXCLUDED.country,
+            elevation_m = {elevation_update},
+            geometry = EXCLUDED.geometry,
+            updated_at = now()
+    """
+
+
+def load_world_locations(csv_path, chunk_size=10000):
+    """
+    Carrega worldcities.csv / worldcities_with_elevation.csv em world_locations.
+
+    - Lê o CSV em streaming e envia blocos de ``chunk_size`` linhas via COPY
+      para uma tabela temporária (memória constante no cliente)
+    - Mescla com upsert na chave (location_name, country_code, lat, lon),
+      construindo a geometria PostGIS no servidor; os índices de
+      world_locations são mantidos, então a tabela segue legível
+
+    Sem coluna de elevação no CSV, mantém a elevação já existente
+    (novas linhas recebem 0.0, pois a coluna é NOT NULL).
+    """
+    start_time = time.time()
+    total = 0
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TEMP TABLE world_locations_staging (
+                location_name varchar(255),
+                country varchar(255),
+                country_code varchar(3),
+                lat double precision,
+                lon double precision,
+                elevation_m double precision
+            ) ON COMMIT DROP
+        """)
+
+        rows = _iter_world_rows(csv_path)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(chunk)
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY world_locations_staging ({', '.join(WORLD_STAGING_COLUMNS)}) "
+                f"FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+            total += len(chunk)
+            logger.info(f"   ... {total} linhas enviadas para staging")
+
+        cursor.execute("SELECT bool_or(elevation_m IS NOT NULL) FROM world_locations_staging")
+        has_elevation = bool(cursor.fetchone()[0])
+        cursor.execute(_world_merge_sql(has_elevation))
+        merged = cursor.rowcount
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ Erro ao carregar {csv_path}: {e}")
+        raise
+    finally:
+        conn.close()
+
+    # Atualiza estatísticas do planner (usadas também nos totais aproximados)
+    with engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").execute(
+            text("ANALYZE world_locations")
+        )
+
+    elapsed = time.time() - start_time
+    logger.info(
+        f"✅ '{Path(csv_path).name}' → world_locations: {total} linhas lidas, "
+        f"{merged} inseridas/atualizadas em {elapsed:.2f}s"
+    )
+    return merged
+
+
 # ===========================================
 # FUNÇÃO PARA CARREGAR JSONs de Cidades (Batch Upsert)
 # ===========================================
@@ -238,6 +365,7 @@ def load_metadata(metadata_path):
 if __name__ == "__main__":
     logger.info("🚀 Iniciando carga de dados para PostgreSQL...")
     start_total = time.time()
+    create_tables()
     
     # Caminhos ajustados para sua estrutura (reports/cities e reports/summary)
     base_path = Path(__file__).parent.parent  # Assuma scripts/ na raiz; ajuste se necessário
@@ -260,6 +388,12 @@ if __name__ == "__main__":
     # Carrega JSONs de cidades
     load_city_reports(cities_folder)
     
+    # Carrega cidades mundiais (com elevação, se disponível)
+    world_csv_folder = base_path / 'data' / 'csv'
+    for world_csv in ('worldcities.csv', 'worldcities_with_elevation.csv'):
+        if (world_csv_folder / world_csv).exists():
+            load_world_locations(world_csv_folder / world_csv)
+    
     # Carrega metadata global (assuma em summary)
     load_metadata(csv_folder / 'generation_metadata.json')
     
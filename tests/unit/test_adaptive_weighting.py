@@ -0,0 +1,72 @@
+"""
+Unit tests for the climate-aware adaptive weighting engine
+Tests: extreme/outlier attenuation and fusion with adaptive weights
+"""
+import pytest
+
+from backend.api.services.adaptive_weighting import (EXTREME_WEIGHT,
+                                                     OUTLIER_WEIGHT,
+                                                     AdaptiveWeightingEngine)
+from backend.api.services.climate_fusion import ClimateFusionService
+from backend.api.services.climate_normals_cube import (STATISTICS,
+                                                       ClimateNormalsCube)
+
+
+class _StaticProvider:
+    def __init__(self, cube):
+        self.cube = cube
+
+    def get(self):
+        return self.cube
+
+
+@pytest.fixture
+def engine():
+    stats = dict(
+        eto_daily_mean=4.0, eto_daily_std=0.5, eto_p01=3.0, eto_p99=5.0,
+        precip_daily_mean=3.0, precip_daily_std=2.0, precip_p99=8.0,
+    )
+    rows = [
+        ["Piracicaba", -22.72, -47.65, 1] + [stats.get(n) for n in STATISTICS]
+    ]
+    cube = ClimateNormalsCube.from_rows(rows, "1991-2020", "test")
+    fusion = ClimateFusionService({"openmeteo": 0.5, "nasa_power": 0.5})
+    return AdaptiveWeightingEngine(fusion, _StaticProvider(cube))
+
+
+@pytest.mark.unit
+def test_score_attenuates_extremes_and_outliers(engine):
+    """Values beyond p99 are attenuated; |z| > 3.5 is nearly discarded."""
+    scores = engine.score(-22.7, -47.6, [1], [[4.2, 5.5, 9.0]], "eto")
+
+    assert scores["weight"][0].tolist() == [1.0, EXTREME_WEIGHT, OUTLIER_WEIGHT]
+
+
+@pytest.mark.unit
+def test_score_dry_day_is_never_extreme(engine):
+    """Zero precipitation is a dry day, not an extreme."""
+    scores = engine.score(-22.7, -47.6, [1], [[0.0]], "precipitation")
+
+    assert scores["weight"][0, 0] == 1.0
+
+
+@pytest.mark.unit
+def test_fuse_down_weights_outlier_source(engine):
+    """Fusion leans towards the plausible source and flags the outlier."""
+    data = {
+        "openmeteo": [{"date": "2024-01-10", "eto": 4.0}],
+        "nasa_power": [{"date": "2024-01-10", "eto": 9.0}],
+    }
+    (record,) = engine.fuse(-22.7, -47.6, data, "eto")
+
+    assert record["eto"] == pytest.approx((4.0 + 0.1 * 9.0) / 1.1, abs=0.01)
+    assert record["eto_confidence"] == 100
+    assert record["eto_flags"] == {"nasa_power": "outlier"}
+
+
+@pytest.mark.unit
+def test_far_from_stations_keeps_base_weights(engine):
+    """Without a nearby reference station all multipliers are 1."""
+    scores = engine.score(48.8, 2.3, [1], [[9.0]], "eto")
+
+    assert scores["weight"][0, 0] == 1.0
@@ -0,0 +1,104 @@
+"""
+Unit tests for the SPI computation in the climate metadata registry
+Tests: per-month gamma fit vs scalar reference, parallel worker, fit cache persistence
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from scripts.analysis.climate_metadata import (ScientificClimateMetadataRegistry,
+                                               _compute_city_metadata,
+                                               load_gamma_params,
+                                               save_gamma_params,
+                                               series_signature)
+
+Registry = ScientificClimateMetadataRegistry
+
+
+@pytest.fixture
+def precip():
+    rng = np.random.default_rng(42)
+    index = pd.date_range("2001-01-01", "2004-12-31", freq="D")
+    rain = rng.gamma(0.8, 6.0, len(index)) * (rng.random(len(index)) < 0.4)
+    return pd.Series(rain, index=index, name="precipitation")
+
+
+def _scalar_spi(precip_data, scale=12):
+    """Reference: one value at a time, gamma fitted on the same calendar month."""
+    roll = precip_data.rolling(window=scale, min_periods=scale).sum().dropna()
+    spi = []
+    for day, value in roll.items():
+        same_month = roll[roll.index.month == day.month].to_numpy()
+        positive = same_month[same_month > 0]
+        p_zero = 1.0 - len(positive) / len(same_month)
+        alpha, loc, beta = stats.gamma.fit(positive, method="MLE")
+        cdf = p_zero + (1.0 - p_zero) * stats.gamma.cdf(value, alpha, loc, beta) if value > 0 else p_zero
+        spi.append(stats.norm.ppf(min(max(cdf, 0.0001), 0.9999)))
+    return pd.Series(spi, index=roll.index)
+
+
+def _original_spi(precip_data, scale=12):
+    """The pre-vectorization implementation (single gamma fit for the whole series)."""
+    roll = precip_data.rolling(window=scale, min_periods=scale).sum()
+    roll = roll[roll.notna()]
+    params = stats.gamma.fit(roll, method="MLE")
+    cdf = np.clip(stats.gamma.cdf(roll, *params), 0.0001, 0.9999)
+    return pd.Series(stats.norm.ppf(cdf), index=roll.index)
+
+
+@pytest.mark.unit
+def test_vectorized_spi_matches_scalar_reference(precip):
+    """The per-month vectorized SPI equals the value-by-value computation."""
+    sample = precip.iloc[:120]
+    spi = Registry._calculate_spi(sample)
+
+    np.testing.assert_allclose(spi.to_numpy(), _scalar_spi(sample).to_numpy(), atol=1e-6)
+
+
+@pytest.mark.unit
+def test_single_month_matches_original_implementation():
+    """With one calendar month and no dry spells, the result is the original SPI."""
+    index = pd.date_range("2003-01-01", "2003-01-31", freq="D")
+    rain = pd.Series(np.linspace(1.0, 9.0, len(index)) ** 1.3, index=index)
+
+    np.testing.assert_allclose(
+        Registry._calculate_spi(rain).to_numpy(), _original_spi(rain).to_numpy(), atol=1e-6
+    )
+
+
+@pytest.mark.unit
+def test_parallel_worker_matches_sequential_and_reuses_fits(precip, monkeypatch):
+    """The process worker gives the sequential SPI and skips refits given cached params."""
+    data = precip.to_frame()
+    periods = Registry.REFERENCE_PERIODS
+    sequential = Registry._compute_city_spi("city", data, {})
+
+    first = _compute_city_metadata("city", data, periods, periods["1991-2020"])
+
+    def no_refit(values):
+        raise AssertionError("gamma refitted")
+
+    monkeypatch.setattr(Registry, "_fit_gamma", staticmethod(no_refit))
+    second = _compute_city_metadata("city", data, periods, periods["1991-2020"],
+                                    first["gamma_params"])
+
+    assert first["spi"] == sequential
+    assert second["spi"] == sequential
+    assert not [e for e in second["errors"] if e.startswith("SPI")]
+
+
+@pytest.mark.unit
+def test_gamma_params_roundtrip(precip, tmp_path):
+    """Fitted (alpha, loc, beta, p_zero) survive a save/load cycle."""
+    params = {}
+    Registry._compute_city_spi("São Paulo", precip.to_frame(), params)
+    path = str(tmp_path / "spi_gamma_params.json")
+
+    save_gamma_params(params, path)
+    loaded = load_gamma_params(path)
+
+    assert set(loaded) == set(params)
+    key = ("São Paulo", series_signature(precip), 12, 1)
+    np.testing.assert_allclose(loaded[key], params[key])
+    assert load_gamma_params(str(tmp_path / "missing.json")) == {}
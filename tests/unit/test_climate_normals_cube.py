@@ -0,0 +1,98 @@
+"""
+Unit tests for the in-memory climate normals cube
+Tests: nearest-station lookup, z-score and percentile context
+"""
+import numpy as np
+import pytest
+
+from backend.api.services.climate_normals_cube import (
+    KEPT_TABLE_VERSIONS, STATISTICS, ClimateNormalsCube,
+    ClimateNormalsCubeProvider)
+
+
+def _row(city_name, lat, lon, month, **stats):
+    return [city_name, lat, lon, month] + [stats.get(name) for name in STATISTICS]
+
+
+@pytest.fixture
+def cube():
+    ladder = dict(
+        eto_abs_min=1.0, eto_p01=1.5, eto_p05=2.0, eto_p10=2.5, eto_p25=3.0,
+        eto_daily_median=4.0, eto_p75=5.0, eto_p90=5.5, eto_p95=6.0,
+        eto_p99=7.0, eto_abs_max=8.0,
+    )
+    rows = [
+        _row("Piracicaba", -22.72, -47.65, 7, eto_normal=3.5,
+             eto_daily_mean=4.0, eto_daily_std=1.0, **ladder),
+        _row("Seville", 37.39, -5.98, 7, eto_normal=7.0,
+             eto_daily_mean=7.0, eto_daily_std=0.5),
+    ]
+    return ClimateNormalsCube.from_rows(rows, "1991-2020", "test")
+
+
+@pytest.mark.unit
+def test_anomaly_uses_nearest_station(cube):
+    """Lookup picks the nearest station and computes anomaly context."""
+    context = cube.anomaly(-22.70, -47.60, month=7, value=5.0)
+
+    assert context["city_name"] == "Piracicaba"
+    assert context["distance_km"] < 10
+    assert context["z_score"] == pytest.approx(1.0)
+    assert context["percentile"] == pytest.approx(75.0)
+
+
+@pytest.mark.unit
+def test_anomaly_respects_max_distance(cube):
+    """Stations farther than max_distance_km yield no context."""
+    assert cube.anomaly(0.0, 0.0, month=7, value=5.0, max_distance_km=100) is None
+
+
+@pytest.mark.unit
+def test_batch_anomalies_missing_month_is_nan(cube):
+    """Months without normals produce NaN instead of failing."""
+    result = cube.anomalies(-22.7, -47.6, months=[7, 1], values=[4.0, 4.0])
+
+    assert result["z_score"][0] == pytest.approx(0.0)
+    assert np.isnan(result["z_score"][1])
+
+
+@pytest.mark.unit
+def test_annotate_series_length_mismatch_is_none(cube):
+    """A series without one value per date yields no context instead of raising."""
+    dates = ["2024-07-01", "2024-07-02"]
+
+    assert cube.annotate_series(-22.7, -47.6, dates, []) is None
+    assert cube.annotate_series(-22.7, -47.6, dates, [4.0]) is None
+    assert cube.annotate_series(-22.7, -47.6, dates, [4.0, 5.0])["z_score"] == [0.0, 1.0]
+
+
+@pytest.mark.unit
+def test_save_open_roundtrip_is_memory_mapped(cube, tmp_path):
+    """Exported tables reopen memory-mapped with identical values."""
+    cube.save(tmp_path)
+    reopened = ClimateNormalsCube.open(tmp_path)
+
+    assert isinstance(reopened.values, np.memmap)
+    assert reopened.city_names == cube.city_names
+    assert reopened.stat("Piracicaba", 7, "eto_p99") == pytest.approx(7.0)
+
+
+@pytest.mark.unit
+def test_save_swaps_versions_without_touching_mapped_files(cube, tmp_path):
+    """A new export never rewrites arrays an open cube has memory-mapped."""
+    cube.save(tmp_path)
+    provider = ClimateNormalsCubeProvider(tables_dir=str(tmp_path), refresh_interval=0)
+    first = provider.get()
+
+    bigger = ClimateNormalsCube.from_rows(
+        [_row(f"City {i}", float(i), float(i), 7, eto_daily_mean=float(i)) for i in range(5)],
+        "1991-2020", "test",
+    )
+    for _ in range(KEPT_TABLE_VERSIONS + 1):
+        bigger.save(tmp_path)
+    second = provider.get()
+
+    assert first.stat("Piracicaba", 7, "eto_p99") == pytest.approx(7.0)
+    assert len(first) == 2 and len(second) == 5
+    assert second is not first
+    assert len([p for p in tmp_path.glob("v*") if p.is_dir()]) == KEPT_TABLE_VERSIONS
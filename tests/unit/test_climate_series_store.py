@@ -0,0 +1,68 @@
+"""
+Unit tests for the memory-mapped climate series store
+Tests: CSV conversion, day-axis alignment, incremental rebuild
+"""
+import os
+
+import numpy as np
+import pytest
+
+from backend.infrastructure.loaders.climate_series_store import (
+    ClimateSeriesStore,
+    build_series_store,
+)
+
+
+def _write_city(data_dir, city_key, eto_rows, pr_rows=None):
+    eto_dir = data_dir / "csv" / "BRASIL" / "ETo"
+    eto_dir.mkdir(parents=True, exist_ok=True)
+    (eto_dir / f"{city_key}.csv").write_text(
+        "Data,ETo\n" + "".join(f"{d},{v}\n" for d, v in eto_rows)
+    )
+    if pr_rows is not None:
+        pr_dir = data_dir / "csv" / "BRASIL" / "pr"
+        pr_dir.mkdir(parents=True, exist_ok=True)
+        (pr_dir / f"{city_key}.csv").write_text(
+            "Data,pr\n" + "".join(f"{d},{v}\n" for d, v in pr_rows)
+        )
+
+
+@pytest.mark.unit
+def test_store_aligns_variables_on_daily_axis(tmp_path):
+    """Variables share one contiguous day axis with NaN for missing days."""
+    _write_city(
+        tmp_path,
+        "Cidade_XX",
+        [("2020-01-01", 4.0), ("2020-01-03", 5.0)],
+        [("2020-01-02", 10.0)],
+    )
+    build_series_store(str(tmp_path))
+
+    store = ClimateSeriesStore.open(str(tmp_path / "series_store"))
+    city = store.city("Cidade_XX")
+
+    assert city.region == "brasil"
+    assert city.dates[0] == np.datetime64("2020-01-01")
+    assert len(city.days) == 3
+    assert city.columns["ETo"].dtype == np.float32
+    np.testing.assert_array_equal(np.isnan(city.columns["ETo"]), [False, True, False])
+    assert city.columns["precipitation"][1] == pytest.approx(10.0)
+
+
+@pytest.mark.unit
+def test_store_rebuilds_only_changed_cities(tmp_path):
+    """Unchanged CSVs keep their arrays; changed CSVs are rebuilt."""
+    _write_city(tmp_path, "A_XX", [("2020-01-01", 1.0)])
+    _write_city(tmp_path, "B_XX", [("2020-01-01", 2.0)])
+    build_series_store(str(tmp_path))
+
+    store_dir = tmp_path / "series_store"
+    mtime_a = os.stat(store_dir / "A_XX" / "ETo.npy").st_mtime_ns
+
+    _write_city(tmp_path, "B_XX", [("2020-01-01", 3.0), ("2020-01-02", 4.0)])
+    manifest = build_series_store(str(tmp_path))
+
+    assert os.stat(store_dir / "A_XX" / "ETo.npy").st_mtime_ns == mtime_a
+    assert manifest["cities"]["B_XX"]["n_days"] == 2
+    store = ClimateSeriesStore.open(str(store_dir))
+    assert store.values("B_XX", "ETo")[1] == pytest.approx(4.0)
@@ -0,0 +1,44 @@
+"""
+Unit tests for the world_locations bulk load helpers
+Tests: CSV row shaping for COPY, upsert SQL generation
+"""
+import pytest
+
+from scripts.load_data_to_pg import (WORLD_NATURAL_KEY, WORLD_STAGING_COLUMNS,
+                                     _iter_world_rows, _world_merge_sql)
+
+
+@pytest.mark.unit
+def test_rows_follow_staging_columns(tmp_path):
+    """CSV columns are mapped in staging order; blanks become NULL."""
+    csv_path = tmp_path / "worldcities.csv"
+    csv_path.write_text(
+        "city,lat,lng,country,sigla,elevation,population\n"
+        "Paris,48.86,2.35,France,FR,35,2100000\n"
+        "Nowhere,,,Atlantis,,,\n",
+        encoding="utf-8",
+    )
+
+    rows = list(_iter_world_rows(csv_path))
+
+    assert len(WORLD_STAGING_COLUMNS) == len(rows[0])
+    assert rows[0] == ["Paris", "France", "FR", "48.86", "2.35", "35"]
+    assert rows[1] == ["Nowhere", "Atlantis", None, None, None, None]
+
+
+@pytest.mark.unit
+def test_merge_keeps_indexes_and_upserts_on_natural_key():
+    """The merge is a plain upsert: no index DDL inside the load transaction."""
+    sql = _world_merge_sql(has_elevation=True)
+
+    assert f"ON CONFLICT ({WORLD_NATURAL_KEY}) DO UPDATE" in sql
+    assert "elevation_m = EXCLUDED.elevation_m" in sql
+    assert "INDEX" not in sql.upper()
+
+
+@pytest.mark.unit
+def test_merge_without_elevation_preserves_stored_value():
+    """A CSV without elevation keeps the elevation already in the table."""
+    sql = _world_merge_sql(has_elevation=False)
+
+    assert "elevation_m = world_locations.elevation_m" in sql
@@ -0,0 +1,153 @@
+"""
+Unit tests for memoized Dash layouts and the callback result cache
+Tests: layout reuse and invalidation, keyed callback outputs, PreventUpdate,
+Redis-shared outputs and global invalidation
+"""
+import pytest
+from dash.exceptions import PreventUpdate
+
+from frontend.utils.render_cache import CallbackCache, invalidate_layouts, memoize_layout
+
+
+@pytest.mark.unit
+def test_layout_memoized_per_language_until_invalidated():
+    """Layouts are built once per argument set and rebuilt after invalidation."""
+    builds = []
+
+    @memoize_layout
+    def page(lang="pt"):
+        builds.append(lang)
+        return {"lang": lang}
+
+    assert page("pt") is page("pt")
+    page("en")
+    assert builds == ["pt", "en"]
+
+    invalidate_layouts()
+    page("pt")
+    assert builds == ["pt", "en", "pt"]
+
+
+@pytest.mark.unit
+def test_layout_vary_by_extends_key():
+    """vary_by adds an extra key component (e.g. today's date)."""
+    day = ["2025-01-01"]
+    builds = []
+
+    @memoize_layout(vary_by=lambda: day[0])
+    def page():
+        builds.append(day[0])
+        return builds[-1]
+
+    page()
+    page()
+    day[0] = "2025-01-02"
+    assert page() == "2025-01-02"
+    assert builds == ["2025-01-01", "2025-01-02"]
+
+
+@pytest.mark.unit
+def test_callback_outputs_cached_by_inputs():
+    """Identical inputs reuse the output; invalidate() forces recomputation."""
+    cache = CallbackCache(maxsize=8, ttl=60, redis_url=None)
+    calls = []
+
+    @cache.memoize(namespace="sources")
+    def detect(location):
+        calls.append(location)
+        return {"nasa_power": {"available": True}}
+
+    detect({"lat": 1.0, "lon": 2.0})
+    detect({"lon": 2.0, "lat": 1.0})
+    detect({"lat": 3.0, "lon": 4.0})
+    assert len(calls) == 2
+
+    cache.invalidate("sources")
+    detect({"lat": 1.0, "lon": 2.0})
+    assert len(calls) == 3
+
+
+@pytest.mark.unit
+def test_prevent_update_not_cached():
+    """Exceptions such as PreventUpdate propagate and are never stored."""
+    cache = CallbackCache(maxsize=8, ttl=60, redis_url=None)
+    calls = []
+
+    @cache.memoize()
+    def callback(value):
+        calls.append(value)
+        raise PreventUpdate
+
+    for _ in range(2):
+        with pytest.raises(PreventUpdate):
+            callback(None)
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+class _FakeRedis:
+    """In-memory stand-in for the shared Redis client (get/mget/set/incr)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, *keys):
+        return [self.data.get(k) for k in keys]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+        return int(self.data[key])
+
+
+def _shared_caches(n):
+    """Caches in separate "processes" sharing one Redis."""
+    redis = _FakeRedis()
+    caches = []
+    for _ in range(n):
+        cache = CallbackCache(maxsize=8, ttl=60, redis_url="redis://fake")
+        cache._redis = redis
+        caches.append(cache)
+    return caches
+
+
+@pytest.mark.unit
+def test_redis_outputs_shared_between_processes():
+    """An output stored by one process is a hit in another."""
+    writer, reader = _shared_caches(2)
+    calls = []
+
+    def detect(location):
+        calls.append(location)
+        return {"location": location}
+
+    writer.memoize(namespace="sources")(detect)("a")
+    assert reader.memoize(namespace="sources")(detect)("a") == {"location": "a"}
+    assert calls == ["a"]
+
+
+@pytest.mark.unit
+def test_redis_global_invalidate_reaches_unseen_namespaces():
+    """invalidate(None) bumps the global generation, even for namespaces
+    the invalidating process never used."""
+    worker, admin = _shared_caches(2)
+    calls = []
+
+    @worker.memoize(namespace="sources")
+    def detect(location):
+        calls.append(location)
+        return len(calls)
+
+    detect("a")
+    key_before = worker.make_key("sources", ("a",), {})
+
+    admin.invalidate()
+
+    assert worker.make_key("sources", ("a",), {}) != key_before
+    assert key_before.startswith("dash_cb:0:sources:0:")
+    assert detect("a") == 2
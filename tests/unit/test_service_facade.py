@@ -0,0 +1,98 @@
+"""
+Unit tests for the Dash service facade
+Tests: in-process route calls, HTTPException mapping, timeouts, HTTP mode
+"""
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from frontend.utils import service_facade as facade_module
+from frontend.utils.service_facade import ServiceFacade
+
+
+@pytest.mark.unit
+def test_inprocess_returns_route_payload():
+    """Route coroutines run in-process and keep their response shape."""
+    async def handler(location_id):
+        return {"location_id": location_id, "exists": True}
+
+    resp = ServiceFacade(mode="inprocess")._call(handler, with_db=False, location_id=42)
+
+    assert resp.ok
+    assert resp.json() == {"location_id": 42, "exists": True}
+
+
+@pytest.mark.unit
+def test_inprocess_maps_http_exceptions():
+    """Route validation errors keep the HTTP status and detail."""
+    async def handler():
+        raise HTTPException(status_code=409, detail="Localização 42 já é favorita")
+
+    resp = ServiceFacade(mode="inprocess")._call(handler, with_db=False)
+
+    assert resp.status_code == 409
+    assert not resp.ok
+    assert resp.json() == {"detail": "Localização 42 já é favorita"}
+
+
+@pytest.mark.unit
+def test_inprocess_runs_in_calling_thread():
+    """Route bodies run in the Dash worker thread, not on the WebSocket loop."""
+    async def handler():
+        return {"thread": threading.get_ident()}
+
+    resp = ServiceFacade(mode="inprocess")._call(handler, with_db=False)
+
+    assert resp.json() == {"thread": threading.get_ident()}
+
+
+@pytest.mark.unit
+def test_inprocess_timeout_cancels_route(monkeypatch):
+    """A timed-out route coroutine is cancelled instead of left running."""
+    cancelled = []
+
+    async def handler():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    monkeypatch.setattr(facade_module, "REQUEST_TIMEOUT_SECONDS", 0.01)
+    resp = ServiceFacade(mode="inprocess")._call(handler, with_db=False)
+
+    assert resp.status_code == 504
+    assert cancelled == [True]
+
+
+@pytest.mark.unit
+def test_http_mode_uses_api_url(monkeypatch):
+    """Split deployments go through HTTP with the Session-ID header."""
+    calls = []
+
+    class FakeResponse:
+        status_code = 200
+
+        def json(self):
+            return {"removed": True}
+
+    def fake_request(method, url, headers=None, timeout=None, **kwargs):
+        calls.append((method, url, headers))
+        return FakeResponse()
+
+    monkeypatch.setattr(facade_module.requests, "request", fake_request)
+    facade = ServiceFacade(mode="http", api_url="http://api:8000/api/v1/")
+
+    resp = facade.remove_favorite(42, "sess_abc")
+
+    assert resp.ok and resp.json() == {"removed": True}
+    assert calls == [("DELETE", "http://api:8000/api/v1/favorites/42", {"Session-ID": "sess_abc"})]
+
+
+@pytest.mark.unit
+def test_invalid_mode_rejected():
+    """Unknown modes fail fast."""
+    with pytest.raises(ValueError):
+        ServiceFacade(mode="grpc")
@@ -0,0 +1,67 @@
+"""
+Unit tests for the multiplexed Dash WebSocket manager
+Tests: routing by task_id, bounded buffers, cleanup after completion
+"""
+import asyncio
+import json
+
+import pytest
+
+from frontend.utils.websocket_handler import (
+    MessageType,
+    WebSocketConnectionManager,
+    WebSocketMessage,
+)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """Manager whose subscriptions never open a real socket."""
+    async def no_subscribe(self, task_id):
+        return None
+
+    monkeypatch.setattr(WebSocketConnectionManager, "_subscribe", no_subscribe)
+    return WebSocketConnectionManager(buffer_size=3, completed_ttl=0.01)
+
+
+@pytest.mark.unit
+def test_backend_status_mapping():
+    """Backend status payloads map to the frontend message types."""
+    msg = WebSocketMessage.from_payload({"task_id": "a", "status": "FAILURE", "error": "x"})
+    assert msg.type == MessageType.ERROR
+    assert msg.data == {"status": "FAILURE", "error": "x"}
+
+    assert WebSocketMessage.from_payload({"status": "STARTED"}).type == MessageType.PROGRESS
+    assert WebSocketMessage.from_payload({"status": "SUCCESS"}).type == MessageType.SUCCESS
+
+
+@pytest.mark.unit
+def test_messages_routed_and_bounded(manager):
+    """Each task only sees its own messages, capped at the buffer size."""
+    received = []
+    manager.connect_sync("a", on_message=received.append)
+    manager.connect_sync("b")
+
+    for step in range(5):
+        manager._handle(json.dumps({"task_id": "a", "status": "PROGRESS", "step": step}))
+    manager._handle(json.dumps({"task_id": "unknown", "status": "PROGRESS"}))
+
+    assert [m.data["step"] for m in manager.get_messages("a")] == [2, 3, 4]
+    assert manager.get_messages("b") == []
+    assert len(received) == 5
+    assert manager.get_connection_stats()["total_messages"] == 5
+
+
+@pytest.mark.unit
+def test_completed_task_is_cleaned_up(manager):
+    """Final statuses stop the subscription and expire after the TTL."""
+    manager.connect_sync("a")
+
+    async def scenario():
+        manager._handle(json.dumps({"task_id": "a", "status": "SUCCESS", "result": []}))
+        assert manager.get_status("a") == "SUCCESS"
+        assert manager._active_task_ids() == []
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert manager.get_status("a") == "not_found"
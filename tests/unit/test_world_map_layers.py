@@ -0,0 +1,52 @@
+"""
+Unit tests for the world map GeoJSON layers
+Tests: layers fetched by URL, client-side clustering and JS styling
+"""
+import json
+
+import pytest
+from dash import html
+from plotly.utils import PlotlyJSONEncoder
+
+from frontend.components.world_map_tabs import _create_map_layers
+
+LAYER_CONFIG = {
+    "bands": [{"name": "low", "min_zoom": 0}, {"name": "mid", "min_zoom": 6}],
+    "layers": {
+        "br_uf": {"low": "/api/v1/map-layers/br_uf/low.geojson?v=a",
+                  "mid": "/api/v1/map-layers/br_uf/mid.geojson?v=b"},
+        "matopiba_cities": {"low": "/api/v1/map-layers/matopiba_cities/low.geojson?v=c",
+                            "mid": "/api/v1/map-layers/matopiba_cities/mid.geojson?v=d"},
+    },
+    "world_markers": "/api/v1/world-locations/markers.geojson",
+}
+
+
+def _layers_by_id(config):
+    return {getattr(layer, "id", None): layer for layer in _create_map_layers(config)}
+
+
+@pytest.mark.unit
+def test_layers_reference_urls_instead_of_inline_data():
+    """With URL config the layout carries no GeoJSON payload."""
+    layers = _layers_by_id(LAYER_CONFIG)
+
+    assert layers["brasil-layer"].url == LAYER_CONFIG["layers"]["br_uf"]["low"]
+    assert layers["world-locations-layer"].url == LAYER_CONFIG["world_markers"]
+    payload = json.dumps(html.Div(list(layers.values())).to_plotly_json(), cls=PlotlyJSONEncoder)
+    assert len(payload) < 20_000
+
+
+@pytest.mark.unit
+def test_city_layers_cluster_client_side():
+    """City layers are single clustered GeoJSON layers styled in JS."""
+    layers = _layers_by_id(LAYER_CONFIG)
+
+    for layer_id in ("matopiba-layer", "world-locations-layer"):
+        layer = layers[layer_id]
+        assert layer.cluster is True
+        assert layer.pointToLayer == {"variable": "dashExtensions.map.pointToLayer"}
+        assert layer.clusterToLayer == {"variable": "dashExtensions.map.clusterToLayer"}
+        assert layer.hideout["classes"]
+
+    assert layers["dynamic-markers"].data == {"type": "FeatureCollection", "features": []}
@@ -7,6 +7,8 @@ Funcionalidades:
 - Reconexão automática com backoff exponencial
 - Gerenciamento de estado da conexão
 - Callbacks para diferentes tipos de eventos
+- Um único event loop em background por processo
+  (``get_background_loop``) compartilhado por todas as conexões
 
 Localizado na raiz (utils/) por ser um utilitário compartilhado entre
 frontend e backend.
@@ -15,6 +17,8 @@ frontend e backend.
 import asyncio
 import json
 import logging
+import threading
+from concurrent.futures import Future
 from datetime import datetime
 from enum import Enum
 from typing import Any, Callable, Dict, Optional
@@ -367,6 +371,40 @@ class WebSocketClient:
         }
 
 
+# ============================================================================
+# EVENT LOOP COMPARTILHADO
+# ============================================================================
+
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Event loop único do processo, executado em uma thread daemon.
+
+    Todas as conexões WebSocket do Dash (callbacks síncronos) agendam suas
+    corrotinas nele via ``run_coroutine_threadsafe``: o número de threads
+    não cresce com o número de tarefas acompanhadas.
+    """
+    global _background_loop
+
+    with _background_lock:
+        if _background_loop is None or _background_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, daemon=True, name="WS-event-loop"
+            )
+            thread.start()
+            _background_loop = loop
+        return _background_loop
+
+
+def run_in_background(coroutine) -> Future:
+    """Agenda uma corrotina no loop compartilhado (thread-safe)."""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_background_loop())
+
+
 # ============================================================================
 # HELPERS PARA USO EM DASH
 # ============================================================================
@@ -380,18 +418,11 @@ class DashWebSocketManager:
     """
     
     _connections: Dict[str, WebSocketClient] = {}
-    _event_loop: Optional[asyncio.AbstractEventLoop] = None
     
     @classmethod
     def get_event_loop(cls) -> asyncio.AbstractEventLoop:
-        """Obtém ou cria event loop para async operations."""
-        if cls._event_loop is None or cls._event_loop.is_closed():
-            try:
-                cls._event_loop = asyncio.get_event_loop()
-            except RuntimeError:
-                cls._event_loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(cls._event_loop)
-        return cls._event_loop
+        """Event loop compartilhado do processo (ver ``get_background_loop``)."""
+        return get_background_loop()
     
     @classmethod
     def create_connection(
@@ -427,8 +458,7 @@ class DashWebSocketManager:
     @classmethod
     def remove_connection(cls, task_id: str) -> None:
         """Remove conexão."""
-        if task_id in cls._connections:
-            del cls._connections[task_id]
+        cls._connections.pop(task_id, None)
     
     @classmethod
     async def connect_async(cls, task_id: str) -> bool:
@@ -449,33 +479,22 @@ class DashWebSocketManager:
         return await client.connect()
     
     @classmethod
-    def connect_sync(cls, task_id: str) -> bool:
+    def connect_sync(cls, task_id: str) -> Future:
         """
-        Conecta um cliente WebSocket de forma síncrona (wrapper para Dash).
+        Conecta um cliente WebSocket sem bloquear (wrapper para Dash).
+        
+        A conexão roda no loop compartilhado e é removida do gerenciador
+        quando termina (sucesso, erro ou desistência).
         
         Args:
             task_id: ID da tarefa
             
         Returns:
-            bool: True se conectado com sucesso
+            Future: resolvida com True/False ao fim da conexão
         """
-        try:
-            loop = cls.get_event_loop()
-            if loop.is_running():
-                # Se loop já está rodando, fazer não-bloqueante
-                future = asyncio.ensure_future(
-                    cls.connect_async(task_id),
-                    loop=loop
-                )
-                return future
-            else:
-                # Se não está rodando, usar run_until_complete
-                return loop.run_until_complete(
-                    cls.connect_async(task_id)
-                )
-        except Exception as e:
-            logger.error(f"Erro ao conectar sincronamente: {e}")
-            return False
+        future = run_in_background(cls.connect_async(task_id))
+        future.add_done_callback(lambda _: cls.remove_connection(task_id))
+        return future
 
 
 __all__ = [
@@ -483,4 +502,6 @@ __all__ = [
     "WebSocketMessage",
     "MessageType",
     "DashWebSocketManager",
+    "get_background_loop",
+    "run_in_background",
 ]